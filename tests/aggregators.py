@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the knowledge base record aggregator."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from winregrc import aggregators
+from winregrc import knownfolders
+from winregrc import sam
+
+from tests import test_lib as shared_test_lib
+
+
+class TestKnowledgeBaseRecordAggregator(
+    aggregators.KnowledgeBaseRecordAggregator):
+  """Knowledge base record aggregator for testing."""
+
+  _RECORDS_PER_SOURCE = {
+      'source1': [
+          ('{00000000-0000-0000-0000-000000000001}', 'Documents'),
+          ('{00000000-0000-0000-0000-000000000002}', None)],
+      'source2': [
+          ('{00000000-0000-0000-0000-000000000001}', 'My Documents'),
+          ('{00000000-0000-0000-0000-000000000002}', 'Music')],
+      'source3': [
+          ('{00000000-0000-0000-0000-000000000001}', 'My Documents'),
+          ('{00000000-0000-0000-0000-000000000003}', 'Pictures')]}
+
+  def _ScanSource(self, source_path):
+    """Scans a source for records.
+
+    Args:
+      source_path (str): path of the source.
+
+    Returns:
+      list[object]: records or None if the source could not be scanned.
+    """
+    records = self._RECORDS_PER_SOURCE.get(source_path, None)
+    if records is None:
+      return None
+
+    return [
+        knownfolders.KnownFolder(identifier, display_name, None)
+        for identifier, display_name in records]
+
+
+class TestUserAccountsCollector(object):
+  """User accounts collector for testing."""
+
+  def __init__(self, debug=False):
+    """Initializes an user accounts collector for testing.
+
+    Args:
+      debug (Optional[bool]): True if debug information should be printed.
+    """
+    super(TestUserAccountsCollector, self).__init__()
+    self._debug = debug
+
+  def Collect(self, registry):
+    """Collects the user accounts as records with an identifier.
+
+    Args:
+      registry (dfwinreg.WinRegistry): Windows Registry.
+
+    Yields:
+      KnownFolder: record with the relative identifier (RID) as identifier
+          and the username as display name.
+    """
+    collector_object = sam.SecurityAccountManagerCollector(debug=self._debug)
+    for user_account in collector_object.Collect(registry):
+      yield knownfolders.KnownFolder(
+          f'{user_account.rid:d}', user_account.username, None)
+
+
+class SourceRecordsCacheTest(shared_test_lib.BaseTestCase):
+  """Tests for the source records cache."""
+
+  # pylint: disable=protected-access
+
+  def testGetAndSetRecords(self):
+    """Tests the GetRecords and SetRecords functions."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      cache_path = os.path.join(temporary_directory, 'cache')
+      source_path = os.path.join(temporary_directory, 'SOFTWARE')
+
+      with open(source_path, 'wb') as file_object:
+        file_object.write(b'regf')
+
+      cache = aggregators.SourceRecordsCache(cache_path)
+
+      records = cache.GetRecords(
+          source_path, knownfolders.KnownFoldersCollector)
+      self.assertIsNone(records)
+
+      known_folder = knownfolders.KnownFolder(
+          '{00000000-0000-0000-0000-000000000001}', 'Documents', None)
+      known_folder.alternate_display_names.append('My Documents')
+
+      cache.SetRecords(
+          source_path, knownfolders.KnownFoldersCollector, [known_folder])
+
+      records = cache.GetRecords(
+          source_path, knownfolders.KnownFoldersCollector)
+      self.assertEqual(len(records), 1)
+
+      known_folder = records[0]
+      self.assertIsInstance(known_folder, knownfolders.KnownFolder)
+      self.assertEqual(
+          known_folder.identifier, '{00000000-0000-0000-0000-000000000001}')
+      self.assertEqual(known_folder.display_name, 'Documents')
+      self.assertEqual(known_folder.alternate_display_names, ['My Documents'])
+      self.assertIsNone(known_folder.localized_display_name)
+
+      # Test that the cached records are not used for another collector.
+      records = cache.GetRecords(
+          source_path, aggregators.KnowledgeBaseRecordAggregator)
+      self.assertIsNone(records)
+
+      # Test that the cached records are not used for a changed source.
+      with open(source_path, 'ab') as file_object:
+        file_object.write(b'\x00')
+
+      records = cache.GetRecords(
+          source_path, knownfolders.KnownFoldersCollector)
+      self.assertIsNone(records)
+
+  def testSetRecordsWithError(self):
+    """Tests the SetRecords function when the cache file cannot be written."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      cache_path = os.path.join(temporary_directory, 'cache')
+      source_path = os.path.join(temporary_directory, 'SOFTWARE')
+
+      with open(source_path, 'wb') as file_object:
+        file_object.write(b'regf')
+
+      cache = aggregators.SourceRecordsCache(cache_path)
+
+      # A directory cannot be replaced by the temporary file.
+      cache_file_path = cache._GetCacheFilePath(
+          source_path, knownfolders.KnownFoldersCollector)
+      os.makedirs(cache_file_path)
+
+      known_folder = knownfolders.KnownFolder(
+          '{00000000-0000-0000-0000-000000000001}', 'Documents', None)
+
+      cache.SetRecords(
+          source_path, knownfolders.KnownFoldersCollector, [known_folder])
+
+      filenames = os.listdir(cache_path)
+      self.assertEqual(filenames, [os.path.basename(cache_file_path)])
+
+  def testSetRecordsWithDirectory(self):
+    """Tests the SetRecords function with a directory as source."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      cache_path = os.path.join(temporary_directory, 'cache')
+
+      cache = aggregators.SourceRecordsCache(cache_path)
+
+      known_folder = knownfolders.KnownFolder(
+          '{00000000-0000-0000-0000-000000000001}', 'Documents', None)
+
+      cache.SetRecords(
+          temporary_directory, knownfolders.KnownFoldersCollector,
+          [known_folder])
+
+      records = cache.GetRecords(
+          temporary_directory, knownfolders.KnownFoldersCollector)
+      self.assertIsNone(records)
+      self.assertFalse(os.path.exists(cache_path))
+
+
+class KnowledgeBaseRecordAggregatorTest(shared_test_lib.BaseTestCase):
+  """Tests for the knowledge base record aggregator."""
+
+  _SOURCE_DEFINITIONS = [
+      {'source': 'source1', 'windows_version': 'Windows XP'},
+      {'source': 'bogus', 'windows_version': 'Windows 2000'},
+      {'source': 'source2', 'windows_version': 'Windows 7'},
+      {'source': 'source3', 'windows_version': 'Windows 7'}]
+
+  def _TestAggregate(self, number_of_workers):
+    """Tests the Aggregate function.
+
+    Args:
+      number_of_workers (int): maximum number of sources to collect records
+          from concurrently.
+    """
+    aggregator = TestKnowledgeBaseRecordAggregator(
+        knownfolders.KnownFoldersCollector, 'display_name',
+        'alternate_display_names', number_of_workers=number_of_workers)
+
+    aggregated_records = aggregator.Aggregate(self._SOURCE_DEFINITIONS)
+    self.assertEqual(len(aggregated_records), 3)
+
+    aggregated_record = aggregated_records[0]
+    self.assertEqual(
+        aggregated_record.record.identifier,
+        '{00000000-0000-0000-0000-000000000001}')
+    self.assertEqual(aggregated_record.record.display_name, 'Documents')
+    self.assertEqual(
+        aggregated_record.record.alternate_display_names, ['My Documents'])
+    self.assertEqual(
+        aggregated_record.windows_versions, ['Windows XP', 'Windows 7'])
+
+    aggregated_record = aggregated_records[1]
+    self.assertEqual(aggregated_record.record.display_name, 'Music')
+    self.assertEqual(aggregated_record.record.alternate_display_names, [])
+
+    aggregated_record = aggregated_records[2]
+    self.assertEqual(aggregated_record.record.display_name, 'Pictures')
+    self.assertEqual(aggregated_record.windows_versions, ['Windows 7'])
+
+  def testAggregate(self):
+    """Tests the Aggregate function."""
+    self._TestAggregate(1)
+
+  def testAggregateWithWorkers(self):
+    """Tests the Aggregate function with multiple workers."""
+    self._TestAggregate(4)
+
+  def testAggregateWithWorkersAndSources(self):
+    """Tests the Aggregate function with multiple workers and sources."""
+    test_path = self._GetTestFilePath(['SAM'])
+    self._SkipIfPathNotExists(test_path)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      config_path = os.path.join(
+          temporary_directory, 'Windows', 'System32', 'config')
+      os.makedirs(config_path)
+      shutil.copy(test_path, os.path.join(config_path, 'SAM'))
+
+      source_definitions = [
+          {'source': test_path, 'windows_version': 'Windows XP'},
+          {'source': temporary_directory, 'windows_version': 'Windows 7'}]
+
+      aggregator = aggregators.KnowledgeBaseRecordAggregator(
+          TestUserAccountsCollector, 'display_name',
+          'alternate_display_names', number_of_workers=2)
+
+      aggregated_records = aggregator.Aggregate(source_definitions)
+      self.assertNotEqual(aggregated_records, [])
+
+      aggregated_record_per_identifier = {
+          aggregated_record.record.identifier: aggregated_record
+          for aggregated_record in aggregated_records}
+
+      aggregated_record = aggregated_record_per_identifier.get('500', None)
+      self.assertIsNotNone(aggregated_record)
+      self.assertEqual(aggregated_record.record.display_name, 'Administrator')
+      self.assertEqual(
+          aggregated_record.windows_versions, ['Windows XP', 'Windows 7'])
+
+  def testAggregateWithNormalizeFunction(self):
+    """Tests the Aggregate function with a normalize function."""
+    def _NormalizeKnownFolder(known_folder):
+      if known_folder.display_name:
+        known_folder.display_name = known_folder.display_name.upper()
+
+    aggregator = TestKnowledgeBaseRecordAggregator(
+        knownfolders.KnownFoldersCollector, 'display_name',
+        'alternate_display_names', normalize_function=_NormalizeKnownFolder)
+
+    aggregated_records = aggregator.Aggregate(self._SOURCE_DEFINITIONS)
+    self.assertEqual(len(aggregated_records), 3)
+
+    aggregated_record = aggregated_records[0]
+    self.assertEqual(aggregated_record.record.display_name, 'DOCUMENTS')
+    self.assertEqual(
+        aggregated_record.record.alternate_display_names, ['MY DOCUMENTS'])
+
+  def testAggregateWithCache(self):
+    """Tests the Aggregate function with a cache."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      source_path = os.path.join(temporary_directory, 'SOFTWARE')
+
+      with open(source_path, 'wb') as file_object:
+        file_object.write(b'regf')
+
+      cache = aggregators.SourceRecordsCache(
+          os.path.join(temporary_directory, 'cache'))
+
+      known_folder = knownfolders.KnownFolder(
+          '{00000000-0000-0000-0000-000000000004}', 'Videos', None)
+      cache.SetRecords(
+          source_path, knownfolders.KnownFoldersCollector, [known_folder])
+
+      aggregator = TestKnowledgeBaseRecordAggregator(
+          knownfolders.KnownFoldersCollector, 'display_name',
+          'alternate_display_names', cache=cache)
+
+      source_definitions = list(self._SOURCE_DEFINITIONS)
+      source_definitions.append(
+          {'source': source_path, 'windows_version': 'Windows 10'})
+
+      aggregated_records = aggregator.Aggregate(source_definitions)
+      self.assertEqual(len(aggregated_records), 4)
+
+      aggregated_record = aggregated_records[3]
+      self.assertEqual(aggregated_record.record.display_name, 'Videos')
+      self.assertEqual(aggregated_record.windows_versions, ['Windows 10'])
+
+  def testAggregateEmpty(self):
+    """Tests the Aggregate function without sources."""
+    aggregator = TestKnowledgeBaseRecordAggregator(
+        knownfolders.KnownFoldersCollector, 'display_name',
+        'alternate_display_names')
+
+    aggregated_records = aggregator.Aggregate([])
+    self.assertEqual(len(aggregated_records), 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the asyncio facade of Windows Registry collectors."""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+import unittest
+
+from dfwinreg import registry as dfwinreg_registry
+
+from winregrc import async_collectors
+
+from tests import test_lib as shared_test_lib
+
+
+class TestCollector(object):
+  """Collector for testing.
+
+  Attributes:
+    closed (bool): True if the records generator was closed before all
+        records were collected.
+    maximum_number_of_tasks (int): maximum number of collectors that ran
+        concurrently.
+  """
+
+  def __init__(self, number_of_records, delay=0.0):
+    """Initializes a collector for testing.
+
+    Args:
+      number_of_records (int): number of records to collect.
+      delay (Optional[float]): time in seconds it takes to collect a record.
+    """
+    super(TestCollector, self).__init__()
+    self._delay = delay
+    self._lock = threading.Lock()
+    self._number_of_records = number_of_records
+    self._number_of_tasks = 0
+    self.closed = False
+    self.maximum_number_of_tasks = 0
+
+  def Collect(self, registry):  # pylint: disable=unused-argument
+    """Collects records.
+
+    Args:
+      registry (dfwinreg.WinRegistry): Windows Registry.
+
+    Yields:
+      int: record.
+    """
+    with self._lock:
+      self._number_of_tasks += 1
+      self.maximum_number_of_tasks = max(
+          self.maximum_number_of_tasks, self._number_of_tasks)
+
+    try:
+      for record in range(self._number_of_records):
+        if self._delay:
+          time.sleep(self._delay)
+        yield record
+
+    except GeneratorExit:
+      self.closed = True
+      raise
+
+    finally:
+      with self._lock:
+        self._number_of_tasks -= 1
+
+
+class AsyncCollectorFacadeTest(shared_test_lib.BaseTestCase):
+  """Tests for the asyncio facade of Windows Registry collectors."""
+
+  async def _CollectRecords(self, facade, collector_object, registry):
+    """Collects records.
+
+    Args:
+      facade (AsyncCollectorFacade): asyncio facade.
+      collector_object (TestCollector): collector.
+      registry (dfwinreg.WinRegistry): Windows Registry.
+
+    Returns:
+      list[int]: records.
+    """
+    return [record async for record in facade.Collect(
+        collector_object.Collect, registry)]
+
+  def testCollect(self):
+    """Tests the Collect function."""
+    registry = dfwinreg_registry.WinRegistry()
+    collector_object = TestCollector(200)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+      facade = async_collectors.AsyncCollectorFacade(executor=executor)
+
+      records = asyncio.run(
+          self._CollectRecords(facade, collector_object, registry))
+
+    self.assertEqual(records, list(range(200)))
+    self.assertFalse(collector_object.closed)
+
+  def testCollectCancel(self):
+    """Tests the Collect function with cancellation."""
+    registry = dfwinreg_registry.WinRegistry()
+    collector_object = TestCollector(1000, delay=0.005)
+
+    facade = async_collectors.AsyncCollectorFacade()
+
+    async def _CancelCollect():
+      task = asyncio.create_task(
+          self._CollectRecords(facade, collector_object, registry))
+      await asyncio.sleep(0.1)
+      task.cancel()
+
+      with self.assertRaises(asyncio.CancelledError):
+        await task
+
+    asyncio.run(_CancelCollect())
+
+    self.assertTrue(collector_object.closed)
+
+  def testCollectPerSourceLimit(self):
+    """Tests the Collect function with a maximum number of tasks per source."""
+    registry = dfwinreg_registry.WinRegistry()
+
+    async def _CollectConcurrently(facade, collector_object):
+      return await asyncio.gather(*[
+          self._CollectRecords(facade, collector_object, registry)
+          for _ in range(4)])
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+      for maximum_number_of_tasks_per_source in (1, 2):
+        collector_object = TestCollector(10, delay=0.001)
+        facade = async_collectors.AsyncCollectorFacade(
+            executor=executor, maximum_number_of_tasks_per_source=(
+                maximum_number_of_tasks_per_source))
+
+        results = asyncio.run(_CollectConcurrently(facade, collector_object))
+
+        self.assertEqual(results, [list(range(10))] * 4)
+        self.assertLessEqual(
+            collector_object.maximum_number_of_tasks,
+            maximum_number_of_tasks_per_source)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the boot key provider."""
+
+import unittest
+
+from dfwinreg import fake as dfwinreg_fake
+from dfwinreg import registry as dfwinreg_registry
+
+from winregrc import boot_keys
+
+from tests import test_lib
+
+
+class BootKeyProviderTest(test_lib.BaseTestCase):
+  """Tests for the boot key provider."""
+
+  # pylint: disable=protected-access
+
+  def _CreateTestRegistry(self, data_class_name='902a3f2c'):
+    """Creates Registry keys and values for testing.
+
+    Args:
+      data_class_name (Optional[str]): class name of the Data subkey.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry for testing.
+    """
+    key_path_prefix = 'HKEY_LOCAL_MACHINE\\System'
+
+    registry_file = dfwinreg_fake.FakeWinRegistryFile(
+        key_path_prefix=key_path_prefix)
+
+    for key_name, class_name in (
+        ('Data', data_class_name), ('GBG', 'c0d054a4'), ('JD', '1ae33251'),
+        ('Skew1', 'be6a589c')):
+      registry_key = dfwinreg_fake.FakeWinRegistryKey(
+          key_name, class_name=class_name)
+      registry_file.AddKeyByPath(
+          '\\CurrentControlSet\\Control\\Lsa', registry_key)
+
+    registry_file.Open(None)
+
+    registry = dfwinreg_registry.WinRegistry()
+    registry.MapFile(key_path_prefix, registry_file)
+    return registry
+
+  def testGetClassNames(self):
+    """Tests the _GetClassNames function."""
+    registry = self._CreateTestRegistry()
+
+    boot_key_provider = boot_keys.BootKeyProvider()
+
+    class_names = boot_key_provider._GetClassNames(registry)
+    self.assertEqual(class_names, '1ae33251be6a589cc0d054a4902a3f2c')
+
+  def testGetBootKey(self):
+    """Tests the GetBootKey function."""
+    registry = self._CreateTestRegistry()
+
+    boot_key_provider = boot_keys.BootKeyProvider()
+
+    boot_key = boot_key_provider.GetBootKey(registry)
+    self.assertEqual(boot_key, b'\xc0j\xbe2\xa4\xd0*Q\x1aX\xe3\x90?T,\x9c')
+
+    # Test that the boot key is cached per class names.
+    other_registry = self._CreateTestRegistry()
+
+    boot_key = boot_key_provider.GetBootKey(other_registry)
+    self.assertEqual(boot_key, b'\xc0j\xbe2\xa4\xd0*Q\x1aX\xe3\x90?T,\x9c')
+    self.assertEqual(len(boot_key_provider._boot_keys_per_class_names), 1)
+    self.assertEqual(len(boot_key_provider._boot_keys_per_registry), 2)
+
+    boot_key_provider.Empty()
+    self.assertEqual(len(boot_key_provider._boot_keys_per_class_names), 0)
+
+  def testGetBootKeyEmpty(self):
+    """Tests the GetBootKey function on an empty Registry."""
+    registry = dfwinreg_registry.WinRegistry()
+
+    boot_key_provider = boot_keys.BootKeyProvider()
+
+    boot_key = boot_key_provider.GetBootKey(registry)
+    self.assertIsNone(boot_key)
+
+  def testGetBootKeyWithMaximumNumberOfBootKeys(self):
+    """Tests the GetBootKey function with a maximum number of boot keys."""
+    boot_key_provider = boot_keys.BootKeyProvider(
+        maximum_number_of_boot_keys=1)
+
+    registry = self._CreateTestRegistry()
+    boot_key = boot_key_provider.GetBootKey(registry)
+    self.assertIsNotNone(boot_key)
+
+    other_registry = self._CreateTestRegistry(data_class_name='902a3f2d')
+    other_boot_key = boot_key_provider.GetBootKey(other_registry)
+    self.assertIsNotNone(other_boot_key)
+    self.assertNotEqual(other_boot_key, boot_key)
+
+    self.assertEqual(
+        list(boot_key_provider._boot_keys_per_class_names.values()),
+        [other_boot_key])
+
+
+if __name__ == '__main__':
+  unittest.main()
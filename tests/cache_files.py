@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the functions to write cache files."""
+
+import os
+import tempfile
+import unittest
+
+from winregrc import cache_files
+
+from tests import test_lib as shared_test_lib
+
+
+class WriteCacheFileTest(shared_test_lib.BaseTestCase):
+  """Tests for the WriteCacheFile function."""
+
+  def testWriteCacheFile(self):
+    """Tests the WriteCacheFile function."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      path = os.path.join(temporary_directory, 'cache', 'test.json')
+
+      cache_files.WriteCacheFile(path, b'{}')
+      cache_files.WriteCacheFile(path, b'[]')
+
+      with open(path, 'rb') as file_object:
+        data = file_object.read()
+
+      self.assertEqual(data, b'[]')
+
+      filenames = os.listdir(os.path.dirname(path))
+      self.assertEqual(filenames, ['test.json'])
+
+  def testWriteCacheFileWithError(self):
+    """Tests the WriteCacheFile function when the file cannot be written."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      # A directory cannot be replaced by the temporary file.
+      path = os.path.join(temporary_directory, 'test.json')
+      os.mkdir(path)
+
+      with self.assertRaises(OSError):
+        cache_files.WriteCacheFile(path, b'{}')
+
+      filenames = os.listdir(temporary_directory)
+      self.assertEqual(filenames, ['test.json'])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -37,6 +37,53 @@ class TestOutputWriter(output_writers.StdoutOutputWriter):
     self.cached_entries.append(cached_entry)
 
 
+class KeyMaterialCacheTest(test_lib.BaseTestCase):
+  """Tests for the key material cache."""
+
+  def testGetAndSetLSAKey(self):
+    """Tests the GetLSAKey and SetLSAKey functions."""
+    key_material_cache = cached_credentials.KeyMaterialCache()
+
+    lsa_key = key_material_cache.GetLSAKey(b'boot key', b'data')
+    self.assertIsNone(lsa_key)
+
+    key_material_cache.SetLSAKey(b'boot key', b'data', b'LSA key')
+
+    lsa_key = key_material_cache.GetLSAKey(b'boot key', b'data')
+    self.assertEqual(lsa_key, b'LSA key')
+
+    lsa_key = key_material_cache.GetLSAKey(b'boot key', b'other data')
+    self.assertIsNone(lsa_key)
+
+    key_material_cache.Empty()
+
+    lsa_key = key_material_cache.GetLSAKey(b'boot key', b'data')
+    self.assertIsNone(lsa_key)
+
+  def testMaximumNumberOfKeys(self):
+    """Tests that the number of cached keys is bounded."""
+    key_material_cache = cached_credentials.KeyMaterialCache(
+        maximum_number_of_keys=2)
+
+    key_material_cache.SetNLKey(b'LSA key', b'data1', b'NL key1')
+    key_material_cache.SetNLKey(b'LSA key', b'data2', b'NL key2')
+
+    # Retrieving the first key makes the second key the least recently used.
+    nl_key = key_material_cache.GetNLKey(b'LSA key', b'data1')
+    self.assertEqual(nl_key, b'NL key1')
+
+    key_material_cache.SetNLKey(b'LSA key', b'data3', b'NL key3')
+
+    nl_key = key_material_cache.GetNLKey(b'LSA key', b'data1')
+    self.assertEqual(nl_key, b'NL key1')
+
+    nl_key = key_material_cache.GetNLKey(b'LSA key', b'data2')
+    self.assertIsNone(nl_key)
+
+    nl_key = key_material_cache.GetNLKey(b'LSA key', b'data3')
+    self.assertEqual(nl_key, b'NL key3')
+
+
 class CachedCredentialsKeyCollectorTest(test_lib.BaseTestCase):
   """Tests for the Application Compatibility Cache collector."""
 
@@ -124,20 +171,13 @@ class CachedCredentialsKeyCollectorTest(test_lib.BaseTestCase):
 
     return registry
 
-  def testGetBootKey(self):
-    """Tests the _GetBootKey function."""
-    registry = self._CreateTestRegistry()
-
-    collector_object = cached_credentials.CachedCredentialsKeyCollector()
-
-    boot_key = collector_object._GetBootKey(registry)
-    self.assertEqual(boot_key, b'\xc0j\xbe2\xa4\xd0*Q\x1aX\xe3\x90?T,\x9c')
-
   def testGetLSAKey(self):
     """Tests the _GetLSAKey function."""
     registry = self._CreateTestRegistry()
 
-    collector_object = cached_credentials.CachedCredentialsKeyCollector()
+    key_material_cache = cached_credentials.KeyMaterialCache()
+    collector_object = cached_credentials.CachedCredentialsKeyCollector(
+        key_material_cache=key_material_cache)
 
     lsa_key = collector_object._GetLSAKey(
         registry, b'\xc0j\xbe2\xa4\xd0*Q\x1aX\xe3\x90?T,\x9c')
@@ -147,7 +187,9 @@ class CachedCredentialsKeyCollectorTest(test_lib.BaseTestCase):
     """Tests the _GetNLKey function."""
     registry = self._CreateTestRegistry()
 
-    collector_object = cached_credentials.CachedCredentialsKeyCollector()
+    key_material_cache = cached_credentials.KeyMaterialCache()
+    collector_object = cached_credentials.CachedCredentialsKeyCollector(
+        key_material_cache=key_material_cache)
 
     expected_nl_key = (
         b'\t\xfeDH\x1b5s\xb7;\x1d\xfc\xf7H\x9f\xc9`;`}\xcfb5P\xfd\xb5\xd8\x8f!u'
@@ -158,6 +200,21 @@ class CachedCredentialsKeyCollectorTest(test_lib.BaseTestCase):
         registry, b'\x01\xd6]\xf4C\xaa\n\x86\xd9B\xd1\x174\xcef|')
     self.assertEqual(nl_key, expected_nl_key)
 
+  def testGetNLKeyWithKeyMaterialCache(self):
+    """Tests the _GetNLKey function with a key material cache."""
+    registry = self._CreateTestRegistry()
+
+    lsa_key = b'\x01\xd6]\xf4C\xaa\n\x86\xd9B\xd1\x174\xcef|'
+
+    key_material_cache = cached_credentials.KeyMaterialCache()
+    key_material_cache.SetNLKey(lsa_key, self._NL_KEY_MATERIAL_DATA, b'NL key')
+
+    collector_object = cached_credentials.CachedCredentialsKeyCollector(
+        key_material_cache=key_material_cache)
+
+    nl_key = collector_object._GetNLKey(registry, lsa_key)
+    self.assertEqual(nl_key, b'NL key')
+
   def testCollect(self):
     """Tests the Collect function."""
     registry = self._CreateTestRegistry()
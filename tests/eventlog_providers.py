@@ -4,6 +4,8 @@
 
 import unittest
 
+from dfwinreg import definitions as dfwinreg_definitions
+from dfwinreg import fake as dfwinreg_fake
 from dfwinreg import regf as dfwinreg_regf
 from dfwinreg import registry as dfwinreg_registry
 
@@ -15,6 +17,46 @@ from tests import test_lib as shared_test_lib
 class EventLogProvidersCollectorTest(shared_test_lib.BaseTestCase):
   """Tests for the Windows Event Log providers collector."""
 
+  def _CreateTestRegistry(self):
+    """Creates Registry keys and values for testing.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry for testing.
+    """
+    key_path_prefix = 'HKEY_LOCAL_MACHINE\\System'
+
+    registry_file = dfwinreg_fake.FakeWinRegistryFile(
+        key_path_prefix=key_path_prefix)
+
+    for control_set_name, log_type, message_file in (
+        ('ControlSet001', 'Application', '%SystemRoot%\\System32\\test.dll'),
+        ('ControlSet002', 'Application', '%SystemRoot%\\system32\\TEST.dll'),
+        ('ControlSet002', 'System', '%SystemRoot%\\System32\\other.dll')):
+      key_path = '\\'.join([
+          '', control_set_name, 'Services', 'EventLog', log_type])
+
+      registry_key = registry_file.GetKeyByPath(key_path)
+      if not registry_key:
+        registry_key = dfwinreg_fake.FakeWinRegistryKey(log_type)
+        registry_file.AddKeyByPath(
+            '\\'.join(['', control_set_name, 'Services', 'EventLog']),
+            registry_key)
+
+      subkey = dfwinreg_fake.FakeWinRegistryKey('Test')
+      registry_key.AddSubkey('Test', subkey)
+
+      value_data = message_file.encode('utf-16-le')
+      registry_value = dfwinreg_fake.FakeWinRegistryValue(
+          'EventMessageFile', data=value_data,
+          data_type=dfwinreg_definitions.REG_EXPAND_SZ)
+      subkey.AddValue(registry_value)
+
+    registry_file.Open(None)
+
+    registry = dfwinreg_registry.WinRegistry()
+    registry.MapFile(key_path_prefix, registry_file)
+    return registry
+
   def testCollect(self):
     """Tests the Collect function."""
     software_test_path = self._GetTestFilePath(['SOFTWARE'])
@@ -60,6 +102,23 @@ class EventLogProvidersCollectorTest(shared_test_lib.BaseTestCase):
         set(['C:\\Windows\\System32\\mscoree.dll']))
     self.assertEqual(eventlog_provider.parameter_message_files, set())
 
+  def testCollectAllControlSets(self):
+    """Tests the Collect function with all control sets."""
+    registry = self._CreateTestRegistry()
+
+    collector_object = eventlog_providers.EventLogProvidersCollector()
+
+    test_results = list(collector_object.Collect(
+        registry, all_control_sets=True))
+    self.assertEqual(len(test_results), 1)
+
+    eventlog_provider = test_results[0]
+    self.assertEqual(eventlog_provider.log_sources, ['Test'])
+    self.assertEqual(eventlog_provider.log_types, ['Application', 'System'])
+    self.assertEqual(eventlog_provider.event_message_files, set([
+        '%SystemRoot%\\System32\\other.dll',
+        '%SystemRoot%\\System32\\test.dll']))
+
   def testCollectEmpty(self):
     """Tests the Collect function on an empty Registry."""
     registry = dfwinreg_registry.WinRegistry()
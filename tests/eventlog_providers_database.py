@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the Windows Event Log providers lookup database."""
+
+import os
+import tempfile
+import unittest
+
+from winregrc import eventlog_providers
+from winregrc import eventlog_providers_database
+
+from tests import test_lib as shared_test_lib
+
+
+class EventLogProvidersDatabaseTest(shared_test_lib.BaseTestCase):
+  """Tests for the Windows Event Log providers lookup database."""
+
+  def _WriteTestDatabase(self, path):
+    """Writes a database for testing.
+
+    Args:
+      path (str): path of the database file.
+    """
+    event_log_provider = eventlog_providers.EventLogProvider()
+    event_log_provider.identifier = '{9e3b3947-ca5d-4614-91a2-7b624e0e7244}'
+    event_log_provider.name = 'Microsoft-Windows-Test'
+    event_log_provider.log_sources = ['Test']
+    event_log_provider.log_types = ['Application', 'System']
+    event_log_provider.event_message_files = set([
+        '%SystemRoot%\\System32\\test.dll'])
+
+    test_database = eventlog_providers_database.EventLogProvidersDatabase()
+    test_database.Open(path, read_only=False)
+    test_database.WriteEventLogProvider(event_log_provider)
+
+    event_log_provider = eventlog_providers.EventLogProvider()
+    event_log_provider.log_sources = ['Other']
+    event_log_provider.log_types = ['Application']
+
+    test_database.WriteEventLogProvider(event_log_provider)
+    test_database.Close()
+
+  def testGetEventLogProviders(self):
+    """Tests the GetEventLogProvidersBy* functions."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      path = os.path.join(temporary_directory, 'providers.db')
+      self._WriteTestDatabase(path)
+
+      test_database = eventlog_providers_database.EventLogProvidersDatabase()
+      test_database.Open(path)
+
+      try:
+        event_log_providers = test_database.GetEventLogProvidersByIdentifier(
+            '{9E3B3947-CA5D-4614-91A2-7B624E0E7244}')
+        self.assertEqual(len(event_log_providers), 1)
+
+        event_log_provider = event_log_providers[0]
+        self.assertEqual(event_log_provider.name, 'Microsoft-Windows-Test')
+        self.assertEqual(event_log_provider.log_sources, ['Test'])
+        self.assertEqual(
+            event_log_provider.log_types, ['Application', 'System'])
+        self.assertEqual(event_log_provider.category_message_files, set())
+        self.assertEqual(event_log_provider.event_message_files, set([
+            '%SystemRoot%\\System32\\test.dll']))
+
+        event_log_providers = test_database.GetEventLogProvidersByName(
+            'microsoft-windows-test')
+        self.assertEqual(len(event_log_providers), 1)
+
+        event_log_providers = test_database.GetEventLogProvidersByLogSource(
+            'OTHER')
+        self.assertEqual(len(event_log_providers), 1)
+        self.assertIsNone(event_log_providers[0].identifier)
+
+        event_log_providers = test_database.GetEventLogProvidersByLogSource(
+            'Bogus')
+        self.assertEqual(event_log_providers, [])
+
+      finally:
+        test_database.Close()
+
+  def testOpenClose(self):
+    """Tests the Open and Close functions."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      path = os.path.join(temporary_directory, 'providers.db')
+
+      test_database = eventlog_providers_database.EventLogProvidersDatabase()
+
+      with self.assertRaises(OSError):
+        test_database.Open(path)
+
+      self._WriteTestDatabase(path)
+
+      with self.assertRaises(OSError):
+        test_database.Open(path, read_only=False)
+
+      test_database.Open(path)
+
+      with self.assertRaises(OSError):
+        test_database.WriteEventLogProvider(
+            eventlog_providers.EventLogProvider())
+
+      test_database.Close()
+
+      with self.assertRaises(OSError):
+        test_database.Close()
+
+  def testOpenWithURICharacters(self):
+    """Tests the Open function with a path that contains URI characters."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      path = os.path.join(temporary_directory, 'test?mode=rw#1 %41')
+      os.mkdir(path)
+
+      path = os.path.join(path, 'providers.db')
+      self._WriteTestDatabase(path)
+
+      test_database = eventlog_providers_database.EventLogProvidersDatabase()
+      test_database.Open(path)
+
+      try:
+        event_log_providers = test_database.GetEventLogProvidersByName(
+            'Microsoft-Windows-Test')
+        self.assertEqual(len(event_log_providers), 1)
+
+      finally:
+        test_database.Close()
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -9,6 +9,7 @@ from dfwinreg import fake as dfwinreg_fake
 from dfwinreg import registry as dfwinreg_registry
 
 from winregrc import mounted_devices
+from winregrc import profilers
 
 from tests import test_lib as shared_test_lib
 
@@ -57,6 +58,21 @@ class MountedDevicesCollectorTest(shared_test_lib.BaseTestCase):
     self.assertEqual(mounted_device.disk_identity, 0x12345678)
     self.assertEqual(mounted_device.partition_offset, 0x1000)
 
+  def testCollectWithStatistics(self):
+    """Tests the Collect function with access statistics."""
+    registry = self._CreateTestRegistry()
+
+    collector_object = mounted_devices.MountedDevicesCollector()
+
+    test_profiler = profilers.ScriptProfiler('profile')
+    registry = test_profiler.ProfileRegistryAccess(collector_object, registry)
+
+    test_results = list(collector_object.Collect(registry))
+    self.assertEqual(len(test_results), 1)
+
+    statistics = test_profiler.GetRegistryAccessStatistics(collector_object)
+    self.assertEqual(statistics.number_of_mappings, 1)
+
   def testCollectEmpty(self):
     """Tests the Collect function on an empty Registry."""
     registry = dfwinreg_registry.WinRegistry()
@@ -9,6 +9,7 @@ from dfwinreg import fake as dfwinreg_fake
 from dfwinreg import registry as dfwinreg_registry
 
 from winregrc import mru
+from winregrc import profilers
 
 from tests import test_lib
 
@@ -67,6 +68,25 @@ class MostRecentlyUsedCollectorTest(test_lib.BaseTestCase):
     self.assertIsNotNone(mru_entry)
     self.assertEqual(mru_entry.string, 'MyFile.txt')
 
+  def testCollectWithStatistics(self):
+    """Tests the Collect function with access statistics."""
+    registry = self._CreateTestRegistry()
+
+    test_output_writer = test_lib.TestOutputWriter()
+    collector_object = mru.MostRecentlyUsedCollector(
+        output_writer=test_output_writer)
+
+    test_profiler = profilers.ScriptProfiler('profile')
+    registry = test_profiler.ProfileRegistryAccess(collector_object, registry)
+
+    result = collector_object.Collect(registry)
+    self.assertTrue(result)
+
+    test_output_writer.Close()
+
+    statistics = test_profiler.GetRegistryAccessStatistics(collector_object)
+    self.assertEqual(statistics.number_of_mappings, 1)
+
   def testCollectEmpty(self):
     """Tests the Collect function on an empty Registry."""
     registry = dfwinreg_registry.WinRegistry()
@@ -77,6 +77,16 @@ class StdoutOutputWriterTest(shared_test_lib.BaseTestCase):
 
     test_output_writer.WriteValue('Description', 'Value')
 
+  def testWriteSnapshot(self):
+    """Tests the WriteSnapshot function."""
+    test_output_writer = shared_test_lib.TestOutputWriter()
+
+    test_output_writer.WriteSnapshot('vss1', None)
+    test_output_writer.WriteSnapshot('vss2', 'vss1')
+
+    self.assertEqual(test_output_writer.output, [
+        'Snapshot: vss1\n\n', 'Snapshot: vss2 (identical to: vss1)\n\n'])
+
   def testWriteText(self):
     """Tests the WriteText function."""
     test_output_writer = output_writers.StdoutOutputWriter()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the script profilers."""
+
+import argparse
+import json
+import os
+import tempfile
+import unittest
+
+from dfwinreg import definitions as dfwinreg_definitions
+from dfwinreg import fake as dfwinreg_fake
+from dfwinreg import registry as dfwinreg_registry
+
+from winregrc import profilers
+from winregrc import services
+
+from tests import test_lib as shared_test_lib
+
+
+class NullScriptProfilerTest(shared_test_lib.BaseTestCase):
+  """Tests for the script profiler that does nothing."""
+
+  def testCreateProfiler(self):
+    """Tests the CreateProfiler function."""
+    argument_parser = argparse.ArgumentParser()
+    profilers.AddArguments(argument_parser)
+
+    options = argument_parser.parse_args([])
+    test_profiler = profilers.CreateProfiler(options)
+    self.assertIsInstance(test_profiler, profilers.NullScriptProfiler)
+    self.assertFalse(test_profiler)
+
+    options = argument_parser.parse_args(['--profile', 'profile'])
+    test_profiler = profilers.CreateProfiler(options)
+    self.assertIsInstance(test_profiler, profilers.ScriptProfiler)
+
+  def testPhase(self):
+    """Tests the Phase function."""
+    test_profiler = profilers.NullScriptProfiler()
+
+    with test_profiler:
+      with test_profiler.Phase('collect'):
+        items = list(test_profiler.ProfileGenerator('collect', range(3)))
+
+    self.assertEqual(items, [0, 1, 2])
+
+
+class RegistryAccessStatisticsTest(shared_test_lib.BaseTestCase):
+  """Tests for the Windows Registry access statistics."""
+
+  def _CreateTestRegistry(self):
+    """Creates Registry keys and values for testing.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry for testing.
+    """
+    key_path_prefix = 'HKEY_LOCAL_MACHINE\\System'
+
+    registry_file = dfwinreg_fake.FakeWinRegistryFile(
+        key_path_prefix=key_path_prefix)
+
+    registry_key = dfwinreg_fake.FakeWinRegistryKey('Services')
+    registry_file.AddKeyByPath('\\CurrentControlSet', registry_key)
+
+    subkey = dfwinreg_fake.FakeWinRegistryKey('WwanSvc')
+    registry_key.AddSubkey('WwanSvc', subkey)
+
+    value_data = b'\x03\x00\x00\x00'
+    registry_value = dfwinreg_fake.FakeWinRegistryValue(
+        'Start', data=value_data, data_type=dfwinreg_definitions.REG_DWORD)
+    subkey.AddValue(registry_value)
+
+    registry_file.Open(None)
+
+    registry = dfwinreg_registry.WinRegistry()
+    registry.MapFile(key_path_prefix, registry_file)
+    return registry
+
+  def testCollect(self):
+    """Tests gathering statistics while collecting."""
+    registry = self._CreateTestRegistry()
+
+    collector_object = services.WindowsServicesCollector()
+
+    statistics = profilers.RegistryAccessStatistics('WindowsServicesCollector')
+    statistics_registry = profilers.StatisticsWinRegistry(registry, statistics)
+    collector_object.SetRegistryAccessStatistics(statistics)
+
+    test_results = list(collector_object.Collect(statistics_registry))
+    self.assertEqual(len(test_results), 1)
+    self.assertEqual(test_results[0].start_value, 3)
+
+    self.assertEqual(statistics.number_of_get_key_by_path, 1)
+    self.assertEqual(statistics.number_of_get_subkeys, 1)
+    self.assertEqual(statistics.number_of_get_value_by_name, 6)
+    self.assertEqual(statistics.value_data_size, 4)
+
+    statistics_dict = statistics.CopyToDict()
+    self.assertEqual(statistics_dict['number_of_get_key_by_path'], 1)
+
+    json_string = json.dumps(statistics_dict)
+    self.assertIsNotNone(json_string)
+
+  def testGetSubkeyByPath(self):
+    """Tests gathering statistics of GetSubkeyByPath."""
+    registry = self._CreateTestRegistry()
+
+    statistics = profilers.RegistryAccessStatistics('test')
+    statistics_registry = profilers.StatisticsWinRegistry(registry, statistics)
+
+    registry_key = statistics_registry.GetKeyByPath(
+        'HKEY_LOCAL_MACHINE\\System\\CurrentControlSet')
+    self.assertIsNotNone(registry_key)
+
+    subkey = registry_key.GetSubkeyByPath('Services\\WwanSvc')
+    self.assertIsNotNone(subkey)
+
+    subkey = registry_key.GetSubkeyByPath('Services\\Bogus')
+    self.assertIsNone(subkey)
+
+    self.assertEqual(statistics.number_of_get_subkey_by_path, 2)
+
+    statistics_dict = statistics.CopyToDict()
+    self.assertEqual(statistics_dict['number_of_get_subkey_by_path'], 2)
+
+
+class ScriptProfilerTest(shared_test_lib.BaseTestCase):
+  """Tests for the script profiler."""
+
+  # pylint: disable=protected-access
+
+  def testPhase(self):
+    """Tests the Phase function."""
+    test_profiler = profilers.ScriptProfiler('profile')
+
+    with self.assertRaises(RuntimeError):
+      with test_profiler.Phase('output'):
+        with test_profiler.Phase('collect'):
+          raise RuntimeError('test')
+
+    self.assertEqual(test_profiler._phase_stack, [])
+    self.assertEqual(test_profiler._timings['collect'][1], 1)
+    self.assertEqual(test_profiler._timings['output'][1], 1)
+
+  def testProfileGenerator(self):
+    """Tests the ProfileGenerator function."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      path_prefix = os.path.join(temporary_directory, 'profile')
+      test_profiler = profilers.ScriptProfiler(path_prefix)
+
+      test_profiler.Start()
+
+      items = list(test_profiler.ProfileGenerator('collect', range(3)))
+      self.assertEqual(items, [0, 1, 2])
+
+      test_profiler.Stop()
+
+    _, number_of_times = test_profiler._timings['collect']
+    self.assertEqual(number_of_times, 4)
+
+  def testStartStop(self):
+    """Tests the Start and Stop functions."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      path_prefix = os.path.join(temporary_directory, 'profile')
+      test_profiler = profilers.ScriptProfiler(
+          path_prefix, number_of_memory_allocations=5)
+
+      test_profiler.Start()
+      test_profiler.StartTiming('output')
+      test_profiler.Stop()
+
+      self.assertTrue(os.path.exists(f'{path_prefix:s}.cprofile'))
+      self.assertTrue(os.path.exists(f'{path_prefix:s}.memory.txt'))
+
+      with open(f'{path_prefix:s}.timing.txt', 'r', encoding='utf-8') as (
+          file_object):
+        lines = file_object.readlines()
+
+    self.assertEqual(len(lines), 7)
+    self.assertTrue(lines[4].startswith('output'))
+    self.assertTrue(lines[6].startswith('total'))
+
+  def testStartTimingStopTiming(self):
+    """Tests the StartTiming and StopTiming functions."""
+    test_profiler = profilers.ScriptProfiler('profile')
+
+    test_profiler.StartTiming('output')
+    test_profiler.StartTiming('collect')
+
+    with self.assertRaises(ValueError):
+      test_profiler.StopTiming('output')
+
+    test_profiler.StopTiming('collect')
+    test_profiler.StopTiming('output')
+
+    self.assertEqual(test_profiler._phase_stack, [])
+    self.assertEqual(test_profiler._timings['collect'][1], 1)
+    self.assertEqual(test_profiler._timings['output'][1], 1)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the on-disk cache of collector results."""
+
+import os
+import tempfile
+import unittest
+
+from winregrc import results_cache
+from winregrc import services
+
+from tests import test_lib as shared_test_lib
+
+
+class CollectorResultsCacheTest(shared_test_lib.BaseTestCase):
+  """Tests for the on-disk cache of collector results."""
+
+  # pylint: disable=protected-access
+
+  def _CreateWindowsService(self, name):
+    """Creates a Windows service for testing.
+
+    Args:
+      name (str): name.
+
+    Returns:
+      WindowsService: Windows service.
+    """
+    return services.WindowsService(
+        name, 0x00000010, f'{name:s} service', None, f'{name:s}.exe',
+        'LocalSystem', 0x00000002)
+
+  def testGetCacheKey(self):
+    """Tests the GetCacheKey function."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      source_path = os.path.join(temporary_directory, 'SYSTEM')
+      with open(source_path, 'wb') as file_object:
+        file_object.write(b'regf1')
+
+      cache = results_cache.CollectorResultsCache(
+          os.path.join(temporary_directory, 'cache'))
+
+      collector_class = services.WindowsServicesCollector
+
+      cache_key = cache.GetCacheKey([source_path], collector_class)
+      self.assertIsNotNone(cache_key)
+      self.assertEqual(
+          cache.GetCacheKey([source_path], collector_class), cache_key)
+
+      other_cache_key = cache.GetCacheKey(
+          [source_path], collector_class, options={'all_control_sets': True})
+      self.assertNotEqual(other_cache_key, cache_key)
+
+      with open(source_path, 'wb') as file_object:
+        file_object.write(b'regf2')
+
+      other_cache_key = cache.GetCacheKey([source_path], collector_class)
+      self.assertNotEqual(other_cache_key, cache_key)
+
+      cache_key = cache.GetCacheKey([temporary_directory], collector_class)
+      self.assertIsNone(cache_key)
+
+      source_path = os.path.join(temporary_directory, 'image.raw')
+      with open(source_path, 'wb') as file_object:
+        file_object.write(b'\x00' * 512)
+
+      cache_key = cache.GetCacheKey([source_path], collector_class)
+      self.assertIsNone(cache_key)
+
+  def testGetCacheKeyFromFileHashes(self):
+    """Tests the GetCacheKeyFromFileHashes function."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      source_path = os.path.join(temporary_directory, 'SYSTEM')
+      with open(source_path, 'wb') as file_object:
+        file_object.write(b'regf1')
+
+      cache = results_cache.CollectorResultsCache(
+          os.path.join(temporary_directory, 'cache'))
+
+      collector_class = services.WindowsServicesCollector
+
+      file_hash = cache._GetFileHash(source_path)
+
+      cache_key = cache.GetCacheKeyFromFileHashes([file_hash], collector_class)
+      self.assertEqual(
+          cache.GetCacheKey([source_path], collector_class), cache_key)
+
+  def testGetAndSetResults(self):
+    """Tests the GetResults and SetResults functions."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      cache = results_cache.CollectorResultsCache(temporary_directory)
+
+      results = cache.GetResults('0123')
+      self.assertIsNone(results)
+
+      result = cache.SetResults('0123', [self._CreateWindowsService('Test')])
+      self.assertTrue(result)
+
+      results = cache.GetResults('0123')
+      self.assertEqual(len(results), 1)
+      self.assertIsInstance(results[0], services.WindowsService)
+      self.assertEqual(results[0].name, 'Test')
+      self.assertEqual(results[0].image_path, 'Test.exe')
+
+      cache_file_path = cache._GetCacheFilePath('0123')
+      with open(cache_file_path, 'wb') as file_object:
+        file_object.write(b'corrupt')
+
+      results = cache.GetResults('0123')
+      self.assertIsNone(results)
+
+  def testSetResultsWithError(self):
+    """Tests the SetResults function when the cache file cannot be written."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      cache = results_cache.CollectorResultsCache(temporary_directory)
+
+      # A directory cannot be replaced by the temporary file.
+      os.mkdir(cache._GetCacheFilePath('0123'))
+
+      result = cache.SetResults('0123', [self._CreateWindowsService('Test')])
+      self.assertFalse(result)
+
+      filenames = os.listdir(temporary_directory)
+      self.assertEqual(filenames, ['0123.json.z'])
+
+  def testRemoveLeastRecentlyUsed(self):
+    """Tests the _RemoveLeastRecentlyUsed function."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      cache = results_cache.CollectorResultsCache(temporary_directory)
+
+      results = [self._CreateWindowsService(f'Test{index:d}')
+                 for index in range(16)]
+
+      cache.SetResults('0001', results)
+      cache.SetResults('0002', results)
+
+      cache_file_size = os.path.getsize(cache._GetCacheFilePath('0001'))
+
+      # Mark the first cache file as more recently used than the second.
+      os.utime(cache._GetCacheFilePath('0001'), ns=(2000000000, 2000000000))
+      os.utime(cache._GetCacheFilePath('0002'), ns=(1000000000, 1000000000))
+
+      cache._maximum_size = cache_file_size
+      cache._RemoveLeastRecentlyUsed()
+
+      self.assertTrue(os.path.isfile(cache._GetCacheFilePath('0001')))
+      self.assertFalse(os.path.isfile(cache._GetCacheFilePath('0002')))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -112,6 +112,16 @@ class SecurityAccountManagerDataParserTest(test_lib.BaseTestCase):
     data_parser.ParseVValue(_V_VALUE_DATA, user_account)
 
     self.assertEqual(user_account.username, 'Administrator')
+    self.assertEqual(user_account.full_name, '')
+    self.assertIsNone(user_account.lm_hash)
+    self.assertIsNone(user_account.ntlm_hash)
+
+    user_account = sam.UserAccount()
+
+    data_parser.ParseVValue(_V_VALUE_DATA, user_account, include_hashes=True)
+
+    self.assertEqual(user_account.username, 'Administrator')
+    self.assertIsNotNone(user_account.ntlm_hash)
 
     # TODO: tests other values set by ParseVValue.
 
@@ -167,14 +177,13 @@ class SecurityAccountManagerCollectorTest(test_lib.BaseTestCase):
     collector_object = sam.SecurityAccountManagerCollector(
         output_writer=test_output_writer)
 
-    result = collector_object.Collect(registry)
-    self.assertTrue(result)
+    test_results = list(collector_object.Collect(registry))
 
     test_output_writer.Close()
 
-    self.assertEqual(len(collector_object.user_accounts), 1)
+    self.assertEqual(len(test_results), 1)
 
-    user_account = collector_object.user_accounts[0]
+    user_account = test_results[0]
     self.assertIsNotNone(user_account)
     self.assertEqual(user_account.username, 'Administrator')
 
@@ -186,12 +195,11 @@ class SecurityAccountManagerCollectorTest(test_lib.BaseTestCase):
     collector_object = sam.SecurityAccountManagerCollector(
         output_writer=test_output_writer)
 
-    result = collector_object.Collect(registry)
-    self.assertFalse(result)
+    test_results = list(collector_object.Collect(registry))
 
     test_output_writer.Close()
 
-    self.assertEqual(len(collector_object.user_accounts), 0)
+    self.assertEqual(len(test_results), 0)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the JSON serializer for collector result records."""
+
+import json
+import unittest
+
+from dfdatetime import filetime as dfdatetime_filetime
+
+from winregrc import appcompatcache
+from winregrc import serializers
+from winregrc import services
+
+from tests import test_lib as shared_test_lib
+
+
+class RecordSerializerTest(shared_test_lib.BaseTestCase):
+  """Tests for the JSON serializer for collector result records."""
+
+  # pylint: disable=protected-access
+
+  def testConvertRecord(self):
+    """Tests the conversion of a record."""
+    windows_service = services.WindowsService(
+        'Test', 0x00000010, 'Test service', None, 'test.exe', 'LocalSystem',
+        0x00000002)
+
+    json_value = serializers.RecordSerializer.ConvertValueToJSON(
+        windows_service)
+    json_value = json.loads(json.dumps(json_value))
+
+    record = serializers.RecordSerializer.ConvertJSONToValue(json_value)
+    self.assertIsInstance(record, services.WindowsService)
+    for attribute_name in services.WindowsService.__slots__:
+      self.assertEqual(
+          getattr(record, attribute_name),
+          getattr(windows_service, attribute_name))
+
+  def testConvertRecordWithDateTimeValues(self):
+    """Tests the conversion of a record with date and time values."""
+    cached_entry = appcompatcache.AppCompatCacheCachedEntry()
+    cached_entry.last_modification_time = dfdatetime_filetime.Filetime(
+        timestamp=0x01cb3a623d0a17ce)
+    cached_entry.path = 'C:\\Windows\\System32\\test.exe'
+
+    json_value = serializers.RecordSerializer.ConvertValueToJSON(
+        [cached_entry])
+    json_value = json.loads(json.dumps(json_value))
+
+    records = serializers.RecordSerializer.ConvertJSONToValue(json_value)
+    self.assertEqual(len(records), 1)
+
+    record = records[0]
+    self.assertIsInstance(record, appcompatcache.AppCompatCacheCachedEntry)
+    self.assertEqual(record.path, 'C:\\Windows\\System32\\test.exe')
+    self.assertIsInstance(
+        record.last_modification_time, dfdatetime_filetime.Filetime)
+    self.assertEqual(
+        record.last_modification_time.timestamp, 0x01cb3a623d0a17ce)
+
+  def testConvertUnsupportedRecord(self):
+    """Tests the conversion of an unsupported record."""
+    with self.assertRaises(ValueError):
+      serializers.RecordSerializer.ConvertValueToJSON(object())
+
+    with self.assertRaises(ValueError):
+      serializers.RecordSerializer.ConvertJSONToValue({
+          '__type__': 'os.PathLike'})
+
+  def testConvertValues(self):
+    """Tests the conversion of values."""
+    value = {
+        'bytes': b'\x00\x01\xff',
+        'list': [1, 'two', None],
+        'set': {1, 2},
+        'tuple': (True, 1.5)}
+
+    json_value = serializers.RecordSerializer.ConvertValueToJSON(value)
+    json_value = json.loads(json.dumps(json_value))
+
+    converted_value = serializers.RecordSerializer.ConvertJSONToValue(
+        json_value)
+    self.assertEqual(converted_value, value)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the Windows Registry server."""
+
+import json
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import unittest
+
+from winregrc import errors
+from winregrc import server
+
+from tests import test_lib as shared_test_lib
+
+
+class ServerTestCase(shared_test_lib.BaseTestCase):
+  """Shared functionality for Windows Registry server tests."""
+
+  def _CreateWindowsDirectory(self, path):
+    """Creates a directory with a Windows installation for testing.
+
+    Args:
+      path (str): path of the directory.
+    """
+    test_path = self._GetTestFilePath(['SAM'])
+    self._SkipIfPathNotExists(test_path)
+
+    config_path = os.path.join(path, 'Windows', 'System32', 'config')
+    os.makedirs(config_path)
+    shutil.copy(test_path, os.path.join(config_path, 'SAM'))
+
+    test_path = self._GetTestFilePath(['NTUSER.DAT'])
+    self._SkipIfPathNotExists(test_path)
+
+    for username in ('alice', 'bob'):
+      user_path = os.path.join(path, 'Users', username)
+      os.makedirs(user_path)
+      shutil.copy(test_path, os.path.join(user_path, 'NTUSER.DAT'))
+
+
+class OpenSourceTest(ServerTestCase):
+  """Tests for the open source."""
+
+  def testGetUserRegistry(self):
+    """Tests the GetUserRegistry function."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      self._CreateWindowsDirectory(temporary_directory)
+
+      open_sources = server.OpenSourcesCache()
+      open_source = open_sources.GetOpenSource(temporary_directory)
+
+      sam_size = os.path.getsize(self._GetTestFilePath(['SAM']))
+      self.assertEqual(open_source.memory_size, sam_size)
+
+      with self.assertRaises(errors.RequestError):
+        open_source.GetUserRegistry()
+
+      with self.assertRaises(errors.RequestError):
+        open_source.GetUserRegistry(username='carol')
+
+      registry = open_source.GetUserRegistry(username='Alice')
+      self.assertIsNotNone(registry)
+
+      key = registry.GetKeyByPath('HKEY_CURRENT_USER\\Software')
+      self.assertIsNotNone(key)
+
+      ntuser_size = os.path.getsize(self._GetTestFilePath(['NTUSER.DAT']))
+      self.assertEqual(open_source.memory_size, sam_size + ntuser_size)
+
+      cached_registry = open_source.GetUserRegistry(username='alice')
+      self.assertIs(cached_registry, registry)
+
+
+class OpenSourcesCacheTest(ServerTestCase):
+  """Tests for the cache of open sources."""
+
+  # pylint: disable=protected-access
+
+  def testCloseIdleSources(self):
+    """Tests the CloseIdleSources function."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      self._CreateWindowsDirectory(temporary_directory)
+
+      open_sources = server.OpenSourcesCache(idle_timeout=60)
+
+      open_source = open_sources.GetOpenSource(temporary_directory)
+
+      open_sources.CloseIdleSources()
+      self.assertEqual(len(open_sources._open_sources), 1)
+
+      open_source.last_used_time -= 120
+
+      open_sources.CloseIdleSources()
+      self.assertEqual(len(open_sources._open_sources), 0)
+
+  def testGetOpenSource(self):
+    """Tests the GetOpenSource function."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      first_path = os.path.join(temporary_directory, 'first')
+      self._CreateWindowsDirectory(first_path)
+
+      second_path = os.path.join(temporary_directory, 'second')
+      self._CreateWindowsDirectory(second_path)
+
+      open_sources = server.OpenSourcesCache(maximum_number_of_sources=1)
+
+      open_source = open_sources.GetOpenSource(first_path)
+      self.assertIsNotNone(open_source.scanner.registry)
+
+      cached_open_source = open_sources.GetOpenSource(first_path)
+      self.assertIs(cached_open_source, open_source)
+
+      open_sources.GetOpenSource(second_path)
+      self.assertEqual(
+          list(open_sources._open_sources.keys()), [second_path])
+
+      cached_open_source = open_sources.GetOpenSource(first_path)
+      self.assertIsNot(cached_open_source, open_source)
+
+      open_sources = server.OpenSourcesCache(maximum_memory_size=1)
+
+      open_sources.GetOpenSource(first_path)
+      open_sources.GetOpenSource(second_path)
+      self.assertEqual(
+          list(open_sources._open_sources.keys()), [second_path])
+
+      with self.assertRaises(errors.RequestError):
+        open_sources.GetOpenSource(os.path.join(temporary_directory, 'bogus'))
+
+
+class WindowsRegistryServerTest(ServerTestCase):
+  """Tests for the Windows Registry server."""
+
+  def _SendRequest(self, file_object, request):
+    """Sends a request to the server.
+
+    Args:
+      file_object (file): file-like object of the connection.
+      request (dict[str, object]): request.
+
+    Returns:
+      dict[str, object]: response.
+    """
+    file_object.write(json.dumps(request).encode('utf-8'))
+    file_object.write(b'\n')
+    file_object.flush()
+
+    return json.loads(file_object.readline())
+
+  def testRequests(self):
+    """Tests requests."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      source_path = os.path.join(temporary_directory, 'source')
+      self._CreateWindowsDirectory(source_path)
+
+      socket_path = os.path.join(temporary_directory, 'winregrc.sock')
+
+      open_sources = server.OpenSourcesCache()
+      server_object = server.WindowsRegistryServer(socket_path, open_sources)
+
+      stat_object = os.stat(socket_path)
+      self.assertEqual(stat.S_IMODE(stat_object.st_mode), 0o600)
+
+      server_thread = threading.Thread(
+          target=server_object.serve_forever, kwargs={'poll_interval': 0.1})
+      server_thread.start()
+
+      try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+          client.connect(socket_path)
+
+          with client.makefile('rwb') as file_object:
+            response = self._SendRequest(file_object, {
+                'collector': 'sam', 'source': source_path})
+            self.assertNotIn('error', response)
+
+            usernames = [
+                record['username'] for record in response['records']]
+            self.assertIn('Administrator', usernames)
+
+            response = self._SendRequest(file_object, {
+                'collector': 'mru', 'source': source_path,
+                'username': 'bob'})
+            self.assertNotIn('error', response)
+            self.assertNotEqual(response['records'], [])
+
+            response = self._SendRequest(file_object, {
+                'collector': 'mru', 'source': source_path})
+            self.assertIn('error', response)
+
+            response = self._SendRequest(file_object, {
+                'collector': 'mru', 'source': source_path,
+                'username': 'bogus'})
+            self.assertIn('error', response)
+
+            response = self._SendRequest(file_object, {
+                'collector': 'bogus', 'source': source_path})
+            self.assertIn('error', response)
+
+            response = self._SendRequest(file_object, {
+                'collector': ['bogus'], 'source': source_path})
+            self.assertIn('error', response)
+
+            file_object.write(b'bogus\n')
+            file_object.flush()
+
+            response = json.loads(file_object.readline())
+            self.assertIn('error', response)
+
+      finally:
+        server_object.shutdown()
+        server_object.server_close()
+        server_thread.join()
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -16,27 +16,31 @@ from tests import test_lib as shared_test_lib
 class WindowsServicesCollectorTest(shared_test_lib.BaseTestCase):
   """Tests for the services collector."""
 
+  # pylint: disable=protected-access
+
   _DESCRIPTION = '@%SystemRoot%\\System32\\wwansvc.dll,-258'
   _DISPLAY_NAME = '@%SystemRoot%\\System32\\wwansvc.dll,-257'
   _IMAGE_PATH = '%SystemRoot%\\system32\\svchost.exe -k LocalServiceNoNetwork'
   _OBJECT_NAME = 'NT Authority\\LocalService'
 
-  def _CreateTestRegistry(self):
-    """Creates Registry keys and values for testing.
+  def _CreateServicesKey(
+      self, service_name, start_value, last_written_time=None):
+    """Creates a Services key for testing.
+
+    Args:
+      service_name (str): name of the service.
+      start_value (int): start value of the service.
+      last_written_time (Optional[int]): last written time of the service
+          key, formatted as a FILETIME timestamp.
 
     Returns:
-      dfwinreg.WinRegistry: Windows Registry for testing.
+      dfwinreg.FakeWinRegistryKey: Services key for testing.
     """
-    key_path_prefix = 'HKEY_LOCAL_MACHINE\\System'
-
-    registry_file = dfwinreg_fake.FakeWinRegistryFile(
-        key_path_prefix=key_path_prefix)
-
     registry_key = dfwinreg_fake.FakeWinRegistryKey('Services')
-    registry_file.AddKeyByPath('\\CurrentControlSet', registry_key)
 
-    subkey = dfwinreg_fake.FakeWinRegistryKey('WwanSvc')
-    registry_key.AddSubkey('WwanSvc', subkey)
+    subkey = dfwinreg_fake.FakeWinRegistryKey(
+        service_name, last_written_time=last_written_time)
+    registry_key.AddSubkey(service_name, subkey)
 
     value_data = self._DESCRIPTION.encode('utf-16-le')
     registry_value = dfwinreg_fake.FakeWinRegistryValue(
@@ -62,7 +66,7 @@ class WindowsServicesCollectorTest(shared_test_lib.BaseTestCase):
         data_type=dfwinreg_definitions.REG_SZ)
     subkey.AddValue(registry_value)
 
-    value_data = b'\x03\x00\x00\x00'
+    value_data = start_value.to_bytes(4, 'little')
     registry_value = dfwinreg_fake.FakeWinRegistryValue(
         'Start', data=value_data, data_type=dfwinreg_definitions.REG_DWORD)
     subkey.AddValue(registry_value)
@@ -72,6 +76,42 @@ class WindowsServicesCollectorTest(shared_test_lib.BaseTestCase):
         'Type', data=value_data, data_type=dfwinreg_definitions.REG_DWORD)
     subkey.AddValue(registry_value)
 
+    return registry_key
+
+  def _CreateTestRegistry(
+      self, control_sets=None, last_written_time=None, service_name='WwanSvc',
+      start_value=3):
+    """Creates Registry keys and values for testing.
+
+    Args:
+      control_sets (Optional[list[tuple[str, int]]]): name of the control set
+          and start value of the service, per control set, where None
+          represents only a current control set.
+      last_written_time (Optional[int]): last written time of the service
+          key, formatted as a FILETIME timestamp.
+      service_name (Optional[str]): name of the service.
+      start_value (Optional[int]): start value of the service.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry for testing.
+    """
+    key_path_prefix = 'HKEY_LOCAL_MACHINE\\System'
+
+    registry_file = dfwinreg_fake.FakeWinRegistryFile(
+        key_path_prefix=key_path_prefix)
+
+    if not control_sets:
+      registry_key = self._CreateServicesKey(
+          service_name, start_value, last_written_time=last_written_time)
+      registry_file.AddKeyByPath('\\CurrentControlSet', registry_key)
+
+    else:
+      for control_set_name, control_set_start_value in control_sets:
+        registry_key = self._CreateServicesKey(
+            service_name, control_set_start_value,
+            last_written_time=last_written_time)
+        registry_file.AddKeyByPath(f'\\{control_set_name:s}', registry_key)
+
     registry_file.Open(None)
 
     registry = dfwinreg_registry.WinRegistry()
@@ -106,7 +146,108 @@ class WindowsServicesCollectorTest(shared_test_lib.BaseTestCase):
     test_results = list(collector_object.Collect(registry))
     self.assertEqual(len(test_results), 0)
 
-  # TODO: add tests for Compare method
+  def testCompare(self):
+    """Tests the Compare function."""
+    registry = self._CreateTestRegistry()
+
+    collector_object = services.WindowsServicesCollector()
+
+    test_results = list(collector_object.Compare(registry))
+    self.assertEqual(len(test_results), 0)
+
+    other_registry = self._CreateTestRegistry(start_value=2)
+
+    test_results = list(collector_object.Compare(
+        registry, other_registry=other_registry))
+    self.assertEqual(len(test_results), 1)
+
+    windows_service_change = test_results[0]
+    self.assertEqual(windows_service_change.change_type, 'changed')
+    self.assertEqual(
+        windows_service_change.changed_attributes, ['start_value'])
+    self.assertEqual(windows_service_change.name, 'WwanSvc')
+    self.assertEqual(windows_service_change.original_service.start_value, 3)
+    self.assertEqual(windows_service_change.service.start_value, 2)
+
+    other_registry = self._CreateTestRegistry(service_name='WwanSvc2')
+
+    test_results = list(collector_object.Compare(
+        registry, other_registry=other_registry))
+    self.assertEqual(len(test_results), 2)
+
+    change_types = [change.change_type for change in test_results]
+    self.assertEqual(change_types, ['removed', 'added'])
+
+  def testCompareControlSets(self):
+    """Tests the Compare function with multiple control sets."""
+    registry = self._CreateTestRegistry(control_sets=[
+        ('ControlSet001', 3), ('ControlSet002', 3), ('ControlSet003', 4)])
+
+    collector_object = services.WindowsServicesCollector()
+
+    test_results = list(collector_object.Compare(registry))
+    self.assertEqual(len(test_results), 1)
+
+    windows_service_change = test_results[0]
+    self.assertEqual(windows_service_change.change_type, 'changed')
+    self.assertEqual(
+        windows_service_change.original_source, 'ControlSet001')
+    self.assertEqual(windows_service_change.source, 'ControlSet003')
+
+  def testGetServiceKeyDigest(self):
+    """Tests the _GetServiceKeyDigest function."""
+    services_key = self._CreateServicesKey(
+        'WwanSvc', 3, last_written_time=0x01d3fcde15a1c2f0)
+    service_key = services_key.GetSubkeyByName('WwanSvc')
+
+    other_services_key = self._CreateServicesKey(
+        'WwanSvc', 3, last_written_time=0x01d3fcde15a1c2f1)
+    other_service_key = other_services_key.GetSubkeyByName('WwanSvc')
+
+    collector_object = services.WindowsServicesCollector()
+
+    # Copies of a key in different control sets differ only in their last
+    # written time.
+    digest = collector_object._GetServiceKeyDigest(service_key)
+    other_digest = collector_object._GetServiceKeyDigest(other_service_key)
+    self.assertEqual(digest, other_digest)
+
+    digest = collector_object._GetServiceKeyDigest(
+        service_key, include_last_written_time=True)
+    other_digest = collector_object._GetServiceKeyDigest(
+        other_service_key, include_last_written_time=True)
+    self.assertNotEqual(digest, other_digest)
+
+  def testCompareLastWrittenTime(self):
+    """Tests the Compare function with last written times."""
+    registry = self._CreateTestRegistry(
+        last_written_time=0x01d3fcde15a1c2f0)
+
+    collector_object = services.WindowsServicesCollector()
+
+    other_registry = self._CreateTestRegistry(
+        last_written_time=0x01d3fcde15a1c2f0, start_value=2)
+
+    # A change that preserves the last written time is detected.
+    test_results = list(collector_object.Compare(
+        registry, other_registry=other_registry))
+    self.assertEqual(len(test_results), 1)
+    self.assertEqual(test_results[0].changed_attributes, ['start_value'])
+
+    other_registry = self._CreateTestRegistry(
+        last_written_time=0x01d3fcde15a1c2f1, start_value=2)
+
+    test_results = list(collector_object.Compare(
+        registry, other_registry=other_registry))
+    self.assertEqual(len(test_results), 1)
+    self.assertEqual(test_results[0].changed_attributes, ['start_value'])
+
+    other_registry = self._CreateTestRegistry(
+        last_written_time=0x01d3fcde15a1c2f1)
+
+    test_results = list(collector_object.Compare(
+        registry, other_registry=other_registry))
+    self.assertEqual(len(test_results), 0)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the collector of records from Volume Shadow Copy snapshots."""
+
+import unittest
+
+from dfwinreg import registry as dfwinreg_registry
+
+from winregrc import snapshot_records
+
+from tests import test_lib as shared_test_lib
+
+
+class TestWindowsRegistryVolumeScanner(object):
+  """Windows Registry volume scanner for testing.
+
+  Attributes:
+    opened_snapshot_identifiers (list[str]): identifiers of the snapshots of
+        which the Windows Registry was opened.
+    registry (dfwinreg.WinRegistry): Windows Registry of the current volume.
+  """
+
+  def __init__(self):
+    """Initializes a Windows Registry volume scanner for testing."""
+    super(TestWindowsRegistryVolumeScanner, self).__init__()
+    self.opened_snapshot_identifiers = []
+    self.registry = dfwinreg_registry.WinRegistry()
+
+  def GetRegistryFileHash(self, path, snapshot_identifier=None):
+    """Calculates the SHA-256 hash of the content of a Windows Registry file.
+
+    Args:
+      path (str): Windows path of the Windows Registry file.
+      snapshot_identifier (Optional[str]): identifier of the snapshot.
+
+    Returns:
+      str: hexadecimal SHA-256 hash or None if the Windows Registry file is
+          not available.
+    """
+    if snapshot_identifier == 'vss1':
+      return f'{path:s}:modified'
+
+    return f'{path:s}:current'
+
+  def GetSnapshotIdentifiers(self):
+    """Retrieves the identifiers of the Volume Shadow Copy snapshots.
+
+    Returns:
+      list[str]: identifiers of the snapshots.
+    """
+    return ['vss1', 'vss2']
+
+  def OpenSnapshotRegistry(self, snapshot_identifier):
+    """Opens the Windows Registry of a snapshot.
+
+    Args:
+      snapshot_identifier (str): identifier of the snapshot.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry of the snapshot.
+    """
+    self.opened_snapshot_identifiers.append(snapshot_identifier)
+    return dfwinreg_registry.WinRegistry()
+
+
+class SnapshotRecordsCollectorTest(shared_test_lib.BaseTestCase):
+  """Tests for the collector of records from snapshots."""
+
+  def _CollectRecords(self, registry):
+    """Collects records from a Windows Registry.
+
+    Args:
+      registry (dfwinreg.WinRegistry): Windows Registry.
+
+    Returns:
+      list[str]: records.
+    """
+    self.assertIsNotNone(registry)
+    return ['record1', 'record2']
+
+  def testCollect(self):
+    """Tests the Collect function."""
+    for number_of_workers in (1, 4):
+      scanner = TestWindowsRegistryVolumeScanner()
+
+      collector_object = snapshot_records.SnapshotRecordsCollector(
+          scanner, self._CollectRecords,
+          ['%SystemRoot%\\System32\\config\\SYSTEM'],
+          number_of_workers=number_of_workers)
+
+      results = [
+          (snapshot_record.snapshot_identifier,
+           snapshot_record.identical_snapshot_identifier,
+           snapshot_record.records)
+          for snapshot_record in collector_object.Collect()]
+
+      self.assertEqual(results, [
+          ('current', None, ['record1', 'record2']),
+          ('vss1', None, ['record1', 'record2']),
+          ('vss2', 'current', ['record1', 'record2'])])
+
+      self.assertEqual(scanner.opened_snapshot_identifiers, ['vss1'])
+
+
+if __name__ == '__main__':
+  unittest.main()
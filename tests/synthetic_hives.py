@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the synthetic Windows Registry file generator."""
+
+import os
+import tempfile
+import unittest
+
+from dfwinreg import regf as dfwinreg_regf
+from dfwinreg import registry as dfwinreg_registry
+
+from utils import synthetic_hives
+
+from winregrc import appcompatcache
+from winregrc import mru
+from winregrc import sam
+from winregrc import services
+from winregrc import task_cache
+from winregrc import userassist
+from winregrc import volume_scanner
+
+from tests import test_lib as shared_test_lib
+
+
+class REGFWriterTest(shared_test_lib.BaseTestCase):
+  """Tests for the Windows NT Registry File (REGF) writer."""
+
+  def testWriteBigData(self):
+    """Tests the Write function with big data (db) values."""
+    value_data_sizes = [4, 5, 16344, 16345, 16348, 16353, 16825, 31644, 100003]
+
+    values = []
+    for value_data_size in value_data_sizes:
+      value_data = bytes(
+          (index * 7) & 0xff for index in range(value_data_size))
+      values.append((
+          f'value{value_data_size:d}', synthetic_hives.REG_BINARY,
+          value_data))
+
+    root_key = synthetic_hives.SyntheticKey('ROOT', subkeys=[
+        synthetic_hives.SyntheticKey('Key', values=values)])
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      path = os.path.join(temporary_directory, 'big_data.hiv')
+
+      writer = synthetic_hives.REGFWriter()
+      number_of_keys = writer.Write(path, root_key)
+      self.assertEqual(number_of_keys, 2)
+
+      registry_file = dfwinreg_regf.REGFWinRegistryFile()
+      with open(path, 'rb') as file_object:
+        registry_file.Open(file_object)
+
+        key = registry_file.GetKeyByPath('\\Key')
+        self.assertIsNotNone(key)
+
+        for value_name, _, value_data in values:
+          value = key.GetValueByName(value_name)
+          self.assertIsNotNone(value)
+          self.assertEqual(value.data, value_data)
+
+        registry_file.Close()
+
+
+class SyntheticHiveGeneratorTest(shared_test_lib.BaseTestCase):
+  """Tests for the synthetic hive generator."""
+
+  def _WriteRegistry(self, path, hive_type, **kwargs):
+    """Writes a synthetic Windows Registry file and opens it.
+
+    Args:
+      path (str): path of the Windows Registry file.
+      hive_type (str): hive type.
+      kwargs (dict[str, object]): hive type specific options.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry.
+    """
+    generator = synthetic_hives.SyntheticHiveGenerator(seed=1)
+    root_key = generator.GetRootKey(hive_type, **kwargs)
+
+    writer = synthetic_hives.REGFWriter()
+    writer.Write(path, root_key)
+
+    registry_file_reader = volume_scanner.SingleFileWindowsRegistryFileReader(
+        path)
+    return dfwinreg_registry.WinRegistry(
+        registry_file_reader=registry_file_reader)
+
+  def testNTUserHive(self):
+    """Tests a synthetic NTUSER.DAT Registry file."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      path = os.path.join(temporary_directory, 'NTUSER.DAT')
+      registry = self._WriteRegistry(
+          path, 'ntuser', mru_entries=5, userassist_entries=5)
+
+      collector_object = mru.MostRecentlyUsedCollector()
+      self.assertTrue(collector_object.Collect(registry))
+      self.assertEqual(len(collector_object.mru_entries), 5)
+
+      collector_object = userassist.UserAssistCollector()
+      self.assertTrue(collector_object.Collect(registry))
+      self.assertEqual(len(collector_object.user_assist_entries), 5)
+
+  def testSAMHive(self):
+    """Tests a synthetic SAM Registry file."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      path = os.path.join(temporary_directory, 'SAM')
+      registry = self._WriteRegistry(path, 'sam', number_of_users=5)
+
+      collector_object = sam.SecurityAccountManagerCollector()
+      user_accounts = list(collector_object.Collect(registry))
+      self.assertEqual(len(user_accounts), 5)
+
+  def testSoftwareHive(self):
+    """Tests a synthetic SOFTWARE Registry file."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      path = os.path.join(temporary_directory, 'SOFTWARE')
+      registry = self._WriteRegistry(path, 'software', number_of_tasks=5)
+
+      collector_object = task_cache.TaskCacheCollector()
+      cached_tasks = list(collector_object.Collect(registry))
+      self.assertEqual(len(cached_tasks), 5)
+
+  def testSystemHive(self):
+    """Tests a synthetic SYSTEM Registry file."""
+    formats = sorted(
+        synthetic_hives.SyntheticValueDataGenerator.APPCOMPATCACHE_FORMATS)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      for appcompatcache_format in formats:
+        path = os.path.join(
+            temporary_directory, f'SYSTEM.{appcompatcache_format:s}')
+
+        # 200 entries result in AppCompatCache value data that is stored in
+        # a big data (db) record.
+        registry = self._WriteRegistry(
+            path, 'system', appcompatcache_entries=200,
+            appcompatcache_format=appcompatcache_format, number_of_services=5)
+
+        collector_object = services.WindowsServicesCollector()
+        windows_services = list(collector_object.Collect(registry))
+        self.assertEqual(len(windows_services), 5)
+
+        collector_object = appcompatcache.AppCompatCacheCollector()
+        self.assertTrue(collector_object.Collect(registry))
+
+        cached_entries = collector_object.cached_entries
+        self.assertEqual(len(cached_entries), 200)
+        self.assertTrue(cached_entries[-1].path.endswith('\\program199.exe'))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -39,6 +39,9 @@ class TaskCacheDataParserTest(test_lib.BaseTestCase):
     # TODO: compare date time value.
     self.assertIsNotNone(cached_task.launch_time)
 
+    self.assertEqual(
+        cached_task.last_registered_time.timestamp, 0x01ca043f127d1c0c)
+
     cached_task = task_cache.CachedTask()
     data_parser.ParseDynamicInfo(_DYNAMIC_INFO2_DATA, cached_task)
 
@@ -174,29 +177,28 @@ class TaskCacheCollectorTest(test_lib.BaseTestCase):
     collector_object = task_cache.TaskCacheCollector(
         output_writer=test_output_writer)
 
-    result = collector_object.Collect(registry)
-    self.assertTrue(result)
+    test_results = list(collector_object.Collect(registry))
 
     test_output_writer.Close()
 
-    self.assertEqual(len(collector_object.cached_tasks), 2)
+    self.assertEqual(len(test_results), 2)
 
-    cached_tasks = sorted(
-        collector_object.cached_tasks, key=lambda task: task.identifier)
+    cached_tasks = sorted(test_results, key=lambda task: task.identifier)
 
     cached_task = cached_tasks[0]
 
     self.assertIsNotNone(cached_task)
     self.assertEqual(cached_task.identifier, self._GUID1)
-    # TODO: fix test
-    # self.assertEqual(cached_task.name, self._NAME1)
+    self.assertEqual(cached_task.name, self._NAME1)
+    self.assertEqual(cached_task.path, self._PATH)
 
     cached_task = cached_tasks[1]
 
     self.assertIsNotNone(cached_task)
     self.assertEqual(cached_task.identifier, self._GUID2)
-    # TODO: fix test
-    # self.assertEqual(cached_task.name, self._NAME2)
+    self.assertEqual(cached_task.name, self._NAME2)
+    self.assertEqual(
+        cached_task.path, '\\Microsoft\\Windows\\Location\\Notifications')
 
   def testCollectEmpty(self):
     """Tests the Collect function on an empty Registry."""
@@ -206,12 +208,11 @@ class TaskCacheCollectorTest(test_lib.BaseTestCase):
     collector_object = task_cache.TaskCacheCollector(
         output_writer=test_output_writer)
 
-    result = collector_object.Collect(registry)
-    self.assertFalse(result)
+    test_results = list(collector_object.Collect(registry))
 
     test_output_writer.Close()
 
-    self.assertEqual(len(collector_object.cached_tasks), 0)
+    self.assertEqual(len(test_results), 0)
 
 
 if __name__ == '__main__':
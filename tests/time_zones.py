@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the Windows time zones collector."""
+
+import datetime
+import struct
+import unittest
+
+from dfwinreg import definitions as dfwinreg_definitions
+from dfwinreg import fake as dfwinreg_fake
+from dfwinreg import registry as dfwinreg_registry
+
+from winregrc import output_writers
+from winregrc import time_zones
+
+from tests import test_lib as shared_test_lib
+
+
+def _CreateTZIValueData(
+    bias, standard_bias, daylight_bias, standard_date, daylight_date):
+  """Creates TZI value data.
+
+  Args:
+    bias (int): bias.
+    standard_bias (int): standard bias.
+    daylight_bias (int): daylight bias.
+    standard_date (tuple[int]): SYSTEMTIME values of the standard date.
+    daylight_date (tuple[int]): SYSTEMTIME values of the daylight date.
+
+  Returns:
+    bytes: TZI value data.
+  """
+  return struct.pack(
+      '<3l16H', bias, standard_bias, daylight_bias, *standard_date,
+      *daylight_date)
+
+
+def _GetFiletime(*date_time_values):
+  """Retrieves a FILETIME timestamp.
+
+  Args:
+    date_time_values (tuple[int]): year, month, day of month, hours and
+        minutes.
+
+  Returns:
+    int: FILETIME timestamp.
+  """
+  time_elapsed = (
+      datetime.datetime(*date_time_values) - datetime.datetime(1601, 1, 1))
+  return time_elapsed // datetime.timedelta(microseconds=1) * 10
+
+
+# Eastern Standard Time since 2007, where daylight saving time starts on the
+# 2nd Sunday of March and ends on the 1st Sunday of November.
+_TZI_VALUE_DATA = _CreateTZIValueData(
+    300, 0, -60, (0, 11, 0, 1, 2, 0, 0, 0), (0, 3, 0, 2, 2, 0, 0, 0))
+
+# Eastern Standard Time before 2007, where daylight saving time starts on the
+# 1st Sunday of April and ends on the last Sunday of October.
+_TZI_VALUE_DATA_2006 = _CreateTZIValueData(
+    300, 0, -60, (0, 10, 0, 5, 2, 0, 0, 0), (0, 4, 0, 1, 2, 0, 0, 0))
+
+# Time zone with daylight saving time on absolute dates in 2011, where
+# daylight saving time starts on March 27 and ends on October 30.
+_TZI_VALUE_DATA_ABSOLUTE = _CreateTZIValueData(
+    -120, 0, -60, (2011, 10, 0, 30, 3, 0, 0, 0),
+    (2011, 3, 0, 27, 2, 0, 0, 0))
+
+# Time zone without daylight saving time.
+_TZI_VALUE_DATA_UTC = _CreateTZIValueData(
+    0, 0, 0, (0, 0, 0, 0, 0, 0, 0, 0), (0, 0, 0, 0, 0, 0, 0, 0))
+
+
+class TestOutputWriter(output_writers.StdoutOutputWriter):
+  """Output writer for testing.
+
+  Attributes:
+    time_zones (list[TimeZone]): time zones.
+  """
+
+  def __init__(self):
+    """Initializes an output writer object."""
+    super(TestOutputWriter, self).__init__()
+    self.time_zones = []
+
+  def WriteTimeZone(self, time_zone):
+    """Writes a time zone to the output.
+
+    Args:
+      time_zone (TimeZone): time zone.
+    """
+    self.time_zones.append(time_zone)
+
+
+class TimeZoneTransitionTableTest(shared_test_lib.BaseTestCase):
+  """Tests for the time zone transition table."""
+
+  def testAddTransition(self):
+    """Tests the AddTransition function."""
+    transition_table = time_zones.TimeZoneTransitionTable()
+
+    transition_table.AddTransition(100, 300)
+    transition_table.AddTransition(200, 300)
+    transition_table.AddTransition(300, 240)
+    transition_table.AddTransition(300, 300)
+    transition_table.AddTransition(400, 240)
+
+    self.assertEqual(transition_table.GetTransitions(), [
+        (100, 300), (400, 240)])
+
+    with self.assertRaises(ValueError):
+      transition_table.AddTransition(200, 300)
+
+  def testCopyLocalTimesToUTC(self):
+    """Tests the CopyLocalTimesToUTC function."""
+    transition_table = time_zones.TimeZoneTransitionTable()
+
+    with self.assertRaises(ValueError):
+      transition_table.CopyLocalTimesToUTC([0])
+
+    transition_table.AddTransition(1000, 1)
+    transition_table.AddTransition(2000, 2)
+
+    bias_multiplier = 60 * 10000000
+
+    utc_timestamps = transition_table.CopyLocalTimesToUTC([
+        500, 1000, 1500, 1999, 2000, 3000, 1500])
+    self.assertEqual(list(utc_timestamps), [
+        500 + bias_multiplier, 1000 + bias_multiplier, 1500 + bias_multiplier,
+        1999 + bias_multiplier, 2000 + 2 * bias_multiplier,
+        3000 + 2 * bias_multiplier, 1500 + bias_multiplier])
+
+
+class TimeZoneInformationDataParserTest(shared_test_lib.BaseTestCase):
+  """Tests for the Time Zone Information (TZI) data parser."""
+
+  def testParseTransitions(self):
+    """Tests the ParseTransitions function."""
+    data_parser = time_zones.TimeZoneInformationDataParser()
+
+    transitions = data_parser.ParseTransitions(_TZI_VALUE_DATA, 2023)
+    self.assertEqual(transitions, [
+        (_GetFiletime(2023, 1, 1), 300),
+        (_GetFiletime(2023, 3, 12, 2, 0), 240),
+        (_GetFiletime(2023, 11, 5, 2, 0), 300)])
+
+    transitions = data_parser.ParseTransitions(_TZI_VALUE_DATA_2006, 2006)
+    self.assertEqual(transitions, [
+        (_GetFiletime(2006, 1, 1), 300),
+        (_GetFiletime(2006, 4, 2, 2, 0), 240),
+        (_GetFiletime(2006, 10, 29, 2, 0), 300)])
+
+    transitions = data_parser.ParseTransitions(_TZI_VALUE_DATA_UTC, 2023)
+    self.assertEqual(transitions, [(_GetFiletime(2023, 1, 1), 0)])
+
+    transitions = data_parser.ParseTransitions(_TZI_VALUE_DATA_ABSOLUTE, 2011)
+    self.assertEqual(transitions, [
+        (_GetFiletime(2011, 1, 1), -120),
+        (_GetFiletime(2011, 3, 27, 2, 0), -180),
+        (_GetFiletime(2011, 10, 30, 3, 0), -120)])
+
+    # Absolute dates only apply to their year.
+    transitions = data_parser.ParseTransitions(_TZI_VALUE_DATA_ABSOLUTE, 2012)
+    self.assertEqual(transitions, [(_GetFiletime(2012, 1, 1), -120)])
+
+  def testParseTZIValue(self):
+    """Tests the ParseTZIValue function."""
+    data_parser = time_zones.TimeZoneInformationDataParser()
+
+    time_zone = time_zones.TimeZone('Eastern Standard Time')
+    data_parser.ParseTZIValue(_TZI_VALUE_DATA, time_zone)
+    self.assertEqual(time_zone.offset, 300)
+
+
+class TimeZonesCollectorTest(shared_test_lib.BaseTestCase):
+  """Tests for the Windows time zones collector."""
+
+  def _CreateTestRegistry(self):
+    """Creates Registry keys and values for testing.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry for testing.
+    """
+    key_path_prefix = 'HKEY_LOCAL_MACHINE\\Software'
+
+    registry_file = dfwinreg_fake.FakeWinRegistryFile(
+        key_path_prefix=key_path_prefix)
+
+    registry_key = dfwinreg_fake.FakeWinRegistryKey('Eastern Standard Time')
+    registry_file.AddKeyByPath(
+        '\\Microsoft\\Windows NT\\CurrentVersion\\Time Zones', registry_key)
+
+    registry_value = dfwinreg_fake.FakeWinRegistryValue(
+        'TZI', data=_TZI_VALUE_DATA, data_type=dfwinreg_definitions.REG_BINARY)
+    registry_key.AddValue(registry_value)
+
+    subkey = dfwinreg_fake.FakeWinRegistryKey('Dynamic DST')
+    registry_key.AddSubkey('Dynamic DST', subkey)
+
+    for value_name, value_data in (
+        ('FirstEntry', 2006), ('LastEntry', 2007)):
+      registry_value = dfwinreg_fake.FakeWinRegistryValue(
+          value_name, data=struct.pack('<L', value_data),
+          data_type=dfwinreg_definitions.REG_DWORD_LITTLE_ENDIAN)
+      subkey.AddValue(registry_value)
+
+    for value_name, value_data in (
+        ('2006', _TZI_VALUE_DATA_2006), ('2007', _TZI_VALUE_DATA)):
+      registry_value = dfwinreg_fake.FakeWinRegistryValue(
+          value_name, data=value_data,
+          data_type=dfwinreg_definitions.REG_BINARY)
+      subkey.AddValue(registry_value)
+
+    registry_file.Open(None)
+
+    registry = dfwinreg_registry.WinRegistry()
+    registry.MapFile(key_path_prefix, registry_file)
+    return registry
+
+  def testCollect(self):
+    """Tests the Collect function."""
+    registry = self._CreateTestRegistry()
+
+    test_output_writer = TestOutputWriter()
+    collector_object = time_zones.TimeZonesCollector()
+
+    result = collector_object.Collect(registry, test_output_writer)
+    self.assertTrue(result)
+
+    test_output_writer.Close()
+
+    self.assertEqual(len(test_output_writer.time_zones), 1)
+
+    time_zone = test_output_writer.time_zones[0]
+    self.assertEqual(time_zone.name, 'Eastern Standard Time')
+    self.assertEqual(time_zone.offset, 300)
+    self.assertIsNone(time_zone.transition_table)
+
+  def testCollectWithYears(self):
+    """Tests the Collect function with years."""
+    registry = self._CreateTestRegistry()
+
+    test_output_writer = TestOutputWriter()
+    collector_object = time_zones.TimeZonesCollector()
+
+    result = collector_object.Collect(
+        registry, test_output_writer, years=[2005, 2006, 2007])
+    self.assertTrue(result)
+
+    test_output_writer.Close()
+
+    self.assertEqual(len(test_output_writer.time_zones), 1)
+
+    transition_table = test_output_writer.time_zones[0].transition_table
+    self.assertIsNotNone(transition_table)
+    self.assertEqual(transition_table.GetTransitions(), [
+        (_GetFiletime(2005, 1, 1), 300),
+        (_GetFiletime(2005, 4, 3, 2, 0), 240),
+        (_GetFiletime(2005, 10, 30, 2, 0), 300),
+        (_GetFiletime(2006, 4, 2, 2, 0), 240),
+        (_GetFiletime(2006, 10, 29, 2, 0), 300),
+        (_GetFiletime(2007, 3, 11, 2, 0), 240),
+        (_GetFiletime(2007, 11, 4, 2, 0), 300)])
+
+    utc_timestamps = transition_table.CopyLocalTimesToUTC([
+        _GetFiletime(2007, 1, 1, 12, 0), _GetFiletime(2007, 7, 1, 12, 0)])
+    self.assertEqual(list(utc_timestamps), [
+        _GetFiletime(2007, 1, 1, 17, 0), _GetFiletime(2007, 7, 1, 16, 0)])
+
+  def testCollectEmpty(self):
+    """Tests the Collect function on an empty Registry."""
+    registry = dfwinreg_registry.WinRegistry()
+
+    test_output_writer = TestOutputWriter()
+    collector_object = time_zones.TimeZonesCollector()
+
+    result = collector_object.Collect(registry, test_output_writer)
+    self.assertFalse(result)
+
+    test_output_writer.Close()
+
+    self.assertEqual(len(test_output_writer.time_zones), 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -74,6 +74,21 @@ class TypeLibraryCollectorTest(test_lib.BaseTestCase):
         '', data=value_data, data_type=dfwinreg_definitions.REG_SZ)
     platform_key.AddValue(registry_value)
 
+    flags_key = dfwinreg_fake.FakeWinRegistryKey('FLAGS')
+    subkey.AddSubkey('FLAGS', flags_key)
+
+    language_key = dfwinreg_fake.FakeWinRegistryKey('407')
+    subkey.AddSubkey('407', language_key)
+
+    for platform in ('Win32', 'Win64'):
+      platform_key = dfwinreg_fake.FakeWinRegistryKey(platform)
+      language_key.AddSubkey(platform, platform_key)
+
+      value_data = self._FILENAME1.encode('utf-16-le')
+      registry_value = dfwinreg_fake.FakeWinRegistryValue(
+          '', data=value_data, data_type=dfwinreg_definitions.REG_SZ)
+      platform_key.AddValue(registry_value)
+
     registry_key = dfwinreg_fake.FakeWinRegistryKey(self._IDENTIFIER2)
     registry_file.AddKeyByPath('\\Classes\\TypeLib', registry_key)
 
@@ -110,19 +125,48 @@ class TypeLibraryCollectorTest(test_lib.BaseTestCase):
     collector_object = type_libraries.TypeLibrariesCollector(
         output_writer=test_output_writer)
 
-    result = collector_object.Collect(registry)
-    self.assertTrue(result)
-
-    self.assertEqual(len(collector_object.type_libraries), 2)
+    test_results = list(collector_object.Collect(registry))
+    self.assertEqual(len(test_results), 2)
 
-    type_library = collector_object.type_libraries[0]
+    type_library = test_results[0]
 
     self.assertIsNotNone(type_library)
     self.assertEqual(type_library.description, self._DESCRIPTION1)
     self.assertEqual(type_library.identifier, self._IDENTIFIER1)
+    self.assertEqual(type_library.language, '409')
+    self.assertEqual(type_library.platform, 'Win32')
     self.assertEqual(type_library.typelib_filename, self._FILENAME1)
     self.assertEqual(type_library.version, self._VERSION1)
 
+    type_library = test_results[1]
+
+    self.assertIsNotNone(type_library)
+    self.assertEqual(type_library.identifier, self._IDENTIFIER2)
+    self.assertEqual(type_library.language, '0')
+    self.assertEqual(type_library.platform, 'x64')
+
+  def testCollectAllLanguagesAndPlatforms(self):
+    """Tests the Collect function with all languages and platforms."""
+    registry = self._CreateTestRegistry()
+
+    test_output_writer = test_lib.TestOutputWriter()
+    collector_object = type_libraries.TypeLibrariesCollector(
+        output_writer=test_output_writer)
+
+    test_results = list(collector_object.Collect(
+        registry, all_languages=True, all_platforms=True))
+    self.assertEqual(len(test_results), 4)
+
+    languages_and_platforms = sorted([
+        (type_library.language, type_library.platform)
+        for type_library in test_results])
+    self.assertEqual(languages_and_platforms, [
+        ('0', 'x64'), ('407', 'Win32'), ('407', 'Win64'), ('409', 'Win32')])
+
+    test_results = list(collector_object.Collect(
+        registry, all_languages=True))
+    self.assertEqual(len(test_results), 3)
+
   def testCollectEmpty(self):
     """Tests the Collect function on an empty Registry."""
     registry = dfwinreg_registry.WinRegistry()
@@ -131,10 +175,8 @@ class TypeLibraryCollectorTest(test_lib.BaseTestCase):
     collector_object = type_libraries.TypeLibrariesCollector(
         output_writer=test_output_writer)
 
-    result = collector_object.Collect(registry)
-    self.assertFalse(result)
-
-    self.assertEqual(len(collector_object.type_libraries), 0)
+    test_results = list(collector_object.Collect(registry))
+    self.assertEqual(len(test_results), 0)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the USB devices correlation collector."""
+
+import unittest
+
+from dfwinreg import definitions as dfwinreg_definitions
+from dfwinreg import fake as dfwinreg_fake
+from dfwinreg import registry as dfwinreg_registry
+
+from winregrc import usb_devices
+
+from tests import test_lib as shared_test_lib
+
+
+class USBDevicesCollectorTest(shared_test_lib.BaseTestCase):
+  """Tests for the USB devices correlation collector."""
+
+  _DEVICE_KEY_NAME = 'Disk&Ven_Generic&Prod_Flash_Disk&Rev_8.07'
+
+  _DISK_CLASS_IDENTIFIER = '{53f56307-b6bf-11d0-94f2-00a0c91efb8b}'
+
+  _VOLUME_CLASS_IDENTIFIER = '{53f5630d-b6bf-11d0-94f2-00a0c91efb8b}'
+
+  _VOLUME_IDENTIFIER = '{9e3b3947-ca5d-4614-91a2-7b624e0e7244}'
+
+  def _CreateTestRegistry(self):
+    """Creates Registry keys and values for testing.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry for testing.
+    """
+    key_path_prefix = 'HKEY_LOCAL_MACHINE\\System'
+
+    registry_file = dfwinreg_fake.FakeWinRegistryFile(
+        key_path_prefix=key_path_prefix)
+
+    device_key = dfwinreg_fake.FakeWinRegistryKey(self._DEVICE_KEY_NAME)
+    registry_file.AddKeyByPath(
+        '\\CurrentControlSet\\Enum\\USBSTOR', device_key)
+
+    for instance_name, parent_identifier_prefix in (
+        ('0123456789&0', None), ('6&2a3b4c5d&0', '7&1c2d3e4f&0')):
+      device_instance_key = dfwinreg_fake.FakeWinRegistryKey(instance_name)
+      device_key.AddSubkey(instance_name, device_instance_key)
+
+      if parent_identifier_prefix:
+        registry_value = dfwinreg_fake.FakeWinRegistryValue(
+            'ParentIdPrefix', data=parent_identifier_prefix.encode(
+                'utf-16-le'), data_type=dfwinreg_definitions.REG_SZ)
+        device_instance_key.AddValue(registry_value)
+
+    registry_key = dfwinreg_fake.FakeWinRegistryKey('MountedDevices')
+    registry_file.AddKeyByPath('\\', registry_key)
+
+    device_string = (
+        f'_??_USBSTOR#{self._DEVICE_KEY_NAME:s}#0123456789&0#'
+        f'{self._DISK_CLASS_IDENTIFIER:s}')
+    for value_name in (
+        f'\\??\\Volume{self._VOLUME_IDENTIFIER:s}', '\\DosDevices\\E:'):
+      registry_value = dfwinreg_fake.FakeWinRegistryValue(
+          value_name, data=device_string.encode('utf-16-le'),
+          data_type=dfwinreg_definitions.REG_BINARY)
+      registry_key.AddValue(registry_value)
+
+    device_string = (
+        f'\\??\\STORAGE#RemovableMedia#7&1c2d3e4f&0&RM#'
+        f'{self._DISK_CLASS_IDENTIFIER:s}')
+    registry_value = dfwinreg_fake.FakeWinRegistryValue(
+        '\\DosDevices\\F:', data=device_string.encode('utf-16-le'),
+        data_type=dfwinreg_definitions.REG_BINARY)
+    registry_key.AddValue(registry_value)
+
+    registry_value = dfwinreg_fake.FakeWinRegistryValue(
+        '\\DosDevices\\C:',
+        data=b'\x78\x56\x34\x12\x00\x10\x00\x00\x00\x00\x00\x00',
+        data_type=dfwinreg_definitions.REG_BINARY)
+    registry_key.AddValue(registry_value)
+
+    registry_key = dfwinreg_fake.FakeWinRegistryKey(
+        self._DISK_CLASS_IDENTIFIER)
+    registry_file.AddKeyByPath(
+        '\\CurrentControlSet\\Control\\DeviceClasses', registry_key)
+
+    key_name = (
+        f'##?#USBSTOR#{self._DEVICE_KEY_NAME:s}#0123456789&0#'
+        f'{self._DISK_CLASS_IDENTIFIER:s}')
+    registry_key.AddSubkey(key_name, dfwinreg_fake.FakeWinRegistryKey(
+        key_name))
+
+    key_name = f'##?#IDE#DiskBogus#0000#{self._DISK_CLASS_IDENTIFIER:s}'
+    registry_key.AddSubkey(key_name, dfwinreg_fake.FakeWinRegistryKey(
+        key_name))
+
+    registry_key = dfwinreg_fake.FakeWinRegistryKey(
+        self._VOLUME_CLASS_IDENTIFIER)
+    registry_file.AddKeyByPath(
+        '\\CurrentControlSet\\Control\\DeviceClasses', registry_key)
+
+    key_name = (
+        f'##?#STORAGE#Volume#{self._VOLUME_IDENTIFIER:s}#0000000000100000#'
+        f'{self._VOLUME_CLASS_IDENTIFIER:s}')
+    registry_key.AddSubkey(key_name, dfwinreg_fake.FakeWinRegistryKey(
+        key_name))
+
+    registry_file.Open(None)
+
+    registry = dfwinreg_registry.WinRegistry()
+    registry.MapFile(key_path_prefix, registry_file)
+    return registry
+
+  def testCollect(self):
+    """Tests the Collect function."""
+    registry = self._CreateTestRegistry()
+
+    collector_object = usb_devices.USBDevicesCollector()
+
+    test_results = list(collector_object.Collect(registry))
+    self.assertEqual(len(test_results), 2)
+
+    usb_device = test_results[0]
+    self.assertEqual(usb_device.storage_device.serial_number, '0123456789')
+    self.assertEqual(len(usb_device.mounted_devices), 2)
+    self.assertEqual(usb_device.volume_identifiers, [self._VOLUME_IDENTIFIER])
+    self.assertEqual(len(usb_device.device_interfaces), 2)
+    self.assertEqual(
+        usb_device.device_interfaces[0].class_identifier,
+        self._DISK_CLASS_IDENTIFIER)
+    self.assertEqual(
+        usb_device.device_interfaces[1].class_identifier,
+        self._VOLUME_CLASS_IDENTIFIER)
+
+    usb_device = test_results[1]
+    self.assertIsNone(usb_device.storage_device.serial_number)
+    self.assertEqual(
+        usb_device.storage_device.parent_identifier_prefix, '7&1c2d3e4f&0')
+    self.assertEqual(len(usb_device.mounted_devices), 1)
+    self.assertEqual(
+        usb_device.mounted_devices[0].identifier, '\\DosDevices\\F:')
+    self.assertEqual(usb_device.volume_identifiers, [])
+    self.assertEqual(usb_device.device_interfaces, [])
+
+  def testCollectEmpty(self):
+    """Tests the Collect function on an empty Registry."""
+    registry = dfwinreg_registry.WinRegistry()
+
+    collector_object = usb_devices.USBDevicesCollector()
+
+    test_results = list(collector_object.Collect(registry))
+    self.assertEqual(len(test_results), 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
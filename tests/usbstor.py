@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the USB storage device collector."""
+
+import unittest
+
+from dfwinreg import definitions as dfwinreg_definitions
+from dfwinreg import fake as dfwinreg_fake
+from dfwinreg import registry as dfwinreg_registry
+
+from winregrc import errors
+from winregrc import profilers
+from winregrc import usbstor
+
+from tests import test_lib as shared_test_lib
+
+
+class USBStorageDeviceCollectorTest(shared_test_lib.BaseTestCase):
+  """Tests for the USB storage device collector."""
+
+  # pylint: disable=protected-access
+
+  _DEVICE_KEY_NAME = 'Disk&Ven_Generic&Prod_Flash_Disk&Rev_8.07'
+
+  _PROPERTY_SET = '{83da6326-97a6-4088-9453-a1923f573b29}'
+
+  def _CreatePropertyKey(self, property_identifier, value_type, value_data):
+    """Creates a property key for testing.
+
+    Args:
+      property_identifier (str): identifier of the property.
+      value_type (int): property value type.
+      value_data (bytes): property value data.
+
+    Returns:
+      dfwinreg.FakeWinRegistryKey: property Windows Registry key.
+    """
+    property_key = dfwinreg_fake.FakeWinRegistryKey(property_identifier)
+
+    property_value_key = dfwinreg_fake.FakeWinRegistryKey('00000000')
+    property_key.AddSubkey('00000000', property_value_key)
+
+    registry_value = dfwinreg_fake.FakeWinRegistryValue(
+        'Type', data=value_type.to_bytes(4, 'little'),
+        data_type=dfwinreg_definitions.REG_DWORD_LITTLE_ENDIAN)
+    property_value_key.AddValue(registry_value)
+
+    registry_value = dfwinreg_fake.FakeWinRegistryValue(
+        'Data', data=value_data, data_type=dfwinreg_definitions.REG_BINARY)
+    property_value_key.AddValue(registry_value)
+
+    return property_key
+
+  def _CreateTestRegistry(self):
+    """Creates Registry keys and values for testing.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry for testing.
+    """
+    key_path_prefix = 'HKEY_LOCAL_MACHINE\\System'
+
+    registry_file = dfwinreg_fake.FakeWinRegistryFile(
+        key_path_prefix=key_path_prefix)
+
+    device_key = dfwinreg_fake.FakeWinRegistryKey(self._DEVICE_KEY_NAME)
+    registry_file.AddKeyByPath(
+        '\\CurrentControlSet\\Enum\\USBSTOR', device_key)
+
+    for instance_name in ('0123456789&0', '9876543210&0'):
+      device_instance_key = dfwinreg_fake.FakeWinRegistryKey(instance_name)
+      device_key.AddSubkey(instance_name, device_instance_key)
+
+      value_data = 'Generic Flash Disk USB Device'.encode('utf-16-le')
+      registry_value = dfwinreg_fake.FakeWinRegistryValue(
+          'FriendlyName', data=value_data,
+          data_type=dfwinreg_definitions.REG_SZ)
+      device_instance_key.AddValue(registry_value)
+
+      properties_key = dfwinreg_fake.FakeWinRegistryKey('Properties')
+      device_instance_key.AddSubkey('Properties', properties_key)
+
+      property_set_key = dfwinreg_fake.FakeWinRegistryKey(self._PROPERTY_SET)
+      properties_key.AddSubkey(self._PROPERTY_SET, property_set_key)
+
+      property_key = self._CreatePropertyKey(
+          '00000006', 0x00000007, b'\x01\x00\x00\x00')
+      property_set_key.AddSubkey('00000006', property_key)
+
+      property_key = self._CreatePropertyKey(
+          '00000064', 0x00000010, b'\x00\x80\x3e\xd5\xde\xb1\x9d\x01')
+      property_set_key.AddSubkey('00000064', property_key)
+
+      property_set_key = dfwinreg_fake.FakeWinRegistryKey(
+          '{a8b865dd-2e3d-4094-ad97-e593a70c75d6}')
+      properties_key.AddSubkey(
+          '{a8b865dd-2e3d-4094-ad97-e593a70c75d6}', property_set_key)
+
+      property_key = self._CreatePropertyKey(
+          '00000003', 0x00000012, '10.0.19041.1\x00'.encode('utf-16-le'))
+      property_set_key.AddSubkey('00000003', property_key)
+
+    registry_file.Open(None)
+
+    registry = dfwinreg_registry.WinRegistry()
+    registry.MapFile(key_path_prefix, registry_file)
+    return registry
+
+  def testCollect(self):
+    """Tests the Collect function."""
+    registry = self._CreateTestRegistry()
+
+    collector_object = usbstor.USBStorageDeviceCollector()
+
+    test_results = list(collector_object.Collect(registry))
+    self.assertEqual(len(test_results), 2)
+
+    storage_device = test_results[0]
+    self.assertEqual(storage_device.device_type, 'Disk')
+    self.assertEqual(
+        storage_device.display_name, 'Generic Flash Disk USB Device')
+    self.assertTrue(storage_device.key_path.endswith(
+        '\\Disk&Ven_Generic&Prod_Flash_Disk&Rev_8.07\\0123456789&0'))
+    self.assertEqual(storage_device.product, 'Prod_Flash_Disk')
+    self.assertEqual(storage_device.revision, 'Rev_8.07')
+    self.assertEqual(storage_device.vendor, 'Ven_Generic')
+    self.assertEqual(len(storage_device.properties), 3)
+
+    storage_device_property = storage_device.properties[0]
+    self.assertEqual(storage_device_property.value_type, 0x00000007)
+    self.assertEqual(storage_device_property.value, 1)
+
+    storage_device_property = storage_device.properties[1]
+    self.assertEqual(storage_device_property.value_type, 0x00000010)
+    self.assertEqual(
+        storage_device_property.value.timestamp, 0x019db1ded53e8000)
+
+    storage_device_property = storage_device.properties[2]
+    self.assertEqual(storage_device_property.value_type, 0x00000012)
+    self.assertEqual(storage_device_property.value, '10.0.19041.1')
+
+    storage_device = test_results[1]
+    self.assertTrue(storage_device.key_path.endswith('\\9876543210&0'))
+
+  def testCollectPropertySets(self):
+    """Tests the Collect function with property sets."""
+    registry = self._CreateTestRegistry()
+
+    collector_object = usbstor.USBStorageDeviceCollector()
+
+    test_results = list(collector_object.Collect(
+        registry, property_sets=[self._PROPERTY_SET.upper()]))
+    self.assertEqual(len(test_results), 2)
+
+    storage_device = test_results[0]
+    self.assertEqual(len(storage_device.properties), 2)
+    self.assertEqual(
+        storage_device.properties[0].property_set, self._PROPERTY_SET)
+
+  def testCollectWithStatistics(self):
+    """Tests the Collect function with access statistics."""
+    registry = self._CreateTestRegistry()
+
+    collector_object = usbstor.USBStorageDeviceCollector()
+
+    test_profiler = profilers.ScriptProfiler('profile')
+    registry = test_profiler.ProfileRegistryAccess(collector_object, registry)
+
+    test_results = list(collector_object.Collect(registry))
+    self.assertEqual(len(test_results), 2)
+
+    # The type and data of the 32-bit and 64-bit integer properties and
+    # the type of the string property are unpacked for each device.
+    statistics = test_profiler.GetRegistryAccessStatistics(collector_object)
+    self.assertEqual(statistics.number_of_mappings, 10)
+
+  def testCollectEmpty(self):
+    """Tests the Collect function on an empty Registry."""
+    registry = dfwinreg_registry.WinRegistry()
+
+    collector_object = usbstor.USBStorageDeviceCollector()
+
+    test_results = list(collector_object.Collect(registry))
+    self.assertEqual(len(test_results), 0)
+
+  def testParseUTF16String(self):
+    """Tests the _ParseUTF16String function."""
+    collector_object = usbstor.USBStorageDeviceCollector()
+
+    string = collector_object._ParseUTF16String(b'A\x00\x00\x01\x00\x00')
+    self.assertEqual(string, 'AĀ')
+
+    string = collector_object._ParseUTF16String(b'A\x00B\x00C')
+    self.assertEqual(string, 'AB')
+
+    string = collector_object._ParseUTF16String(b'')
+    self.assertEqual(string, '')
+
+    with self.assertRaises(errors.ParseError):
+      collector_object._GetPropertyValueData(None, 0x00000007)
+
+
+if __name__ == '__main__':
+  unittest.main()
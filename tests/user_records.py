@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the collector of records from the Registry files of all users."""
+
+import unittest
+
+from dfwinreg import registry as dfwinreg_registry
+
+from winregrc import profiles
+from winregrc import user_records
+
+from tests import test_lib as shared_test_lib
+
+
+class TestWindowsRegistryVolumeScanner(object):
+  """Windows Registry volume scanner for testing."""
+
+  def GetUserProfiles(self):
+    """Retrieves the user profiles of the Windows volume.
+
+    Returns:
+      list[UserProfile]: user profiles.
+    """
+    return [
+        profiles.UserProfile('S-1-5-21-1-2-3-1000', '\\Users\\alice'),
+        profiles.UserProfile(None, '\\Users\\bob'),
+        profiles.UserProfile('S-1-5-21-1-2-3-1002', '\\Users\\carol')]
+
+  def OpenUserRegistry(self, user_profile):
+    """Opens the Windows Registry of a user.
+
+    Args:
+      user_profile (UserProfile): user profile.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry of the user or None if not
+          available.
+    """
+    if user_profile.profile_path == '\\Users\\carol':
+      return None
+
+    return dfwinreg_registry.WinRegistry()
+
+
+class UserRecordsCollectorTest(shared_test_lib.BaseTestCase):
+  """Tests for the collector of records from the Registry files of users."""
+
+  def _CollectRecords(self, registry):
+    """Collects records from a Windows Registry.
+
+    Args:
+      registry (dfwinreg.WinRegistry): Windows Registry.
+
+    Returns:
+      list[str]: records.
+    """
+    self.assertIsNotNone(registry)
+    return ['record1', 'record2']
+
+  def testCollect(self):
+    """Tests the Collect function."""
+    scanner = TestWindowsRegistryVolumeScanner()
+
+    for number_of_workers in (1, 4):
+      collector_object = user_records.UserRecordsCollector(
+          scanner, self._CollectRecords, number_of_workers=number_of_workers)
+
+      results = [
+          (user_record.username, user_record.security_identifier,
+           user_record.record)
+          for user_record in collector_object.Collect()]
+
+      self.assertEqual(results, [
+          ('alice', 'S-1-5-21-1-2-3-1000', 'record1'),
+          ('alice', 'S-1-5-21-1-2-3-1000', 'record2'),
+          ('bob', None, 'record1'),
+          ('bob', None, 'record2')])
+
+
+if __name__ == '__main__':
+  unittest.main()
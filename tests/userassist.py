@@ -41,6 +41,8 @@ class UserAssistDataParserTest(test_lib.BaseTestCase):
 class UserAssistCollectorTest(test_lib.BaseTestCase):
   """Tests for the Windows User Assist collector."""
 
+  # pylint: disable=protected-access
+
   _GUID = '{5E6AB780-7743-11CF-A12B-00AA004AE837}'
 
   _UEME_CTLSESSION_VALUE_DATA = bytes(bytearray([
@@ -105,7 +107,22 @@ class UserAssistCollectorTest(test_lib.BaseTestCase):
 
     self.assertEqual(len(collector_object.user_assist_entries), 1)
 
-    # TODO: test user assist entry values.
+    user_assist_entry = collector_object.user_assist_entries[0]
+    self.assertEqual(user_assist_entry.guid, self._GUID)
+    self.assertEqual(
+        user_assist_entry.name, 'UEME_RUNPIDL:%csidl2%\\Windows Messenger.lnk')
+    self.assertEqual(user_assist_entry.number_of_executions, 17)
+    self.assertEqual(user_assist_entry.last_execution_time, 0x01ca1515d3f64b54)
+    self.assertIsNone(user_assist_entry.application_focus_count)
+
+  def testDecodeValueNames(self):
+    """Tests the _DecodeValueNames function."""
+    collector_object = userassist.UserAssistCollector()
+
+    value_names = collector_object._DecodeValueNames([
+        'HRZR_PGYFRFFVBA', 'P:\\Hfref\\Züyyre\\qbjaybnq.rkr'])
+    self.assertEqual(value_names, [
+        'UEME_CTLSESSION', 'C:\\Users\\Müller\\download.exe'])
 
   def testCollectEmpty(self):
     """Tests the Collect function on an empty Registry."""
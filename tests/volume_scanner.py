@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Tests for the Windows Registry volume scanner."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from dfvfs.helpers import windows_path_resolver as dfvfs_windows_path_resolver
+from dfvfs.lib import definitions as dfvfs_definitions
+from dfvfs.path import factory as dfvfs_path_spec_factory
+from dfvfs.resolver import resolver as dfvfs_resolver
+
+from winregrc import volume_scanner
+
+from tests import test_lib as shared_test_lib
+
+
+class CachingWindowsPathResolverTest(shared_test_lib.BaseTestCase):
+  """Tests for the Windows path resolver with previously resolved paths."""
+
+  def testResolvePath(self):
+    """Tests the ResolvePath function."""
+    test_path = self._GetTestFilePath([])
+    self._SkipIfPathNotExists(test_path)
+
+    mount_point = dfvfs_path_spec_factory.Factory.NewPathSpec(
+        dfvfs_definitions.TYPE_INDICATOR_OS, location=test_path)
+    file_system = dfvfs_resolver.Resolver.OpenFileSystem(mount_point)
+
+    sam_path_spec = dfvfs_path_spec_factory.Factory.NewPathSpec(
+        dfvfs_definitions.TYPE_INDICATOR_OS,
+        location=os.path.join(test_path, 'SAM'))
+
+    path_resolver = volume_scanner.CachingWindowsPathResolver(
+        file_system, mount_point, resolved_path_specs={
+            '%SystemRoot%\\System32\\config\\SAM': sam_path_spec,
+            '%SystemRoot%\\System32\\config\\SOFTWARE': None})
+
+    path_spec = path_resolver.ResolvePath(
+        '%SystemRoot%\\System32\\config\\SAM')
+    self.assertEqual(path_spec, sam_path_spec)
+
+    path_spec = path_resolver.ResolvePath(
+        '%SystemRoot%\\System32\\config\\SOFTWARE')
+    self.assertIsNone(path_spec)
+
+    path_spec = path_resolver.ResolvePath('\\SECURITY')
+    self.assertIsNotNone(path_spec)
+    self.assertEqual(
+        path_spec.location, os.path.join(test_path, 'SECURITY'))
+
+
+class PrefetchingWindowsRegistryFileReaderTest(shared_test_lib.BaseTestCase):
+  """Tests for the prefetching Windows Registry file reader."""
+
+  # pylint: disable=protected-access
+
+  def testPrefetchAndOpen(self):
+    """Tests the Prefetch and Open functions."""
+    test_path = self._GetTestFilePath([])
+    self._SkipIfPathNotExists(test_path)
+
+    mount_point = dfvfs_path_spec_factory.Factory.NewPathSpec(
+        dfvfs_definitions.TYPE_INDICATOR_OS, location=test_path)
+    file_system = dfvfs_resolver.Resolver.OpenFileSystem(mount_point)
+    path_resolver = dfvfs_windows_path_resolver.WindowsPathResolver(
+        file_system, mount_point)
+
+    registry_file_reader = (
+        volume_scanner.PrefetchingWindowsRegistryFileReader(
+            file_system, path_resolver, number_of_workers=2))
+
+    number_of_files = registry_file_reader.Prefetch(
+        paths=['\\SAM', '\\SECURITY', '\\bogus'])
+    self.assertEqual(number_of_files, 2)
+
+    registry_file = registry_file_reader.Open('\\SAM')
+    self.assertIsNotNone(registry_file)
+
+    root_key = registry_file.GetRootKey()
+    self.assertIsNotNone(root_key)
+
+    # Test a file that was not prefetched.
+    registry_file = registry_file_reader.Open('\\NTUSER.DAT')
+    self.assertIsNotNone(registry_file)
+
+    registry_file = registry_file_reader.Open('\\bogus')
+    self.assertIsNone(registry_file)
+
+    self.assertEqual(list(registry_file_reader._file_objects), ['\\SECURITY'])
+
+    registry_file_reader.Close()
+    self.assertEqual(registry_file_reader._file_objects, {})
+
+
+class WindowsRegistryVolumeScannerTest(shared_test_lib.BaseTestCase):
+  """Tests for the Windows Registry volume scanner."""
+
+  # pylint: disable=protected-access
+
+  def _CreateWindowsDirectory(self, path):
+    """Creates a directory with a Windows installation for testing.
+
+    Args:
+      path (str): path of the directory.
+    """
+    test_path = self._GetTestFilePath(['SAM'])
+    self._SkipIfPathNotExists(test_path)
+
+    config_path = os.path.join(path, 'Windows', 'System32', 'config')
+    os.makedirs(config_path)
+    shutil.copy(test_path, os.path.join(config_path, 'SAM'))
+
+    test_path = self._GetTestFilePath(['NTUSER.DAT'])
+    self._SkipIfPathNotExists(test_path)
+
+    for username in ('alice', 'bob'):
+      user_path = os.path.join(path, 'Users', username)
+      os.makedirs(user_path)
+      shutil.copy(test_path, os.path.join(user_path, 'NTUSER.DAT'))
+
+  def testGetUserProfilePath(self):
+    """Tests the _GetUserProfilePath function."""
+    scanner = volume_scanner.WindowsRegistryVolumeScanner()
+    scanner._windows_directory = 'C:\\Windows'
+
+    profile_path = scanner._GetUserProfilePath('C:\\Users\\alice')
+    self.assertEqual(profile_path, '\\Users\\alice')
+
+    profile_path = scanner._GetUserProfilePath(
+        '%SystemDrive%\\Users\\alice')
+    self.assertEqual(profile_path, '\\Users\\alice')
+
+    profile_path = scanner._GetUserProfilePath(
+        '%systemroot%\\system32\\config\\systemprofile')
+    self.assertEqual(
+        profile_path, '\\Windows\\system32\\config\\systemprofile')
+
+    profile_path = scanner._GetUserProfilePath('\\\\server\\share\\alice')
+    self.assertIsNone(profile_path)
+
+  def testGetUserProfilesAndOpenUserRegistry(self):
+    """Tests the GetUserProfiles and OpenUserRegistry functions."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      self._CreateWindowsDirectory(temporary_directory)
+
+      options = volume_scanner.VolumeScannerOptions()
+      options.username = ['none']
+
+      scanner = volume_scanner.WindowsRegistryVolumeScanner()
+      result = scanner.ScanForWindowsVolume(
+          temporary_directory, options=options)
+      self.assertTrue(result)
+
+      user_profiles = scanner.GetUserProfiles()
+      profile_paths = sorted(
+          user_profile.profile_path for user_profile in user_profiles)
+      self.assertEqual(
+          profile_paths, ['\\Users\\alice', '\\Users\\bob'])
+
+      registry = scanner.OpenUserRegistry(user_profiles[0])
+      self.assertIsNotNone(registry)
+
+      key = registry.GetKeyByPath('HKEY_CURRENT_USER\\Software')
+      self.assertIsNotNone(key)
+
+  def testGetRegistryFileHashAndGetSnapshotIdentifiers(self):
+    """Tests the GetRegistryFileHash and GetSnapshotIdentifiers functions."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      self._CreateWindowsDirectory(temporary_directory)
+
+      options = volume_scanner.VolumeScannerOptions()
+      options.username = ['none']
+
+      scanner = volume_scanner.WindowsRegistryVolumeScanner()
+      result = scanner.ScanForWindowsVolume(
+          temporary_directory, options=options)
+      self.assertTrue(result)
+
+      file_hash = scanner.GetRegistryFileHash(
+          '%SystemRoot%\\System32\\config\\SAM')
+      self.assertEqual(file_hash, (
+          'ce88f84842d5048550542126c1d9cc15ba7dea0486996dc1c814bf8a2d9351ea'))
+
+      file_hash = scanner.GetRegistryFileHash(
+          '%SystemRoot%\\System32\\config\\SYSTEM')
+      self.assertIsNone(file_hash)
+
+      # The file system of the current volume is opened once.
+      self.assertEqual(list(scanner._file_systems_per_snapshot), [''])
+
+      file_hash = scanner.GetRegistryFileHash(
+          '%SystemRoot%\\System32\\config\\SYSTEM',
+          snapshot_identifier='vss1')
+      self.assertIsNone(file_hash)
+
+      snapshot_identifiers = scanner.GetSnapshotIdentifiers()
+      self.assertEqual(snapshot_identifiers, [])
+
+      scanner.Close()
+      self.assertEqual(scanner._file_systems_per_snapshot, {})
+
+  def testGetRegistryFileSize(self):
+    """Tests the GetRegistryFileSize function."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      self._CreateWindowsDirectory(temporary_directory)
+
+      options = volume_scanner.VolumeScannerOptions()
+      options.username = ['none']
+
+      scanner = volume_scanner.WindowsRegistryVolumeScanner()
+      result = scanner.ScanForWindowsVolume(
+          temporary_directory, options=options)
+      self.assertTrue(result)
+
+      file_size = scanner.GetRegistryFileSize(
+          '%SystemRoot%\\System32\\config\\SAM')
+      self.assertEqual(file_size, 262144)
+
+      file_size = scanner.GetRegistryFileSize('\\Users\\bob\\NTUSER.DAT')
+      self.assertEqual(file_size, 524288)
+
+      file_size = scanner.GetRegistryFileSize(
+          '%SystemRoot%\\System32\\config\\SYSTEM')
+      self.assertIsNone(file_size)
+
+  def testScanForWindowsVolumeWithPrefetchPaths(self):
+    """Tests the ScanForWindowsVolume function with prefetch paths."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      self._CreateWindowsDirectory(temporary_directory)
+
+      options = volume_scanner.VolumeScannerOptions()
+      options.username = ['none']
+
+      scanner = volume_scanner.WindowsRegistryVolumeScanner(
+          number_of_prefetch_workers=2,
+          prefetch_paths=['%SystemRoot%\\System32\\config\\SAM'])
+      result = scanner.ScanForWindowsVolume(
+          temporary_directory, options=options)
+      self.assertTrue(result)
+
+      registry_file_reader = scanner._prefetching_file_reader
+      self.assertEqual(
+          list(registry_file_reader._file_objects),
+          ['%SystemRoot%\\System32\\config\\SAM'])
+
+      scanner.Close()
+      self.assertIsNone(scanner._prefetching_file_reader)
+      self.assertEqual(registry_file_reader._file_objects, {})
+
+
+class VolumeScanCacheTest(shared_test_lib.BaseTestCase):
+  """Tests for the sidecar cache of volume scan results."""
+
+  # pylint: disable=protected-access
+
+  def _CreateScanResult(self, source_path):
+    """Creates a volume scan result for testing.
+
+    Args:
+      source_path (str): path of the source.
+
+    Returns:
+      VolumeScanResult: volume scan result.
+    """
+    os_path_spec = dfvfs_path_spec_factory.Factory.NewPathSpec(
+        dfvfs_definitions.TYPE_INDICATOR_OS, location=source_path)
+    raw_path_spec = dfvfs_path_spec_factory.Factory.NewPathSpec(
+        dfvfs_definitions.TYPE_INDICATOR_RAW, parent=os_path_spec)
+
+    scan_result = volume_scanner.VolumeScanResult()
+    scan_result.file_system_path_spec = (
+        dfvfs_path_spec_factory.Factory.NewPathSpec(
+            dfvfs_definitions.TYPE_INDICATOR_TSK, location='/',
+            parent=raw_path_spec))
+    scan_result.registry_file_path_specs = {
+        '%SystemRoot%\\System32\\config\\SAM': None,
+        '%SystemRoot%\\System32\\config\\SYSTEM': (
+            dfvfs_path_spec_factory.Factory.NewPathSpec(
+                dfvfs_definitions.TYPE_INDICATOR_TSK,
+                location='/Windows/System32/config/SYSTEM',
+                parent=raw_path_spec))}
+    scan_result.source_type = (
+        dfvfs_definitions.SOURCE_TYPE_STORAGE_MEDIA_IMAGE)
+    scan_result.windows_directory = 'C:\\Windows'
+
+    return scan_result
+
+  def testGetCacheKey(self):
+    """Tests the _GetCacheKey function."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      source_path = os.path.join(temporary_directory, 'image.raw')
+      with open(source_path, 'wb') as file_object:
+        file_object.write(b'\x00' * 512)
+
+      cache = volume_scanner.VolumeScanCache(
+          os.path.join(temporary_directory, 'scan.json'))
+
+      options = volume_scanner.VolumeScannerOptions()
+      options.partitions = ['all']
+
+      cache_key = cache._GetCacheKey(source_path, options)
+      self.assertIsNotNone(cache_key)
+
+      options.partitions = ['p1']
+      other_cache_key = cache._GetCacheKey(source_path, options)
+      self.assertNotEqual(other_cache_key, cache_key)
+
+      options.credentials = [('password', 'secret')]
+      cache_key = cache._GetCacheKey(source_path, options)
+      self.assertIsNone(cache_key)
+
+      cache_key = cache._GetCacheKey(temporary_directory, None)
+      self.assertIsNone(cache_key)
+
+  def testGetAndSetScanResult(self):
+    """Tests the GetScanResult and SetScanResult functions."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      source_path = os.path.join(temporary_directory, 'image.raw')
+      with open(source_path, 'wb') as file_object:
+        file_object.write(b'\x00' * 512)
+
+      cache = volume_scanner.VolumeScanCache(
+          os.path.join(temporary_directory, 'scan.json'))
+
+      options = volume_scanner.VolumeScannerOptions()
+
+      scan_result = cache.GetScanResult(source_path, options)
+      self.assertIsNone(scan_result)
+
+      expected_scan_result = self._CreateScanResult(source_path)
+      cache.SetScanResult(source_path, options, expected_scan_result)
+
+      scan_result = cache.GetScanResult(source_path, options)
+      self.assertIsNotNone(scan_result)
+      self.assertEqual(
+          scan_result.file_system_path_spec,
+          expected_scan_result.file_system_path_spec)
+      self.assertEqual(
+          scan_result.registry_file_path_specs,
+          expected_scan_result.registry_file_path_specs)
+      self.assertEqual(
+          scan_result.source_type, expected_scan_result.source_type)
+      self.assertEqual(scan_result.windows_directory, 'C:\\Windows')
+
+      with open(source_path, 'ab') as file_object:
+        file_object.write(b'\x00' * 512)
+
+      scan_result = cache.GetScanResult(source_path, options)
+      self.assertIsNone(scan_result)
+
+  def testSetScanResultWithError(self):
+    """Tests the SetScanResult function when the cache cannot be written."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      source_path = os.path.join(temporary_directory, 'image.raw')
+      with open(source_path, 'wb') as file_object:
+        file_object.write(b'\x00' * 512)
+
+      # A directory cannot be replaced by the temporary file.
+      cache_path = os.path.join(temporary_directory, 'scan.json')
+      os.mkdir(cache_path)
+
+      cache = volume_scanner.VolumeScanCache(cache_path)
+
+      options = volume_scanner.VolumeScannerOptions()
+
+      scan_result = self._CreateScanResult(source_path)
+      cache.SetScanResult(source_path, options, scan_result)
+
+      filenames = sorted(os.listdir(temporary_directory))
+      self.assertEqual(filenames, ['image.raw', 'scan.json'])
+
+
+if __name__ == '__main__':
+  unittest.main()
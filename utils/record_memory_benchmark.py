@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Script to benchmark the memory used per collector result record."""
+
+import argparse
+import sys
+import tracemalloc
+
+from winregrc import appcompatcache
+from winregrc import application_identifiers
+from winregrc import catalog
+from winregrc import controlpanel_items
+from winregrc import delegatefolders
+from winregrc import environment_variables
+from winregrc import eventlog_providers
+from winregrc import knownfolders
+from winregrc import mounted_devices
+from winregrc import mru
+from winregrc import msie_zone_info
+from winregrc import profiles
+from winregrc import sam
+from winregrc import services
+from winregrc import shellfolders
+from winregrc import srum_extensions
+from winregrc import sysinfo
+from winregrc import syskey
+from winregrc import task_cache
+from winregrc import time_zones
+from winregrc import type_libraries
+from winregrc import usbstor
+from winregrc import userassist
+
+
+class DictRecord(object):
+  """Record that stores its attributes in a per-instance dictionary.
+
+  This is how the collector result records stored their attributes before
+  they were defined with __slots__.
+  """
+
+
+def _CreateWindowsService():
+  """Creates a Windows service.
+
+  Returns:
+    WindowsService: Windows service.
+  """
+  return services.WindowsService(
+      'WwanSvc', 0x20, 'WWAN AutoConfig', None, None, None, 3)
+
+
+def _CreateWindowsServiceChange():
+  """Creates a Windows service change.
+
+  Returns:
+    WindowsServiceChange: Windows service change.
+  """
+  return services.WindowsServiceChange(
+      None, 'ControlSet001', _CreateWindowsService(), 'ControlSet002')
+
+
+# Functions that create a record with representative attribute values.
+_RECORD_FACTORIES = [
+    appcompatcache.AppCompatCacheCachedEntry,
+    appcompatcache.AppCompatCacheHeader,
+    lambda: application_identifiers.ApplicationIdentifier(
+        '{00000000-0000-0000-0000-000000000000}', None),
+    catalog.CatalogKeyDescriptor,
+    lambda: controlpanel_items.ControlPanelItem(
+        '{00000000-0000-0000-0000-000000000000}', 'module.dll'),
+    lambda: delegatefolders.DelegateFolder(
+        '{00000000-0000-0000-0000-000000000000}', 'Name', 'Namespace'),
+    lambda: environment_variables.EnvironmentVariable('Path', '%SystemRoot%'),
+    eventlog_providers.EventLogProvider,
+    lambda: knownfolders.KnownFolder(
+        '{00000000-0000-0000-0000-000000000000}', 'Documents', None),
+    lambda: mounted_devices.MountedDevice('\\DosDevices\\C:'),
+    lambda: mru.MostRecentlyUsedEntry(
+        key_path='HKEY_CURRENT_USER\\Software', value_name='0'),
+    lambda: msie_zone_info.MSIEZoneInformation('0', 'Computer', '1001', 0),
+    lambda: profiles.UserProfile(
+        'S-1-5-18', '%systemroot%\\system32\\config\\systemprofile'),
+    sam.UserAccount,
+    _CreateWindowsService,
+    _CreateWindowsServiceChange,
+    lambda: shellfolders.WindowsShellFolder(
+        identifier='{00000000-0000-0000-0000-000000000000}'),
+    lambda: srum_extensions.SRUMExtension(
+        '{00000000-0000-0000-0000-000000000000}', 'srumext.dll'),
+    sysinfo.SystemInformation,
+    syskey.SystemKey,
+    task_cache.CachedTask,
+    lambda: time_zones.TimeZone('UTC'),
+    lambda: type_libraries.TypeLibrary(
+        '{00000000-0000-0000-0000-000000000000}', '1.0', None, 'type.tlb'),
+    usbstor.USBStorageDevice,
+    lambda: usbstor.USBStorageDeviceProperty(
+        '{00000000-0000-0000-0000-000000000000}', '0002'),
+    lambda: userassist.UserAssistEntry(
+        guid='{00000000-0000-0000-0000-000000000000}', name='Name',
+        value_name='Value name')]
+
+
+def _CreateDictRecord(record):
+  """Creates a record with a dictionary with the attributes of another record.
+
+  Args:
+    record (object): record with __slots__.
+
+  Returns:
+    DictRecord: record with the same attribute values.
+  """
+  dict_record = DictRecord()
+  for attribute_name in record.__slots__:
+    setattr(dict_record, attribute_name, getattr(record, attribute_name))
+
+  return dict_record
+
+
+def _MeasureBytesPerRecord(record_factory, number_of_records):
+  """Measures the number of bytes allocated per record.
+
+  The measurement includes the attribute values created by the record and
+  the reference to the record in the list that holds the records.
+
+  Args:
+    record_factory (function): function that creates a record.
+    number_of_records (int): number of records to create.
+
+  Returns:
+    float: number of bytes allocated per record.
+  """
+  tracemalloc.start()
+  try:
+    start_size, _ = tracemalloc.get_traced_memory()
+
+    records = [record_factory() for _ in range(number_of_records)]
+
+    end_size, _ = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+
+  del records
+
+  return (end_size - start_size) / number_of_records
+
+
+def Main():
+  """Entry point of console script to benchmark the memory used per record.
+
+  Returns:
+    int: exit code that is provided to sys.exit().
+  """
+  argument_parser = argparse.ArgumentParser(description=(
+      'Benchmarks the memory used per collector result record with a '
+      'per-instance dictionary and with __slots__.'))
+
+  argument_parser.add_argument(
+      '--records', dest='number_of_records', type=int, action='store',
+      default=100000, metavar='NUMBER',
+      help='number of records to create per record type.')
+
+  options = argument_parser.parse_args()
+
+  print((f'{"Record":<32s}{"Dictionary":>12s}{"Slots":>12s}'
+         f'{"Saved":>12s}'))
+
+  for record_factory in _RECORD_FACTORIES:
+    record = record_factory()
+    record_name = record.__class__.__name__
+
+    dict_bytes_per_record = _MeasureBytesPerRecord(
+        lambda record_factory=record_factory: _CreateDictRecord(
+            record_factory()), options.number_of_records)
+    slots_bytes_per_record = _MeasureBytesPerRecord(
+        record_factory, options.number_of_records)
+
+    saved_bytes_per_record = dict_bytes_per_record - slots_bytes_per_record
+
+    print((f'{record_name:<32s}{dict_bytes_per_record:>12.1f}'
+           f'{slots_bytes_per_record:>12.1f}{saved_bytes_per_record:>12.1f}'))
+
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(Main())
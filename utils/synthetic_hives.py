@@ -0,0 +1,1195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Script to generate synthetic Windows Registry files for scale testing."""
+
+import argparse
+import codecs
+import random
+import struct
+import sys
+import uuid
+
+
+REG_SZ = 1
+REG_EXPAND_SZ = 2
+REG_BINARY = 3
+REG_DWORD = 4
+REG_QWORD = 11
+
+
+class SyntheticKey(object):
+  """Synthetic Windows Registry key.
+
+  Attributes:
+    class_name (str): class name or None if not set.
+    name (str): name.
+    subkeys (iterable[SyntheticKey]): sub keys, which can be a generator
+        so that large key trees do not need to be held in memory.
+    values (iterable[tuple[str, int, bytes]]): value name, data type and data
+        of the values.
+  """
+
+  def __init__(self, name, class_name=None, subkeys=None, values=None):
+    """Initializes a synthetic Windows Registry key.
+
+    Args:
+      name (str): name.
+      class_name (Optional[str]): class name.
+      subkeys (Optional[iterable[SyntheticKey]]): sub keys.
+      values (Optional[iterable[tuple[str, int, bytes]]]): value name, data
+          type and data of the values.
+    """
+    super(SyntheticKey, self).__init__()
+    self.class_name = class_name
+    self.name = name
+    self.subkeys = subkeys or []
+    self.values = values or []
+
+
+class REGFWriter(object):
+  """Windows NT Registry File (REGF) writer.
+
+  The key tree is written depth-first, where the sub keys of a key are
+  consumed one at a time, hence only the sub key offsets of the keys on
+  the current path need to be kept in memory.
+  """
+
+  # Maximum size of value data stored in a single cell, larger value data is
+  # stored in a big data (db) record.
+  _MAXIMUM_CELL_DATA_SIZE = 16344
+
+  # Maximum number of elements in a hash leaf (lh), more sub keys are stored
+  # in multiple hash leaves referenced by an index root (ri).
+  _MAXIMUM_HASH_LEAF_ELEMENTS = 512
+
+  _HIVE_BIN_SIZE = 4096
+
+  _KEY_NAME_IS_ASCII = 0x0020
+  _KEY_IS_ROOT = 0x0004 | 0x0008
+
+  _VALUE_NAME_IS_ASCII = 0x0001
+
+  # Self-relative security descriptor without owner, group, SACL and DACL.
+  _SECURITY_DESCRIPTOR = struct.pack('<BBHIIII', 1, 0, 0x8000, 0, 0, 0, 0)
+
+  def __init__(self, timestamp=0x01d5c03669050000):
+    """Initializes a REGF writer.
+
+    Args:
+      timestamp (Optional[int]): FILETIME timestamp used as last written time
+          of the file and the keys.
+    """
+    super(REGFWriter, self).__init__()
+    self._data = bytearray()
+    self._hive_bin_offset = 0
+    self._hive_bin_size = 0
+    self._hive_bin_used_size = 0
+    self._number_of_keys = 0
+    self._security_key_offset = 0xffffffff
+    self._timestamp = timestamp
+
+  def _AllocateCell(self, data_size):
+    """Allocates a cell.
+
+    Args:
+      data_size (int): size of the cell data.
+
+    Returns:
+      int: offset of the cell relative to the start of the hive bins data.
+    """
+    cell_size = (data_size + 4 + 7) & ~7
+
+    if self._hive_bin_used_size + cell_size > self._hive_bin_size:
+      self._CloseHiveBin()
+      self._OpenHiveBin(cell_size)
+
+    cell_offset = self._hive_bin_offset + self._hive_bin_used_size
+    self._data.extend(struct.pack('<i', -cell_size))
+    self._data.extend(bytes(cell_size - 4))
+    self._hive_bin_used_size += cell_size
+
+    return cell_offset
+
+  def _CloseHiveBin(self):
+    """Closes the current hive bin by marking its remainder as a free cell."""
+    free_size = self._hive_bin_size - self._hive_bin_used_size
+    if free_size > 0:
+      self._data.extend(struct.pack('<i', free_size))
+      self._data.extend(bytes(free_size - 4))
+      self._hive_bin_used_size = self._hive_bin_size
+
+  def _EncodeName(self, name):
+    """Encodes a key or value name.
+
+    Args:
+      name (str): name.
+
+    Returns:
+      tuple[bytes, bool]: encoded name and True if the name is stored as
+          an ASCII string or False if stored as an UTF-16 little-endian
+          string.
+    """
+    try:
+      return name.encode('ascii'), True
+    except UnicodeEncodeError:
+      return name.encode('utf-16-le'), False
+
+  def _GetNameHash(self, name):
+    """Calculates the hash of a key name as stored in a hash leaf (lh).
+
+    Args:
+      name (str): key name.
+
+    Returns:
+      int: hash of the key name.
+    """
+    name_hash = 0
+    for character in name.upper():
+      name_hash = ((name_hash * 37) + ord(character)) & 0xffffffff
+
+    return name_hash
+
+  def _OpenHiveBin(self, cell_size):
+    """Opens a new hive bin.
+
+    Args:
+      cell_size (int): size of the cell that needs to fit in the hive bin.
+    """
+    self._hive_bin_offset = len(self._data)
+    self._hive_bin_size = (
+        (cell_size + 32 + self._HIVE_BIN_SIZE - 1) // self._HIVE_BIN_SIZE *
+        self._HIVE_BIN_SIZE)
+    self._hive_bin_used_size = 32
+
+    self._data.extend(struct.pack(
+        '<4sIIQQI', b'hbin', self._hive_bin_offset, self._hive_bin_size, 0,
+        self._timestamp, 0))
+
+  def _WriteCell(self, data):
+    """Writes data into a newly allocated cell.
+
+    Args:
+      data (bytes): cell data.
+
+    Returns:
+      int: offset of the cell relative to the start of the hive bins data.
+    """
+    cell_offset = self._AllocateCell(len(data))
+    self._data[cell_offset + 4:cell_offset + 4 + len(data)] = data
+    return cell_offset
+
+  def _WriteKey(self, synthetic_key, parent_offset, flags=0):
+    """Writes a key and its values and sub keys.
+
+    Args:
+      synthetic_key (SyntheticKey): key.
+      parent_offset (int): offset of the parent key (nk) cell.
+      flags (Optional[int]): additional key flags.
+
+    Returns:
+      int: offset of the key (nk) cell.
+    """
+    name_data, is_ascii = self._EncodeName(synthetic_key.name)
+    if is_ascii:
+      flags |= self._KEY_NAME_IS_ASCII
+
+    key_offset = self._AllocateCell(76 + len(name_data))
+    self._number_of_keys += 1
+
+    class_name_offset = 0xffffffff
+    class_name_size = 0
+    if synthetic_key.class_name:
+      class_name_data = synthetic_key.class_name.encode('utf-16-le')
+      class_name_offset = self._WriteCell(class_name_data)
+      class_name_size = len(class_name_data)
+
+    value_offsets = []
+    largest_value_name_size = 0
+    largest_value_data_size = 0
+    for value_name, data_type, value_data in synthetic_key.values:
+      value_offsets.append(self._WriteValue(value_name, data_type, value_data))
+      largest_value_name_size = max(
+          largest_value_name_size, len(value_name) * 2)
+      largest_value_data_size = max(largest_value_data_size, len(value_data))
+
+    values_list_offset = 0xffffffff
+    if value_offsets:
+      values_list_offset = self._WriteCell(struct.pack(
+          f'<{len(value_offsets):d}I', *value_offsets))
+
+    subkey_elements = []
+    largest_subkey_name_size = 0
+    largest_subkey_class_name_size = 0
+    for subkey in synthetic_key.subkeys:
+      subkey_offset = self._WriteKey(subkey, key_offset)
+      subkey_elements.append((subkey.name.upper(), subkey_offset))
+      largest_subkey_name_size = max(
+          largest_subkey_name_size, len(subkey.name) * 2)
+      if subkey.class_name:
+        largest_subkey_class_name_size = max(
+            largest_subkey_class_name_size, len(subkey.class_name) * 2)
+
+    subkeys_list_offset = 0xffffffff
+    if subkey_elements:
+      subkeys_list_offset = self._WriteSubkeysList(subkey_elements)
+
+    key_data = struct.pack(
+        '<2sHQIIIIIIIIIIIIIIIHH', b'nk', flags, self._timestamp, 0,
+        parent_offset, len(subkey_elements), 0, subkeys_list_offset,
+        0xffffffff, len(value_offsets), values_list_offset,
+        self._security_key_offset, class_name_offset, largest_subkey_name_size,
+        largest_subkey_class_name_size, largest_value_name_size,
+        largest_value_data_size, 0, len(name_data), class_name_size)
+
+    self._data[key_offset + 4:key_offset + 80] = key_data
+    self._data[key_offset + 80:key_offset + 80 + len(name_data)] = name_data
+
+    return key_offset
+
+  def _WriteSecurityKey(self):
+    """Writes the security key (sk) shared by all keys."""
+    data_size = 20 + len(self._SECURITY_DESCRIPTOR)
+    self._security_key_offset = self._AllocateCell(data_size)
+
+  def _UpdateSecurityKey(self):
+    """Updates the security key (sk) reference count."""
+    security_key_data = b''.join([
+        struct.pack(
+            '<2sHIIII', b'sk', 0, self._security_key_offset,
+            self._security_key_offset, self._number_of_keys,
+            len(self._SECURITY_DESCRIPTOR)),
+        self._SECURITY_DESCRIPTOR])
+
+    cell_offset = self._security_key_offset + 4
+    self._data[cell_offset:cell_offset + len(security_key_data)] = (
+        security_key_data)
+
+  def _WriteSubkeysList(self, subkey_elements):
+    """Writes a sub keys list.
+
+    Args:
+      subkey_elements (list[tuple[str, int]]): upper case name and offset of
+          the sub keys.
+
+    Returns:
+      int: offset of the sub keys list cell.
+    """
+    subkey_elements.sort()
+
+    leaf_offsets = []
+    for element_index in range(
+        0, len(subkey_elements), self._MAXIMUM_HASH_LEAF_ELEMENTS):
+      leaf_elements = subkey_elements[
+          element_index:element_index + self._MAXIMUM_HASH_LEAF_ELEMENTS]
+
+      leaf_data = [struct.pack('<2sH', b'lh', len(leaf_elements))]
+      for name, subkey_offset in leaf_elements:
+        leaf_data.append(struct.pack(
+            '<II', subkey_offset, self._GetNameHash(name)))
+
+      leaf_offsets.append(self._WriteCell(b''.join(leaf_data)))
+
+    if len(leaf_offsets) == 1:
+      return leaf_offsets[0]
+
+    return self._WriteCell(b''.join([
+        struct.pack('<2sH', b'ri', len(leaf_offsets)),
+        struct.pack(f'<{len(leaf_offsets):d}I', *leaf_offsets)]))
+
+  def _WriteValue(self, value_name, data_type, value_data):
+    """Writes a value.
+
+    Args:
+      value_name (str): name of the value.
+      data_type (int): data type of the value.
+      value_data (bytes): data of the value.
+
+    Returns:
+      int: offset of the value (vk) cell.
+    """
+    name_data, is_ascii = self._EncodeName(value_name)
+    flags = self._VALUE_NAME_IS_ASCII if is_ascii else 0
+
+    value_data_size = len(value_data)
+    if value_data_size <= 4:
+      data_size = 0x80000000 | value_data_size
+      data_offset, = struct.unpack('<I', value_data.ljust(4, b'\x00'))
+
+    elif value_data_size <= self._MAXIMUM_CELL_DATA_SIZE:
+      data_size = value_data_size
+      data_offset = self._WriteCell(value_data)
+
+    else:
+      # The data of a segment is read as the cell size minus 8 bytes, like
+      # the 16344 bytes of a full segment in a 16352 bytes cell, hence
+      # the segment data is padded with 4 bytes so that a last segment of
+      # a size that is not a multiple of 8 is not truncated.
+      segment_offsets = []
+      for segment_offset in range(
+          0, value_data_size, self._MAXIMUM_CELL_DATA_SIZE):
+        segment_data = value_data[
+            segment_offset:segment_offset + self._MAXIMUM_CELL_DATA_SIZE]
+        segment_offsets.append(self._WriteCell(b''.join([
+            segment_data, bytes(4)])))
+
+      segments_list_offset = self._WriteCell(struct.pack(
+          f'<{len(segment_offsets):d}I', *segment_offsets))
+
+      data_size = value_data_size
+      data_offset = self._WriteCell(struct.pack(
+          '<2sHI', b'db', len(segment_offsets), segments_list_offset))
+
+    return self._WriteCell(b''.join([
+        struct.pack(
+            '<2sHIIIHH', b'vk', len(name_data), data_size, data_offset,
+            data_type, flags, 0),
+        name_data]))
+
+  def Write(self, path, root_key):
+    """Writes a Windows NT Registry File.
+
+    Args:
+      path (str): path of the file to write.
+      root_key (SyntheticKey): root key.
+
+    Returns:
+      int: number of keys written.
+    """
+    self._data = bytearray()
+    self._hive_bin_offset = 0
+    self._hive_bin_size = 0
+    self._hive_bin_used_size = 0
+    self._number_of_keys = 0
+
+    self._WriteSecurityKey()
+    root_key_offset = self._WriteKey(
+        root_key, 0xffffffff, flags=self._KEY_IS_ROOT)
+    self._UpdateSecurityKey()
+    self._CloseHiveBin()
+
+    file_header = bytearray(4096)
+    struct.pack_into(
+        '<4sIIQIIIIIII', file_header, 0, b'regf', 1, 1, self._timestamp, 1, 5,
+        0, 1, root_key_offset, len(self._data), 1)
+
+    file_name = root_key.name.encode('utf-16-le')[:64]
+    file_header[48:48 + len(file_name)] = file_name
+
+    checksum = 0
+    for value, in struct.iter_unpack('<I', file_header[:508]):
+      checksum ^= value
+
+    if checksum == 0xffffffff:
+      checksum = 0xfffffffe
+    elif checksum == 0:
+      checksum = 1
+
+    struct.pack_into('<I', file_header, 508, checksum)
+
+    with open(path, 'wb') as file_object:
+      file_object.write(file_header)
+      file_object.write(self._data)
+
+    return self._number_of_keys
+
+
+class SyntheticValueDataGenerator(object):
+  """Generates valid value data of the binary formats parsed by winregrc."""
+
+  APPCOMPATCACHE_FORMATS = frozenset([
+      '2003', '7', '8.0', '8.1', '10', 'vista', 'xp'])
+
+  # Base FILETIME timestamp: 2020-01-01 00:00:00
+  _BASE_FILETIME = 0x01d5c03669050000
+
+  _FILETIME_RANGE = 365 * 24 * 60 * 60 * 10000000
+
+  _MY_COMPUTER_IDENTIFIER = uuid.UUID('20d04fe0-3aea-1069-a2d8-08002b30309d')
+
+  # Number of user information descriptors in the SAM V value.
+  _NUMBER_OF_USER_INFORMATION_DESCRIPTORS = 17
+
+  def __init__(self, seed=0):
+    """Initializes a synthetic value data generator.
+
+    Args:
+      seed (Optional[int]): seed of the pseudo random number generator, which
+          makes the generated data reproducible.
+    """
+    super(SyntheticValueDataGenerator, self).__init__()
+    self._random = random.Random(seed)
+
+  def _GetAppCompatCacheEntryFormat(self, format_type, number_of_bits):
+    """Retrieves the Windows 2003, Vista or 7 AppCompatCache entry format.
+
+    Args:
+      format_type (str): AppCompatCache format, either "2003", "vista" or "7".
+      number_of_bits (int): 32 or 64.
+
+    Returns:
+      tuple[int, str]: cached entry size and struct format string.
+    """
+    if format_type == '2003':
+      if number_of_bits == 64:
+        entry_format = '<HHIQQQ'
+      else:
+        entry_format = '<HHIQQ'
+    elif format_type == 'vista':
+      if number_of_bits == 64:
+        entry_format = '<HHIQQII'
+      else:
+        entry_format = '<HHIQII'
+    elif number_of_bits == 64:
+      entry_format = '<HHIQQIIQQ'
+    else:
+      entry_format = '<HHIQIIII'
+
+    return struct.calcsize(entry_format), entry_format
+
+  def GetAppCompatCacheValueData(
+      self, format_type, number_of_entries, number_of_bits=32):
+    """Retrieves AppCompatCache value data.
+
+    Note that the Windows 2003 and Vista formats share the same header
+    signature.
+
+    Args:
+      format_type (str): AppCompatCache format, one of APPCOMPATCACHE_FORMATS.
+      number_of_entries (int): number of cached entries.
+      number_of_bits (Optional[int]): 32 or 64, only used by the Windows 2003,
+          Vista and 7 formats.
+
+    Returns:
+      bytes: AppCompatCache value data.
+
+    Raises:
+      ValueError: if the format type or number of bits is not supported.
+    """
+    if format_type not in self.APPCOMPATCACHE_FORMATS:
+      raise ValueError(f'Unsupported format type: {format_type:s}')
+
+    if number_of_bits not in (32, 64):
+      raise ValueError(f'Unsupported number of bits: {number_of_bits:d}')
+
+    paths = [
+        self.GetPath(entry_index) for entry_index in range(number_of_entries)]
+
+    if format_type == 'xp':
+      number_of_lru_entries = min(number_of_entries, 96)
+      lru_entries = list(range(number_of_lru_entries))
+      lru_entries.extend([0] * (96 - number_of_lru_entries))
+
+      value_data = [struct.pack(
+          '<IIII96I', 0xdeadbeef, number_of_entries, number_of_lru_entries, 0,
+          *lru_entries)]
+
+      for path in paths:
+        path_data = path.encode('utf-16-le')[:526]
+        value_data.append(struct.pack(
+            '<528sQQQ', path_data, self.GetFiletime(),
+            self._random.randint(0, 0xffffffff), self.GetFiletime()))
+
+      return b''.join(value_data)
+
+    if format_type in ('2003', 'vista', '7'):
+      entry_size, entry_format = self._GetAppCompatCacheEntryFormat(
+          format_type, number_of_bits)
+
+      if format_type == '7':
+        header_data = struct.pack('<II120x', 0xbadc0fee, number_of_entries)
+      else:
+        header_data = struct.pack('<II', 0xbadc0ffe, number_of_entries)
+
+      entries_data = []
+      strings_data = []
+      strings_offset = len(header_data) + (entry_size * number_of_entries)
+
+      for path in paths:
+        path_data = path.encode('utf-16-le')
+        path_size = len(path_data)
+
+        path_offset = strings_offset
+        strings_data.append(path_data)
+        strings_data.append(b'\x00\x00')
+        strings_offset += path_size + 2
+
+        data_offset = 0
+        shim_data = b''
+        if format_type == '7':
+          shim_data = self._random.randbytes(self._random.randint(0, 8) * 4)
+          data_offset = strings_offset if shim_data else 0
+          strings_data.append(shim_data)
+          strings_offset += len(shim_data)
+
+        if number_of_bits == 64:
+          path_values = [path_size, path_size + 2, 0, path_offset]
+        else:
+          path_values = [path_size, path_size + 2, path_offset]
+
+        last_modification_time = self.GetFiletime()
+        if format_type == '2003':
+          entry_values = [
+              last_modification_time, self._random.randint(0, 0xffffffff)]
+        elif format_type == 'vista':
+          entry_values = [last_modification_time, 0x00000002, 0x00000000]
+        else:
+          entry_values = [
+              last_modification_time, 0x00000002, 0x00000000, len(shim_data),
+              data_offset]
+
+        entries_data.append(struct.pack(
+            entry_format, *path_values, *entry_values))
+
+      return b''.join([header_data] + entries_data + strings_data)
+
+    if format_type == '10':
+      value_data = [struct.pack(
+          '<II28xI8x4x', 0x00000034, 0, number_of_entries)]
+    else:
+      value_data = [struct.pack('<II120x', 0x00000080, 0)]
+
+    if format_type == '8.0':
+      signature = b'00ts'
+    else:
+      signature = b'10ts'
+
+    for path in paths:
+      path_data = path.encode('utf-16-le')
+      shim_data = self._random.randbytes(self._random.randint(0, 8) * 4)
+
+      last_modification_time = self.GetFiletime()
+      if format_type == '8.0':
+        body_data = b''.join([
+            struct.pack('<H', len(path_data)), path_data,
+            struct.pack(
+                '<IIQI', 0x00000002, 0x00000000, last_modification_time,
+                len(shim_data)),
+            shim_data])
+      elif format_type == '8.1':
+        body_data = b''.join([
+            struct.pack('<H', len(path_data)), path_data,
+            struct.pack(
+                '<IIHQI', 0x00000002, 0x00000000, 0x0000,
+                last_modification_time, len(shim_data)),
+            shim_data])
+      else:
+        body_data = b''.join([
+            struct.pack('<H', len(path_data)), path_data,
+            struct.pack('<QI', last_modification_time, len(shim_data)),
+            shim_data])
+
+      value_data.append(struct.pack(
+          '<4sII', signature, 0x00000000, len(body_data)))
+      value_data.append(body_data)
+
+    return b''.join(value_data)
+
+  def GetDynamicInfoValueData(self, format_version=2):
+    """Retrieves Task Cache DynamicInfo value data.
+
+    Args:
+      format_version (Optional[int]): 1 for the 28 byte or 2 for the 36 byte
+          DynamicInfo record.
+
+    Returns:
+      bytes: DynamicInfo value data.
+    """
+    value_data = struct.pack(
+        '<IQQII', 0x00000003, self.GetFiletime(), self.GetFiletime(), 0, 0)
+    if format_version == 2:
+      value_data = b''.join([value_data, struct.pack('<Q', 0)])
+
+    return value_data
+
+  def GetFiletime(self):
+    """Retrieves a FILETIME timestamp.
+
+    Returns:
+      int: FILETIME timestamp.
+    """
+    return self._BASE_FILETIME + self._random.randrange(self._FILETIME_RANGE)
+
+  def GetGUID(self):
+    """Retrieves a GUID string.
+
+    Returns:
+      str: GUID in the form: {%GUID%}.
+    """
+    guid = uuid.UUID(int=self._random.getrandbits(128), version=4)
+    return f'{{{str(guid).upper():s}}}'
+
+  def GetMRUListExValueData(self, number_of_entries):
+    """Retrieves MRUListEx value data.
+
+    Args:
+      number_of_entries (int): number of entries.
+
+    Returns:
+      bytes: MRUListEx value data.
+    """
+    entries = list(range(number_of_entries))
+    self._random.shuffle(entries)
+    entries.append(0xffffffff)
+    return struct.pack(f'<{len(entries):d}I', *entries)
+
+  def GetPath(self, index, extension='exe'):
+    """Retrieves a Windows path.
+
+    Args:
+      index (int): index used to make the path unique.
+      extension (Optional[str]): file name extension.
+
+    Returns:
+      str: Windows path.
+    """
+    directory_index = self._random.randint(0, 255)
+    return (
+        f'C:\\Program Files\\Vendor{directory_index:d}\\Application{index:d}\\'
+        f'program{index:d}.{extension:s}')
+
+  def GetSAMFValueData(self, rid):
+    """Retrieves Security Accounts Manager (SAM) F value data.
+
+    Args:
+      rid (int): relative identifier (RID).
+
+    Returns:
+      bytes: F value data.
+    """
+    return struct.pack(
+        '<HHIQQQQQIIIHHHHIII', 3, 1, 0, self.GetFiletime(), 0,
+        self.GetFiletime(), 0x7fffffffffffffff, self.GetFiletime(), rid, 513,
+        0x00000210, 0, 0, self._random.randint(0, 16),
+        self._random.randint(0, 1000), 0, 0, 0)
+
+  def GetSAMVValueData(
+      self, username, full_name='', comment='', lm_hash=b'', ntlm_hash=b''):
+    """Retrieves Security Accounts Manager (SAM) V value data.
+
+    Args:
+      username (str): username.
+      full_name (Optional[str]): full name.
+      comment (Optional[str]): comment.
+      lm_hash (Optional[bytes]): LM hash data.
+      ntlm_hash (Optional[bytes]): NTLM hash data.
+
+    Returns:
+      bytes: V value data.
+    """
+    descriptors_data = [b''] * self._NUMBER_OF_USER_INFORMATION_DESCRIPTORS
+    descriptors_data[1] = username.encode('utf-16-le')
+    descriptors_data[2] = full_name.encode('utf-16-le')
+    descriptors_data[3] = comment.encode('utf-16-le')
+    descriptors_data[13] = lm_hash
+    descriptors_data[14] = ntlm_hash
+
+    header_data = []
+    data = []
+    data_offset = 0
+    for descriptor_data in descriptors_data:
+      header_data.append(struct.pack(
+          '<III', data_offset, len(descriptor_data), 0))
+
+      alignment_size = (4 - (len(descriptor_data) % 4)) % 4
+      data.append(descriptor_data)
+      data.append(bytes(alignment_size))
+      data_offset += len(descriptor_data) + alignment_size
+
+    return b''.join(header_data + data)
+
+  def GetShellItemListData(self, path_segments):
+    """Retrieves shell item list data.
+
+    The shell item list consists of a "My Computer" root folder shell item
+    followed by a directory file entry shell item per path segment where the
+    last path segment is stored as a file file entry shell item.
+
+    Args:
+      path_segments (list[str]): path segments, which should be ASCII strings.
+
+    Returns:
+      bytes: shell item list data.
+    """
+    shell_items_data = [struct.pack(
+        '<HBB16s', 20, 0x1f, 0x50, self._MY_COMPUTER_IDENTIFIER.bytes_le)]
+
+    last_path_segment_index = len(path_segments) - 1
+    for path_segment_index, path_segment in enumerate(path_segments):
+      if path_segment_index == last_path_segment_index:
+        class_type = 0x32
+        file_size = self._random.randint(0, 0xffffffff)
+        file_attribute_flags = 0x0020
+      else:
+        class_type = 0x31
+        file_size = 0
+        file_attribute_flags = 0x0010
+
+      name_data = path_segment.encode('ascii') + b'\x00'
+      if len(name_data) % 2:
+        name_data += b'\x00'
+
+      # Use a fixed valid FAT date and time: 2020-01-01 12:00:00
+      fat_date_time = (0x6000 << 16) | 0x5021
+
+      shell_item_data = b''.join([
+          struct.pack(
+              '<BBIIH', class_type, 0, file_size, fat_date_time,
+              file_attribute_flags),
+          name_data])
+      shell_items_data.append(struct.pack('<H', len(shell_item_data) + 2))
+      shell_items_data.append(shell_item_data)
+
+    shell_items_data.append(b'\x00\x00')
+
+    return b''.join(shell_items_data)
+
+  def GetUserAssistValue(self, path, format_version=5):
+    """Retrieves an UserAssist value.
+
+    Args:
+      path (str): path of the executed program.
+      format_version (Optional[int]): UserAssist format version, either 3 or 5.
+
+    Returns:
+      tuple[str, bytes]: ROT13 encoded value name and value data.
+
+    Raises:
+      ValueError: if the format version is not supported.
+    """
+    value_name = codecs.encode(path, 'rot-13')
+
+    number_of_executions = self._random.randint(1, 1000)
+    last_execution_time = self.GetFiletime()
+
+    if format_version == 3:
+      value_data = struct.pack(
+          '<IIQ', 0, number_of_executions, last_execution_time)
+
+    elif format_version == 5:
+      value_data = struct.pack(
+          '<IIII10fIQI', 0, number_of_executions,
+          self._random.randint(0, 1000), self._random.randint(0, 0xffffff),
+          *([-1.0] * 10), 0xffffffff, last_execution_time, 0)
+
+    else:
+      raise ValueError(f'Unsupported format version: {format_version:d}')
+
+    return value_name, value_data
+
+
+class SyntheticHiveGenerator(object):
+  """Generates synthetic Windows Registry key trees."""
+
+  HIVE_TYPES = frozenset(['ntuser', 'sam', 'software', 'system'])
+
+  _SERVICE_NAME_PREFIX = 'SyntheticService'
+
+  _USER_ASSIST_GUID = '{CEBFF5CD-ACE2-4F4F-9178-9926F41749EA}'
+
+  def __init__(self, seed=0):
+    """Initializes a synthetic hive generator.
+
+    Args:
+      seed (Optional[int]): seed of the pseudo random number generator, which
+          makes the generated key trees reproducible.
+    """
+    super(SyntheticHiveGenerator, self).__init__()
+    self._value_data_generator = SyntheticValueDataGenerator(seed=seed)
+
+  def _GetDWORDValue(self, name, integer):
+    """Retrieves a REG_DWORD value.
+
+    Args:
+      name (str): name of the value.
+      integer (int): integer.
+
+    Returns:
+      tuple[str, int, bytes]: value name, data type and data.
+    """
+    return name, REG_DWORD, struct.pack('<I', integer)
+
+  def _GetStringValue(self, name, string, data_type=REG_SZ):
+    """Retrieves a REG_SZ value.
+
+    Args:
+      name (str): name of the value.
+      string (str): string.
+      data_type (Optional[int]): data type.
+
+    Returns:
+      tuple[str, int, bytes]: value name, data type and data.
+    """
+    return name, data_type, f'{string:s}\x00'.encode('utf-16-le')
+
+  def _GetKeyPath(self, root_key, key_path):
+    """Retrieves a key by path, creating missing keys.
+
+    Args:
+      root_key (SyntheticKey): root key.
+      key_path (str): path of the key relative to the root key.
+
+    Returns:
+      SyntheticKey: key.
+    """
+    synthetic_key = root_key
+    for key_name in key_path.split('\\'):
+      for subkey in synthetic_key.subkeys:
+        if subkey.name == key_name:
+          synthetic_key = subkey
+          break
+
+      else:
+        subkey = SyntheticKey(key_name, subkeys=[], values=[])
+        synthetic_key.subkeys.append(subkey)
+        synthetic_key = subkey
+
+    return synthetic_key
+
+  def _GetNTUserKeys(self, root_key, userassist_entries=0, mru_entries=0):
+    """Adds the NTUSER.DAT keys.
+
+    Args:
+      root_key (SyntheticKey): root key.
+      userassist_entries (Optional[int]): number of UserAssist entries.
+      mru_entries (Optional[int]): number of OpenSavePidlMRU entries.
+    """
+    for key_name in (
+        'AppEvents', 'Console', 'Control Panel', 'Environment',
+        'Keyboard Layout', 'Software'):
+      self._GetKeyPath(root_key, key_name)
+
+    explorer_key = self._GetKeyPath(
+        root_key, 'Software\\Microsoft\\Windows\\CurrentVersion\\Explorer')
+
+    if userassist_entries:
+      guid_key = self._GetKeyPath(
+          explorer_key, f'UserAssist\\{self._USER_ASSIST_GUID:s}')
+      guid_key.values.append(self._GetDWORDValue('Version', 5))
+
+      count_key = self._GetKeyPath(guid_key, 'Count')
+      for entry_index in range(userassist_entries):
+        path = self._value_data_generator.GetPath(entry_index)
+        value_name, value_data = (
+            self._value_data_generator.GetUserAssistValue(path))
+        count_key.values.append((value_name, REG_BINARY, value_data))
+
+    if mru_entries:
+      mru_key = self._GetKeyPath(explorer_key, 'ComDlg32\\OpenSavePidlMRU\\*')
+      mru_key.values.append((
+          'MRUListEx', REG_BINARY,
+          self._value_data_generator.GetMRUListExValueData(mru_entries)))
+
+      for entry_index in range(mru_entries):
+        path_segments = [
+            'C:', 'Users', 'Synthetic', 'Documents',
+            f'document{entry_index:d}.txt']
+        mru_key.values.append((
+            f'{entry_index:d}', REG_BINARY,
+            self._value_data_generator.GetShellItemListData(path_segments)))
+
+  def _GetSAMKeys(self, root_key, number_of_users=0):
+    """Adds the SAM keys.
+
+    Args:
+      root_key (SyntheticKey): root key.
+      number_of_users (Optional[int]): number of user accounts.
+    """
+    users_key = self._GetKeyPath(root_key, 'SAM\\Domains\\Account\\Users')
+    names_key = self._GetKeyPath(users_key, 'Names')
+
+    for user_index in range(number_of_users):
+      rid = 1000 + user_index
+      username = f'user{user_index:d}'
+
+      user_key = SyntheticKey(f'{rid:08X}', values=[
+          ('F', REG_BINARY, self._value_data_generator.GetSAMFValueData(rid)),
+          ('V', REG_BINARY, self._value_data_generator.GetSAMVValueData(
+              username, full_name=f'Synthetic User {user_index:d}',
+              comment='Synthetic user account'))])
+      users_key.subkeys.append(user_key)
+
+      names_key.subkeys.append(SyntheticKey(username))
+
+  def _GetServiceKeys(self, number_of_services):
+    """Retrieves service keys.
+
+    Args:
+      number_of_services (int): number of services.
+
+    Yields:
+      SyntheticKey: service key.
+    """
+    for service_index in range(number_of_services):
+      name = f'{self._SERVICE_NAME_PREFIX:s}{service_index:d}'
+      image_path = self._value_data_generator.GetPath(service_index)
+
+      yield SyntheticKey(name, values=[
+          self._GetStringValue('DisplayName', f'Synthetic service {name:s}'),
+          self._GetStringValue(
+              'ImagePath', image_path, data_type=REG_EXPAND_SZ),
+          self._GetStringValue('ObjectName', 'LocalSystem'),
+          self._GetDWORDValue('Start', service_index % 5),
+          self._GetDWORDValue('Type', 0x00000010)])
+
+  def _GetSoftwareKeys(self, root_key, number_of_tasks=0):
+    """Adds the SOFTWARE keys.
+
+    Args:
+      root_key (SyntheticKey): root key.
+      number_of_tasks (Optional[int]): number of cached tasks.
+    """
+    self._GetKeyPath(
+        root_key, 'Microsoft\\Windows\\CurrentVersion\\App Paths')
+
+    if number_of_tasks:
+      task_cache_key = self._GetKeyPath(
+          root_key,
+          'Microsoft\\Windows NT\\CurrentVersion\\Schedule\\TaskCache')
+      tasks_key = self._GetKeyPath(task_cache_key, 'Tasks')
+      tree_key = self._GetKeyPath(task_cache_key, 'Tree')
+
+      for task_index in range(number_of_tasks):
+        guid = self._value_data_generator.GetGUID()
+        format_version = 1 + (task_index % 2)
+
+        tasks_key.subkeys.append(SyntheticKey(guid, values=[(
+            'DynamicInfo', REG_BINARY,
+            self._value_data_generator.GetDynamicInfoValueData(
+                format_version=format_version))]))
+
+        tree_key.subkeys.append(SyntheticKey(
+            f'SyntheticTask{task_index:d}',
+            values=[self._GetStringValue('Id', guid)]))
+
+  def _GetSystemKeys(
+      self, root_key, appcompatcache_format=None, appcompatcache_entries=0,
+      number_of_control_sets=1, number_of_services=0):
+    """Adds the SYSTEM keys.
+
+    Args:
+      root_key (SyntheticKey): root key.
+      appcompatcache_format (Optional[str]): AppCompatCache format.
+      appcompatcache_entries (Optional[int]): number of AppCompatCache
+          entries.
+      number_of_control_sets (Optional[int]): number of control sets.
+      number_of_services (Optional[int]): number of services per control set.
+    """
+    self._GetKeyPath(root_key, 'MountedDevices')
+    self._GetKeyPath(root_key, 'Setup')
+
+    select_key = self._GetKeyPath(root_key, 'Select')
+    select_key.values.extend([
+        self._GetDWORDValue('Current', 1),
+        self._GetDWORDValue('Default', 1),
+        self._GetDWORDValue('Failed', 0),
+        self._GetDWORDValue('LastKnownGood', 1)])
+
+    for control_set_number in range(1, number_of_control_sets + 1):
+      control_set_key = self._GetKeyPath(
+          root_key, f'ControlSet{control_set_number:03d}')
+
+      if appcompatcache_format:
+        if appcompatcache_format == 'xp':
+          key_name = 'AppCompatibility'
+        else:
+          key_name = 'AppCompatCache'
+
+        app_compat_cache_key = self._GetKeyPath(
+            control_set_key, f'Control\\Session Manager\\{key_name:s}')
+        app_compat_cache_key.values.append((
+            'AppCompatCache', REG_BINARY,
+            self._value_data_generator.GetAppCompatCacheValueData(
+                appcompatcache_format, appcompatcache_entries)))
+
+      services_key = self._GetKeyPath(control_set_key, 'Services')
+      services_key.subkeys.extend(self._GetServiceKeys(number_of_services))
+
+  def _GetTreeKeys(self, fan_out, depth, number_of_values, key_path=''):
+    """Retrieves a synthetic key tree.
+
+    Args:
+      fan_out (int): number of sub keys per key.
+      depth (int): number of levels of sub keys.
+      number_of_values (int): number of values per key.
+      key_path (Optional[str]): path used to make key names unique.
+
+    Yields:
+      SyntheticKey: key.
+    """
+    if depth <= 0:
+      return
+
+    for key_index in range(fan_out):
+      name = f'Key{key_path:s}{key_index:d}'
+      values = [
+          self._GetStringValue(f'Value{value_index:d}', name)
+          for value_index in range(number_of_values)]
+
+      yield SyntheticKey(
+          name, subkeys=self._GetTreeKeys(
+              fan_out, depth - 1, number_of_values,
+              key_path=f'{key_path:s}{key_index:d}_'),
+          values=values)
+
+  def GetRootKey(
+      self, hive_type, fan_out=0, depth=0, number_of_values=0,
+      tree_key_name='Synthetic', **kwargs):
+    """Retrieves the root key of a synthetic Windows Registry file.
+
+    Args:
+      hive_type (str): hive type, one of HIVE_TYPES.
+      fan_out (Optional[int]): number of sub keys per key of the synthetic key
+          tree.
+      depth (Optional[int]): number of levels of the synthetic key tree.
+      number_of_values (Optional[int]): number of values per key of
+          the synthetic key tree.
+      tree_key_name (Optional[str]): name of the key that contains the
+          synthetic key tree.
+      kwargs (dict[str, object]): hive type specific options.
+
+    Returns:
+      SyntheticKey: root key.
+
+    Raises:
+      ValueError: if the hive type is not supported.
+    """
+    if hive_type not in self.HIVE_TYPES:
+      raise ValueError(f'Unsupported hive type: {hive_type:s}')
+
+    root_key = SyntheticKey('ROOT', subkeys=[], values=[])
+
+    if hive_type == 'ntuser':
+      self._GetNTUserKeys(root_key, **kwargs)
+    elif hive_type == 'sam':
+      self._GetSAMKeys(root_key, **kwargs)
+    elif hive_type == 'software':
+      self._GetSoftwareKeys(root_key, **kwargs)
+    elif hive_type == 'system':
+      self._GetSystemKeys(root_key, **kwargs)
+
+    if fan_out and depth:
+      root_key.subkeys.append(SyntheticKey(
+          tree_key_name, subkeys=self._GetTreeKeys(
+              fan_out, depth, number_of_values)))
+
+    return root_key
+
+
+def Main():
+  """Entry point of console script to generate a synthetic Registry file.
+
+  Returns:
+    int: exit code that is provided to sys.exit().
+  """
+  argument_parser = argparse.ArgumentParser(description=(
+      'Generates a synthetic Windows NT Registry File (REGF) for scale '
+      'testing.'))
+
+  argument_parser.add_argument(
+      '--type', dest='hive_type', action='store', metavar='TYPE',
+      choices=sorted(SyntheticHiveGenerator.HIVE_TYPES), default='system',
+      help=(
+          'type of Registry file to generate, supported types: ntuser, sam, '
+          'software and system.'))
+
+  argument_parser.add_argument(
+      '--fan-out', dest='fan_out', type=int, action='store', default=0,
+      metavar='NUMBER', help='number of sub keys per synthetic tree key.')
+
+  argument_parser.add_argument(
+      '--depth', dest='depth', type=int, action='store', default=0,
+      metavar='NUMBER', help='number of levels of the synthetic tree.')
+
+  argument_parser.add_argument(
+      '--values', dest='number_of_values', type=int, action='store',
+      default=0, metavar='NUMBER', help='number of values per synthetic key.')
+
+  argument_parser.add_argument(
+      '--appcompatcache', dest='appcompatcache_format', action='store',
+      metavar='FORMAT', default=None, choices=sorted(
+          SyntheticValueDataGenerator.APPCOMPATCACHE_FORMATS),
+      help=(
+          'AppCompatCache format of the system Registry file, supported '
+          'formats: 2003, 7, 8.0, 8.1, 10, vista and xp.'))
+
+  argument_parser.add_argument(
+      '--appcompatcache-entries', dest='appcompatcache_entries', type=int,
+      action='store', default=100, metavar='NUMBER',
+      help='number of AppCompatCache entries.')
+
+  argument_parser.add_argument(
+      '--control-sets', dest='number_of_control_sets', type=int,
+      action='store', default=1, metavar='NUMBER',
+      help='number of control sets of the system Registry file.')
+
+  argument_parser.add_argument(
+      '--services', dest='number_of_services', type=int, action='store',
+      default=0, metavar='NUMBER', help='number of services per control set.')
+
+  argument_parser.add_argument(
+      '--tasks', dest='number_of_tasks', type=int, action='store', default=0,
+      metavar='NUMBER',
+      help='number of Task Cache tasks of the software Registry file.')
+
+  argument_parser.add_argument(
+      '--users', dest='number_of_users', type=int, action='store', default=0,
+      metavar='NUMBER',
+      help='number of user accounts of the SAM Registry file.')
+
+  argument_parser.add_argument(
+      '--userassist', dest='userassist_entries', type=int, action='store',
+      default=0, metavar='NUMBER',
+      help='number of UserAssist entries of the ntuser Registry file.')
+
+  argument_parser.add_argument(
+      '--mru', dest='mru_entries', type=int, action='store', default=0,
+      metavar='NUMBER',
+      help='number of OpenSavePidlMRU entries of the ntuser Registry file.')
+
+  argument_parser.add_argument(
+      '--seed', dest='seed', type=int, action='store', default=0,
+      metavar='NUMBER', help='seed of the pseudo random number generator.')
+
+  argument_parser.add_argument(
+      'target', nargs='?', action='store', metavar='PATH', default=None,
+      help='path of the Registry file to generate.')
+
+  options = argument_parser.parse_args()
+
+  if not options.target:
+    print('Target value is missing.')
+    print('')
+    argument_parser.print_help()
+    print('')
+    return 1
+
+  if options.hive_type == 'ntuser':
+    hive_type_options = {
+        'mru_entries': options.mru_entries,
+        'userassist_entries': options.userassist_entries}
+  elif options.hive_type == 'sam':
+    hive_type_options = {'number_of_users': options.number_of_users}
+  elif options.hive_type == 'software':
+    hive_type_options = {'number_of_tasks': options.number_of_tasks}
+  else:
+    hive_type_options = {
+        'appcompatcache_entries': options.appcompatcache_entries,
+        'appcompatcache_format': options.appcompatcache_format,
+        'number_of_control_sets': options.number_of_control_sets,
+        'number_of_services': options.number_of_services}
+
+  generator = SyntheticHiveGenerator(seed=options.seed)
+  root_key = generator.GetRootKey(
+      options.hive_type, fan_out=options.fan_out, depth=options.depth,
+      number_of_values=options.number_of_values, **hive_type_options)
+
+  writer = REGFWriter()
+  number_of_keys = writer.Write(options.target, root_key)
+
+  print(f'Generated: {options.target:s} with {number_of_keys:d} keys.')
+
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(Main())
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""Knowledge base record aggregator."""
+
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+
+import winregrc
+
+from winregrc import cache_files
+from winregrc import serializers
+from winregrc import volume_scanner
+
+
+class AggregatedRecord(object):
+  """Record aggregated from multiple sources.
+
+  Attributes:
+    record (object): record, such as a shell folder, of the first source the
+        identifier was found in, with the names of the other sources merged.
+    windows_versions (list[str]): Windows versions of the sources the
+        identifier was found in, in the order of the sources.
+  """
+
+  __slots__ = ('record', 'windows_versions')
+
+  def __init__(self, record):
+    """Initializes an aggregated record.
+
+    Args:
+      record (object): record.
+    """
+    super(AggregatedRecord, self).__init__()
+    self.record = record
+    self.windows_versions = []
+
+
+class SourceRecordsCache(object):
+  """Cache of the records collected per source.
+
+  The records of a source are stored as a JSON file in the cache directory,
+  named after a hash of the path, size and modification time of the source,
+  the collector and the version of winregrc. Changing the source or
+  the collector therefore results in a cache miss, while stale entries are
+  never used.
+
+  Only sources that are files, such as storage media images and Registry
+  files, are cached since the size and modification time of a directory do
+  not reflect changes to the files it contains.
+  """
+
+  _FORMAT_VERSION = 1
+
+  def __init__(self, path):
+    """Initializes a source records cache.
+
+    Args:
+      path (str): path of the cache directory.
+    """
+    super(SourceRecordsCache, self).__init__()
+    self._path = path
+
+  def _GetCacheFilePath(self, source_path, collector_class):
+    """Retrieves the path of the cache file of a source.
+
+    Args:
+      source_path (str): path of the source.
+      collector_class (type): class of the collector.
+
+    Returns:
+      str: path of the cache file or None if the source cannot be cached.
+    """
+    try:
+      stat_object = os.stat(source_path)
+    except OSError:
+      return None
+
+    if not os.path.isfile(source_path):
+      return None
+
+    cache_key = json.dumps([
+        self._FORMAT_VERSION, winregrc.__version__, os.path.abspath(
+            source_path), stat_object.st_size, stat_object.st_mtime_ns,
+        collector_class.__module__, collector_class.__name__])
+
+    digest = hashlib.sha256(cache_key.encode('utf-8')).hexdigest()
+    return os.path.join(self._path, f'{digest:s}.json')
+
+  def GetRecords(self, source_path, collector_class):
+    """Retrieves the cached records of a source.
+
+    Args:
+      source_path (str): path of the source.
+      collector_class (type): class of the collector.
+
+    Returns:
+      list[object]: records or None if not cached.
+    """
+    cache_file_path = self._GetCacheFilePath(source_path, collector_class)
+    if not cache_file_path or not os.path.isfile(cache_file_path):
+      return None
+
+    try:
+      with open(cache_file_path, 'r', encoding='utf-8') as file_object:
+        json_values = json.load(file_object)
+
+      return serializers.RecordSerializer.ConvertJSONToValue(json_values)
+
+    except (AttributeError, ImportError, KeyError, OSError, TypeError,
+            ValueError) as exception:
+      logging.warning((
+          f'Unable to read cached records of: {source_path:s} with error: '
+          f'{exception!s}'))
+      return None
+
+  def SetRecords(self, source_path, collector_class, records):
+    """Caches the records of a source.
+
+    Args:
+      source_path (str): path of the source.
+      collector_class (type): class of the collector.
+      records (list[object]): records.
+    """
+    cache_file_path = self._GetCacheFilePath(source_path, collector_class)
+    if not cache_file_path:
+      return
+
+    try:
+      json_values = serializers.RecordSerializer.ConvertValueToJSON(records)
+      json_string = json.dumps(json_values)
+
+    except (TypeError, ValueError) as exception:
+      logging.warning((
+          f'Unable to cache records of: {source_path:s} with error: '
+          f'{exception!s}'))
+      return
+
+    try:
+      cache_files.WriteCacheFile(cache_file_path, json_string.encode('utf-8'))
+
+    except OSError as exception:
+      logging.warning((
+          f'Unable to cache records of: {source_path:s} with error: '
+          f'{exception!s}'))
+
+
+class KnowledgeBaseRecordAggregator(object):
+  """Knowledge base record aggregator.
+
+  Records are collected per source in a map phase, optionally by multiple
+  worker processes, and merged per identifier in a reduce phase. The reduce
+  phase merges the records in the order of the source definitions, so that
+  the result does not depend on the number of workers.
+
+  When records are merged, the first name of an identifier is kept as its
+  name and other names are added to its alternate names.
+
+  When a cache is used, only sources that are new or changed since they were
+  cached are scanned and the cached records are used for the others.
+  """
+
+  def __init__(
+      self, collector_class, name_attribute, alternate_names_attribute,
+      cache=None, debug=False, normalize_function=None, number_of_workers=1,
+      profiler=None):
+    """Initializes a knowledge base record aggregator.
+
+    Args:
+      collector_class (type): class of the collector, whose Collect method
+          yields records with an identifier attribute.
+      name_attribute (str): name of the record attribute that contains
+          the name, such as "display_name".
+      alternate_names_attribute (str): name of the record attribute that
+          contains the list of alternate names, such as
+          "alternate_display_names".
+      cache (Optional[SourceRecordsCache]): cache of the records collected
+          per source, where None represents no cache.
+      debug (Optional[bool]): True if debug information should be printed.
+      normalize_function (Optional[function]): function that normalizes
+          a record before it is merged.
+      number_of_workers (Optional[int]): maximum number of sources to collect
+          records from concurrently, each in a separate process.
+      profiler (Optional[ScriptProfiler]): profiler, where the sources are
+          processed sequentially when profiling.
+    """
+    super(KnowledgeBaseRecordAggregator, self).__init__()
+    self._alternate_names_attribute = alternate_names_attribute
+    self._cache = cache
+    self._collector_class = collector_class
+    self._debug = debug
+    self._name_attribute = name_attribute
+    self._normalize_function = normalize_function
+    self._number_of_workers = number_of_workers
+    self._profiler = profiler
+
+  def _CollectRecords(self, source_definition):
+    """Collects the records of a source.
+
+    Args:
+      source_definition (dict[str, str]): source definition, with the path
+          of the source as "source" and optionally the Windows version of
+          the source as "windows_version".
+
+    Returns:
+      list[object]: records or None if the source could not be scanned.
+    """
+    source_path = source_definition['source']
+
+    if self._cache:
+      records = self._cache.GetRecords(source_path, self._collector_class)
+      if records is not None:
+        logging.info(f'Using cached records of: {source_path:s}')
+        return records
+
+    records = self._ScanSource(source_path)
+
+    if self._cache and records is not None:
+      self._cache.SetRecords(source_path, self._collector_class, records)
+
+    return records
+
+  def _MergeRecords(self, source_definitions, records_per_source):
+    """Merges the records of the sources per identifier.
+
+    Args:
+      source_definitions (list[dict[str, str]]): source definitions.
+      records_per_source (list[list[object]]): records per source, in
+          the order of the source definitions, where None represents
+          a source that could not be scanned.
+
+    Returns:
+      list[AggregatedRecord]: aggregated records sorted by identifier.
+    """
+    aggregated_record_per_identifier = {}
+    names_per_identifier = {}
+    windows_versions_per_identifier = {}
+
+    for source_definition, records in zip(
+        source_definitions, records_per_source):
+      if records is None:
+        continue
+
+      # TODO: determine Windows version from source.
+      windows_version = source_definition.get('windows_version', None)
+
+      for record in records:
+        if self._normalize_function:
+          self._normalize_function(record)
+
+        name = getattr(record, self._name_attribute)
+
+        aggregated_record = aggregated_record_per_identifier.get(
+            record.identifier, None)
+        if not aggregated_record:
+          aggregated_record = AggregatedRecord(record)
+          aggregated_record_per_identifier[record.identifier] = (
+              aggregated_record)
+
+          names = set(getattr(record, self._alternate_names_attribute))
+          names_per_identifier[record.identifier] = names
+
+          windows_versions = set()
+          windows_versions_per_identifier[record.identifier] = (
+              windows_versions)
+
+        else:
+          # TODO: compare other attributes with the existing record.
+          existing_record = aggregated_record.record
+          existing_name = getattr(existing_record, self._name_attribute)
+          names = names_per_identifier[record.identifier]
+          windows_versions = windows_versions_per_identifier[record.identifier]
+
+          if not existing_name:
+            setattr(existing_record, self._name_attribute, name)
+
+          elif name and name != existing_name and name not in names:
+            getattr(existing_record, self._alternate_names_attribute).append(
+                name)
+            names.add(name)
+
+        if windows_version and windows_version not in windows_versions:
+          aggregated_record.windows_versions.append(windows_version)
+          windows_versions.add(windows_version)
+
+    return [aggregated_record for _, aggregated_record in sorted(
+        aggregated_record_per_identifier.items())]
+
+  def _ScanSource(self, source_path):
+    """Scans a source for records.
+
+    Args:
+      source_path (str): path of the source.
+
+    Returns:
+      list[object]: records or None if the source could not be scanned.
+    """
+    logging.info(f'Processing: {source_path:s}')
+
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator, profiler=self._profiler)
+
+    volume_scanner_options = volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.username = ['none']
+    volume_scanner_options.volumes = ['none']
+
+    if not scanner.ScanForWindowsVolume(
+        source_path, options=volume_scanner_options):
+      logging.error((
+          f'Unable to retrieve the volume with the Windows directory from: '
+          f'{source_path:s}.'))
+      return None
+
+    collector_object = self._collector_class(debug=self._debug)
+
+    registry = scanner.registry
+    if self._profiler:
+      registry = self._profiler.ProfileRegistryAccess(
+          collector_object, registry)
+
+    records = collector_object.Collect(registry)
+    if self._profiler:
+      records = self._profiler.ProfileGenerator('collect', records)
+
+    return list(records)
+
+  def Aggregate(self, source_definitions):
+    """Aggregates the records of multiple sources.
+
+    Args:
+      source_definitions (list[dict[str, str]]): source definitions, with
+          the path of the source as "source" and optionally the Windows
+          version of the source as "windows_version".
+
+    Returns:
+      list[AggregatedRecord]: aggregated records sorted by identifier.
+    """
+    number_of_workers = min(self._number_of_workers, len(source_definitions))
+
+    if self._profiler or number_of_workers <= 1:
+      records_per_source = [
+          self._CollectRecords(source_definition)
+          for source_definition in source_definitions]
+
+    else:
+      # The sources are collected in separate processes, since the dfvfs
+      # volume scanner opens the sources with the default resolver context,
+      # which cannot be used by multiple threads.
+      with concurrent.futures.ProcessPoolExecutor(
+          max_workers=number_of_workers) as executor:
+        records_per_source = list(executor.map(
+            self._CollectRecords, source_definitions))
+
+    return self._MergeRecords(source_definitions, records_per_source)
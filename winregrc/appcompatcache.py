@@ -18,6 +18,8 @@ class AppCompatCacheHeader(object):
     header_size (int): header size.
   """
 
+  __slots__ = ('header_size', 'number_of_cached_entries')
+
   def __init__(self):
     """Initializes an Application Compatibility Cache header."""
     super(AppCompatCacheHeader, self).__init__()
@@ -40,6 +42,10 @@ class AppCompatCacheCachedEntry(object):
     path (str): path of the cached entry.
   """
 
+  __slots__ = (
+      'cached_entry_size', 'data', 'file_size', 'insertion_flags',
+      'last_modification_time', 'last_update_time', 'path', 'shim_flags')
+
   def __init__(self):
     """Initializes an Application Compatibility Cache cached entry."""
     super(AppCompatCacheCachedEntry, self).__init__()
@@ -684,7 +690,7 @@ class AppCompatCacheCollector(interface.WindowsRegistryKeyCollector):
       cached_entry_offset += cached_entry.cached_entry_size
       cached_entry_index += 1
 
-      if (cache_header.number_of_cached_entries != 0 and
+      if (cache_header.number_of_cached_entries and
           cached_entry_index >= cache_header.number_of_cached_entries):
         break
 
@@ -755,3 +761,12 @@ class AppCompatCacheCollector(interface.WindowsRegistryKeyCollector):
           result = True
 
     return result
+
+  def SetRegistryAccessStatistics(self, statistics):
+    """Sets the Windows Registry access statistics.
+
+    Args:
+      statistics (RegistryAccessStatistics): statistics to update.
+    """
+    super(AppCompatCacheCollector, self).SetRegistryAccessStatistics(statistics)
+    self._parser.SetRegistryAccessStatistics(statistics)
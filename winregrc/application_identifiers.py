@@ -12,6 +12,8 @@ class ApplicationIdentifier(object):
     guid (str): identifier.
   """
 
+  __slots__ = ('description', 'guid')
+
   def __init__(self, guid, description):
     """Initializes an application identifier.
 
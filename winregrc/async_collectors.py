@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""Asyncio facade of Windows Registry collectors."""
+
+import asyncio
+import functools
+import itertools
+import threading
+
+
+class AsyncCollectorFacade(object):
+  """Asyncio facade of Windows Registry collectors.
+
+  Collectors, such as WindowsServicesCollector, read the Windows Registry
+  files and parse their values synchronously, which blocks the event loop.
+  The facade runs a collector in an executor and yields its records to
+  an "async for" loop. The records are read in batches, which limits
+  the overhead of switching between the event loop and the executor.
+
+  The number of collectors that run concurrently on the same source, such as
+  a storage media image, is limited, since the Windows Registry files of
+  a source are shared by its collectors.
+
+  When the task that iterates the records is cancelled or stops iterating,
+  the collector is stopped after the batch of records it is reading.
+  """
+
+  _BATCH_SIZE = 64
+
+  def __init__(self, executor=None, maximum_number_of_tasks_per_source=1):
+    """Initializes an asyncio facade of Windows Registry collectors.
+
+    Args:
+      executor (Optional[concurrent.futures.ThreadPoolExecutor]): executor
+          the collectors are run in, where None represents the default
+          executor of the event loop.
+      maximum_number_of_tasks_per_source (Optional[int]): maximum number of
+          collectors that run concurrently on the same source.
+    """
+    super(AsyncCollectorFacade, self).__init__()
+    self._executor = executor
+    self._maximum_number_of_tasks_per_source = (
+        maximum_number_of_tasks_per_source)
+    self._number_of_tasks_per_source = {}
+    self._semaphore_per_source = {}
+
+  def _CloseRecords(self, records, lock):
+    """Closes the records generator of a collector.
+
+    Args:
+      records (iterator[object]): records generator of the collector.
+      lock (threading.Lock): lock that prevents the generator from being
+          closed while a batch of records is read.
+    """
+    close_function = getattr(records, 'close', None)
+    if close_function:
+      with lock:
+        close_function()
+
+  def _ReadRecords(self, records, lock):
+    """Reads a batch of records from the records generator of a collector.
+
+    Args:
+      records (iterator[object]): records generator of the collector.
+      lock (threading.Lock): lock that prevents the generator from being
+          closed while a batch of records is read.
+
+    Returns:
+      list[object]: records, where an empty list represents that the
+          collector has no more records.
+    """
+    with lock:
+      return list(itertools.islice(records, self._BATCH_SIZE))
+
+  def _StartCollector(self, collect_function, registry):
+    """Starts a collector.
+
+    Args:
+      collect_function (function): function that collects the records from
+          the Windows Registry, which is passed as its argument.
+      registry (dfwinreg.WinRegistry): Windows Registry.
+
+    Returns:
+      iterator[object]: records generator of the collector.
+    """
+    return iter(collect_function(registry))
+
+  async def Collect(self, collect_function, registry, source=None):
+    """Collects records from the Windows Registry.
+
+    Args:
+      collect_function (function): function that collects the records from
+          the Windows Registry, which is passed as its argument, such as
+          the Collect method of a collector or a functools.partial of it.
+      registry (dfwinreg.WinRegistry): Windows Registry.
+      source (Optional[object]): source of the Windows Registry, such as
+          the path of a storage media image, which is used to limit
+          the number of collectors that run concurrently on the same source,
+          where None represents the Windows Registry itself.
+
+    Yields:
+      object: record, such as a Windows service.
+    """
+    if source is None:
+      source = registry
+
+    semaphore = self._semaphore_per_source.get(source, None)
+    if not semaphore:
+      semaphore = asyncio.Semaphore(self._maximum_number_of_tasks_per_source)
+      self._number_of_tasks_per_source[source] = 0
+      self._semaphore_per_source[source] = semaphore
+
+    self._number_of_tasks_per_source[source] += 1
+
+    try:
+      async with semaphore:
+        event_loop = asyncio.get_running_loop()
+
+        records = await event_loop.run_in_executor(
+            self._executor, functools.partial(
+                self._StartCollector, collect_function, registry))
+
+        lock = threading.Lock()
+        try:
+          batch = await event_loop.run_in_executor(
+              self._executor, functools.partial(
+                  self._ReadRecords, records, lock))
+          while batch:
+            for record in batch:
+              yield record
+
+            batch = await event_loop.run_in_executor(
+                self._executor, functools.partial(
+                    self._ReadRecords, records, lock))
+
+        finally:
+          # The generator is closed in the executor, after the batch that is
+          # being read, so that the collector does not keep running on
+          # the source after the semaphore has been released.
+          await asyncio.shield(event_loop.run_in_executor(
+              self._executor, functools.partial(
+                  self._CloseRecords, records, lock)))
+
+    finally:
+      self._number_of_tasks_per_source[source] -= 1
+      if not self._number_of_tasks_per_source[source]:
+        del self._number_of_tasks_per_source[source]
+        del self._semaphore_per_source[source]
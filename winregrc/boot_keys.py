@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Boot key provider."""
+
+import codecs
+import collections
+import threading
+import weakref
+
+
+class BootKeyProvider(object):
+  """Boot key provider.
+
+  The boot key is derived from the class names of the JD, Skew1, GBG and Data
+  subkeys of the Lsa key in the SYSTEM Registry file. The provider caches
+  the boot key per Windows Registry, so that the Lsa key is only resolved
+  once, and per class names, so that the boot key of the same SYSTEM
+  Registry file opened more than once is only descrambled once.
+
+  The provider can be shared by collectors that run on different threads,
+  hence the caches are guarded by a lock. The number of boot keys cached per
+  class names is bounded, where the least recently used boot keys are
+  removed first.
+  """
+
+  _LSA_KEY_PATH = (
+      'HKEY_LOCAL_MACHINE\\System\\CurrentControlSet\\Control\\Lsa')
+
+  _LSA_SUBKEY_NAMES = ('JD', 'Skew1', 'GBG', 'Data')
+
+  _SCRAMBLED_INDEXES = [8, 5, 4, 2, 11, 9, 13, 3, 0, 6, 1, 12, 14, 10, 15, 7]
+
+  def __init__(self, maximum_number_of_boot_keys=64):
+    """Initializes a boot key provider.
+
+    Args:
+      maximum_number_of_boot_keys (Optional[int]): maximum number of boot keys
+          cached per class names.
+    """
+    super(BootKeyProvider, self).__init__()
+    self._boot_keys_per_class_names = collections.OrderedDict()
+    self._boot_keys_per_registry = weakref.WeakKeyDictionary()
+    self._lock = threading.Lock()
+    self._maximum_number_of_boot_keys = maximum_number_of_boot_keys
+
+  def _GetClassNames(self, registry):
+    """Retrieves the concatenated class names of the Lsa subkeys.
+
+    Args:
+      registry (dfwinreg.WinRegistry): Windows Registry.
+
+    Returns:
+      str: concatenated class names of the JD, Skew1, GBG and Data subkeys or
+          None if not available.
+    """
+    try:
+      lsa_key = registry.GetKeyByPath(self._LSA_KEY_PATH)
+    except RuntimeError:
+      lsa_key = None
+
+    if not lsa_key:
+      return None
+
+    class_names = []
+    for subkey_name in self._LSA_SUBKEY_NAMES:
+      lsa_subkey = lsa_key.GetSubkeyByName(subkey_name)
+      if not lsa_subkey or lsa_subkey.class_name is None:
+        return None
+
+      class_names.append(lsa_subkey.class_name)
+
+    return ''.join(class_names)
+
+  def Empty(self):
+    """Empties the cache."""
+    with self._lock:
+      self._boot_keys_per_class_names.clear()
+      self._boot_keys_per_registry = weakref.WeakKeyDictionary()
+
+  def GetBootKey(self, registry):
+    """Retrieves the boot key.
+
+    Args:
+      registry (dfwinreg.WinRegistry): Windows Registry.
+
+    Returns:
+      bytes: boot key or None if not found.
+    """
+    with self._lock:
+      try:
+        boot_key = self._boot_keys_per_registry.get(registry, None)
+      except TypeError:
+        # The Windows Registry does not support weak references.
+        boot_key = None
+
+    if boot_key:
+      return boot_key
+
+    class_names = self._GetClassNames(registry)
+    if not class_names:
+      return None
+
+    with self._lock:
+      boot_key = self._boot_keys_per_class_names.get(class_names, None)
+
+    if not boot_key:
+      scrambled_key = codecs.decode(class_names, 'hex')
+      boot_key = bytes([
+          scrambled_key[scrambled_index]
+          for scrambled_index in self._SCRAMBLED_INDEXES])
+
+    with self._lock:
+      self._boot_keys_per_class_names[class_names] = boot_key
+      self._boot_keys_per_class_names.move_to_end(class_names)
+
+      while (len(self._boot_keys_per_class_names) >
+             self._maximum_number_of_boot_keys):
+        self._boot_keys_per_class_names.popitem(last=False)
+
+      try:
+        self._boot_keys_per_registry[registry] = boot_key
+      except TypeError:
+        pass
+
+    return boot_key
+
+
+SHARED_BOOT_KEY_PROVIDER = BootKeyProvider()
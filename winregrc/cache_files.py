@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Functions to write cache files."""
+
+import os
+import tempfile
+
+
+def WriteCacheFile(path, data):
+  """Writes a cache file.
+
+  The data is written to a temporary file in the directory of the cache file
+  first, that then replaces the cache file, so that an interrupted write does
+  not leave a partial cache file. The temporary file is removed when it cannot
+  be written or cannot replace the cache file.
+
+  Args:
+    path (str): path of the cache file.
+    data (bytes): data of the cache file.
+
+  Raises:
+    OSError: if the cache file cannot be written.
+  """
+  directory_path = os.path.dirname(os.path.abspath(path))
+  os.makedirs(directory_path, exist_ok=True)
+
+  file_descriptor, temporary_path = tempfile.mkstemp(
+      dir=directory_path, suffix='.tmp')
+  try:
+    with os.fdopen(file_descriptor, 'wb') as file_object:
+      file_object.write(data)
+
+    os.replace(temporary_path, path)
+
+  except OSError:
+    try:
+      os.remove(temporary_path)
+    except OSError:
+      pass
+
+    raise
@@ -1,27 +1,150 @@
 # -*- coding: utf-8 -*-
 """Domain cached credentials collector."""
 
-import codecs
+import collections
 import struct
+import threading
 
 import pyfcrypto
 import pyhmac
 
+from winregrc import boot_keys
 from winregrc import hexdump
 from winregrc import interface
 
 
+class KeyMaterialCache(object):
+  """Cache of key material derived from SYSTEM and SECURITY Registry files.
+
+  Each key is cached per the key and Registry data it is derived from, such
+  as the boot key and the PolSecretEncryptionKey and NL$KM values in the
+  SECURITY Registry file. The boot key itself is cached by the boot key
+  provider.
+  As a result the key material of a specific pair of Registry files is
+  derived once, regardless of the number of collectors, and a modified
+  Registry file cannot result in a stale key.
+
+  The cache is kept in memory, hence it only helps within one process, such
+  as a script that runs multiple collectors or the server. The number of
+  cached keys is bounded, where the least recently used keys are removed
+  first.
+  """
+
+  def __init__(self, maximum_number_of_keys=64):
+    """Initializes a key material cache.
+
+    Args:
+      maximum_number_of_keys (Optional[int]): maximum number of cached keys,
+          per type of key.
+    """
+    super(KeyMaterialCache, self).__init__()
+    self._lock = threading.Lock()
+    self._lsa_keys = collections.OrderedDict()
+    self._maximum_number_of_keys = maximum_number_of_keys
+    self._nl_keys = collections.OrderedDict()
+
+  def _GetKey(self, keys, lookup_key):
+    """Retrieves a cached key.
+
+    Args:
+      keys (collections.OrderedDict[tuple[bytes, bytes], bytes]): cached keys
+          of a specific type.
+      lookup_key (tuple[bytes, bytes]): key and Registry data the key is
+          derived from.
+
+    Returns:
+      bytes: key or None if not cached.
+    """
+    with self._lock:
+      key = keys.get(lookup_key, None)
+      if key is not None:
+        keys.move_to_end(lookup_key)
+
+    return key
+
+  def _SetKey(self, keys, lookup_key, key):
+    """Caches a key.
+
+    Args:
+      keys (collections.OrderedDict[tuple[bytes, bytes], bytes]): cached keys
+          of a specific type.
+      lookup_key (tuple[bytes, bytes]): key and Registry data the key is
+          derived from.
+      key (bytes): key.
+    """
+    with self._lock:
+      keys[lookup_key] = key
+      keys.move_to_end(lookup_key)
+
+      while len(keys) > self._maximum_number_of_keys:
+        keys.popitem(last=False)
+
+  def Empty(self):
+    """Empties the cache."""
+    with self._lock:
+      self._lsa_keys.clear()
+      self._nl_keys.clear()
+
+  def GetLSAKey(self, boot_key, policy_encryption_data):
+    """Retrieves a cached LSA key.
+
+    Args:
+      boot_key (bytes): boot key.
+      policy_encryption_data (bytes): PolSecretEncryptionKey value data.
+
+    Returns:
+      bytes: LSA key or None if not cached.
+    """
+    return self._GetKey(self._lsa_keys, (boot_key, policy_encryption_data))
+
+  def GetNLKey(self, lsa_key, nl_key_material_data):
+    """Retrieves a cached NL key.
+
+    Args:
+      lsa_key (bytes): LSA key.
+      nl_key_material_data (bytes): NL$KM value data.
+
+    Returns:
+      bytes: NL key or None if not cached.
+    """
+    return self._GetKey(self._nl_keys, (lsa_key, nl_key_material_data))
+
+  def SetLSAKey(self, boot_key, policy_encryption_data, lsa_key):
+    """Caches a LSA key.
+
+    Args:
+      boot_key (bytes): boot key.
+      policy_encryption_data (bytes): PolSecretEncryptionKey value data.
+      lsa_key (bytes): LSA key.
+    """
+    self._SetKey(
+        self._lsa_keys, (boot_key, policy_encryption_data), lsa_key)
+
+  def SetNLKey(self, lsa_key, nl_key_material_data, nl_key):
+    """Caches a NL key.
+
+    Args:
+      lsa_key (bytes): LSA key.
+      nl_key_material_data (bytes): NL$KM value data.
+      nl_key (bytes): NL key.
+    """
+    self._SetKey(self._nl_keys, (lsa_key, nl_key_material_data), nl_key)
+
+
 class CachedCredentialsKeyCollector(interface.WindowsRegistryKeyCollector):
-  """Domain cached credentials key collector."""
+  """Domain cached credentials key collector.
+
+  The boot key is retrieved from a boot key provider and the derived key
+  material is stored in a key material cache, that by default are shared by
+  all collectors in the same process, so that the boot, LSA and NL keys of
+  the same SYSTEM and SECURITY Registry files are only derived once.
+  """
 
   _CREDENTIALS_CACHE_KEY_PATH = 'HKEY_LOCAL_MACHINE\\Security\\Cache'
 
   _NL_KEY_MATERIAL_KEY_PATH = (
       'HKEY_LOCAL_MACHINE\\Security\\Policy\\Secrets\\NL$KM\\CurrVal')
 
-  _LSA_KEY_PATH = (
-      'HKEY_LOCAL_MACHINE\\System\\CurrentControlSet\\Control\\Lsa')
-
   _POLICY_ENCRYPTION_KEY_PATH = (
       'HKEY_LOCAL_MACHINE\\Security\\Policy\\PolSecretEncryptionKey')
 
@@ -43,14 +166,23 @@ class CachedCredentialsKeyCollector(interface.WindowsRegistryKeyCollector):
       229, 230, 230, 233, 233, 234, 234, 236, 236, 239, 239, 241, 241, 242, 242,
       244, 244, 247, 247, 248, 248, 251, 251, 253, 253, 254, 254]
 
-  def __init__(self, debug=False, output_writer=None):
+  def __init__(
+      self, boot_key_provider=None, debug=False, key_material_cache=None,
+      output_writer=None):
     """Initializes a system key collector.
 
     Args:
+      boot_key_provider (Optional[BootKeyProvider]): boot key provider, where
+          None represents the provider shared by all collectors.
       debug (Optional[bool]): True if debug information should be printed.
+      key_material_cache (Optional[KeyMaterialCache]): key material cache,
+          where None represents the cache shared by all collectors.
       output_writer (Optional[OutputWriter]): output writer.
     """
     super(CachedCredentialsKeyCollector, self).__init__(debug=debug)
+    self._boot_key_provider = (
+        boot_key_provider or boot_keys.SHARED_BOOT_KEY_PROVIDER)
+    self._key_material_cache = key_material_cache or _KEY_MATERIAL_CACHE
     self._output_writer = output_writer
 
   def _DecryptARC4(self, key, data):
@@ -84,53 +216,60 @@ class CachedCredentialsKeyCollector(interface.WindowsRegistryKeyCollector):
     return pyfcrypto.crypt_des3(
         des3_context, pyfcrypto.crypt_modes.DECRYPT, data)
 
-  def _GetBootKey(self, registry):
-    """Retrieves the boot key.
+  def _DecryptNLKeyMaterial(self, lsa_key, value_data):
+    """Decrypts the NL$KM value data.
+
+    Every 8-byte block is decrypted with a Triple DES key unpacked from the
+    next 7 bytes of the LSA key, which cycles through a few distinct keys.
+    The blocks are therefore grouped per key, so that all blocks that share
+    a key are decrypted with a single Triple DES context.
 
     Args:
-      registry (dfwinreg.WinRegistry): Windows Registry.
+      lsa_key (bytes): LSA key.
+      value_data (bytes): NL$KM value data.
 
     Returns:
-      bytes: boot key or None if not found.
+      bytes: decrypted value data.
     """
-    try:
-      lsa_key = registry.GetKeyByPath(self._LSA_KEY_PATH)
-    except RuntimeError:
-      lsa_key = None
-
-    if not lsa_key:
-      return None
+    key_size = len(lsa_key)
+    value_data_size = len(value_data)
 
-    lsa_jd_key = lsa_key.GetSubkeyByName('JD')
-    lsa_skew1_key = lsa_key.GetSubkeyByName('Skew1')
-    lsa_gbg_key = lsa_key.GetSubkeyByName('GBG')
-    lsa_data_key = lsa_key.GetSubkeyByName('Data')
+    block_offsets_per_key_offset = {}
+    key_offset = 0
+    for value_data_offset in range(12, value_data_size, 8):
+      block_offsets = block_offsets_per_key_offset.setdefault(key_offset, [])
+      block_offsets.append(value_data_offset)
 
-    if None in (lsa_jd_key, lsa_skew1_key, lsa_gbg_key, lsa_data_key):
-      return None
+      key_offset += 7
 
-    lsa_jd_class_name = lsa_jd_key.class_name
-    lsa_skew1_class_name = lsa_skew1_key.class_name
-    lsa_gbg_class_name = lsa_gbg_key.class_name
-    lsa_data_class_name = lsa_data_key.class_name
+      available_key_size = key_size - key_offset
+      if available_key_size < 7:
+        key_offset = available_key_size
 
-    if None in (
-        lsa_jd_class_name, lsa_skew1_class_name, lsa_gbg_class_name,
-        lsa_data_class_name):
-      return None
+    decrypted_blocks = {}
+    for key_offset, block_offsets in block_offsets_per_key_offset.items():
+      des_key = self._UnpackLSAKey(lsa_key[key_offset:key_offset + 7])
 
-    class_name_string = ''.join([
-        lsa_jd_class_name, lsa_skew1_class_name, lsa_gbg_class_name,
-        lsa_data_class_name])
+      # A trailing partial block is decrypted on its own.
+      last_block_offset = block_offsets[-1]
+      if last_block_offset + 8 > value_data_size:
+        decrypted_blocks[last_block_offset] = self._DecryptTripleDES(
+            des_key, value_data[last_block_offset:])
+        block_offsets = block_offsets[:-1]
 
-    scrambled_key = codecs.decode(class_name_string, 'hex')
-    key = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+      if block_offsets:
+        decrypted_data = self._DecryptTripleDES(des_key, b''.join([
+            value_data[block_offset:block_offset + 8]
+            for block_offset in block_offsets]))
 
-    for index, scrambled_index in enumerate([
-        8, 5, 4, 2, 11, 9, 13, 3, 0, 6, 1, 12, 14, 10, 15, 7]):
-      key[index] = scrambled_key[scrambled_index]
+        for index, block_offset in enumerate(block_offsets):
+          data_offset = index * 8
+          decrypted_blocks[block_offset] = decrypted_data[
+              data_offset:data_offset + 8]
 
-    return bytes(key)
+    return b''.join([
+        decrypted_block for _, decrypted_block in sorted(
+            decrypted_blocks.items())])
 
   def _GetLSAKey(self, registry, boot_key):
     """Retrieves the LSA key.
@@ -153,6 +292,10 @@ class CachedCredentialsKeyCollector(interface.WindowsRegistryKeyCollector):
 
     value_data = policy_encryption_value.data
 
+    lsa_key = self._key_material_cache.GetLSAKey(boot_key, value_data)
+    if lsa_key:
+      return lsa_key
+
     digest_context = pyhmac.md5_context()
     digest_context.update(boot_key)
 
@@ -163,7 +306,11 @@ class CachedCredentialsKeyCollector(interface.WindowsRegistryKeyCollector):
 
     rc4_key = digest_context.finalize()
     decrypted_data = self._DecryptARC4(rc4_key, value_data[12:60])
-    return decrypted_data[16:32]
+
+    lsa_key = decrypted_data[16:32]
+    self._key_material_cache.SetLSAKey(boot_key, value_data, lsa_key)
+
+    return lsa_key
 
   def _GetNLKey(self, registry, lsa_key):
     """Retrieves the NL key.
@@ -184,34 +331,23 @@ class CachedCredentialsKeyCollector(interface.WindowsRegistryKeyCollector):
     if not nl_key_material_value:
       return None
 
-    key_size = len(lsa_key)
     value_data = nl_key_material_value.data
-    value_data_size = len(value_data)
 
-    decrypted_value_data = []
-    key_offset = 0
-    for value_data_offset in range(12, value_data_size, 8):
-      key_end_offset = key_offset + 7
-      value_data_end_offset = value_data_offset + 8
+    nl_key = self._key_material_cache.GetNLKey(lsa_key, value_data)
+    if nl_key:
+      return nl_key
 
-      des_key = self._UnpackLSAKey(lsa_key[key_offset:key_end_offset])
-      decrypted_data = self._DecryptTripleDES(
-          des_key, value_data[value_data_offset:value_data_end_offset])
-      decrypted_value_data.append(decrypted_data)
-
-      key_offset = key_end_offset
-
-      available_key_size = key_size - key_offset
-      if available_key_size < 7:
-        key_offset = available_key_size
-
-    decrypted_value_data = b''.join(decrypted_value_data)
-    print(hexdump.Hexdump(decrypted_value_data))
+    decrypted_value_data = self._DecryptNLKeyMaterial(lsa_key, value_data)
+    if self._debug:
+      print(hexdump.Hexdump(decrypted_value_data))
 
     (data_size, ) = struct.unpack('<L', decrypted_value_data[:4])
     data_size += 8
 
-    return decrypted_value_data[8:data_size]
+    nl_key = decrypted_value_data[8:data_size]
+    self._key_material_cache.SetNLKey(lsa_key, value_data, nl_key)
+
+    return nl_key
 
   def _UnpackLSAKey(self, lsa_key):
     """Unpacks 7 bytes of the LSA key as a 8-byte Triple DES decryption key.
@@ -252,7 +388,7 @@ class CachedCredentialsKeyCollector(interface.WindowsRegistryKeyCollector):
     if not credentials_cache_key:
       return False
 
-    boot_key = self._GetBootKey(registry)
+    boot_key = self._boot_key_provider.GetBootKey(registry)
     if not boot_key:
       return False
 
@@ -276,3 +412,6 @@ class CachedCredentialsKeyCollector(interface.WindowsRegistryKeyCollector):
       print(hexdump.Hexdump(decrypted_data))
 
     return True
+
+
+_KEY_MATERIAL_CACHE = KeyMaterialCache()
@@ -14,6 +14,8 @@ class CatalogKeyDescriptor(object):
     value_descriptors (tuple[str,str]): pairs of value name and data type.
   """
 
+  __slots__ = ('grouped_key_paths', 'key_path', 'value_descriptors')
+
   def __init__(self):
     """Initializes a catalog key descriptor."""
     super(CatalogKeyDescriptor, self).__init__()
@@ -13,6 +13,8 @@ class ControlPanelItem(object):
     module_name (str): module name.
   """
 
+  __slots__ = ('alternate_module_names', 'identifier', 'module_name')
+
   def __init__(self, identifier, module_name):
     """Initializes a control panel item.
 
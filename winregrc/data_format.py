@@ -36,6 +36,7 @@ class BinaryDataFormat(object):
     self._debug = debug
     self._fabric = self._ReadDefinitionFile(self._DEFINITION_FILE)
     self._output_writer = output_writer
+    self._statistics = None
 
   def _DebugPrintData(self, description, data):
     """Prints data for debugging.
@@ -359,9 +360,22 @@ class BinaryDataFormat(object):
       raise ValueError('Missing data type map.')
 
     try:
+      if self._statistics:
+        return self._statistics.MapByteStream(
+            data_type_map, byte_stream, context=context)
+
       return data_type_map.MapByteStream(byte_stream, context=context)
     except (dtfabric_errors.ByteStreamTooSmallError,
             dtfabric_errors.MappingError) as exception:
       raise errors.ParseError((
           f'Unable to map {description:s} data at offset: 0x{file_offset:08x} '
           f'with error: {exception!s}'))
+
+  def SetRegistryAccessStatistics(self, statistics):
+    """Sets the Windows Registry access statistics.
+
+    Args:
+      statistics (RegistryAccessStatistics): statistics to update, where None
+          disables gathering statistics.
+    """
+    self._statistics = statistics
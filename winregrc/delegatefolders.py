@@ -13,6 +13,8 @@ class DelegateFolder(object):
     namespace (str): namespace.
   """
 
+  __slots__ = ('identifier', 'name', 'namespace')
+
   def __init__(self, identifier, name, namespace):
     """Initializes a delegate folder.
 
@@ -12,6 +12,8 @@ class EnvironmentVariable(object):
     value (str): value.
   """
 
+  __slots__ = ('name', 'value')
+
   def __init__(self, name, value):
     """Initializes an environment variable.
 
@@ -8,3 +8,7 @@ class Error(Exception):
 
 class ParseError(Error):
   """Error that is raised when value data cannot be parsed."""
+
+
+class RequestError(Error):
+  """Error that is raised when a server request cannot be answered."""
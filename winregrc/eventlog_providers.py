@@ -20,6 +20,11 @@ class EventLogProvider(object):
         files.
   """
 
+  __slots__ = (
+      'additional_identifier', 'category_message_files', 'event_message_files',
+      'identifier', 'log_sources', 'log_types', 'name',
+      'parameter_message_files')
+
   def __init__(self):
     """Initializes a Windows Event Log provider."""
     super(EventLogProvider, self).__init__()
@@ -44,12 +49,16 @@ class EventLogProvidersCollector(interface.WindowsRegistryKeyCollector):
       'WINEVT\\Publishers')
 
   def _CollectEventLogProviders(
-      self, services_eventlog_key, winevt_publishers_key):
+      self, services_eventlog_keys, winevt_publishers_key):
     """Collects Windows Event Log providers.
 
+    The providers are merged using indexes on the identifier, the name and
+    the log source, so that the time needed to merge scales linearly with
+    the number of providers.
+
     Args:
-      services_eventlog_key (dfwinreg.WinRegistryKey): a Services\\EventLog
-          Windows Registry.
+      services_eventlog_keys (list[dfwinreg.WinRegistryKey]): Services\\EventLog
+          Windows Registry keys, such as those of multiple control sets.
       winevt_publishers_key (dfwinreg.WinRegistryKey): a WINEVT\\Publishers
           Windows Registry.
 
@@ -79,38 +88,52 @@ class EventLogProvidersCollector(interface.WindowsRegistryKeyCollector):
 
     event_log_providers_per_log_source = {}
 
-    for event_log_provider in self._CollectEventLogProvidersFromServicesKey(
-        services_eventlog_key):
-      provider_identifier = event_log_provider.identifier
+    for services_eventlog_key in services_eventlog_keys:
+      for event_log_provider in self._CollectEventLogProvidersFromServicesKey(
+          services_eventlog_key):
+        provider_identifier = event_log_provider.identifier
+
+        if provider_identifier:
+          existing_event_log_provider = event_log_providers_per_identifier.get(
+              provider_identifier, None)
+          if existing_event_log_provider:
+            self._MergeEventLogProviders(
+                existing_event_log_provider, event_log_provider)
+            continue
+
+        log_source = event_log_provider.log_sources[0]
+        existing_event_log_provider = event_log_providers_per_name.get(
+            log_source, None)
+        if not existing_event_log_provider:
+          existing_event_log_provider = event_log_providers_per_log_source.get(
+              log_source, None)
 
-      if provider_identifier:
-        existing_event_log_provider = event_log_providers_per_identifier.get(
-            provider_identifier, None)
         if existing_event_log_provider:
+          if not existing_event_log_provider.identifier:
+            existing_event_log_provider.identifier = provider_identifier
+
+          elif (provider_identifier and
+                provider_identifier != existing_event_log_provider.identifier):
+            existing_event_log_provider.additional_identifier = (
+                provider_identifier)
+
           self._MergeEventLogProviders(
               existing_event_log_provider, event_log_provider)
           continue
 
-      log_source = event_log_provider.log_sources[0]
-      existing_event_log_provider = event_log_providers_per_name.get(
-          log_source, None)
-      if existing_event_log_provider:
-        if (provider_identifier and
-            provider_identifier != existing_event_log_provider.identifier):
-          existing_event_log_provider.additional_identifier = (
-              provider_identifier)
-
-        self._MergeEventLogProviders(
-            existing_event_log_provider, event_log_provider)
-        continue
-
-      event_log_providers_per_log_source[log_source] = event_log_provider
+        event_log_providers_per_log_source[log_source] = event_log_provider
 
     event_log_providers = list(event_log_providers_per_identifier.values())
     event_log_providers.extend(event_log_providers_per_log_source.values())
 
     for event_log_provider in sorted(
         event_log_providers, key=self._GetEventLogProviderSortedKey):
+      # Use dictionaries as insertion ordered sets to remove duplicates.
+      event_log_provider.log_sources = list(dict.fromkeys(
+          event_log_provider.log_sources))
+      event_log_provider.log_types = list(dict.fromkeys(
+          event_log_provider.log_types))
+
       event_log_provider.category_message_files = self._NormalizeMessageFiles(
           event_log_provider.category_message_files)
       event_log_provider.event_message_files = self._NormalizeMessageFiles(
@@ -223,13 +246,12 @@ class EventLogProvidersCollector(interface.WindowsRegistryKeyCollector):
       first_event_log_provider (EventLogProvider): first Event Log provider.
       second_event_log_provider (EventLogProvider): second Event Log provider.
     """
-    for log_source in second_event_log_provider.log_sources:
-      if log_source not in first_event_log_provider.log_sources:
-        first_event_log_provider.log_sources.append(log_source)
-
-    for log_type in second_event_log_provider.log_types:
-      if log_type not in first_event_log_provider.log_types:
-        first_event_log_provider.log_types.append(log_type)
+    # Duplicate log sources and types are removed after all providers have
+    # been merged.
+    first_event_log_provider.log_sources.extend(
+        second_event_log_provider.log_sources)
+    first_event_log_provider.log_types.extend(
+        second_event_log_provider.log_types)
 
     first_event_log_provider.category_message_files.update(
         second_event_log_provider.category_message_files)
@@ -241,37 +263,69 @@ class EventLogProvidersCollector(interface.WindowsRegistryKeyCollector):
   def _NormalizeMessageFiles(self, message_files):
     """Normalizes the message files.
 
+    Paths that only differ in case are considered the same message file, of
+    which the path that sorts first is kept.
+
     Args:
-      message_files (list[str]): paths of the message files.
+      message_files (set[str]): paths of the message files.
 
     Returns:
       set[str]: normalized paths of the message files.
     """
-    normalized_message_files = set()
-    paths_lower = set()
-    for path in message_files:
-      path_lower = path.lower()
-      if path_lower not in paths_lower:
-        paths_lower.add(path_lower)
-        normalized_message_files.add(path)
+    paths_per_lower_case_path = {}
+    for path in sorted(message_files):
+      paths_per_lower_case_path.setdefault(path.lower(), path)
+
+    return set(paths_per_lower_case_path.values())
 
-    return normalized_message_files
+  def _GetServicesEventLogKeys(self, registry, all_control_sets=False):
+    """Retrieves the Services\\EventLog keys.
 
-  def Collect(self, registry):
+    Args:
+      registry (dfwinreg.WinRegistry): Windows Registry.
+      all_control_sets (Optional[bool]): True if the keys of all control sets
+          should be retrieved instead of only that of the current control set.
+
+    Returns:
+      list[dfwinreg.WinRegistryKey]: Services\\EventLog keys.
+    """
+    if not all_control_sets:
+      services_eventlog_key = registry.GetKeyByPath(
+          self._SERVICES_EVENTLOG_KEY_PATH)
+      if not services_eventlog_key:
+        return []
+
+      return [services_eventlog_key]
+
+    services_eventlog_keys = []
+
+    system_key = registry.GetKeyByPath('HKEY_LOCAL_MACHINE\\System')
+    if system_key:
+      for control_set_key in system_key.GetSubkeys():
+        if control_set_key.name.startswith('ControlSet'):
+          services_eventlog_key = control_set_key.GetSubkeyByPath(
+              'Services\\EventLog')
+          if services_eventlog_key:
+            services_eventlog_keys.append(services_eventlog_key)
+
+    return services_eventlog_keys
+
+  def Collect(self, registry, all_control_sets=False):
     """Collects Windows Event Log providers from a Windows Registry.
 
     Args:
       registry (dfwinreg.WinRegistry): Windows Registry.
+      all_control_sets (Optional[bool]): True if the Event Log providers
+          should be collected from all control sets instead of only the
+          current control set.
 
     Returns:
       generator[EventLogProvider]: Event Log provider generator.
     """
-    # TODO: add support to collect Event Log providers from all control sets.
-
-    services_eventlog_key = registry.GetKeyByPath(
-        self._SERVICES_EVENTLOG_KEY_PATH)
+    services_eventlog_keys = self._GetServicesEventLogKeys(
+        registry, all_control_sets=all_control_sets)
     winevt_publishers_key = registry.GetKeyByPath(
         self._WINEVT_PUBLISHERS_KEY_PATH)
 
     return self._CollectEventLogProviders(
-        services_eventlog_key, winevt_publishers_key)
+        services_eventlog_keys, winevt_publishers_key)
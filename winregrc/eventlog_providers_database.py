@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""Windows Event Log providers lookup database."""
+
+import os
+import pathlib
+import sqlite3
+
+from winregrc import eventlog_providers
+
+
+class EventLogProvidersDatabase(object):
+  """Windows Event Log providers lookup database.
+
+  The database is a SQLite database with indexes on the provider identifier,
+  name and log source, that are compared case-insensitive, so that a lookup
+  does not require the whole database to be read.
+  """
+
+  FORMAT_VERSION = 1
+
+  _MESSAGE_FILE_TYPES = ('category', 'event', 'parameter')
+
+  _CREATE_TABLE_QUERIES = [
+      'CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT)',
+      ('CREATE TABLE providers (provider_key INTEGER PRIMARY KEY, '
+       'identifier TEXT COLLATE NOCASE, '
+       'additional_identifier TEXT COLLATE NOCASE, name TEXT COLLATE NOCASE)'),
+      ('CREATE TABLE log_sources (provider_key INTEGER, '
+       'log_source TEXT COLLATE NOCASE)'),
+      'CREATE TABLE log_types (provider_key INTEGER, log_type TEXT)',
+      ('CREATE TABLE message_files (provider_key INTEGER, file_type TEXT, '
+       'path TEXT)')]
+
+  _CREATE_INDEX_QUERIES = [
+      'CREATE INDEX providers_identifier ON providers (identifier)',
+      ('CREATE INDEX providers_additional_identifier ON providers '
+       '(additional_identifier)'),
+      'CREATE INDEX providers_name ON providers (name)',
+      'CREATE INDEX log_sources_log_source ON log_sources (log_source)',
+      'CREATE INDEX log_sources_provider_key ON log_sources (provider_key)',
+      'CREATE INDEX log_types_provider_key ON log_types (provider_key)',
+      'CREATE INDEX message_files_provider_key ON message_files (provider_key)']
+
+  def __init__(self):
+    """Initializes a Windows Event Log providers lookup database."""
+    super(EventLogProvidersDatabase, self).__init__()
+    self._connection = None
+    self._number_of_providers = 0
+    self._read_only = True
+
+  def _GetEventLogProvider(self, values):
+    """Retrieves an Event Log provider from the database.
+
+    Args:
+      values (tuple[int, str, str, str]): provider key, identifier, additional
+          identifier and name of the provider.
+
+    Returns:
+      EventLogProvider: Event Log provider.
+    """
+    provider_key, identifier, additional_identifier, name = values
+
+    event_log_provider = eventlog_providers.EventLogProvider()
+    event_log_provider.additional_identifier = additional_identifier
+    event_log_provider.identifier = identifier
+    event_log_provider.name = name
+
+    cursor = self._connection.execute((
+        'SELECT log_source FROM log_sources WHERE provider_key = ? '
+        'ORDER BY rowid'), (provider_key, ))
+    event_log_provider.log_sources = [log_source for log_source, in cursor]
+
+    cursor = self._connection.execute((
+        'SELECT log_type FROM log_types WHERE provider_key = ? '
+        'ORDER BY rowid'), (provider_key, ))
+    event_log_provider.log_types = [log_type for log_type, in cursor]
+
+    cursor = self._connection.execute(
+        'SELECT file_type, path FROM message_files WHERE provider_key = ?',
+        (provider_key, ))
+    for file_type, path in cursor:
+      if file_type == 'category':
+        event_log_provider.category_message_files.add(path)
+      elif file_type == 'event':
+        event_log_provider.event_message_files.add(path)
+      elif file_type == 'parameter':
+        event_log_provider.parameter_message_files.add(path)
+
+    return event_log_provider
+
+  def _GetEventLogProviders(self, query, parameters):
+    """Retrieves Event Log providers from the database.
+
+    Args:
+      query (str): query that selects the provider key, identifier, additional
+          identifier and name of the providers.
+      parameters (tuple[object]): query parameters.
+
+    Returns:
+      list[EventLogProvider]: Event Log providers.
+
+    Raises:
+      OSError: if the database is not opened.
+    """
+    if not self._connection:
+      raise OSError('Database not opened.')
+
+    cursor = self._connection.execute(query, parameters)
+    return [self._GetEventLogProvider(values) for values in cursor.fetchall()]
+
+  def Close(self):
+    """Closes the database.
+
+    When the database was opened for writing, the indexes are created before
+    it is closed.
+
+    Raises:
+      OSError: if the database is not opened.
+    """
+    if not self._connection:
+      raise OSError('Database not opened.')
+
+    if not self._read_only:
+      # Creating the indexes after all providers were added is faster than
+      # maintaining them while adding.
+      for query in self._CREATE_INDEX_QUERIES:
+        self._connection.execute(query)
+
+      self._connection.commit()
+
+    self._connection.close()
+    self._connection = None
+
+  def GetEventLogProvidersByIdentifier(self, identifier):
+    """Retrieves Event Log providers by identifier.
+
+    Args:
+      identifier (str): identifier of the provider, which is matched
+          case-insensitive against both the identifier and the additional
+          identifier.
+
+    Returns:
+      list[EventLogProvider]: Event Log providers.
+
+    Raises:
+      OSError: if the database is not opened.
+    """
+    return self._GetEventLogProviders((
+        'SELECT provider_key, identifier, additional_identifier, name '
+        'FROM providers WHERE identifier = ?1 UNION '
+        'SELECT provider_key, identifier, additional_identifier, name '
+        'FROM providers WHERE additional_identifier = ?1'), (identifier, ))
+
+  def GetEventLogProvidersByLogSource(self, log_source):
+    """Retrieves Event Log providers by log source.
+
+    Args:
+      log_source (str): name of the Event Log source, which is matched
+          case-insensitive.
+
+    Returns:
+      list[EventLogProvider]: Event Log providers.
+
+    Raises:
+      OSError: if the database is not opened.
+    """
+    return self._GetEventLogProviders((
+        'SELECT provider_key, identifier, additional_identifier, name '
+        'FROM providers WHERE provider_key IN ('
+        'SELECT provider_key FROM log_sources WHERE log_source = ?)'),
+        (log_source, ))
+
+  def GetEventLogProvidersByName(self, name):
+    """Retrieves Event Log providers by name.
+
+    Args:
+      name (str): name of the provider, which is matched case-insensitive.
+
+    Returns:
+      list[EventLogProvider]: Event Log providers.
+
+    Raises:
+      OSError: if the database is not opened.
+    """
+    return self._GetEventLogProviders((
+        'SELECT provider_key, identifier, additional_identifier, name '
+        'FROM providers WHERE name = ?'), (name, ))
+
+  def Open(self, path, read_only=True):
+    """Opens the database.
+
+    Args:
+      path (str): path of the database file.
+      read_only (Optional[bool]): True if the database should be opened in
+          read-only mode. Since the database is a lookup database, opening it
+          for writing creates a new database file.
+
+    Raises:
+      OSError: if the database is already opened, the database file already
+          exists when opened for writing or has an unsupported format.
+    """
+    if self._connection:
+      raise OSError('Database already opened.')
+
+    if read_only:
+      if not os.path.isfile(path):
+        raise OSError(f'No such database file: {path:s}')
+
+    elif os.path.exists(path):
+      raise OSError(f'Database file: {path:s} already exists.')
+
+    if read_only:
+      # The path is converted into an URI, which escapes characters that have
+      # a special meaning in an URI, such as "?" and "#".
+      uri = pathlib.Path(path).absolute().as_uri()
+      connection = sqlite3.connect(f'{uri:s}?mode=ro', uri=True)
+    else:
+      connection = sqlite3.connect(path)
+
+    try:
+      if read_only:
+        cursor = connection.execute(
+            "SELECT value FROM metadata WHERE key = 'format_version'")
+        row = cursor.fetchone()
+        format_version = int(row[0]) if row else None
+        if format_version != self.FORMAT_VERSION:
+          raise OSError(f'Unsupported database format version: {row!s}')
+
+      else:
+        for query in self._CREATE_TABLE_QUERIES:
+          connection.execute(query)
+
+        connection.execute(
+            "INSERT INTO metadata VALUES ('format_version', ?)",
+            (f'{self.FORMAT_VERSION:d}', ))
+
+    except (OSError, sqlite3.Error) as exception:
+      connection.close()
+      raise OSError(
+          f'Unable to open database: {path:s} with error: {exception!s}')
+
+    self._connection = connection
+    self._number_of_providers = 0
+    self._read_only = read_only
+
+  def WriteEventLogProvider(self, event_log_provider):
+    """Writes an Event Log provider to the database.
+
+    Args:
+      event_log_provider (EventLogProvider): Event Log provider.
+
+    Raises:
+      OSError: if the database is not opened for writing.
+    """
+    if not self._connection or self._read_only:
+      raise OSError('Database not opened for writing.')
+
+    self._number_of_providers += 1
+    provider_key = self._number_of_providers
+
+    self._connection.execute(
+        'INSERT INTO providers VALUES (?, ?, ?, ?)', (
+            provider_key, event_log_provider.identifier,
+            event_log_provider.additional_identifier, event_log_provider.name))
+
+    self._connection.executemany(
+        'INSERT INTO log_sources VALUES (?, ?)', [
+            (provider_key, log_source)
+            for log_source in event_log_provider.log_sources])
+
+    self._connection.executemany(
+        'INSERT INTO log_types VALUES (?, ?)', [
+            (provider_key, log_type)
+            for log_type in event_log_provider.log_types])
+
+    message_files = []
+    for file_type, paths in zip(self._MESSAGE_FILE_TYPES, (
+        event_log_provider.category_message_files,
+        event_log_provider.event_message_files,
+        event_log_provider.parameter_message_files)):
+      message_files.extend([
+          (provider_key, file_type, path) for path in sorted(paths)])
+
+    self._connection.executemany(
+        'INSERT INTO message_files VALUES (?, ?, ?)', message_files)
@@ -13,6 +13,7 @@ class WindowsRegistryKeyCollector(object):
     """
     super(WindowsRegistryKeyCollector, self).__init__()
     self._debug = debug
+    self._statistics = None
 
   def _GetStringValueFromKey(
       self, registry_key, value_name, default_value=None):
@@ -76,3 +77,12 @@ class WindowsRegistryKeyCollector(object):
       return default_value
 
     return registry_value.GetDataAsObject()
+
+  def SetRegistryAccessStatistics(self, statistics):
+    """Sets the Windows Registry access statistics.
+
+    Args:
+      statistics (RegistryAccessStatistics): statistics to update, where None
+          disables gathering statistics.
+    """
+    self._statistics = statistics
@@ -14,6 +14,10 @@ class KnownFolder(object):
     display_name (str): display name.
   """
 
+  __slots__ = (
+      'alternate_display_names', 'display_name', 'identifier',
+      'localized_display_name')
+
   def __init__(self, identifier, display_name, localized_display_name):
     """Initializes a known folder.
 
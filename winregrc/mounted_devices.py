@@ -16,6 +16,10 @@ class MountedDevice(object):
     partition_offset (int): MBR partition offset.
   """
 
+  __slots__ = (
+      'device', 'disk_identity', 'identifier', 'partition_identifier',
+      'partition_offset')
+
   def __init__(self, identifier):
     """Initializes a mounted device.
 
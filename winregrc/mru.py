@@ -18,6 +18,10 @@ class MostRecentlyUsedEntry(object):
     value_name (str): name of the Windows Registry value.
   """
 
+  __slots__ = (
+      'key_path', 'shell_item_data', 'shell_item_list_data', 'string',
+      'value_name')
+
   def __init__(
       self, key_path=None, shell_item_data=None, shell_item_list_data=None,
       string=None, value_name=None):
@@ -14,6 +14,8 @@ class MSIEZoneInformation(object):
     zone_name (str): name of the zone to which the control applies.
   """
 
+  __slots__ = ('control', 'control_value', 'zone', 'zone_name')
+
   def __init__(self, zone, zone_name, control, control_value):
     """Initializes MSIE zone information.
 
@@ -194,6 +194,21 @@ class OutputWriter(object):
       value (str): value to write.
     """
 
+  def WriteSnapshot(self, snapshot_identifier, identical_snapshot_identifier):
+    """Writes the start of the records of a snapshot.
+
+    Args:
+      snapshot_identifier (str): identifier of the snapshot, such as "vss1".
+      identical_snapshot_identifier (str): identifier of a snapshot with
+          identical Windows Registry files or None if not set.
+    """
+    if identical_snapshot_identifier:
+      self.WriteText((
+          f'Snapshot: {snapshot_identifier:s} (identical to: '
+          f'{identical_snapshot_identifier:s})\n\n'))
+    else:
+      self.WriteText(f'Snapshot: {snapshot_identifier:s}\n\n')
+
   @abc.abstractmethod
   def WriteText(self, text):
     """Writes text.
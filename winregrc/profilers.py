@@ -0,0 +1,731 @@
+# -*- coding: utf-8 -*-
+"""Script profilers."""
+
+import contextlib
+import cProfile
+import json
+import time
+import tracemalloc
+
+from dfwinreg import interface as dfwinreg_interface
+
+
+class RegistryAccessStatistics(object):
+  """Windows Registry access statistics.
+
+  Attributes:
+    mapping_time (float): time spent mapping byte streams onto dtFabric data
+        type maps or unpacking them with struct, in seconds.
+    name (str): name of the collector the statistics are gathered for.
+    number_of_get_key_by_path (int): number of GetKeyByPath calls.
+    number_of_get_subkey_by_name (int): number of GetSubkeyByName calls.
+    number_of_get_subkey_by_path (int): number of GetSubkeyByPath calls.
+    number_of_get_subkeys (int): number of GetSubkeys calls.
+    number_of_get_value_by_name (int): number of GetValueByName calls.
+    number_of_get_values (int): number of GetValues calls.
+    number_of_mappings (int): number of byte stream mappings.
+    value_data_size (int): number of bytes of value data read.
+  """
+
+  def __init__(self, name):
+    """Initializes Windows Registry access statistics.
+
+    Args:
+      name (str): name of the collector the statistics are gathered for.
+    """
+    super(RegistryAccessStatistics, self).__init__()
+    self.mapping_time = 0.0
+    self.name = name
+    self.number_of_get_key_by_path = 0
+    self.number_of_get_subkey_by_name = 0
+    self.number_of_get_subkey_by_path = 0
+    self.number_of_get_subkeys = 0
+    self.number_of_get_value_by_name = 0
+    self.number_of_get_values = 0
+    self.number_of_mappings = 0
+    self.value_data_size = 0
+
+  def CopyToDict(self):
+    """Copies the statistics to a dictionary.
+
+    Returns:
+      dict[str, object]: statistics that can be serialized as JSON.
+    """
+    return {
+        'mapping_time': self.mapping_time,
+        'number_of_get_key_by_path': self.number_of_get_key_by_path,
+        'number_of_get_subkey_by_name': self.number_of_get_subkey_by_name,
+        'number_of_get_subkey_by_path': self.number_of_get_subkey_by_path,
+        'number_of_get_subkeys': self.number_of_get_subkeys,
+        'number_of_get_value_by_name': self.number_of_get_value_by_name,
+        'number_of_get_values': self.number_of_get_values,
+        'number_of_mappings': self.number_of_mappings,
+        'value_data_size': self.value_data_size}
+
+  def MapByteStream(self, data_type_map, byte_stream, context=None):
+    """Maps a byte stream onto a dtFabric data type map and times it.
+
+    Args:
+      data_type_map (dtfabric.DataTypeMap): data type map.
+      byte_stream (bytes): byte stream.
+      context (Optional[dtfabric.DataTypeMapContext]): data type map context.
+
+    Returns:
+      object: mapped value.
+
+    Raises:
+      dtfabric.ByteStreamTooSmallError: if the byte stream is too small.
+      dtfabric.MappingError: if the byte stream cannot be mapped.
+    """
+    start_time = time.perf_counter()
+    try:
+      return data_type_map.MapByteStream(byte_stream, context=context)
+    finally:
+      self.mapping_time += time.perf_counter() - start_time
+      self.number_of_mappings += 1
+
+  def UnpackFrom(self, struct_object, byte_stream):
+    """Unpacks a byte stream with a struct and times it as a mapping.
+
+    Args:
+      struct_object (struct.Struct): struct.
+      byte_stream (bytes): byte stream.
+
+    Returns:
+      tuple[object]: unpacked values.
+
+    Raises:
+      struct.error: if the byte stream cannot be unpacked.
+    """
+    start_time = time.perf_counter()
+    try:
+      return struct_object.unpack_from(byte_stream, 0)
+    finally:
+      self.mapping_time += time.perf_counter() - start_time
+      self.number_of_mappings += 1
+
+
+class StatisticsWinRegistry(object):
+  """Windows Registry that gathers access statistics.
+
+  Only the part of the dfWinReg WinRegistry interface used by the collectors
+  is provided.
+  """
+
+  def __init__(self, registry, statistics):
+    """Initializes a Windows Registry that gathers access statistics.
+
+    Args:
+      registry (dfwinreg.WinRegistry): Windows Registry.
+      statistics (RegistryAccessStatistics): statistics to update.
+    """
+    super(StatisticsWinRegistry, self).__init__()
+    self._registry = registry
+    self._statistics = statistics
+
+  def GetKeyByPath(self, key_path):
+    """Retrieves the key for a specific path.
+
+    Args:
+      key_path (str): Windows Registry key path.
+
+    Returns:
+      WinRegistryKey: Windows Registry key or None if not available.
+    """
+    self._statistics.number_of_get_key_by_path += 1
+
+    registry_key = self._registry.GetKeyByPath(key_path)
+    if not registry_key:
+      return None
+
+    return StatisticsWinRegistryKey(registry_key, self._statistics)
+
+  def GetRootKey(self):
+    """Retrieves the Windows Registry root key.
+
+    Returns:
+      WinRegistryKey: Windows Registry root key.
+    """
+    registry_key = self._registry.GetRootKey()
+    return StatisticsWinRegistryKey(registry_key, self._statistics)
+
+
+class StatisticsWinRegistryKey(dfwinreg_interface.WinRegistryKey):
+  """Windows Registry key that gathers access statistics."""
+
+  def __init__(self, registry_key, statistics):
+    """Initializes a Windows Registry key that gathers access statistics.
+
+    Args:
+      registry_key (dfwinreg.WinRegistryKey): Windows Registry key.
+      statistics (RegistryAccessStatistics): statistics to update.
+    """
+    super(StatisticsWinRegistryKey, self).__init__()
+    self._registry_key = registry_key
+    self._statistics = statistics
+
+  @property
+  def class_name(self):
+    """str: class name of the key or None if not available."""
+    return self._registry_key.class_name
+
+  @property
+  def last_written_time(self):
+    """dfdatetime.DateTimeValues: last written time or None."""
+    return self._registry_key.last_written_time
+
+  @property
+  def name(self):
+    """str: name of the key."""
+    return self._registry_key.name
+
+  @property
+  def number_of_subkeys(self):
+    """int: number of subkeys within the key."""
+    return self._registry_key.number_of_subkeys
+
+  @property
+  def number_of_values(self):
+    """int: number of values within the key."""
+    return self._registry_key.number_of_values
+
+  @property
+  def offset(self):
+    """int: offset of the key within the Windows Registry file or None."""
+    return self._registry_key.offset
+
+  @property
+  def path(self):
+    """str: Windows Registry key path."""
+    return self._registry_key.path
+
+  def GetSubkeyByIndex(self, index):
+    """Retrieves a subkey by index.
+
+    Args:
+      index (int): index of the subkey.
+
+    Returns:
+      WinRegistryKey: Windows Registry subkey.
+
+    Raises:
+      IndexError: if the index is out of bounds.
+    """
+    registry_key = self._registry_key.GetSubkeyByIndex(index)
+    return StatisticsWinRegistryKey(registry_key, self._statistics)
+
+  def GetSubkeyByName(self, name):
+    """Retrieves a subkey by name.
+
+    Args:
+      name (str): name of the subkey.
+
+    Returns:
+      WinRegistryKey: Windows Registry subkey or None if not found.
+    """
+    self._statistics.number_of_get_subkey_by_name += 1
+
+    registry_key = self._registry_key.GetSubkeyByName(name)
+    if not registry_key:
+      return None
+
+    return StatisticsWinRegistryKey(registry_key, self._statistics)
+
+  def GetSubkeyByPath(self, key_path):
+    """Retrieves a subkey by path.
+
+    Args:
+      key_path (str): path of the subkey.
+
+    Returns:
+      WinRegistryKey: Windows Registry subkey or None if not found.
+    """
+    self._statistics.number_of_get_subkey_by_path += 1
+
+    registry_key = self._registry_key.GetSubkeyByPath(key_path)
+    if not registry_key:
+      return None
+
+    return StatisticsWinRegistryKey(registry_key, self._statistics)
+
+  def GetSubkeys(self):
+    """Retrieves all subkeys within the key.
+
+    Yields:
+      WinRegistryKey: Windows Registry subkey.
+    """
+    self._statistics.number_of_get_subkeys += 1
+
+    for registry_key in self._registry_key.GetSubkeys():
+      yield StatisticsWinRegistryKey(registry_key, self._statistics)
+
+  def GetValueByName(self, name):
+    """Retrieves a value by name.
+
+    Args:
+      name (str): name of the value or an empty string for the default value.
+
+    Returns:
+      WinRegistryValue: Windows Registry value or None if not found.
+    """
+    self._statistics.number_of_get_value_by_name += 1
+
+    registry_value = self._registry_key.GetValueByName(name)
+    if not registry_value:
+      return None
+
+    return StatisticsWinRegistryValue(registry_value, self._statistics)
+
+  def GetValues(self):
+    """Retrieves all values within the key.
+
+    Yields:
+      WinRegistryValue: Windows Registry value.
+    """
+    self._statistics.number_of_get_values += 1
+
+    for registry_value in self._registry_key.GetValues():
+      yield StatisticsWinRegistryValue(registry_value, self._statistics)
+
+
+class StatisticsWinRegistryValue(dfwinreg_interface.WinRegistryValue):
+  """Windows Registry value that gathers access statistics."""
+
+  def __init__(self, registry_value, statistics):
+    """Initializes a Windows Registry value that gathers access statistics.
+
+    Args:
+      registry_value (dfwinreg.WinRegistryValue): Windows Registry value.
+      statistics (RegistryAccessStatistics): statistics to update.
+    """
+    super(StatisticsWinRegistryValue, self).__init__()
+    self._registry_value = registry_value
+    self._statistics = statistics
+
+  @property
+  def data(self):
+    """bytes: value data as a byte string."""
+    data = self._registry_value.data
+    if data:
+      self._statistics.value_data_size += len(data)
+    return data
+
+  @property
+  def data_type(self):
+    """int: data type."""
+    return self._registry_value.data_type
+
+  @property
+  def name(self):
+    """str: name of the value."""
+    return self._registry_value.name
+
+  @property
+  def offset(self):
+    """int: offset of the value within the Windows Registry file."""
+    return self._registry_value.offset
+
+  def GetDataAsObject(self):
+    """Retrieves the data as an object.
+
+    Returns:
+      object: data as a Python type.
+    """
+    # The data is read once more to determine its size, which is acceptable
+    # since statistics are only gathered when profiling.
+    data = self._registry_value.data
+    if data:
+      self._statistics.value_data_size += len(data)
+
+    return self._registry_value.GetDataAsObject()
+
+
+def AddArguments(argument_parser):
+  """Adds the profiling command line arguments to an argument parser.
+
+  Args:
+    argument_parser (argparse.ArgumentParser): argument parser.
+  """
+  argument_parser.add_argument(
+      '--profile', dest='profile', action='store', metavar='PATH_PREFIX',
+      default=None, help=(
+          'enable profiling and write the profiling output files with the '
+          'path prefix.'))
+
+  argument_parser.add_argument(
+      '--profile_memory', '--profile-memory', dest='profile_memory',
+      action='store', metavar='NUMBER', type=int, default=0, help=(
+          'number of top memory allocations to include in the profiling '
+          'output, where 0 disables memory profiling.'))
+
+
+def CreateProfiler(options):
+  """Creates a script profiler from the command line arguments.
+
+  Args:
+    options (argparse.Namespace): command line arguments, with the arguments
+        added by AddArguments.
+
+  Returns:
+    ScriptProfiler|NullScriptProfiler: script profiler or a script profiler
+        that does nothing if profiling is disabled.
+  """
+  if not options.profile:
+    return NullScriptProfiler()
+
+  return ScriptProfiler(
+      options.profile, number_of_memory_allocations=options.profile_memory)
+
+
+class NullScriptProfiler(object):
+  """Script profiler that does nothing, used when profiling is disabled.
+
+  The profiler evaluates as False, like None, so that code that is passed
+  a profiler can determine if profiling is enabled.
+  """
+
+  def __bool__(self):
+    """Determines the truth value of the profiler.
+
+    Returns:
+      bool: False, since profiling is disabled.
+    """
+    return False
+
+  def __enter__(self):
+    """Enters a with statement.
+
+    Returns:
+      NullScriptProfiler: profiler.
+    """
+    return self
+
+  def __exit__(self, exception_type, value, traceback):
+    """Exits a with statement."""
+    return
+
+  def Phase(self, phase):  # pylint: disable=unused-argument
+    """Times a phase, which does nothing.
+
+    Args:
+      phase (str): name of the phase.
+
+    Returns:
+      contextlib.nullcontext: context manager that does nothing.
+    """
+    return contextlib.nullcontext()
+
+  def ProfileGenerator(
+      self, phase, generator):  # pylint: disable=unused-argument
+    """Times the production of the items of a generator, which does nothing.
+
+    Args:
+      phase (str): name of the phase.
+      generator (generator): generator.
+
+    Returns:
+      generator: the generator.
+    """
+    return generator
+
+  def ProfileRegistryAccess(
+      self, collector_object, registry):  # pylint: disable=unused-argument
+    """Gathers the Windows Registry access statistics, which does nothing.
+
+    Args:
+      collector_object (WindowsRegistryKeyCollector): collector.
+      registry (dfwinreg.WinRegistry): Windows Registry.
+
+    Returns:
+      dfwinreg.WinRegistry: the Windows Registry.
+    """
+    return registry
+
+
+class ScriptProfiler(object):
+  """Script profiler.
+
+  The profiler writes the following files:
+  * {path_prefix}.cprofile: cProfile statistics, which can be read with
+    the pstats module;
+  * {path_prefix}.memory.txt: top memory allocations, if tracemalloc is
+    enabled;
+  * {path_prefix}.statistics.json: Windows Registry access statistics per
+    collector, if registry access is profiled;
+  * {path_prefix}.timing.txt: time spent per processing phase.
+
+  Phases can be nested, where the time of the nested phase is not included
+  in the time of the enclosing phase. For example the time to open a Windows
+  Registry file during collection is only accounted for as "hive open".
+
+  The profiler is started and stopped by a with statement and a phase is
+  timed by a with statement on Phase.
+  """
+
+  PHASES = ('volume scan', 'hive open', 'collect', 'output')
+
+  def __init__(self, path_prefix, number_of_memory_allocations=0):
+    """Initializes a script profiler.
+
+    Args:
+      path_prefix (str): path prefix of the profiling output files.
+      number_of_memory_allocations (Optional[int]): number of top memory
+          allocations to report, where 0 disables tracemalloc.
+    """
+    super(ScriptProfiler, self).__init__()
+    self._cprofile = None
+    self._number_of_memory_allocations = number_of_memory_allocations
+    self._path_prefix = path_prefix
+    self._phase_stack = []
+    self._phase_start_time = None
+    self._registry_access_statistics = {}
+    self._start_time = None
+    self._stop_time = None
+    self._timings = {}
+
+  def __enter__(self):
+    """Enters a with statement, which starts profiling.
+
+    Returns:
+      ScriptProfiler: profiler.
+    """
+    self.Start()
+    return self
+
+  def __exit__(self, exception_type, value, traceback):
+    """Exits a with statement, which stops profiling."""
+    self.Stop()
+
+  def _AddElapsedTime(self, current_time):
+    """Adds the time elapsed since the phase was (re)started to the phase.
+
+    Args:
+      current_time (float): current time.
+    """
+    phase = self._phase_stack[-1]
+    elapsed_time = current_time - self._phase_start_time
+    self._timings[phase][0] += elapsed_time
+
+  def _WriteMemoryAllocations(self):
+    """Writes the top memory allocations."""
+    snapshot = tracemalloc.take_snapshot()
+    statistics = snapshot.statistics('lineno')
+
+    path = f'{self._path_prefix:s}.memory.txt'
+    with open(path, 'w', encoding='utf-8') as file_object:
+      current_size, peak_size = tracemalloc.get_traced_memory()
+      file_object.write(f'Current size\t: {current_size:d} bytes\n')
+      file_object.write(f'Peak size\t: {peak_size:d} bytes\n\n')
+
+      for statistic in statistics[:self._number_of_memory_allocations]:
+        file_object.write(f'{statistic!s}\n')
+
+  def _WriteRegistryAccessStatistics(self):
+    """Writes the Windows Registry access statistics."""
+    statistics_per_collector = {
+        name: statistics.CopyToDict()
+        for name, statistics in self._registry_access_statistics.items()}
+
+    path = f'{self._path_prefix:s}.statistics.json'
+    with open(path, 'w', encoding='utf-8') as file_object:
+      json.dump(statistics_per_collector, file_object, indent=2, sort_keys=True)
+
+  def _WriteTimings(self):
+    """Writes the time spent per processing phase."""
+    total_time = self._stop_time - self._start_time
+    phases_time = sum(elapsed_time for elapsed_time, _ in (
+        self._timings.values()))
+
+    phases = list(self.PHASES)
+    phases.extend(sorted(set(self._timings.keys()).difference(phases)))
+
+    path = f'{self._path_prefix:s}.timing.txt'
+    with open(path, 'w', encoding='utf-8') as file_object:
+      file_object.write(
+          f'{"Phase":<16s}{"Time (seconds)":>16s}{"Number of times":>16s}\n')
+
+      for phase in phases:
+        elapsed_time, number_of_times = self._timings.get(phase, (0.0, 0))
+        file_object.write(
+            f'{phase:<16s}{elapsed_time:>16.6f}{number_of_times:>16d}\n')
+
+      other_time = max(total_time - phases_time, 0.0)
+      file_object.write(f'{"other":<16s}{other_time:>16.6f}\n')
+      file_object.write(f'{"total":<16s}{total_time:>16.6f}\n')
+
+  def GetRegistryAccessStatistics(self, collector_object):
+    """Retrieves the Windows Registry access statistics of a collector.
+
+    Collectors of the same type share their statistics.
+
+    Args:
+      collector_object (object): collector.
+
+    Returns:
+      RegistryAccessStatistics: Windows Registry access statistics.
+    """
+    name = collector_object.__class__.__name__
+    statistics = self._registry_access_statistics.get(name, None)
+    if not statistics:
+      statistics = RegistryAccessStatistics(name)
+      self._registry_access_statistics[name] = statistics
+
+    return statistics
+
+  @contextlib.contextmanager
+  def Phase(self, phase):
+    """Times a phase.
+
+    Args:
+      phase (str): name of the phase.
+
+    Yields:
+      None: while the phase is timed.
+    """
+    self.StartTiming(phase)
+    try:
+      yield
+    finally:
+      self.StopTiming(phase)
+
+  def ProfileGenerator(self, phase, generator):
+    """Times the production of the items of a generator as a phase.
+
+    The time spent by the caller between items is not included.
+
+    Args:
+      phase (str): name of the phase.
+      generator (generator): generator.
+
+    Yields:
+      object: item produced by the generator.
+    """
+    iterator = iter(generator)
+    while True:
+      self.StartTiming(phase)
+      try:
+        item = next(iterator)
+      except StopIteration:
+        return
+      finally:
+        self.StopTiming(phase)
+
+      yield item
+
+  def ProfileRegistryAccess(self, collector_object, registry):
+    """Gathers the Windows Registry access statistics of a collector.
+
+    Args:
+      collector_object (WindowsRegistryKeyCollector): collector.
+      registry (dfwinreg.WinRegistry): Windows Registry.
+
+    Returns:
+      StatisticsWinRegistry: Windows Registry, that gathers access statistics,
+          for the collector to use.
+    """
+    statistics = self.GetRegistryAccessStatistics(collector_object)
+    collector_object.SetRegistryAccessStatistics(statistics)
+
+    return StatisticsWinRegistry(registry, statistics)
+
+  def Start(self):
+    """Starts profiling."""
+    self._phase_stack = []
+    self._registry_access_statistics = {}
+    self._timings = {}
+
+    if self._number_of_memory_allocations:
+      tracemalloc.start()
+
+    self._cprofile = cProfile.Profile()
+    self._start_time = time.perf_counter()
+    self._cprofile.enable()
+
+  def StartTiming(self, phase):
+    """Starts timing a phase.
+
+    Args:
+      phase (str): name of the phase.
+    """
+    current_time = time.perf_counter()
+    if self._phase_stack:
+      self._AddElapsedTime(current_time)
+
+    if phase not in self._timings:
+      self._timings[phase] = [0.0, 0]
+
+    self._timings[phase][1] += 1
+    self._phase_stack.append(phase)
+    self._phase_start_time = current_time
+
+  def Stop(self):
+    """Stops profiling and writes the profiling output files."""
+    self._cprofile.disable()
+    self._stop_time = time.perf_counter()
+
+    while self._phase_stack:
+      self.StopTiming(self._phase_stack[-1])
+
+    self._cprofile.dump_stats(f'{self._path_prefix:s}.cprofile')
+    self._cprofile = None
+
+    if self._number_of_memory_allocations:
+      self._WriteMemoryAllocations()
+      tracemalloc.stop()
+
+    if self._registry_access_statistics:
+      self._WriteRegistryAccessStatistics()
+
+    self._WriteTimings()
+
+  def StopTiming(self, phase):
+    """Stops timing a phase.
+
+    Args:
+      phase (str): name of the phase.
+
+    Raises:
+      ValueError: if the phase is not the most recently started phase.
+    """
+    if not self._phase_stack or self._phase_stack[-1] != phase:
+      raise ValueError(f'Phase: {phase:s} is not the current phase.')
+
+    current_time = time.perf_counter()
+    self._AddElapsedTime(current_time)
+    self._phase_stack.pop()
+    self._phase_start_time = current_time
+
+
+class ProfilingWindowsRegistryFileReader(
+    dfwinreg_interface.WinRegistryFileReader):
+  """Windows Registry file reader that times opening files."""
+
+  def __init__(self, registry_file_reader, profiler):
+    """Initializes a profiling Windows Registry file reader.
+
+    Args:
+      registry_file_reader (dfwinreg.WinRegistryFileReader): Windows Registry
+          file reader that is profiled.
+      profiler (ScriptProfiler): profiler.
+    """
+    super(ProfilingWindowsRegistryFileReader, self).__init__()
+    self._profiler = profiler
+    self._registry_file_reader = registry_file_reader
+
+  def Open(self, path, ascii_codepage='cp1252'):
+    """Opens the Windows Registry file specified by the path.
+
+    Args:
+      path (str): path of the Windows Registry file.
+      ascii_codepage (Optional[str]): ASCII string codepage.
+
+    Returns:
+      WinRegistryFile: Windows Registry file or None if the file cannot
+          be opened.
+    """
+    self._profiler.StartTiming('hive open')
+    try:
+      return self._registry_file_reader.Open(
+          path, ascii_codepage=ascii_codepage)
+    finally:
+      self._profiler.StopTiming('hive open')
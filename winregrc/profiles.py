@@ -12,6 +12,8 @@ class UserProfile(object):
     security_identifier (str): security identifier of the user.
   """
 
+  __slots__ = ('profile_path', 'security_identifier')
+
   def __init__(self, security_identifier, profile_path):
     """Initializes an user profile.
 
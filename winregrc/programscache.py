@@ -319,3 +319,12 @@ class ProgramsCacheCollector(interface.WindowsRegistryKeyCollector):
       result = True
 
     return result
+
+  def SetRegistryAccessStatistics(self, statistics):
+    """Sets the Windows Registry access statistics.
+
+    Args:
+      statistics (RegistryAccessStatistics): statistics to update.
+    """
+    super(ProgramsCacheCollector, self).SetRegistryAccessStatistics(statistics)
+    self._parser.SetRegistryAccessStatistics(statistics)
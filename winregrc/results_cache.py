@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""On-disk cache of collector results."""
+
+import hashlib
+import json
+import logging
+import os
+import zlib
+
+import winregrc
+
+from winregrc import cache_files
+from winregrc import serializers
+
+
+class CollectorResultsCache(object):
+  """On-disk cache of collector results.
+
+  The results are stored as zlib compressed JSON files in the cache
+  directory, named after a hash of the content of the Registry files,
+  the collector, its options and the version of winregrc. When the source is
+  a Registry file, cached results can therefore be retrieved without opening
+  it. When the source is a storage media image, only the Registry files the
+  collector reads are hashed after the volume scan, instead of the entire
+  image. A modified Registry file or another version of winregrc results in
+  a cache miss.
+
+  The modification time of a cache file is updated when it is used, so that
+  the least recently used cache files can be removed when the total size of
+  the cache exceeds its maximum size.
+  """
+
+  _CACHE_FILE_EXTENSION = '.json.z'
+
+  _FORMAT_VERSION = 1
+
+  _MAXIMUM_SIZE = 256 * 1024 * 1024
+
+  _READ_BUFFER_SIZE = 1024 * 1024
+
+  _REGISTRY_FILE_SIGNATURES = (b'CREG', b'regf')
+
+  def __init__(self, path, maximum_size=None):
+    """Initializes a collector results cache.
+
+    Args:
+      path (str): path of the cache directory.
+      maximum_size (Optional[int]): maximum total size of the cache files in
+          bytes, where None represents the default of 256 MiB.
+    """
+    super(CollectorResultsCache, self).__init__()
+    self._maximum_size = maximum_size or self._MAXIMUM_SIZE
+    self._path = path
+
+  def _GetCacheFilePath(self, cache_key):
+    """Retrieves the path of a cache file.
+
+    Args:
+      cache_key (str): cache key.
+
+    Returns:
+      str: path of the cache file.
+    """
+    return os.path.join(
+        self._path, f'{cache_key:s}{self._CACHE_FILE_EXTENSION:s}')
+
+  def _GetFileHash(self, path):
+    """Calculates the SHA-256 hash of the content of a file.
+
+    Args:
+      path (str): path of the file.
+
+    Returns:
+      str: hexadecimal SHA-256 hash.
+
+    Raises:
+      OSError: if the file cannot be read.
+    """
+    hash_context = hashlib.sha256()
+    with open(path, 'rb') as file_object:
+      data = file_object.read(self._READ_BUFFER_SIZE)
+      while data:
+        hash_context.update(data)
+        data = file_object.read(self._READ_BUFFER_SIZE)
+
+    return hash_context.hexdigest()
+
+  def _IsRegistryFile(self, path):
+    """Determines if a file is a Windows Registry file.
+
+    Args:
+      path (str): path of the file.
+
+    Returns:
+      bool: True if the file starts with the signature of a Windows 9x/Me
+          (CREG) or Windows NT (REGF) Registry file.
+
+    Raises:
+      OSError: if the file cannot be read.
+    """
+    with open(path, 'rb') as file_object:
+      signature = file_object.read(4)
+
+    return signature in self._REGISTRY_FILE_SIGNATURES
+
+  def _RemoveLeastRecentlyUsed(self):
+    """Removes the least recently used cache files exceeding the maximum."""
+    cache_file_stats = []
+    total_size = 0
+
+    with os.scandir(self._path) as directory_entries:
+      for directory_entry in directory_entries:
+        if not directory_entry.name.endswith(self._CACHE_FILE_EXTENSION):
+          continue
+
+        try:
+          stat_object = directory_entry.stat()
+        except OSError:
+          continue
+
+        cache_file_stats.append((
+            stat_object.st_mtime_ns, stat_object.st_size,
+            directory_entry.path))
+        total_size += stat_object.st_size
+
+    for _, size, path in sorted(cache_file_stats):
+      if total_size <= self._maximum_size:
+        break
+
+      try:
+        os.remove(path)
+      except OSError:
+        continue
+
+      total_size -= size
+
+  def GetCacheKey(self, source_paths, collector_class, options=None):
+    """Retrieves the cache key of collector results of Registry files.
+
+    Args:
+      source_paths (list[str]): paths of the Registry files the results are
+          collected from.
+      collector_class (type): class of the collector.
+      options (Optional[dict[str, object]]): options of the collector that
+          affect its results, such as "all_control_sets".
+
+    Returns:
+      str: cache key or None if a source is not a Registry file, such as
+          a storage media image, for which GetCacheKeyFromFileHashes can be
+          used after the volume scan.
+    """
+    file_hashes = []
+    for source_path in source_paths:
+      if not os.path.isfile(source_path):
+        return None
+
+      try:
+        if not self._IsRegistryFile(source_path):
+          return None
+
+        file_hashes.append(self._GetFileHash(source_path))
+      except OSError as exception:
+        logging.warning((
+            f'Unable to read: {source_path:s} with error: {exception!s}'))
+        return None
+
+    return self.GetCacheKeyFromFileHashes(
+        file_hashes, collector_class, options=options)
+
+  def GetCacheKeyFromFileHashes(
+      self, file_hashes, collector_class, options=None):
+    """Retrieves the cache key of collector results from file hashes.
+
+    Args:
+      file_hashes (list[str]): hexadecimal SHA-256 hashes of the Registry
+          files the results are collected from, such as those calculated by
+          WindowsRegistryVolumeScanner.GetRegistryFileHash.
+      collector_class (type): class of the collector.
+      options (Optional[dict[str, object]]): options of the collector that
+          affect its results, such as "all_control_sets".
+
+    Returns:
+      str: cache key.
+    """
+    cache_key = json.dumps([
+        self._FORMAT_VERSION, winregrc.__version__, file_hashes,
+        collector_class.__module__, collector_class.__name__, options or {}],
+        sort_keys=True)
+
+    return hashlib.sha256(cache_key.encode('utf-8')).hexdigest()
+
+  def GetResults(self, cache_key):
+    """Retrieves cached collector results.
+
+    Args:
+      cache_key (str): cache key.
+
+    Returns:
+      list[object]: results or None if not cached.
+    """
+    cache_file_path = self._GetCacheFilePath(cache_key)
+    if not os.path.isfile(cache_file_path):
+      return None
+
+    try:
+      with open(cache_file_path, 'rb') as file_object:
+        compressed_data = file_object.read()
+
+      json_string = zlib.decompress(compressed_data).decode('utf-8')
+      results = serializers.RecordSerializer.ConvertJSONToValue(
+          json.loads(json_string))
+
+      # Mark the cache file as recently used.
+      os.utime(cache_file_path)
+
+    except (AttributeError, ImportError, KeyError, OSError, TypeError,
+            ValueError, zlib.error) as exception:
+      logging.warning((
+          f'Unable to read cache file: {cache_file_path:s} with error: '
+          f'{exception!s}'))
+      return None
+
+    return results
+
+  def SetResults(self, cache_key, results):
+    """Caches collector results.
+
+    Args:
+      cache_key (str): cache key.
+      results (list[object]): results.
+
+    Returns:
+      bool: True if the results were cached, False if not.
+    """
+    try:
+      json_values = serializers.RecordSerializer.ConvertValueToJSON(results)
+      json_string = json.dumps(json_values, separators=(',', ':'))
+
+    except (TypeError, ValueError) as exception:
+      logging.warning(f'Unable to cache results with error: {exception!s}')
+      return False
+
+    compressed_data = zlib.compress(json_string.encode('utf-8'))
+    if len(compressed_data) > self._maximum_size:
+      return False
+
+    try:
+      cache_files.WriteCacheFile(
+          self._GetCacheFilePath(cache_key), compressed_data)
+
+    except OSError as exception:
+      logging.warning(f'Unable to cache results with error: {exception!s}')
+      return False
+
+    self._RemoveLeastRecentlyUsed()
+
+    return True
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """Security Accounts Manager (SAM) collector."""
 
+import struct
+
 import pyfwnt
 
 from dfdatetime import filetime as dfdatetime_filetime
@@ -25,7 +27,11 @@ class UserAccount(object):
         failure date and time.
     last_password_set_time (dfdatetime.DateTimeValues): last password set
         date and time.
+    lm_hash (bytes): encrypted LM hash or None if not available or not
+        requested.
     name (str): name
+    ntlm_hash (bytes): encrypted NTLM hash or None if not available or not
+        requested.
     number_of_logons (int): number of log-ons.
     number_of_password_failures (int): number of password failures.
     primary_gid (int): primary group identifier (GID).
@@ -35,6 +41,13 @@ class UserAccount(object):
     username (str): username.
   """
 
+  __slots__ = (
+      'account_expiration_time', 'codepage', 'comment', 'full_name',
+      'last_login_time', 'last_password_failure_time', 'last_password_set_time',
+      'lm_hash', 'name', 'ntlm_hash', 'number_of_logons',
+      'number_of_password_failures', 'primary_gid', 'rid',
+      'user_account_control_flags', 'user_comment', 'username')
+
   def __init__(self):
     """Initializes an user account."""
     super(UserAccount, self).__init__()
@@ -45,7 +58,9 @@ class UserAccount(object):
     self.last_login_time = None
     self.last_password_failure_time = None
     self.last_password_set_time = None
+    self.lm_hash = None
     self.name = None
+    self.ntlm_hash = None
     self.number_of_logons = None
     self.number_of_password_failures = None
     self.primary_gid = None
@@ -79,6 +94,27 @@ class SecurityAccountManagerDataParser(data_format.BinaryDataFormat):
       'unknown3',
       'unknown4']
 
+  # The V value starts with 17 user information descriptors of 12 bytes
+  # each, which consist of a 32-bit offset, size and unknown value. The
+  # offsets are relative to the end of the descriptors.
+  _USER_INFORMATION_DESCRIPTORS_STRUCT = struct.Struct('<51I')
+
+  _USER_INFORMATION_DATA_OFFSET = 0xcc
+
+  # Indexes of the user information descriptors that contain strings and
+  # the corresponding user account attribute names.
+  _USER_INFORMATION_STRING_DESCRIPTORS = (
+      (1, 'username'),
+      (2, 'full_name'),
+      (3, 'comment'),
+      (4, 'user_comment'))
+
+  # Indexes of the user information descriptors that contain the encrypted
+  # hashes and the corresponding user account attribute names.
+  _USER_INFORMATION_HASH_DESCRIPTORS = (
+      (13, 'lm_hash'),
+      (14, 'ntlm_hash'))
+
   _USER_ACCOUNT_CONTROL_FLAGS = {
       0x00000001: 'USER_ACCOUNT_DISABLED',
       0x00000002: 'USER_HOME_DIRECTORY_REQUIRED',
@@ -297,8 +333,8 @@ class SecurityAccountManagerDataParser(data_format.BinaryDataFormat):
     if self._debug:
       self._DebugPrintStructureObject(f_value, self._DEBUG_INFO_F_VALUE)
 
-  def ParseVValue(self, value_data, user_account):
-    """Parses the V value data.
+  def _ParseVValueWithDebug(self, value_data, user_account):
+    """Parses the V value data and prints all descriptors for debugging.
 
     Args:
       value_data (bytes): V value data.
@@ -372,13 +408,66 @@ class SecurityAccountManagerDataParser(data_format.BinaryDataFormat):
     if self._debug:
       self._DebugPrintText('\n')
 
+  def ParseVValue(self, value_data, user_account, include_hashes=False):
+    """Parses the V value data.
 
-class SecurityAccountManagerCollector(interface.WindowsRegistryKeyCollector):
-  """Security Accounts Manager (SAM) collector.
+    Only the descriptors of the username, full name, comment, user comment
+    and, if requested, the encrypted hashes are read from the V value data.
 
-  Attributes:
-    user_accounts (list[UserAccount]): user accounts.
-  """
+    Args:
+      value_data (bytes): V value data.
+      user_account (UserAccount): user account.
+      include_hashes (Optional[bool]): True if the encrypted LM and NTLM
+          hashes should be read.
+
+    Raises:
+      ParseError: if the value data could not be parsed.
+    """
+    if self._debug:
+      self._ParseVValueWithDebug(value_data, user_account)
+      if not include_hashes:
+        return
+
+    try:
+      descriptor_values = self._USER_INFORMATION_DESCRIPTORS_STRUCT.unpack_from(
+          value_data, 0)
+    except struct.error as exception:
+      raise errors.ParseError(
+          f'Unable to parse V value with error: {exception!s}')
+
+    data_view = memoryview(value_data)
+
+    descriptors = []
+    if not self._debug:
+      descriptors.extend(self._USER_INFORMATION_STRING_DESCRIPTORS)
+    if include_hashes:
+      descriptors.extend(self._USER_INFORMATION_HASH_DESCRIPTORS)
+
+    for index, attribute_name in descriptors:
+      descriptor_index = index * 3
+      data_start_offset = (
+          descriptor_values[descriptor_index] +
+          self._USER_INFORMATION_DATA_OFFSET)
+      data_end_offset = data_start_offset + descriptor_values[
+          descriptor_index + 1]
+
+      descriptor_data = data_view[data_start_offset:data_end_offset]
+
+      if index >= 13:
+        attribute_value = descriptor_data.tobytes() or None
+      else:
+        try:
+          attribute_value = str(descriptor_data, 'utf-16-le').rstrip('\x00')
+        except UnicodeDecodeError as exception:
+          raise errors.ParseError((
+              f'Unable to decode V value {attribute_name:s} with error: '
+              f'{exception!s}'))
+
+      setattr(user_account, attribute_name, attribute_value)
+
+
+class SecurityAccountManagerCollector(interface.WindowsRegistryKeyCollector):
+  """Security Accounts Manager (SAM) collector."""
 
   _USERS_KEY_PATH = (
       'HKEY_LOCAL_MACHINE\\SAM\\SAM\\Domains\\Account\\Users')
@@ -394,21 +483,23 @@ class SecurityAccountManagerCollector(interface.WindowsRegistryKeyCollector):
     self._parser = SecurityAccountManagerDataParser(
         debug=debug, output_writer=output_writer)
 
-    self.user_accounts = []
-
-  def Collect(self, registry):  # pylint: disable=arguments-differ
+  def Collect(self, registry, include_hashes=False):
     """Collects the Security Accounts Manager (SAM) information.
 
     Args:
       registry (dfwinreg.WinRegistry): Windows Registry.
+      include_hashes (Optional[bool]): True if the encrypted LM and NTLM
+          hashes of the user accounts should be collected.
 
-    Returns:
-      bool: True if the Security Accounts Manager (SAM) information key was
-          found, False if not.
+    Yields:
+      UserAccount: an user account.
+
+    Raises:
+      ParseError: if a F or V value could not be parsed.
     """
     main_key = registry.GetKeyByPath('HKEY_LOCAL_MACHINE\\SAM\\SAM')
     if not main_key:
-      return False
+      return
 
     c_value = main_key.GetValueByName('C')
     if c_value:
@@ -416,7 +507,7 @@ class SecurityAccountManagerCollector(interface.WindowsRegistryKeyCollector):
 
     users_key = registry.GetKeyByPath(self._USERS_KEY_PATH)
     if not users_key:
-      return False
+      return
 
     for subkey in users_key.GetSubkeys():
       if subkey.name == 'Names':
@@ -430,8 +521,17 @@ class SecurityAccountManagerCollector(interface.WindowsRegistryKeyCollector):
 
       v_value = subkey.GetValueByName('V')
       if v_value:
-        self._parser.ParseVValue(v_value.data, user_account)
+        self._parser.ParseVValue(
+            v_value.data, user_account, include_hashes=include_hashes)
+
+      yield user_account
 
-      self.user_accounts.append(user_account)
+  def SetRegistryAccessStatistics(self, statistics):
+    """Sets the Windows Registry access statistics.
 
-    return True
+    Args:
+      statistics (RegistryAccessStatistics): statistics to update.
+    """
+    super(SecurityAccountManagerCollector, self).SetRegistryAccessStatistics(
+        statistics)
+    self._parser.SetRegistryAccessStatistics(statistics)
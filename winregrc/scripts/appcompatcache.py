@@ -3,6 +3,7 @@
 """Script to extract Application Compatibility Cache information."""
 
 import argparse
+import functools
 import logging
 import sys
 
@@ -10,9 +11,54 @@ from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
 from winregrc import appcompatcache
 from winregrc import output_writers
+from winregrc import profilers
+from winregrc import results_cache
+from winregrc import snapshot_records
 from winregrc import volume_scanner
 
 
+def _CollectCachedEntries(
+    registry, all_control_sets=False, debug=False, output_writer=None,
+    profiler=None):
+  """Collects the AppCompatCache cached entries from a Windows Registry.
+
+  Args:
+    registry (dfwinreg.WinRegistry): Windows Registry.
+    all_control_sets (Optional[bool]): True if the cached entries should be
+        collected from all control sets instead of only the current control
+        set.
+    debug (Optional[bool]): True if debug information should be printed.
+    output_writer (Optional[OutputWriter]): output writer.
+    profiler (Optional[ScriptProfiler]): profiler, where None represents
+        profiling is disabled.
+
+  Returns:
+    list[AppCompatCacheCachedEntry]: cached entries.
+  """
+  collector_object = appcompatcache.AppCompatCacheCollector(
+      debug=debug, output_writer=output_writer)
+
+  if profiler:
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+  collector_object.Collect(registry, all_control_sets=all_control_sets)
+
+  return collector_object.cached_entries
+
+
+def _WriteCachedEntry(output_writer, cached_entry):
+  """Writes an AppCompatCache cached entry.
+
+  Args:
+    output_writer (OutputWriter): output writer.
+    cached_entry (AppCompatCacheCachedEntry): cached entry.
+  """
+  output_writer.WriteFiletimeValue(
+      'Last modification time', cached_entry.last_modification_time)
+  output_writer.WriteValue('Path', cached_entry.path)
+  output_writer.WriteText('\n')
+
+
 def Main():
   """Entry point of console script to extract AppCompatCache information.
 
@@ -28,10 +74,49 @@ def Main():
       help=(
           'Process all control sets instead of only the current control set.'))
 
+  argument_parser.add_argument(
+      '--cache', dest='cache', action='store', metavar='PATH', default=None,
+      help=(
+          'path of a directory to cache the results in, per hash of the '
+          'SYSTEM Registry file.'))
+
+  argument_parser.add_argument(
+      '--cache_size', '--cache-size', dest='cache_size', action='store',
+      metavar='MIB', type=int, default=256, help=(
+          'maximum size of the cache in MiB.'))
+
   argument_parser.add_argument(
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
+  argument_parser.add_argument(
+      '--snapshots', dest='snapshots', action='store_true', default=False,
+      help=(
+          'Process the Volume Shadow Copy snapshots in addition to the current '
+          'volume, where snapshots with identical Registry files are not '
+          'processed again.'))
+
+  argument_parser.add_argument(
+      '--workers', dest='number_of_workers', action='store', type=int,
+      metavar='NUMBER', default=1, help=(
+          'maximum number of snapshots to process concurrently.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=(
@@ -51,49 +136,135 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
+  profiler = profilers.CreateProfiler(options)
 
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
+  with profiler:
+    cache = None
+    cache_key = None
+    if options.cache and not (options.debug or options.snapshots):
+      cache = results_cache.CollectorResultsCache(
+          options.cache, maximum_size=options.cache_size * 1024 * 1024)
+      cache_key = cache.GetCacheKey(
+          [options.source], appcompatcache.AppCompatCacheCollector,
+          options={'all_control_sets': options.all_control_sets})
 
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
-    print('')
-    return 1
+    cached_entries = None
+    if cache_key:
+      cached_entries = cache.GetResults(cache_key)
 
-  output_writer = output_writers.StdoutOutputWriter()
+    scanner = None
+    if cached_entries is None:
+      scan_cache = None
+      if options.scan_cache:
+        scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
 
-  if not output_writer.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
+      mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+      scanner = volume_scanner.WindowsRegistryVolumeScanner(
+          mediator=mediator,
+          number_of_prefetch_workers=options.prefetch_workers,
+          prefetch_paths=[
+              '%SystemRoot%\\SYSTEM.DAT',
+              '%SystemRoot%\\System32\\config\\SYSTEM'],
+          profiler=profiler, scan_cache=scan_cache)
+
+      volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+      volume_scanner_options.partitions = ['all']
+      volume_scanner_options.snapshots = ['none']
+      volume_scanner_options.volumes = ['none']
+
+      if not scanner.ScanForWindowsVolume(
+          options.source, options=volume_scanner_options):
+        print((f'Unable to retrieve the volume with the Windows directory '
+               f'from: {options.source:s}.'))
+        print('')
+        return 1
+
+      if options.snapshots and scanner.IsSingleFileRegistry():
+        print('Unable to process snapshots of a single Registry file.')
+        print('')
+        return 1
+
+      if cache and not cache_key:
+        # The source is not a Registry file, such as a storage media image,
+        # hence only the SYSTEM Registry file is hashed.
+        file_hash = scanner.GetRegistryFileHash(
+            '%SystemRoot%\\System32\\config\\SYSTEM')
+        if file_hash:
+          cache_key = cache.GetCacheKeyFromFileHashes(
+              [file_hash], appcompatcache.AppCompatCacheCollector,
+              options={'all_control_sets': options.all_control_sets})
+          cached_entries = cache.GetResults(cache_key)
+
+    output_writer = output_writers.StdoutOutputWriter()
+
+    if not output_writer.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    try:
+      has_results = cached_entries is not None
+
+      if options.snapshots:
+        collect_function = functools.partial(
+            _CollectCachedEntries, all_control_sets=options.all_control_sets,
+            debug=options.debug, output_writer=output_writer,
+            profiler=profiler)
+
+        # Debug output of snapshots processed concurrently would be
+        # interleaved.
+        number_of_workers = 1 if options.debug else options.number_of_workers
+
+        snapshots_collector = snapshot_records.SnapshotRecordsCollector(
+            scanner, collect_function,
+            ['%SystemRoot%\\System32\\config\\SYSTEM'],
+            number_of_workers=number_of_workers, profiler=profiler)
+
+        with profiler.Phase('collect'):
+          snapshots_records = list(snapshots_collector.Collect())
+
+        scanner.Close()
+
+        with profiler.Phase('output'):
+          for snapshot_records_object in snapshots_records:
+            output_writer.WriteSnapshot(
+                snapshot_records_object.snapshot_identifier,
+                snapshot_records_object.identical_snapshot_identifier)
+
+            if not snapshot_records_object.identical_snapshot_identifier:
+              for cached_entry in snapshot_records_object.records:
+                _WriteCachedEntry(output_writer, cached_entry)
+                has_results = True
+
+      elif cached_entries is None:
+        collector_object = appcompatcache.AppCompatCacheCollector(
+            debug=options.debug, output_writer=output_writer)
+
+        registry = scanner.registry
+        registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+        with profiler.Phase('collect'):
+          # TODO: change collector to generate AppCompatCacheCachedEntry
+          has_results = collector_object.Collect(
+              registry, all_control_sets=options.all_control_sets)
+
+        cached_entries = collector_object.cached_entries
 
-  try:
-    collector_object = appcompatcache.AppCompatCacheCollector(
-        debug=options.debug, output_writer=output_writer)
+        if cache_key and has_results:
+          cache.SetResults(cache_key, cached_entries)
 
-    # TODO: change collector to generate AppCompatCacheCachedEntry
-    has_results = collector_object.Collect(
-        scanner.registry, all_control_sets=options.all_control_sets)
-    if has_results:
-      for cached_entry in collector_object.cached_entries:
-        output_writer.WriteFiletimeValue(
-            'Last modification time', cached_entry.last_modification_time)
-        output_writer.WriteValue('Path', cached_entry.path)
-        output_writer.WriteText('\n')
+      if has_results and not options.snapshots:
+        with profiler.Phase('output'):
+          for cached_entry in cached_entries:
+            _WriteCachedEntry(output_writer, cached_entry)
 
-  finally:
-    output_writer.Close()
+    finally:
+      output_writer.Close()
 
-  if not has_results:
-    print('No application compatibility cache entries found.')
+    if not has_results:
+      print('No application compatibility cache entries found.')
 
-  return 0
+    return 0
 
 
 if __name__ == '__main__':
@@ -13,6 +13,7 @@ from dfwinreg import registry as dfwinreg_registry
 
 from winregrc import catalog
 from winregrc import output_writers
+from winregrc import profilers
 
 
 class StdoutWriter(output_writers.StdoutOutputWriter):
@@ -49,6 +50,8 @@ def Main():
       '--group_keys', '--group-keys', dest='group_keys', action='store_true',
       default=False, help='Group keys with similar values.')
 
+  profilers.AddArguments(argument_parser)
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help='path of a Windows Registry file.')
@@ -65,72 +68,86 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  with open(options.source, 'rb') as file_object:
-    try:
-      registry_file = dfwinreg_regf.REGFWinRegistryFile()
+  profiler = profilers.CreateProfiler(options)
 
-      registry_file.Open(file_object)
-    except IOError:
-      registry_file = None
+  with profiler:
+    with open(options.source, 'rb') as file_object:
+      with profiler.Phase('hive open'):
+        try:
+          registry_file = dfwinreg_regf.REGFWinRegistryFile()
 
-    if not registry_file:
-      try:
-        registry_file = dfwinreg_creg.CREGWinRegistryFile()
+          registry_file.Open(file_object)
+        except IOError:
+          registry_file = None
+
+        if not registry_file:
+          try:
+            registry_file = dfwinreg_creg.CREGWinRegistryFile()
+
+            registry_file.Open(file_object)
+          except IOError:
+            registry_file = None
 
-        registry_file.Open(file_object)
-      except IOError:
-        registry_file = None
+        if not registry_file:
+          print('Unable to open Windows Registry file.')
+          return 1
 
-    if not registry_file:
-      print('Unable to open Windows Registry file.')
-      return 1
+        # Using dfWinReg to determine Windows native key paths if available.
+        registry = dfwinreg_registry.WinRegistry()
 
-    # Using dfWinReg to determine Windows native key paths if available.
-    registry = dfwinreg_registry.WinRegistry()
+        key_path_prefix = registry.GetRegistryFileMapping(registry_file)
+        registry_file.SetKeyPathPrefix(key_path_prefix)
 
-    key_path_prefix = registry.GetRegistryFileMapping(registry_file)
-    registry_file.SetKeyPathPrefix(key_path_prefix)
+        root_key = registry_file.GetRootKey()
 
-    root_key = registry_file.GetRootKey()
+      output_writer_object = StdoutWriter()
 
-    output_writer_object = StdoutWriter()
+      if not output_writer_object.Open():
+        print('Unable to open output writer.')
+        print('')
+        return 1
 
-    if not output_writer_object.Open():
-      print('Unable to open output writer.')
-      print('')
-      return 1
+      collector_object = catalog.CatalogCollector(group_keys=options.group_keys)
 
-    collector_object = catalog.CatalogCollector(group_keys=options.group_keys)
+      if profiler:
+        statistics = profiler.GetRegistryAccessStatistics(collector_object)
+        root_key = profilers.StatisticsWinRegistryKey(root_key, statistics)
+
+      def AlphanumericCompare(key):
+        return (int(text) if text.isdigit() else text.lower()
+                for text in re.split('([0-9]+)', key[0]))
+
+      try:
+        has_results = False
 
-    def AlphanumericCompare(key):
-      return (int(text) if text.isdigit() else text.lower()
-              for text in re.split('([0-9]+)', key[0]))
+        key_descriptors = collector_object.Collect(root_key)
+        key_descriptors = profiler.ProfileGenerator(
+            'collect', key_descriptors)
 
-    try:
-      has_results = False
-      for key_descriptor in collector_object.Collect(root_key):
-        output_writer_object.WriteKeyPath(key_descriptor.key_path)
+        with profiler.Phase('output'):
+          for key_descriptor in key_descriptors:
+            output_writer_object.WriteKeyPath(key_descriptor.key_path)
 
-        for key_path in key_descriptor.grouped_key_paths:
-          output_writer_object.WriteKeyPath(key_path)
+            for key_path in key_descriptor.grouped_key_paths:
+              output_writer_object.WriteKeyPath(key_path)
 
-        for value_name, data_type_string in sorted(
-            key_descriptor.value_descriptors, key=AlphanumericCompare):
-          output_writer_object.WriteValueDescriptor(
-              value_name, data_type_string)
+            for value_name, data_type_string in sorted(
+                key_descriptor.value_descriptors, key=AlphanumericCompare):
+              output_writer_object.WriteValueDescriptor(
+                  value_name, data_type_string)
 
-        if options.group_keys:
-          output_writer_object.WriteText('\n')
+            if options.group_keys:
+              output_writer_object.WriteText('\n')
 
-        has_results = True
+            has_results = True
 
-    finally:
-      output_writer_object.Close()
+      finally:
+        output_writer_object.Close()
 
-  if not has_results:
-    print('No keys and values found.')
+    if not has_results:
+      print('No keys and values found.')
 
-  return 0
+    return 0
 
 
 if __name__ == '__main__':
@@ -7,10 +7,11 @@ import logging
 import sys
 import yaml
 
+from winregrc import aggregators
 from winregrc import controlpanel_items
 from winregrc import output_writers
+from winregrc import profilers
 from winregrc import versions
-from winregrc import volume_scanner
 
 
 class StdoutWriter(output_writers.StdoutOutputWriter):
@@ -44,6 +45,18 @@ class StdoutWriter(output_writers.StdoutOutputWriter):
     print(f'windows_versions: [{windows_versions:s}]')
 
 
+def _NormalizeControlPanelItem(control_panel_item):
+  """Normalizes a control panel item.
+
+  Args:
+    control_panel_item (ControlPanelItem): control panel item.
+  """
+  # Ignore a module name that is the same as the identifier.
+  if (control_panel_item.module_name and
+      control_panel_item.module_name.lower() == control_panel_item.identifier):
+    control_panel_item.module_name = None
+
+
 def Main():
   """Entry point of console script to extract control panel items.
 
@@ -53,6 +66,12 @@ def Main():
   argument_parser = argparse.ArgumentParser(description=(
       'Extracts Windows control panel items from the Windows Registry.'))
 
+  argument_parser.add_argument(
+      '--cache', dest='cache', action='store', metavar='PATH', default=None,
+      help=(
+          'path of a directory to cache the results per source in, so that '
+          'only new or changed sources are processed on a rerun.'))
+
   argument_parser.add_argument(
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
@@ -62,6 +81,13 @@ def Main():
       action='store', metavar='VERSION', default=None,
       help='string that identifies the Windows version.')
 
+  argument_parser.add_argument(
+      '--workers', dest='number_of_workers', action='store', type=int,
+      metavar='NUMBER', default=1, help=(
+          'maximum number of sources to process concurrently.'))
+
+  profilers.AddArguments(argument_parser)
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=(
@@ -81,93 +107,51 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  try:
-    with open(options.source, 'r', encoding='utf-8') as file_object:
-      source_definitions = list(yaml.safe_load_all(file_object))
-
-  except (SyntaxError, UnicodeDecodeError, yaml.parser.ParserError):
-    source_definitions = [{
-        'source': options.source, 'windows_version': options.windows_version}]
-
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
-
-  volume_scanner_options = volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.username = ['none']
-  volume_scanner_options.volumes = ['none']
-
-  control_panel_item_per_identifier = {}
-  windows_versions_per_control_panel_item = {}
-
-  for source_definition in source_definitions:
-    source_path = source_definition['source']
-    logging.info(f'Processing: {source_path:s}')
-
-    if not scanner.ScanForWindowsVolume(
-        source_path, options=volume_scanner_options):
-      logging.error((
-          f'Unable to retrieve the volume with the Windows directory from: '
-          f'{source_path:s}.'))
-      continue
-
-    collector_object = controlpanel_items.ControlPanelItemsCollector(
-        debug=options.debug)
-
-    # TODO: determine Windows version from source.
-    windows_version = source_definition['windows_version']
-
-    for item in collector_object.Collect(scanner.registry):
-      # TODO: compare attributes with existing item.
-      existing_item = control_panel_item_per_identifier.get(
-          item.identifier, None)
-
-      # Ignore a module name that is the same as the identifier.
-      if (item.module_name and
-          item.module_name.lower() == item.identifier):
-        item.module_name = None
-
-      if not existing_item:
-        control_panel_item_per_identifier[item.identifier] = item
-      elif not existing_item.module_name:
-        existing_item.module_name = item.module_name
-      elif (item.module_name and
-            item.module_name != existing_item.module_name and
-            item.module_name not in existing_item.alternate_module_names):
-        existing_item.alternate_module_names.append(item.module_name)
-
-      if item.identifier not in (
-          windows_versions_per_control_panel_item):
-        windows_versions_per_control_panel_item[item.identifier] = []
-
-      if windows_version:
-        windows_versions_per_control_panel_item[item.identifier].append(
-            windows_version)
-
-  if not control_panel_item_per_identifier:
-    print('No control panel items found.')
-    return 0
+  profiler = profilers.CreateProfiler(options)
 
-  output_writer_object = StdoutWriter()
+  with profiler:
+    try:
+      with open(options.source, 'r', encoding='utf-8') as file_object:
+        source_definitions = list(yaml.safe_load_all(file_object))
 
-  if not output_writer_object.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
+    except (SyntaxError, UnicodeDecodeError, yaml.parser.ParserError):
+      source_definitions = [{
+          'source': options.source, 'windows_version': options.windows_version}]
+
+    cache = None
+    if options.cache:
+      cache = aggregators.SourceRecordsCache(options.cache)
+
+    aggregator = aggregators.KnowledgeBaseRecordAggregator(
+        controlpanel_items.ControlPanelItemsCollector, 'module_name',
+        'alternate_module_names', cache=cache, debug=options.debug,
+        normalize_function=_NormalizeControlPanelItem,
+        number_of_workers=options.number_of_workers, profiler=profiler)
 
-  try:
-    output_writer_object.WriteHeader()
-    for identifier, windows_versions in sorted(
-        windows_versions_per_control_panel_item.items()):
-      control_panel_item = control_panel_item_per_identifier[identifier]
-      output_writer_object.WriteKnownFolder(
-          control_panel_item, windows_versions)
+    aggregated_control_panel_items = aggregator.Aggregate(source_definitions)
 
-  finally:
-    output_writer_object.Close()
+    if not aggregated_control_panel_items:
+      print('No control panel items found.')
+      return 0
 
-  return 0
+    output_writer_object = StdoutWriter()
+
+    if not output_writer_object.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    with profiler.Phase('output'):
+      try:
+        output_writer_object.WriteHeader()
+        for aggregated_record in aggregated_control_panel_items:
+          output_writer_object.WriteKnownFolder(
+              aggregated_record.record, aggregated_record.windows_versions)
+
+      finally:
+        output_writer_object.Close()
+
+    return 0
 
 
 if __name__ == '__main__':
@@ -9,10 +9,52 @@ import sys
 from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
 from winregrc import eventlog_providers
+from winregrc import eventlog_providers_database
 from winregrc import output_writers
+from winregrc import profilers
 from winregrc import volume_scanner
 
 
+class DatabaseWriter(object):
+  """Event Log providers lookup database writer."""
+
+  def __init__(self, path):
+    """Initializes an Event Log providers lookup database writer.
+
+    Args:
+      path (str): path of the database file.
+    """
+    super(DatabaseWriter, self).__init__()
+    self._database = eventlog_providers_database.EventLogProvidersDatabase()
+    self._path = path
+
+  def Close(self):
+    """Closes the output writer."""
+    self._database.Close()
+
+  def Open(self):
+    """Opens the output writer.
+
+    Returns:
+      bool: True if successful or False if not.
+    """
+    try:
+      self._database.Open(self._path, read_only=False)
+    except OSError as exception:
+      logging.error(f'Unable to open database with error: {exception!s}')
+      return False
+
+    return True
+
+  def WriteEventLogProvider(self, eventlog_provider):
+    """Writes a Event Log provider to the database.
+
+    Args:
+      eventlog_provider (EventLogProvider): Event Log provider.
+    """
+    self._database.WriteEventLogProvider(eventlog_provider)
+
+
 class StdoutWriter(output_writers.StdoutOutputWriter):
   """Stdout output writer."""
 
@@ -83,10 +125,37 @@ def Main():
   argument_parser = argparse.ArgumentParser(description=(
       'Extracts Windows Event Log providers from the Windows Registry.'))
 
+  argument_parser.add_argument(
+      '--all', dest='all_control_sets', action='store_true', default=False,
+      help=(
+          'Process all control sets instead of only the current control set.'))
+
+  argument_parser.add_argument(
+      '--database', dest='database', action='store', metavar='PATH',
+      default=None, help=(
+          'write the Event Log providers to a SQLite lookup database, with '
+          'indexes on identifier, name and log source, instead of stdout.'))
+
   argument_parser.add_argument(
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=('path of the volume containing C:\\Windows, the filename of '
@@ -105,43 +174,70 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
-
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
-
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
-    print('')
-    return 1
-
-  collector_object = eventlog_providers.EventLogProvidersCollector(
-      debug=options.debug)
-
-  output_writer_object = StdoutWriter()
-  if not output_writer_object.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
-
-  try:
-    has_results = False
-    for eventlog_provider in collector_object.Collect(scanner.registry):
-      output_writer_object.WriteEventLogProvider(eventlog_provider)
-      has_results = True
-
-  finally:
-    output_writer_object.Close()
-
-  if not has_results:
-    print('No Windows Event Log providers found.')
-
-  return 0
+  profiler = profilers.CreateProfiler(options)
+
+  with profiler:
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
+
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\SYSTEM.DAT',
+            '%SystemRoot%\\System32\\config\\SOFTWARE',
+            '%SystemRoot%\\System32\\config\\SYSTEM'],
+        profiler=profiler, scan_cache=scan_cache)
+
+    volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.volumes = ['none']
+
+    if not scanner.ScanForWindowsVolume(
+        options.source, options=volume_scanner_options):
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
+
+    collector_object = eventlog_providers.EventLogProvidersCollector(
+        debug=options.debug)
+
+    registry = scanner.registry
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+    if options.database:
+      output_writer_object = DatabaseWriter(options.database)
+    else:
+      output_writer_object = StdoutWriter()
+
+    if not output_writer_object.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    try:
+      has_results = False
+
+      providers = collector_object.Collect(
+          registry, all_control_sets=options.all_control_sets)
+      providers = profiler.ProfileGenerator('collect', providers)
+
+      with profiler.Phase('output'):
+        for eventlog_provider in providers:
+          output_writer_object.WriteEventLogProvider(eventlog_provider)
+          has_results = True
+
+    finally:
+      output_writer_object.Close()
+
+    if not has_results:
+      print('No Windows Event Log providers found.')
+
+    return 0
 
 
 if __name__ == '__main__':
@@ -8,9 +8,10 @@ import sys
 import yaml
 
 from winregrc import knownfolders
+from winregrc import aggregators
 from winregrc import output_writers
+from winregrc import profilers
 from winregrc import versions
-from winregrc import volume_scanner
 
 
 class StdoutWriter(output_writers.StdoutOutputWriter):
@@ -58,6 +59,12 @@ def Main():
   argument_parser = argparse.ArgumentParser(description=(
       'Extracts Windows known folders from the Windows Registry.'))
 
+  argument_parser.add_argument(
+      '--cache', dest='cache', action='store', metavar='PATH', default=None,
+      help=(
+          'path of a directory to cache the results per source in, so that '
+          'only new or changed sources are processed on a rerun.'))
+
   argument_parser.add_argument(
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
@@ -67,6 +74,13 @@ def Main():
       action='store', metavar='VERSION', default=None,
       help='string that identifies the Windows version.')
 
+  argument_parser.add_argument(
+      '--workers', dest='number_of_workers', action='store', type=int,
+      metavar='NUMBER', default=1, help=(
+          'maximum number of sources to process concurrently.'))
+
+  profilers.AddArguments(argument_parser)
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=(
@@ -86,87 +100,50 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  try:
-    with open(options.source, 'r', encoding='utf-8') as file_object:
-      source_definitions = list(yaml.safe_load_all(file_object))
-
-  except (SyntaxError, UnicodeDecodeError, yaml.parser.ParserError):
-    source_definitions = [{
-        'source': options.source, 'windows_version': options.windows_version}]
-
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
-
-  volume_scanner_options = volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.username = ['none']
-  volume_scanner_options.volumes = ['none']
-
-  known_folder_per_identifier = {}
-  windows_versions_per_known_folder = {}
-
-  for source_definition in source_definitions:
-    source_path = source_definition['source']
-    logging.info(f'Processing: {source_path:s}')
-
-    if not scanner.ScanForWindowsVolume(
-        source_path, options=volume_scanner_options):
-      logging.error((
-          f'Unable to retrieve the volume with the Windows directory from: '
-          f'{source_path:s}.'))
-      continue
-
-    collector_object = knownfolders.KnownFoldersCollector(debug=options.debug)
-
-    # TODO: determine Windows version from source.
-    windows_version = source_definition['windows_version']
-
-    for known_folder in collector_object.Collect(scanner.registry):
-      # TODO: compare attributes with existing with known folder.
-      existing_known_folder = known_folder_per_identifier.get(
-          known_folder.identifier, None)
-
-      if not existing_known_folder:
-        known_folder_per_identifier[known_folder.identifier] = known_folder
-      elif not existing_known_folder.display_name:
-        existing_known_folder.display_name = known_folder.display_name
-      elif (known_folder.display_name and
-            known_folder.display_name != existing_known_folder.display_name and
-            known_folder.display_name not in (
-                existing_known_folder.alternate_display_names)):
-        existing_known_folder.alternate_display_names.append(
-            known_folder.display_name)
-
-      if known_folder.identifier not in windows_versions_per_known_folder:
-        windows_versions_per_known_folder[known_folder.identifier] = []
-
-      if windows_version:
-        windows_versions_per_known_folder[known_folder.identifier].append(
-            windows_version)
-
-  if not known_folder_per_identifier:
-    print('No known folders found.')
-    return 0
+  profiler = profilers.CreateProfiler(options)
 
-  output_writer_object = StdoutWriter()
+  with profiler:
+    try:
+      with open(options.source, 'r', encoding='utf-8') as file_object:
+        source_definitions = list(yaml.safe_load_all(file_object))
 
-  if not output_writer_object.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
+    except (SyntaxError, UnicodeDecodeError, yaml.parser.ParserError):
+      source_definitions = [{
+          'source': options.source, 'windows_version': options.windows_version}]
+
+    cache = None
+    if options.cache:
+      cache = aggregators.SourceRecordsCache(options.cache)
+
+    aggregator = aggregators.KnowledgeBaseRecordAggregator(
+        knownfolders.KnownFoldersCollector, 'display_name',
+        'alternate_display_names', cache=cache, debug=options.debug,
+        number_of_workers=options.number_of_workers, profiler=profiler)
+
+    aggregated_known_folders = aggregator.Aggregate(source_definitions)
 
-  try:
-    output_writer_object.WriteHeader()
-    for identifier, windows_versions in sorted(
-        windows_versions_per_known_folder.items()):
-      known_folder = known_folder_per_identifier[identifier]
-      output_writer_object.WriteKnownFolder(known_folder, windows_versions)
+    if not aggregated_known_folders:
+      print('No known folders found.')
+      return 0
 
-  finally:
-    output_writer_object.Close()
+    output_writer_object = StdoutWriter()
 
-  return 0
+    if not output_writer_object.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    with profiler.Phase('output'):
+      try:
+        output_writer_object.WriteHeader()
+        for aggregated_record in aggregated_known_folders:
+          output_writer_object.WriteKnownFolder(
+              aggregated_record.record, aggregated_record.windows_versions)
+
+      finally:
+        output_writer_object.Close()
+
+    return 0
 
 
 if __name__ == '__main__':
@@ -10,6 +10,7 @@ from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
 from winregrc import mounted_devices
 from winregrc import output_writers
+from winregrc import profilers
 from winregrc import volume_scanner
 
 
@@ -55,6 +56,22 @@ def Main():
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=(
@@ -74,44 +91,65 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
+  profiler = profilers.CreateProfiler(options)
 
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
+  with profiler:
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
 
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
-    print('')
-    return 1
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\SYSTEM.DAT',
+            '%SystemRoot%\\System32\\config\\SYSTEM'],
+        profiler=profiler, scan_cache=scan_cache)
 
-  collector_object = mounted_devices.MountedDevicesCollector(
-      debug=options.debug)
+    volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.volumes = ['none']
 
-  output_writer_object = StdoutWriter()
+    if not scanner.ScanForWindowsVolume(
+        options.source, options=volume_scanner_options):
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
 
-  if not output_writer_object.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
+    collector_object = mounted_devices.MountedDevicesCollector(
+        debug=options.debug)
+
+    registry = scanner.registry
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+    output_writer_object = StdoutWriter()
+
+    if not output_writer_object.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    try:
+      has_results = False
+
+      devices = collector_object.Collect(registry)
+      devices = profiler.ProfileGenerator('collect', devices)
 
-  try:
-    has_results = False
-    for mounted_device in collector_object.Collect(scanner.registry):
-      output_writer_object.WriteMountedDevice(mounted_device)
-      has_results = True
+      with profiler.Phase('output'):
+        for mounted_device in devices:
+          output_writer_object.WriteMountedDevice(mounted_device)
+          has_results = True
 
-  finally:
-    output_writer_object.Close()
+    finally:
+      output_writer_object.Close()
 
-  if not has_results:
-    print('No Windows mounted devices found.')
+    if not has_results:
+      print('No Windows mounted devices found.')
 
-  return 0
+    return 0
 
 
 if __name__ == '__main__':
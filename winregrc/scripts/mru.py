@@ -3,6 +3,7 @@
 """Script to extract Most Recently Used (MRU) information."""
 
 import argparse
+import functools
 import logging
 import sys
 
@@ -13,7 +14,9 @@ import pyfwsi
 
 from winregrc import mru
 from winregrc import output_writers
+from winregrc import profilers
 from winregrc import shell_property_keys
+from winregrc import user_records
 from winregrc import volume_scanner
 
 
@@ -279,6 +282,33 @@ class StdoutWriter(output_writers.StdoutOutputWriter):
       self._WriteShellItem(fwsi_item)
 
 
+def _CollectMostRecentlyUsedEntries(
+    registry, debug=False, output_writer=None, profiler=None):
+  """Collects the Most Recently Used (MRU) entries from a Windows Registry.
+
+  Args:
+    registry (dfwinreg.WinRegistry): Windows Registry.
+    debug (Optional[bool]): True if debug information should be printed.
+    output_writer (Optional[OutputWriter]): output writer.
+    profiler (Optional[ScriptProfiler]): profiler, where None represents
+        profiling is disabled.
+
+  Returns:
+    list[MostRecentlyUsedEntry]: Most Recently Used (MRU) entries.
+  """
+  collector_object = mru.MostRecentlyUsedCollector(
+      debug=debug, output_writer=output_writer)
+
+  if profiler:
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+  # TODO: change collector to generate MostRecentlyUsedEntry
+  if not collector_object.Collect(registry):
+    return []
+
+  return collector_object.mru_entries
+
+
 def Main():
   """Entry point of console script to extract Most Recently Used information.
 
@@ -289,6 +319,12 @@ def Main():
       'Extracts Most Recently Used information from a NTUSER.DAT Registry '
       'file.'))
 
+  argument_parser.add_argument(
+      '--all_users', '--all-users', dest='all_users', action='store_true',
+      default=False, help=(
+          'extract the Most Recently Used information of all user profiles '
+          'instead of a single user.'))
+
   argument_parser.add_argument(
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
@@ -297,6 +333,27 @@ def Main():
       '-u', '--username', dest='username', action='store', metavar='USERNAME',
       default=None, help='username within a storage media image.')
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
+  argument_parser.add_argument(
+      '--workers', dest='number_of_workers', action='store', type=int,
+      metavar='NUMBER', default=1, help=(
+          'maximum number of user profiles to process concurrently.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=(
@@ -316,75 +373,123 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  output_writer = StdoutWriter()
-
-  if not output_writer.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
-
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
-
-  volume_scanner_options = volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.username = options.username
-  volume_scanner_options.volumes = ['none']
-
-  try:
-    result = scanner.ScanForWindowsVolume(
-        options.source, options=volume_scanner_options)
-
-  except dfvfs_errors.ScannerError as exception:
-    print(f'[ERROR] {exception!s}', file=sys.stderr)
-    print('')
-    return 1
-
-  except KeyboardInterrupt:
-    print('Aborted by user.', file=sys.stderr)
-    print('')
-    return 1
-
-  if not result:
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
-    print('')
-    return 1
+  profiler = profilers.CreateProfiler(options)
+
+  with profiler:
+    output_writer = StdoutWriter()
+
+    if not output_writer.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
+
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\USER.DAT',
+            '%UserProfile%\\NTUSER.DAT',
+            '%UserProfile%\\AppData\\Local\\Microsoft\\Windows\\UsrClass.dat',
+            ('%UserProfile%\\Local Settings\\Application Data\\'
+             'Microsoft\\Windows\\UsrClass.dat')],
+        profiler=profiler, scan_cache=scan_cache)
+
+    volume_scanner_options = volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.username = options.username
+    if options.all_users:
+      volume_scanner_options.username = ['none']
+    volume_scanner_options.volumes = ['none']
+
+    try:
+      result = scanner.ScanForWindowsVolume(
+          options.source, options=volume_scanner_options)
+
+    except dfvfs_errors.ScannerError as exception:
+      print(f'[ERROR] {exception!s}', file=sys.stderr)
+      print('')
+      return 1
+
+    except KeyboardInterrupt:
+      print('Aborted by user.', file=sys.stderr)
+      print('')
+      return 1
+
+    if not result:
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
+
+    if options.all_users and scanner.IsSingleFileRegistry():
+      print('Unable to process all user profiles of a single Registry file.')
+      print('')
+      return 1
+
+    collect_function = functools.partial(
+        _CollectMostRecentlyUsedEntries, debug=options.debug,
+        output_writer=output_writer, profiler=profiler)
+
+    with profiler.Phase('collect'):
+      if options.all_users:
+        # Debug output of users processed concurrently would be interleaved.
+        number_of_workers = 1 if options.debug else options.number_of_workers
+
+        collector_object = user_records.UserRecordsCollector(
+            scanner, collect_function, number_of_workers=number_of_workers,
+            profiler=profiler)
+        mru_records = list(collector_object.Collect())
+
+      else:
+        mru_records = [
+            user_records.UserRecord(mru_entry)
+            for mru_entry in collect_function(scanner.registry)]
+
+    with profiler.Phase('output'):
+      if not mru_records:
+        print('No Most Recently Used key found.')
+        return 0
+
+      username = None
+      for mru_record in mru_records:
+        if mru_record.username != username:
+          username = mru_record.username
+
+          output_writer.WriteValue('User', username)
+          if mru_record.security_identifier:
+            output_writer.WriteValue('SID', mru_record.security_identifier)
+          output_writer.WriteText('\n')
+
+        mru_entry = mru_record.record
+        output_writer.WriteValue('Key path', mru_entry.key_path)
+        output_writer.WriteValue('Value name', mru_entry.value_name)
+
+        if mru_entry.string:
+          output_writer.WriteValue('String', mru_entry.string)
+          output_writer.WriteText('\n')
+
+        if mru_entry.shell_item_data:
+          fwsi_item = pyfwsi.item()
+          fwsi_item.copy_from_byte_stream(mru_entry.shell_item_data)
+
+          output_writer.WriteShellItem(fwsi_item)
+
+        elif mru_entry.shell_item_list_data:
+          shell_item_list = pyfwsi.item_list()
+          shell_item_list.copy_from_byte_stream(mru_entry.shell_item_list_data)
+
+          output_writer.WriteShellItemList(shell_item_list)
+
+    output_writer.Close()
 
-  collector_object = mru.MostRecentlyUsedCollector(
-      debug=options.debug, output_writer=output_writer)
-
-  # TODO: change collector to generate MostRecentlyUsedEntry
-  result = collector_object.Collect(scanner.registry)
-  if not result:
-    print('No Most Recently Used key found.')
     return 0
 
-  for mru_entry in collector_object.mru_entries:
-    output_writer.WriteValue('Key path', mru_entry.key_path)
-    output_writer.WriteValue('Value name', mru_entry.value_name)
-
-    if mru_entry.string:
-      output_writer.WriteValue('String', mru_entry.string)
-      output_writer.WriteText('\n')
-
-    if mru_entry.shell_item_data:
-      fwsi_item = pyfwsi.item()
-      fwsi_item.copy_from_byte_stream(mru_entry.shell_item_data)
-
-      output_writer.WriteShellItem(fwsi_item)
-
-    elif mru_entry.shell_item_list_data:
-      shell_item_list = pyfwsi.item_list()
-      shell_item_list.copy_from_byte_stream(mru_entry.shell_item_list_data)
-
-      output_writer.WriteShellItemList(shell_item_list)
-
-  output_writer.Close()
-
-  return 0
-
 
 if __name__ == '__main__':
   sys.exit(Main())
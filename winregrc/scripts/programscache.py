@@ -9,6 +9,7 @@ import sys
 from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
 from winregrc import output_writers
+from winregrc import profilers
 from winregrc import programscache
 from winregrc import volume_scanner
 
@@ -26,6 +27,22 @@ def Main():
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=(
@@ -45,43 +62,60 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  # TODO: add support to select user.
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
+  profiler = profilers.CreateProfiler(options)
 
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
+  with profiler:
+    # TODO: add support to select user.
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
 
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
-    print('')
-    return 1
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\USER.DAT',
+            '%UserProfile%\\NTUSER.DAT'],
+        profiler=profiler, scan_cache=scan_cache)
 
-  output_writer = output_writers.StdoutOutputWriter()
+    volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.volumes = ['none']
 
-  if not output_writer.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
+    if not scanner.ScanForWindowsVolume(
+        options.source, options=volume_scanner_options):
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
+
+    output_writer = output_writers.StdoutOutputWriter()
+
+    if not output_writer.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    try:
+      collector_object = programscache.ProgramsCacheCollector(
+          debug=options.debug, output_writer=output_writer)
 
-  try:
-    collector_object = programscache.ProgramsCacheCollector(
-        debug=options.debug, output_writer=output_writer)
+      registry = scanner.registry
+      registry = profiler.ProfileRegistryAccess(collector_object, registry)
 
-    # TODO: change collector to generate ProgramCacheEntry
-    has_results = collector_object.Collect(scanner.registry)
+      with profiler.Phase('collect'):
+        # TODO: change collector to generate ProgramCacheEntry
+        has_results = collector_object.Collect(registry)
 
-  finally:
-    output_writer.Close()
+    finally:
+      output_writer.Close()
 
-  if not has_results:
-    print('No program cache entries found.')
+    if not has_results:
+      print('No program cache entries found.')
 
-  return 0
+    return 0
 
 
 if __name__ == '__main__':
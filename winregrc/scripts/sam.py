@@ -3,16 +3,89 @@
 """Script to extract Security Account Manager (SAM) information."""
 
 import argparse
+import functools
 import logging
 import sys
 
 from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
 from winregrc import output_writers
+from winregrc import profilers
 from winregrc import sam
+from winregrc import snapshot_records
 from winregrc import volume_scanner
 
 
+def _CollectUserAccounts(
+    registry, debug=False, output_writer=None, profiler=None):
+  """Collects the user accounts from a Windows Registry.
+
+  Args:
+    registry (dfwinreg.WinRegistry): Windows Registry.
+    debug (Optional[bool]): True if debug information should be printed.
+    output_writer (Optional[OutputWriter]): output writer.
+    profiler (Optional[ScriptProfiler]): profiler, where None represents
+        profiling is disabled.
+
+  Returns:
+    generator[UserAccount]: user account generator.
+  """
+  # TODO: map collector to available Registry keys.
+  collector_object = sam.SecurityAccountManagerCollector(
+      debug=debug, output_writer=output_writer)
+
+  if profiler:
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+  return collector_object.Collect(registry)
+
+
+def _WriteUserAccount(output_writer, user_account):
+  """Writes a user account.
+
+  Args:
+    output_writer (OutputWriter): output writer.
+    user_account (UserAccount): user account.
+  """
+  output_writer.WriteValue('Username', user_account.username)
+  output_writer.WriteValue('Relative identifier (RID)', user_account.rid)
+  output_writer.WriteValue(
+      'Primary group identifier', user_account.primary_gid)
+
+  if user_account.full_name:
+    output_writer.WriteValue('Full name', user_account.full_name)
+
+  if user_account.comment:
+    output_writer.WriteValue('Comment', user_account.comment)
+
+  if user_account.user_comment:
+    output_writer.WriteValue('User comment', user_account.user_comment)
+
+  output_writer.WriteFiletimeValue(
+      'Last log-in time', user_account.last_login_time)
+
+  output_writer.WriteFiletimeValue(
+      'Last password set time', user_account.last_password_set_time)
+
+  output_writer.WriteFiletimeValue(
+      'Account expiration time', user_account.account_expiration_time)
+
+  output_writer.WriteFiletimeValue(
+      'Last password failure time',
+      user_account.last_password_failure_time)
+
+  output_writer.WriteValue(
+      'Number of log-ons', user_account.number_of_logons)
+  output_writer.WriteValue(
+      'Number of password failures',
+      user_account.number_of_password_failures)
+
+  if user_account.codepage:
+    output_writer.WriteValue('Codepage', user_account.codepage)
+
+  output_writer.WriteText('\n')
+
+
 def Main():
   """Entry point of console script to extract SAM information.
 
@@ -27,6 +100,34 @@ def Main():
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
+  argument_parser.add_argument(
+      '--snapshots', dest='snapshots', action='store_true', default=False,
+      help=(
+          'Process the Volume Shadow Copy snapshots in addition to the current '
+          'volume, where snapshots with identical Registry files are not '
+          'processed again.'))
+
+  argument_parser.add_argument(
+      '--workers', dest='number_of_workers', action='store', type=int,
+      metavar='NUMBER', default=1, help=(
+          'maximum number of snapshots to process concurrently.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=(
@@ -46,79 +147,94 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  output_writer = output_writers.StdoutOutputWriter()
-
-  if not output_writer.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
-
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
-
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
-
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
-    print('')
-    return 1
-
-  # TODO: map collector to available Registry keys.
-  collector_object = sam.SecurityAccountManagerCollector(
-      debug=options.debug, output_writer=output_writer)
-
-  result = collector_object.Collect(scanner.registry)
-  if not result:
-    output_writer.WriteText('No Security Account Manager key found.')
-    output_writer.WriteText('')
-
-  else:
-    for user_account in collector_object.user_accounts:
-      output_writer.WriteValue('Username', user_account.username)
-      output_writer.WriteValue('Relative identifier (RID)', user_account.rid)
-      output_writer.WriteValue(
-          'Primary group identifier', user_account.primary_gid)
-
-      if user_account.full_name:
-        output_writer.WriteValue('Full name', user_account.full_name)
-
-      if user_account.comment:
-        output_writer.WriteValue('Comment', user_account.comment)
-
-      if user_account.user_comment:
-        output_writer.WriteValue('User comment', user_account.user_comment)
-
-      output_writer.WriteFiletimeValue(
-          'Last log-in time', user_account.last_login_time)
-
-      output_writer.WriteFiletimeValue(
-          'Last password set time', user_account.last_password_set_time)
-
-      output_writer.WriteFiletimeValue(
-          'Account expiration time', user_account.account_expiration_time)
-
-      output_writer.WriteFiletimeValue(
-          'Last password failure time', user_account.last_password_failure_time)
-
-      output_writer.WriteValue(
-          'Number of log-ons', user_account.number_of_logons)
-      output_writer.WriteValue(
-          'Number of password failures',
-          user_account.number_of_password_failures)
-
-      if user_account.codepage:
-        output_writer.WriteValue('Codepage', user_account.codepage)
-
-      output_writer.WriteText('\n')
-
-  output_writer.Close()
-
-  return 0
+  profiler = profilers.CreateProfiler(options)
+
+  with profiler:
+    output_writer = output_writers.StdoutOutputWriter()
+
+    if not output_writer.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
+
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\System32\\config\\SAM'],
+        profiler=profiler, scan_cache=scan_cache)
+
+    volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.volumes = ['none']
+
+    if not scanner.ScanForWindowsVolume(
+        options.source, options=volume_scanner_options):
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
+
+    if options.snapshots and scanner.IsSingleFileRegistry():
+      print('Unable to process snapshots of a single Registry file.')
+      print('')
+      return 1
+
+    has_results = False
+
+    if options.snapshots:
+      collect_function = functools.partial(
+          _CollectUserAccounts, debug=options.debug,
+          output_writer=output_writer, profiler=profiler)
+
+      # Debug output of snapshots processed concurrently would be
+      # interleaved.
+      number_of_workers = 1 if options.debug else options.number_of_workers
+
+      snapshots_collector = snapshot_records.SnapshotRecordsCollector(
+          scanner, collect_function, ['%SystemRoot%\\System32\\config\\SAM'],
+          number_of_workers=number_of_workers, profiler=profiler)
+
+      with profiler.Phase('collect'):
+        snapshots_records = list(snapshots_collector.Collect())
+
+      scanner.Close()
+
+      with profiler.Phase('output'):
+        for snapshot_records_object in snapshots_records:
+          output_writer.WriteSnapshot(
+              snapshot_records_object.snapshot_identifier,
+              snapshot_records_object.identical_snapshot_identifier)
+
+          if not snapshot_records_object.identical_snapshot_identifier:
+            for user_account in snapshot_records_object.records:
+              _WriteUserAccount(output_writer, user_account)
+              has_results = True
+
+    else:
+      user_accounts = _CollectUserAccounts(
+          scanner.registry, debug=options.debug, output_writer=output_writer,
+          profiler=profiler)
+      user_accounts = profiler.ProfileGenerator('collect', user_accounts)
+
+      with profiler.Phase('output'):
+        for user_account in user_accounts:
+          _WriteUserAccount(output_writer, user_account)
+          has_results = True
+
+    if not has_results:
+      output_writer.WriteText('No Security Account Manager key found.')
+      output_writer.WriteText('')
+
+    output_writer.Close()
+
+    return 0
 
 
 if __name__ == '__main__':
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Script to answer Windows Registry collector requests on an Unix socket."""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+
+from winregrc import server
+from winregrc import volume_scanner
+
+
+def _SignalHandler(
+    signal_number, stack_frame):  # pylint: disable=unused-argument
+  """Signal handler that stops the server.
+
+  Args:
+    signal_number (int): number of the signal.
+    stack_frame (frame): current stack frame.
+
+  Raises:
+    KeyboardInterrupt: to stop the server.
+  """
+  raise KeyboardInterrupt()
+
+
+def Main():
+  """Entry point of console script to serve Windows Registry requests.
+
+  Returns:
+    int: exit code that is provided to sys.exit().
+  """
+  argument_parser = argparse.ArgumentParser(description=(
+      'Answers Windows Registry collector requests, such as Windows services '
+      'or the Most Recently Used information of an user, on an Unix domain '
+      'socket, while keeping the sources open between requests.'))
+
+  argument_parser.add_argument(
+      '--idle_timeout', '--idle-timeout', dest='idle_timeout', action='store',
+      type=int, metavar='SECONDS', default=600, help=(
+          'number of seconds after which a source that is not used is closed, '
+          'where 0 disables the timeout.'))
+
+  argument_parser.add_argument(
+      '--maximum_memory', '--maximum-memory', dest='maximum_memory',
+      action='store', type=int, metavar='MIB', default=1024, help=(
+          'maximum total size of the Windows Registry files of the open '
+          'sources in MiB, after which the least recently used sources are '
+          'closed, where 0 disables the maximum.'))
+
+  argument_parser.add_argument(
+      '--maximum_sources', '--maximum-sources', dest='maximum_sources',
+      action='store', type=int, metavar='NUMBER', default=8, help=(
+          'maximum number of open sources, after which the least recently '
+          'used sources are closed, where 0 disables the maximum.'))
+
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image when it is opened, where 0 disables '
+          'prefetching.'))
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again after a restart.'))
+
+  argument_parser.add_argument(
+      'socket', nargs='?', action='store', metavar='PATH', default=None,
+      help='path of the Unix domain socket to listen on.')
+
+  options = argument_parser.parse_args()
+
+  if not options.socket:
+    print('Socket path is missing.')
+    print('')
+    argument_parser.print_help()
+    print('')
+    return 1
+
+  if os.path.exists(options.socket):
+    print(f'Socket path: {options.socket:s} already exists.')
+    print('')
+    return 1
+
+  logging.basicConfig(
+      level=logging.INFO, format='[%(levelname)s] %(message)s')
+
+  scan_cache = None
+  if options.scan_cache:
+    scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
+
+  open_sources = server.OpenSourcesCache(
+      idle_timeout=options.idle_timeout or None,
+      maximum_memory_size=(options.maximum_memory * 1024 * 1024) or None,
+      maximum_number_of_sources=options.maximum_sources or None,
+      number_of_prefetch_workers=options.prefetch_workers,
+      scan_cache=scan_cache)
+
+  server_object = server.WindowsRegistryServer(options.socket, open_sources)
+
+  signal.signal(signal.SIGTERM, _SignalHandler)
+
+  logging.info(f'Listening on: {options.socket:s}')
+
+  try:
+    server_object.serve_forever()
+
+  except KeyboardInterrupt:
+    pass
+
+  finally:
+    server_object.server_close()
+    os.remove(options.socket)
+
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(Main())
@@ -3,13 +3,17 @@
 """Script to extract services information."""
 
 import argparse
+import functools
 import logging
 import sys
 
 from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
 from winregrc import output_writers
+from winregrc import profilers
+from winregrc import results_cache
 from winregrc import services
+from winregrc import snapshot_records
 from winregrc import volume_scanner
 
 
@@ -24,8 +28,55 @@ class StdoutWriter(output_writers.StdoutOutputWriter):
     """
     super(StdoutWriter, self).__init__()
     self._printed_header = False
+    self._snapshot_identifier = None
     self._use_tsv = use_tsv
 
+  def WriteSnapshot(self, snapshot_identifier, identical_snapshot_identifier):
+    """Writes the start of the services of a snapshot to stdout.
+
+    Args:
+      snapshot_identifier (str): identifier of the snapshot, such as "vss1".
+      identical_snapshot_identifier (str): identifier of a snapshot with
+          identical Windows Registry files or None if not set.
+    """
+    self._snapshot_identifier = snapshot_identifier
+
+    if not self._use_tsv:
+      super(StdoutWriter, self).WriteSnapshot(
+          snapshot_identifier, identical_snapshot_identifier)
+
+  def WriteWindowsServiceChange(self, change):
+    """Writes the Windows service change to stdout.
+
+    Args:
+      change (WindowsServiceChange): Windows service change.
+    """
+    if self._use_tsv:
+      if not self._printed_header:
+        print('\t'.join([
+            'Change', 'Service', 'Original source', 'Source', 'Attributes']))
+        self._printed_header = True
+
+      print('\t'.join([
+          change.change_type, change.name, change.original_source,
+          change.source, ', '.join(change.changed_attributes)]))
+
+    elif change.change_type == 'added':
+      print(f'Added in {change.source:s}: {change.name:s}')
+      self.WriteWindowsService(change.service)
+
+    elif change.change_type == 'removed':
+      print(f'Removed in {change.source:s}: {change.name:s}')
+      self.WriteWindowsService(change.original_service)
+
+    else:
+      changed_attributes = ', '.join(change.changed_attributes)
+      print((f'Changed in {change.source:s} compared to '
+             f'{change.original_source:s}: {change.name:s} '
+             f'({changed_attributes:s})'))
+      self.WriteWindowsService(change.original_service)
+      self.WriteWindowsService(change.service)
+
   def WriteWindowsService(self, service):
     """Writes the Windows service to stdout.
 
@@ -41,8 +92,16 @@ class StdoutWriter(output_writers.StdoutOutputWriter):
       start_value_description = service.GetStartValueDescription()
 
     if self._use_tsv:
+      snapshot_column = []
+      if self._snapshot_identifier:
+        snapshot_column = [self._snapshot_identifier]
+
       if not self._printed_header:
-        print('\t'.join([
+        snapshot_header = []
+        if self._snapshot_identifier:
+          snapshot_header = ['Snapshot']
+
+        print('\t'.join(snapshot_header + [
             'Service', 'Type', 'Display name', 'Description', 'Executable',
             'Start']))
         self._printed_header = True
@@ -51,7 +110,7 @@ class StdoutWriter(output_writers.StdoutOutputWriter):
       service_description = service.description or ''
       service_image_path = service.image_path or ''
 
-      print('\t'.join([
+      print('\t'.join(snapshot_column + [
           service.name, service_type_description, service_display_name,
           service_description, service_image_path, start_value_description]))
 
@@ -80,6 +139,61 @@ class StdoutWriter(output_writers.StdoutOutputWriter):
       print('')
 
 
+def _CollectWindowsServices(
+    registry, all_control_sets=False, debug=False, profiler=None):
+  """Collects the Windows services from a Windows Registry.
+
+  Args:
+    registry (dfwinreg.WinRegistry): Windows Registry.
+    all_control_sets (Optional[bool]): True if the services should be
+        collected from all control sets instead of only the current control
+        set.
+    debug (Optional[bool]): True if debug information should be printed.
+    profiler (Optional[ScriptProfiler]): profiler, where None represents
+        profiling is disabled.
+
+  Returns:
+    generator[WindowsService]: Windows service generator.
+  """
+  collector_object = services.WindowsServicesCollector(debug=debug)
+
+  if profiler:
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+  return collector_object.Collect(registry, all_control_sets=all_control_sets)
+
+
+def _WriteCachedWindowsServices(windows_services, use_tsv=False):
+  """Writes cached Windows services.
+
+  Args:
+    windows_services (list[WindowsService]): cached Windows services.
+    use_tsv (Optional[bool]): True if the output should be in tab separated
+        values.
+
+  Returns:
+    int: exit code that is provided to sys.exit().
+  """
+  output_writer_object = StdoutWriter(use_tsv=use_tsv)
+
+  if not output_writer_object.Open():
+    print('Unable to open output writer.')
+    print('')
+    return 1
+
+  try:
+    for windows_service in windows_services:
+      output_writer_object.WriteWindowsService(windows_service)
+
+  finally:
+    output_writer_object.Close()
+
+  if not windows_services:
+    print('No Services key found.')
+
+  return 0
+
+
 def Main():
   """Entry point of console script to extract services information.
 
@@ -98,14 +212,60 @@ def Main():
       '--diff', dest='diff_control_sets', action='store_true', default=False,
       help='Only list differences between control sets.')
 
+  argument_parser.add_argument(
+      '--diff_with', '--diff-with', dest='diff_source', action='store',
+      metavar='PATH', default=None, help=(
+          'only list differences between the current control set of the '
+          'source and that of another source, such as a later snapshot of '
+          'the same system.'))
+
   argument_parser.add_argument(
       '--tsv', dest='use_tsv', action='store_true', default=False,
       help='Use tab separated value (TSV) output.')
 
+  argument_parser.add_argument(
+      '--cache', dest='cache', action='store', metavar='PATH', default=None,
+      help=(
+          'path of a directory to cache the results in, per hash of the '
+          'SYSTEM Registry file.'))
+
+  argument_parser.add_argument(
+      '--cache_size', '--cache-size', dest='cache_size', action='store',
+      metavar='MIB', type=int, default=256, help=(
+          'maximum size of the cache in MiB.'))
+
   argument_parser.add_argument(
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
+  argument_parser.add_argument(
+      '--snapshots', dest='snapshots', action='store_true', default=False,
+      help=(
+          'Process the Volume Shadow Copy snapshots in addition to the current '
+          'volume, where snapshots with identical Registry files are not '
+          'processed again.'))
+
+  argument_parser.add_argument(
+      '--workers', dest='number_of_workers', action='store', type=int,
+      metavar='NUMBER', default=1, help=(
+          'maximum number of snapshots to process concurrently.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=(
@@ -122,52 +282,188 @@ def Main():
     print('')
     return 1
 
-  logging.basicConfig(
-      level=logging.INFO, format='[%(levelname)s] %(message)s')
-
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
-
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
-
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
+  if options.snapshots and (options.diff_control_sets or options.diff_source):
+    print('Snapshots cannot be combined with differences.')
     print('')
     return 1
 
-  collector_object = services.WindowsServicesCollector(debug=options.debug)
-
-  output_writer_object = StdoutWriter(use_tsv=options.use_tsv)
+  logging.basicConfig(
+      level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  if not output_writer_object.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
+  profiler = profilers.CreateProfiler(options)
+
+  with profiler:
+    cache = None
+    cache_key = None
+    if options.cache and not (
+        options.debug or options.diff_control_sets or options.diff_source or
+        options.snapshots):
+      cache = results_cache.CollectorResultsCache(
+          options.cache, maximum_size=options.cache_size * 1024 * 1024)
+      cache_key = cache.GetCacheKey(
+          [options.source], services.WindowsServicesCollector,
+          options={'all_control_sets': options.all_control_sets})
+
+    cached_windows_services = None
+    if cache_key:
+      cached_windows_services = cache.GetResults(cache_key)
+
+    if cached_windows_services is not None:
+      return _WriteCachedWindowsServices(
+          cached_windows_services, use_tsv=options.use_tsv)
+
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
+
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\SYSTEM.DAT',
+            '%SystemRoot%\\System32\\config\\SYSTEM'],
+        profiler=profiler, scan_cache=scan_cache)
+
+    volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.volumes = ['none']
+
+    if not scanner.ScanForWindowsVolume(
+        options.source, options=volume_scanner_options):
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
 
-  try:
-    if options.diff_control_sets:
-      has_results = collector_object.Compare(
-          scanner.registry, output_writer_object)
+    if options.snapshots and scanner.IsSingleFileRegistry():
+      print('Unable to process snapshots of a single Registry file.')
+      print('')
+      return 1
+
+    if cache and not cache_key:
+      # The source is not a Registry file, such as a storage media image,
+      # hence only the SYSTEM Registry file is hashed.
+      file_hash = scanner.GetRegistryFileHash(
+          '%SystemRoot%\\System32\\config\\SYSTEM')
+      if file_hash:
+        cache_key = cache.GetCacheKeyFromFileHashes(
+            [file_hash], services.WindowsServicesCollector,
+            options={'all_control_sets': options.all_control_sets})
+
+        cached_windows_services = cache.GetResults(cache_key)
+        if cached_windows_services is not None:
+          return _WriteCachedWindowsServices(
+              cached_windows_services, use_tsv=options.use_tsv)
+
+    other_registry = None
+    if options.diff_source:
+      other_scanner = volume_scanner.WindowsRegistryVolumeScanner(
+          mediator=mediator,
+          number_of_prefetch_workers=options.prefetch_workers,
+          prefetch_paths=[
+              '%SystemRoot%\\SYSTEM.DAT',
+              '%SystemRoot%\\System32\\config\\SYSTEM'],
+          profiler=profiler, scan_cache=scan_cache)
+
+      if not other_scanner.ScanForWindowsVolume(
+          options.diff_source, options=volume_scanner_options):
+        print((f'Unable to retrieve the volume with the Windows directory '
+               f'from: {options.diff_source:s}.'))
+        print('')
+        return 1
+
+      other_registry = other_scanner.registry
+
+    collector_object = services.WindowsServicesCollector(debug=options.debug)
+
+    registry = scanner.registry
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+    if other_registry:
+      other_registry = profiler.ProfileRegistryAccess(
+          collector_object, other_registry)
+
+    output_writer_object = StdoutWriter(use_tsv=options.use_tsv)
+
+    if not output_writer_object.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
 
-    else:
+    try:
       has_results = False
-      for windows_service in collector_object.Collect(
-          scanner.registry, all_control_sets=options.all_control_sets):
-        output_writer_object.WriteWindowsService(windows_service)
-        has_results = True
 
-  finally:
-    output_writer_object.Close()
-
-  if not has_results:
-    print('No Services key found.')
-
-  return 0
+      if options.diff_control_sets or other_registry:
+        changes = collector_object.Compare(
+            registry, other_registry=other_registry)
+        changes = profiler.ProfileGenerator('collect', changes)
+
+        with profiler.Phase('output'):
+          for change in changes:
+            output_writer_object.WriteWindowsServiceChange(change)
+            has_results = True
+
+      elif options.snapshots:
+        collect_function = functools.partial(
+            _CollectWindowsServices,
+            all_control_sets=options.all_control_sets, debug=options.debug,
+            profiler=profiler)
+
+        # Debug output of snapshots processed concurrently would be
+        # interleaved.
+        number_of_workers = 1 if options.debug else options.number_of_workers
+
+        snapshots_collector = snapshot_records.SnapshotRecordsCollector(
+            scanner, collect_function,
+            ['%SystemRoot%\\System32\\config\\SYSTEM'],
+            number_of_workers=number_of_workers, profiler=profiler)
+
+        with profiler.Phase('collect'):
+          snapshots_records = list(snapshots_collector.Collect())
+
+        scanner.Close()
+
+        with profiler.Phase('output'):
+          for snapshot_records_object in snapshots_records:
+            output_writer_object.WriteSnapshot(
+                snapshot_records_object.snapshot_identifier,
+                snapshot_records_object.identical_snapshot_identifier)
+
+            if (options.use_tsv or
+                not snapshot_records_object.identical_snapshot_identifier):
+              for windows_service in snapshot_records_object.records:
+                output_writer_object.WriteWindowsService(windows_service)
+                has_results = True
+
+      else:
+        windows_services = collector_object.Collect(
+            registry, all_control_sets=options.all_control_sets)
+        windows_services = profiler.ProfileGenerator(
+            'collect', windows_services)
+
+        with profiler.Phase('output'):
+          collected_windows_services = []
+          for windows_service in windows_services:
+            output_writer_object.WriteWindowsService(windows_service)
+            has_results = True
+
+            if cache_key:
+              collected_windows_services.append(windows_service)
+
+        if cache_key:
+          cache.SetResults(cache_key, collected_windows_services)
+
+    finally:
+      output_writer_object.Close()
+
+    if not has_results:
+      if options.diff_control_sets or other_registry:
+        print('No differences in services found.')
+      else:
+        print('No Services key found.')
+
+    return 0
 
 
 if __name__ == '__main__':
@@ -7,10 +7,11 @@ import logging
 import sys
 import yaml
 
+from winregrc import aggregators
 from winregrc import output_writers
+from winregrc import profilers
 from winregrc import shellfolders
 from winregrc import versions
-from winregrc import volume_scanner
 
 
 class StdoutWriter(output_writers.StdoutOutputWriter):
@@ -61,6 +62,12 @@ def Main():
   argument_parser = argparse.ArgumentParser(description=(
       'Extracts the shell folder identifiers from the Windows Registry.'))
 
+  argument_parser.add_argument(
+      '--cache', dest='cache', action='store', metavar='PATH', default=None,
+      help=(
+          'path of a directory to cache the results per source in, so that '
+          'only new or changed sources are processed on a rerun.'))
+
   argument_parser.add_argument(
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
@@ -70,6 +77,13 @@ def Main():
       action='store', metavar='VERSION', default=None,
       help='string that identifies the Windows version.')
 
+  argument_parser.add_argument(
+      '--workers', dest='number_of_workers', action='store', type=int,
+      metavar='NUMBER', default=1, help=(
+          'maximum number of sources to process concurrently.'))
+
+  profilers.AddArguments(argument_parser)
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None, help=(
           'path of the volume containing C:\\Windows, the filename of a '
@@ -88,87 +102,50 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  try:
-    with open(options.source, 'r', encoding='utf-8') as file_object:
-      source_definitions = list(yaml.safe_load_all(file_object))
-
-  except (SyntaxError, UnicodeDecodeError, yaml.parser.ParserError):
-    source_definitions = [{
-        'source': options.source, 'windows_version': options.windows_version}]
-
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
-
-  volume_scanner_options = volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.username = ['none']
-  volume_scanner_options.volumes = ['none']
-
-  shell_folder_per_identifier = {}
-  windows_versions_per_shell_folder = {}
-
-  for source_definition in source_definitions:
-    source_path = source_definition['source']
-    logging.info(f'Processing: {source_path:s}')
-
-    if not scanner.ScanForWindowsVolume(
-        source_path, options=volume_scanner_options):
-      logging.error((
-          f'Unable to retrieve the volume with the Windows directory from: '
-          f'{source_path:s}.'))
-      continue
-
-    # TODO: map collector to available Registry keys.
-    collector_object = shellfolders.ShellFoldersCollector(
-        debug=options.debug)
-
-    # TODO: determine Windows version from source.
-    windows_version = source_definition['windows_version']
-
-    for shell_folder in collector_object.Collect(scanner.registry):
-      # TODO: compare attributes with existing with shell folder.
-      existing_shell_folder = shell_folder_per_identifier.get(
-          shell_folder.identifier, None)
-
-      if not existing_shell_folder:
-        shell_folder_per_identifier[shell_folder.identifier] = shell_folder
-      elif not existing_shell_folder.name:
-        existing_shell_folder.name = shell_folder.name
-      elif (shell_folder.name and
-            shell_folder.name != existing_shell_folder.name and
-            shell_folder.name not in existing_shell_folder.alternate_names):
-        existing_shell_folder.alternate_names.append(shell_folder.name)
-
-      if windows_version:
-        if shell_folder.identifier not in windows_versions_per_shell_folder:
-          windows_versions_per_shell_folder[shell_folder.identifier] = []
-
-        windows_versions_per_shell_folder[shell_folder.identifier].append(
-            windows_version)
-
-  if not shell_folder_per_identifier:
-    print('No shell folder identifiers found.')
-    return 0
+  profiler = profilers.CreateProfiler(options)
 
-  output_writer_object = StdoutWriter()
+  with profiler:
+    try:
+      with open(options.source, 'r', encoding='utf-8') as file_object:
+        source_definitions = list(yaml.safe_load_all(file_object))
 
-  if not output_writer_object.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
+    except (SyntaxError, UnicodeDecodeError, yaml.parser.ParserError):
+      source_definitions = [{
+          'source': options.source, 'windows_version': options.windows_version}]
 
-  try:
-    output_writer_object.WriteHeader()
-    for identifier, windows_versions in sorted(
-        windows_versions_per_shell_folder.items()):
-      shell_folder = shell_folder_per_identifier[identifier]
-      output_writer_object.WriteShellFolder(shell_folder, windows_versions)
+    cache = None
+    if options.cache:
+      cache = aggregators.SourceRecordsCache(options.cache)
 
-  finally:
-    output_writer_object.Close()
+    aggregator = aggregators.KnowledgeBaseRecordAggregator(
+        shellfolders.ShellFoldersCollector, 'name', 'alternate_names',
+        cache=cache, debug=options.debug,
+        number_of_workers=options.number_of_workers, profiler=profiler)
 
-  return 0
+    aggregated_shell_folders = aggregator.Aggregate(source_definitions)
+
+    if not aggregated_shell_folders:
+      print('No shell folder identifiers found.')
+      return 0
+
+    output_writer_object = StdoutWriter()
+
+    if not output_writer_object.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    with profiler.Phase('output'):
+      try:
+        output_writer_object.WriteHeader()
+        for aggregated_record in aggregated_shell_folders:
+          output_writer_object.WriteShellFolder(
+              aggregated_record.record, aggregated_record.windows_versions)
+
+      finally:
+        output_writer_object.Close()
+
+    return 0
 
 
 if __name__ == '__main__':
@@ -9,6 +9,7 @@ import sys
 from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
 from winregrc import output_writers
+from winregrc import profilers
 from winregrc import sysinfo
 from winregrc import volume_scanner
 
@@ -26,6 +27,22 @@ def Main():
       '-d', '--debug', dest='debug', action='store_true', default=False, help=(
           'enable debug output.'))
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None, help=(
           'path of the volume containing C:\\Windows, the filename of '
@@ -44,73 +61,93 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  output_writer = output_writers.StdoutOutputWriter()
-
-  if not output_writer.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
-
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
-
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
-
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
-    print('')
-    return 1
-
-  # TODO: map collector to available Registry keys.
-  collector_object = sysinfo.SystemInfoCollector(
-      debug=options.debug, output_writer=output_writer)
-
-  result = collector_object.Collect(scanner.registry)
-  if not result:
-    print('No Current Version key found.')
-  else:
-    output_writer.WriteValue(
-        'Product name', collector_object.system_information.product_name)
-    output_writer.WriteValue(
-        'Product identifier',
-        collector_object.system_information.product_identifier)
-
-    output_writer.WriteValue(
-        'Current version', collector_object.system_information.current_version)
-    output_writer.WriteValue(
-        'Current type', collector_object.system_information.current_type)
-    output_writer.WriteValue(
-        'Current build number',
-        collector_object.system_information.current_build_number)
-    output_writer.WriteValue(
-        'CSD version', collector_object.system_information.csd_version)
-
-    output_writer.WriteValue(
-        'Registered organization',
-        collector_object.system_information.registered_organization)
-    output_writer.WriteValue(
-        'Registered owner',
-        collector_object.system_information.registered_owner)
-
-    date_time_value = collector_object.system_information.installation_date
-    date_time_string = date_time_value.CopyToDateTimeString()
-    output_writer.WriteValue('Installation date', date_time_string)
-
-    output_writer.WriteValue(
-        'Path name', collector_object.system_information.path_name)
-    output_writer.WriteValue(
-        '%SystemRoot%', collector_object.system_information.system_root)
-
-    output_writer.WriteText('\n')
-
-  output_writer.Close()
-
-  return 0
+  profiler = profilers.CreateProfiler(options)
+
+  with profiler:
+    output_writer = output_writers.StdoutOutputWriter()
+
+    if not output_writer.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
+
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\SYSTEM.DAT',
+            '%SystemRoot%\\System32\\config\\SOFTWARE'],
+        profiler=profiler, scan_cache=scan_cache)
+
+    volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.volumes = ['none']
+
+    if not scanner.ScanForWindowsVolume(
+        options.source, options=volume_scanner_options):
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
+
+    # TODO: map collector to available Registry keys.
+    collector_object = sysinfo.SystemInfoCollector(
+        debug=options.debug, output_writer=output_writer)
+
+    registry = scanner.registry
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+    with profiler.Phase('collect'):
+      result = collector_object.Collect(registry)
+
+    with profiler.Phase('output'):
+      if not result:
+        print('No Current Version key found.')
+      else:
+        output_writer.WriteValue(
+            'Product name', collector_object.system_information.product_name)
+        output_writer.WriteValue(
+            'Product identifier',
+            collector_object.system_information.product_identifier)
+
+        output_writer.WriteValue(
+            'Current version',
+            collector_object.system_information.current_version)
+        output_writer.WriteValue(
+            'Current type', collector_object.system_information.current_type)
+        output_writer.WriteValue(
+            'Current build number',
+            collector_object.system_information.current_build_number)
+        output_writer.WriteValue(
+            'CSD version', collector_object.system_information.csd_version)
+
+        output_writer.WriteValue(
+            'Registered organization',
+            collector_object.system_information.registered_organization)
+        output_writer.WriteValue(
+            'Registered owner',
+            collector_object.system_information.registered_owner)
+
+        date_time_value = collector_object.system_information.installation_date
+        date_time_string = date_time_value.CopyToDateTimeString()
+        output_writer.WriteValue('Installation date', date_time_string)
+
+        output_writer.WriteValue(
+            'Path name', collector_object.system_information.path_name)
+        output_writer.WriteValue(
+            '%SystemRoot%', collector_object.system_information.system_root)
+
+        output_writer.WriteText('\n')
+
+    output_writer.Close()
+
+    return 0
 
 
 if __name__ == '__main__':
@@ -10,6 +10,7 @@ import sys
 from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
 from winregrc import output_writers
+from winregrc import profilers
 from winregrc import syskey
 from winregrc import volume_scanner
 
@@ -27,6 +28,22 @@ def Main():
       '-d', '--debug', dest='debug', action='store_true', default=False, help=(
           'enable debug output.'))
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None, help=(
           'path of the volume containing C:\\Windows, the filename of '
@@ -45,44 +62,62 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  output_writer = output_writers.StdoutOutputWriter()
+  profiler = profilers.CreateProfiler(options)
 
-  if not output_writer.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
+  with profiler:
+    output_writer = output_writers.StdoutOutputWriter()
 
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
+    if not output_writer.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
 
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
 
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
-    print('')
-    return 1
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\SYSTEM.DAT',
+            '%SystemRoot%\\System32\\config\\SYSTEM'],
+        profiler=profiler, scan_cache=scan_cache)
+
+    volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.volumes = ['none']
+
+    if not scanner.ScanForWindowsVolume(
+        options.source, options=volume_scanner_options):
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
+
+    # TODO: map collector to available Registry keys.
+    collector_object = syskey.SystemKeyCollector(
+        debug=options.debug, output_writer=output_writer)
+
+    registry = scanner.registry
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
 
-  # TODO: map collector to available Registry keys.
-  collector_object = syskey.SystemKeyCollector(
-      debug=options.debug, output_writer=output_writer)
+    with profiler.Phase('collect'):
+      result = collector_object.Collect(registry)
 
-  result = collector_object.Collect(scanner.registry)
-  if not result:
-    print('No LSA key found.')
-  else:
-    boot_key = codecs.encode(collector_object.system_key.boot_key, 'hex')
-    output_writer.WriteValue('Boot key', boot_key.decode('ascii'))
+    if not result:
+      print('No LSA key found.')
+    else:
+      boot_key = codecs.encode(collector_object.system_key.boot_key, 'hex')
+      output_writer.WriteValue('Boot key', boot_key.decode('ascii'))
 
-    output_writer.WriteText('\n')
+      output_writer.WriteText('\n')
 
-  output_writer.Close()
+    output_writer.Close()
 
-  return 0
+    return 0
 
 
 if __name__ == '__main__':
@@ -3,16 +3,60 @@
 """Script to extract Task Scheduler Task Cache information."""
 
 import argparse
+import functools
 import logging
 import sys
 
 from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
 from winregrc import output_writers
+from winregrc import profilers
+from winregrc import snapshot_records
 from winregrc import task_cache
 from winregrc import volume_scanner
 
 
+def _CollectCachedTasks(
+    registry, debug=False, output_writer=None, profiler=None):
+  """Collects the cached tasks from a Windows Registry.
+
+  Args:
+    registry (dfwinreg.WinRegistry): Windows Registry.
+    debug (Optional[bool]): True if debug information should be printed.
+    output_writer (Optional[OutputWriter]): output writer.
+    profiler (Optional[ScriptProfiler]): profiler, where None represents
+        profiling is disabled.
+
+  Returns:
+    generator[CachedTask]: cached task generator.
+  """
+  # TODO: map collector to available Registry keys.
+  collector_object = task_cache.TaskCacheCollector(
+      debug=debug, output_writer=output_writer)
+
+  if profiler:
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+  return collector_object.Collect(registry)
+
+
+def _WriteCachedTask(output_writer, cached_task):
+  """Writes a cached task.
+
+  Args:
+    output_writer (OutputWriter): output writer.
+    cached_task (CachedTask): cached task.
+  """
+  output_writer.WriteValue('Task', cached_task.path or cached_task.name)
+  output_writer.WriteValue('Identifier', cached_task.identifier)
+  output_writer.WriteValue(
+      'Last registered time',
+      cached_task.last_registered_time.CopyToDateTimeString())
+  output_writer.WriteValue(
+      'Launch time', cached_task.launch_time.CopyToDateTimeString())
+  output_writer.WriteText('\n')
+
+
 def Main():
   """Entry point of console script to extract Scheduler Task Cache information.
 
@@ -27,6 +71,34 @@ def Main():
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
+  argument_parser.add_argument(
+      '--snapshots', dest='snapshots', action='store_true', default=False,
+      help=(
+          'Process the Volume Shadow Copy snapshots in addition to the current '
+          'volume, where snapshots with identical Registry files are not '
+          'processed again.'))
+
+  argument_parser.add_argument(
+      '--workers', dest='number_of_workers', action='store', type=int,
+      metavar='NUMBER', default=1, help=(
+          'maximum number of snapshots to process concurrently.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=(
@@ -46,39 +118,101 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  output_writer = output_writers.StdoutOutputWriter()
-
-  if not output_writer.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
-
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
-
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
-
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
-    print('')
-    return 1
-
-  # TODO: map collector to available Registry keys.
-  collector_object = task_cache.TaskCacheCollector(
-      debug=options.debug, output_writer=output_writer)
-
-  result = collector_object.Collect(scanner.registry)
-  if not result:
-    print('No Task Cache key found.')
-
-  output_writer.Close()
-
-  return 0
+  profiler = profilers.CreateProfiler(options)
+
+  with profiler:
+    output_writer = output_writers.StdoutOutputWriter()
+
+    if not output_writer.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
+
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\SYSTEM.DAT',
+            '%SystemRoot%\\System32\\config\\SOFTWARE'],
+        profiler=profiler, scan_cache=scan_cache)
+
+    volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.volumes = ['none']
+
+    if not scanner.ScanForWindowsVolume(
+        options.source, options=volume_scanner_options):
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
+
+    if options.snapshots and scanner.IsSingleFileRegistry():
+      print('Unable to process snapshots of a single Registry file.')
+      print('')
+      return 1
+
+    has_results = False
+
+    if options.snapshots:
+      collect_function = functools.partial(
+          _CollectCachedTasks, debug=options.debug,
+          output_writer=output_writer, profiler=profiler)
+
+      # Debug output of snapshots processed concurrently would be
+      # interleaved.
+      number_of_workers = 1 if options.debug else options.number_of_workers
+
+      snapshots_collector = snapshot_records.SnapshotRecordsCollector(
+          scanner, collect_function,
+          ['%SystemRoot%\\System32\\config\\SOFTWARE'],
+          number_of_workers=number_of_workers, profiler=profiler)
+
+      with profiler.Phase('collect'):
+        snapshots_records = list(snapshots_collector.Collect())
+
+      scanner.Close()
+
+      with profiler.Phase('output'):
+        for snapshot_records_object in snapshots_records:
+          output_writer.WriteSnapshot(
+              snapshot_records_object.snapshot_identifier,
+              snapshot_records_object.identical_snapshot_identifier)
+
+          if not snapshot_records_object.identical_snapshot_identifier:
+            for cached_task in snapshot_records_object.records:
+              # Note that in debug mode the collector writes the cached tasks.
+              if not options.debug:
+                _WriteCachedTask(output_writer, cached_task)
+
+              has_results = True
+
+    else:
+      cached_tasks = _CollectCachedTasks(
+          scanner.registry, debug=options.debug, output_writer=output_writer,
+          profiler=profiler)
+      cached_tasks = profiler.ProfileGenerator('collect', cached_tasks)
+
+      with profiler.Phase('output'):
+        for cached_task in cached_tasks:
+          # Note that in debug mode the collector writes the cached tasks.
+          if not options.debug:
+            _WriteCachedTask(output_writer, cached_task)
+
+          has_results = True
+
+    if not has_results:
+      print('No Task Cache key found.')
+
+    output_writer.Close()
+
+    return 0
 
 
 if __name__ == '__main__':
@@ -6,10 +6,13 @@ import argparse
 import logging
 import sys
 
+from dfdatetime import filetime as dfdatetime_filetime
+
 from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
-from winregrc import time_zones
 from winregrc import output_writers
+from winregrc import profilers
+from winregrc import time_zones
 from winregrc import volume_scanner
 
 
@@ -91,6 +94,12 @@ class StdoutWriter(output_writers.StdoutOutputWriter):
         f'{time_zone.name:s}\t{sign:s}{hours_from_utc:02d}:'
         f'{minutes_from_utc:02d}\n'))
 
+    if time_zone.transition_table:
+      for timestamp, bias in time_zone.transition_table.GetTransitions():
+        date_time = dfdatetime_filetime.Filetime(timestamp=timestamp)
+        date_time_string = date_time.CopyToDateTimeString()
+        self.WriteText(f'\t{date_time_string:s}\t{bias:d}\n')
+
 
 def Main():
   """Entry point of console script to extract tize zone information.
@@ -109,6 +118,28 @@ def Main():
       '--csv', dest='csv_file', action='store', metavar='time_zones.csv',
       default=None, help='path of the CSV file to write to.')
 
+  argument_parser.add_argument(
+      '--years', dest='years', action='store', metavar='FIRST-LAST',
+      default=None, help=(
+          'range of years to precompute the standard and daylight '
+          'transitions of, for example "1970-2037".'))
+
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=(
@@ -125,44 +156,76 @@ def Main():
     print('')
     return 1
 
+  years = None
+  if options.years:
+    first_year, _, last_year = options.years.partition('-')
+    try:
+      years = range(int(first_year, 10), int(last_year, 10) + 1)
+    except ValueError:
+      years = None
+
+    if not years:
+      print(f'Unsupported range of years: {options.years:s}')
+      print('')
+      return 1
+
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  if options.csv_file:
-    output_writer_object = CSVFileWriter(options.csv_file)
-  else:
-    output_writer_object = StdoutWriter()
+  profiler = profilers.CreateProfiler(options)
 
-  if not output_writer_object.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
+  with profiler:
+    if options.csv_file:
+      output_writer_object = CSVFileWriter(options.csv_file)
+    else:
+      output_writer_object = StdoutWriter()
 
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
+    if not output_writer_object.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
 
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
 
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
-    print('')
-    return 1
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\SYSTEM.DAT',
+            '%SystemRoot%\\System32\\config\\SOFTWARE'],
+        profiler=profiler, scan_cache=scan_cache)
 
-  # TODO: map collector to available Registry keys.
-  collector_object = time_zones.TimeZonesCollector(debug=options.debug)
+    volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.volumes = ['none']
 
-  result = collector_object.Collect(scanner.registry, output_writer_object)
-  if not result:
-    print('No "Time Zones" key found.')
+    if not scanner.ScanForWindowsVolume(
+        options.source, options=volume_scanner_options):
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
 
-  output_writer_object.Close()
+    # TODO: map collector to available Registry keys.
+    collector_object = time_zones.TimeZonesCollector(debug=options.debug)
 
-  return 0
+    registry = scanner.registry
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+    with profiler.Phase('collect'):
+      result = collector_object.Collect(
+          registry, output_writer_object, years=years)
+
+    if not result:
+      print('No "Time Zones" key found.')
+
+    output_writer_object.Close()
+
+    return 0
 
 
 if __name__ == '__main__':
@@ -9,6 +9,7 @@ import sys
 from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
 from winregrc import output_writers
+from winregrc import profilers
 from winregrc import type_libraries
 from winregrc import volume_scanner
 
@@ -22,10 +23,38 @@ def Main():
   argument_parser = argparse.ArgumentParser(description=(
       'Extracts the type libraries from the Windows Registry.'))
 
+  argument_parser.add_argument(
+      '--all_languages', '--all-languages', dest='all_languages',
+      action='store_true', default=False, help=(
+          'collect the type libraries of all languages instead of only '
+          'the preferred language.'))
+
+  argument_parser.add_argument(
+      '--all_platforms', '--all-platforms', dest='all_platforms',
+      action='store_true', default=False, help=(
+          'collect the type libraries of all platforms instead of only '
+          'the preferred platform.'))
+
   argument_parser.add_argument(
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=(
@@ -45,44 +74,76 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  output_writer = output_writers.StdoutOutputWriter()
-
-  if not output_writer.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
-
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
-
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
-
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
-    print('')
-    return 1
-
-  # TODO: map collector to available Registry keys.
-  collector_object = type_libraries.TypeLibrariesCollector(
-      debug=options.debug, output_writer=output_writer)
-
-  result = collector_object.Collect(scanner.registry)
-  if not result:
-    print('No TypeLib key found.')
-  else:
-    for type_library in collector_object.type_libraries:
-      print((f'{type_library.identifier:s}\t{type_library.version:s}\t'
-             f'{type_library.description:s}\t'
-             f'{type_library.typelib_filename:s}'))
-
-  output_writer.Close()
-
-  return 0
+  profiler = profilers.CreateProfiler(options)
+
+  with profiler:
+    output_writer = output_writers.StdoutOutputWriter()
+
+    if not output_writer.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
+
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\SYSTEM.DAT',
+            '%SystemRoot%\\System32\\config\\SOFTWARE'],
+        profiler=profiler, scan_cache=scan_cache)
+
+    volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.volumes = ['none']
+
+    if not scanner.ScanForWindowsVolume(
+        options.source, options=volume_scanner_options):
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
+
+    # TODO: map collector to available Registry keys.
+    collector_object = type_libraries.TypeLibrariesCollector(
+        debug=options.debug, output_writer=output_writer)
+
+    registry = scanner.registry
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+    has_results = False
+
+    type_libraries_generator = collector_object.Collect(
+        registry, all_languages=options.all_languages,
+        all_platforms=options.all_platforms)
+    type_libraries_generator = profiler.ProfileGenerator(
+        'collect', type_libraries_generator)
+
+    with profiler.Phase('output'):
+      for type_library in type_libraries_generator:
+        if options.all_languages or options.all_platforms:
+          print((f'{type_library.identifier:s}\t{type_library.version:s}\t'
+                 f'{type_library.language!s}\t{type_library.platform!s}\t'
+                 f'{type_library.description!s}\t'
+                 f'{type_library.typelib_filename!s}'))
+        else:
+          print((f'{type_library.identifier:s}\t{type_library.version:s}\t'
+                 f'{type_library.description!s}\t'
+                 f'{type_library.typelib_filename!s}'))
+
+        has_results = True
+
+    if not has_results:
+      print('No TypeLib key found.')
+
+    output_writer.Close()
+
+    return 0
 
 
 if __name__ == '__main__':
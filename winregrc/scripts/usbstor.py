@@ -9,6 +9,8 @@ import sys
 from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
 from winregrc import output_writers
+from winregrc import profilers
+from winregrc import usb_devices
 from winregrc import usbstor
 from winregrc import volume_scanner
 
@@ -88,6 +90,38 @@ class StdoutWriter(output_writers.StdoutOutputWriter):
 
     self.WriteText('\n')
 
+  def WriteUSBDevice(self, usb_device):
+    """Writes an USB device to the output.
+
+    Args:
+      usb_device (USBDevice): USB device.
+    """
+    storage_device = usb_device.storage_device
+    if storage_device.serial_number:
+      self.WriteText(f'Serial number\t: {storage_device.serial_number:s}\n')
+
+    if storage_device.parent_identifier_prefix:
+      self.WriteText((
+          f'Parent prefix\t: {storage_device.parent_identifier_prefix:s}\n'))
+
+    for volume_identifier in usb_device.volume_identifiers:
+      self.WriteText(f'Volume\t\t: {volume_identifier:s}\n')
+
+    for mounted_device in usb_device.mounted_devices:
+      self.WriteText(f'Mounted device\t: {mounted_device.identifier:s}\n')
+
+    for device_interface in usb_device.device_interfaces:
+      date_time_string = 'Not set'
+      if device_interface.last_written_time:
+        date_time_string = (
+            device_interface.last_written_time.CopyToDateTimeStringISO8601())
+
+      self.WriteText((
+          f'Interface\t: {device_interface.class_identifier:s} '
+          f'{date_time_string:s}\n'))
+
+    self.WriteUserProfile(storage_device)
+
 
 def Main():
   """Entry point of console script to extract USB storage devices.
@@ -98,10 +132,39 @@ def Main():
   argument_parser = argparse.ArgumentParser(description=(
       'Extracts the USB storage devices from the Windows Registry.'))
 
+  argument_parser.add_argument(
+      '--correlate', dest='correlate', action='store_true', default=False,
+      help=(
+          'correlate the USB storage devices with the mounted devices and '
+          'device interfaces.'))
+
+  argument_parser.add_argument(
+      '--property_set', '--property-set', dest='property_sets',
+      action='append', metavar='GUID', default=None, help=(
+          'identifier of a property set to collect, such as '
+          '"{83da6326-97a6-4088-9453-a1923f573b29}". Can be specified '
+          'multiple times. By default all property sets are collected.'))
+
   argument_parser.add_argument(
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None,
       help=(
@@ -121,44 +184,73 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
-
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
-
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
-    print('')
-    return 1
-
-  # TODO: map collector to available Registry keys.
-  collector_object = usbstor.USBStorageDeviceCollector(debug=options.debug)
-
-  output_writer_object = StdoutWriter()
-
-  if not output_writer_object.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
-
-  try:
-    has_results = False
-    for storage_device in collector_object.Collect(scanner.registry):
-      output_writer_object.WriteUserProfile(storage_device)
-      has_results = True
-
-  finally:
-    output_writer_object.Close()
-
-  if not has_results:
-    print('No USB storage devices found.')
-
-  return 0
+  profiler = profilers.CreateProfiler(options)
+
+  with profiler:
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
+
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\SYSTEM.DAT',
+            '%SystemRoot%\\System32\\config\\SYSTEM'],
+        profiler=profiler, scan_cache=scan_cache)
+
+    volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.volumes = ['none']
+
+    if not scanner.ScanForWindowsVolume(
+        options.source, options=volume_scanner_options):
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
+
+    # TODO: map collector to available Registry keys.
+    if options.correlate:
+      collector_object = usb_devices.USBDevicesCollector(debug=options.debug)
+    else:
+      collector_object = usbstor.USBStorageDeviceCollector(
+          debug=options.debug)
+
+    registry = scanner.registry
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+    output_writer_object = StdoutWriter()
+
+    if not output_writer_object.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    try:
+      has_results = False
+
+      storage_devices = collector_object.Collect(
+          registry, property_sets=options.property_sets)
+      storage_devices = profiler.ProfileGenerator('collect', storage_devices)
+
+      with profiler.Phase('output'):
+        for storage_device in storage_devices:
+          if options.correlate:
+            output_writer_object.WriteUSBDevice(storage_device)
+          else:
+            output_writer_object.WriteUserProfile(storage_device)
+          has_results = True
+
+    finally:
+      output_writer_object.Close()
+
+    if not has_results:
+      print('No USB storage devices found.')
+
+    return 0
 
 
 if __name__ == '__main__':
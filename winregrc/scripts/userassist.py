@@ -3,16 +3,48 @@
 """Script to extract UserAssist information."""
 
 import argparse
+import functools
 import logging
 import sys
 
+from dfdatetime import filetime as dfdatetime_filetime
+
 from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
 
 from winregrc import output_writers
+from winregrc import profilers
+from winregrc import user_records
 from winregrc import userassist
 from winregrc import volume_scanner
 
 
+def _CollectUserAssistEntries(
+    registry, debug=False, output_writer=None, profiler=None):
+  """Collects the UserAssist entries from a Windows Registry.
+
+  Args:
+    registry (dfwinreg.WinRegistry): Windows Registry.
+    debug (Optional[bool]): True if debug information should be printed.
+    output_writer (Optional[OutputWriter]): output writer.
+    profiler (Optional[ScriptProfiler]): profiler, where None represents
+        profiling is disabled.
+
+  Returns:
+    list[UserAssistEntry]: UserAssist entries.
+  """
+  # TODO: map collector to available Registry keys.
+  collector_object = userassist.UserAssistCollector(
+      debug=debug, output_writer=output_writer)
+
+  if profiler:
+    registry = profiler.ProfileRegistryAccess(collector_object, registry)
+
+  if not collector_object.Collect(registry):
+    return []
+
+  return collector_object.user_assist_entries
+
+
 def Main():
   """Entry point of console script to extract UserAssist information.
 
@@ -22,6 +54,12 @@ def Main():
   argument_parser = argparse.ArgumentParser(description=(
       'Extracts the UserAssist information from a NTUSER.DAT Registry file.'))
 
+  argument_parser.add_argument(
+      '--all_users', '--all-users', dest='all_users', action='store_true',
+      default=False, help=(
+          'extract the UserAssist information of all user profiles instead '
+          'of a single user.'))
+
   argument_parser.add_argument(
       '--codepage', dest='codepage', action='store', metavar='CODEPAGE',
       default='cp1252', help='the codepage of the extended ASCII strings.')
@@ -30,6 +68,27 @@ def Main():
       '-d', '--debug', dest='debug', action='store_true', default=False,
       help='enable debug output.')
 
+  argument_parser.add_argument(
+      '--prefetch_workers', '--prefetch-workers', dest='prefetch_workers',
+      action='store', type=int, metavar='NUMBER', default=0, help=(
+          'number of Windows Registry files to read concurrently from '
+          'a storage media image before processing, where 0 disables '
+          'prefetching.'))
+
+  profilers.AddArguments(argument_parser)
+
+  argument_parser.add_argument(
+      '--scan_cache', '--scan-cache', dest='scan_cache', action='store',
+      metavar='PATH', default=None, help=(
+          'path of a file to cache the location of the Windows volume and its '
+          'Registry files in, so that storage media images are not scanned '
+          'again on a rerun.'))
+
+  argument_parser.add_argument(
+      '--workers', dest='number_of_workers', action='store', type=int,
+      metavar='NUMBER', default=1, help=(
+          'maximum number of user profiles to process concurrently.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH', default=None, help=(
           'path of the volume containing C:\\Windows, the filename of '
@@ -48,49 +107,116 @@ def Main():
   logging.basicConfig(
       level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-  output_writer = output_writers.StdoutOutputWriter()
-
-  if not output_writer.Open():
-    print('Unable to open output writer.')
-    print('')
-    return 1
-
-  mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
-  scanner = volume_scanner.WindowsRegistryVolumeScanner(mediator=mediator)
+  profiler = profilers.CreateProfiler(options)
+
+  with profiler:
+    output_writer = output_writers.StdoutOutputWriter()
+
+    if not output_writer.Open():
+      print('Unable to open output writer.')
+      print('')
+      return 1
+
+    scan_cache = None
+    if options.scan_cache:
+      scan_cache = volume_scanner.VolumeScanCache(options.scan_cache)
+
+    mediator = volume_scanner.WindowsRegistryVolumeScannerMediator()
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        mediator=mediator,
+        number_of_prefetch_workers=options.prefetch_workers,
+        prefetch_paths=[
+            '%SystemRoot%\\USER.DAT',
+            '%UserProfile%\\NTUSER.DAT'],
+        profiler=profiler, scan_cache=scan_cache)
+
+    if options.all_users:
+      volume_scanner_options = volume_scanner.VolumeScannerOptions()
+      volume_scanner_options.username = ['none']
+    else:
+      volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
+
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.volumes = ['none']
+
+    if not scanner.ScanForWindowsVolume(
+        options.source, options=volume_scanner_options):
+      print((f'Unable to retrieve the volume with the Windows directory from: '
+             f'{options.source:s}.'))
+      print('')
+      return 1
+
+    if options.all_users and scanner.IsSingleFileRegistry():
+      print('Unable to process all user profiles of a single Registry file.')
+      print('')
+      return 1
+
+    collect_function = functools.partial(
+        _CollectUserAssistEntries, debug=options.debug,
+        output_writer=output_writer, profiler=profiler)
+
+    with profiler.Phase('collect'):
+      if options.all_users:
+        # Debug output of users processed concurrently would be interleaved.
+        number_of_workers = 1 if options.debug else options.number_of_workers
+
+        collector_object = user_records.UserRecordsCollector(
+            scanner, collect_function, number_of_workers=number_of_workers,
+            profiler=profiler)
+        user_assist_records = list(collector_object.Collect())
+
+      else:
+        user_assist_records = [
+            user_records.UserRecord(user_assist_entry)
+            for user_assist_entry in collect_function(scanner.registry)]
+
+    with profiler.Phase('output'):
+      if not user_assist_records:
+        print('No UserAssist key found.')
+      else:
+        guid = None
+        username = None
+        for user_assist_record in user_assist_records:
+          if user_assist_record.username != username:
+            username = user_assist_record.username
+            guid = None
+
+            print(f'User\t\t: {username:s}')
+            if user_assist_record.security_identifier:
+              print((f'SID\t\t: '
+                     f'{user_assist_record.security_identifier:s}'))
+
+          user_assist_entry = user_assist_record.record
+          if user_assist_entry.guid != guid:
+            print(f'GUID\t\t: {user_assist_entry.guid:s}')
+            guid = user_assist_entry.guid
+
+          print(f'Name\t\t: {user_assist_entry.name:s}')
+          print(f'Original name\t: {user_assist_entry.value_name:s}')
+          print(f'Executions\t: {user_assist_entry.number_of_executions:d}')
+
+          if user_assist_entry.application_focus_count is not None:
+            print((f'Focus count\t: '
+                   f'{user_assist_entry.application_focus_count:d}'))
+
+          if user_assist_entry.application_focus_duration is not None:
+            print((f'Focus duration\t: '
+                   f'{user_assist_entry.application_focus_duration:d}'))
+
+          date_time_string = 'Not set'
+          if user_assist_entry.last_execution_time:
+            date_time = dfdatetime_filetime.Filetime(
+                timestamp=user_assist_entry.last_execution_time)
+            date_time_string = date_time.CopyToDateTimeString() or (
+                f'0x{user_assist_entry.last_execution_time:08x}')
+
+          print(f'Last execution\t: {date_time_string:s}')
 
-  volume_scanner_options = dfvfs_volume_scanner.VolumeScannerOptions()
-  volume_scanner_options.partitions = ['all']
-  volume_scanner_options.snapshots = ['none']
-  volume_scanner_options.volumes = ['none']
-
-  if not scanner.ScanForWindowsVolume(
-      options.source, options=volume_scanner_options):
-    print((f'Unable to retrieve the volume with the Windows directory from: '
-           f'{options.source:s}.'))
     print('')
-    return 1
-
-  # TODO: map collector to available Registry keys.
-  collector_object = userassist.UserAssistCollector(
-      debug=options.debug, output_writer=output_writer)
-
-  result = collector_object.Collect(scanner.registry)
-  if not result:
-    print('No UserAssist key found.')
-  else:
-    guid = None
-    for user_assist_entry in collector_object.user_assist_entries:
-      if user_assist_entry.guid != guid:
-        print(f'GUID\t\t: {user_assist_entry.guid:s}')
-        guid = user_assist_entry.guid
-
-      print(f'Name\t\t: {user_assist_entry.name:s}')
-      print(f'Original name\t: {user_assist_entry.value_name:s}')
-
-  print('')
-  output_writer.Close()
+    output_writer.Close()
 
-  return 0
+    return 0
 
 
 if __name__ == '__main__':
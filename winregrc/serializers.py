@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""JSON serializer for collector result records."""
+
+import base64
+import importlib
+
+from dfdatetime import interface as dfdatetime_interface
+from dfdatetime import serializer as dfdatetime_serializer
+
+
+class RecordSerializer(object):
+  """JSON serializer for collector result records.
+
+  Records are serialized by the attributes defined by their __slots__. Values
+  that are not supported by JSON, such as bytes, date and time values, sets
+  and tuples, are serialized as a JSON dictionary with a "__type__" key.
+  """
+
+  _RECORD_MODULE_PREFIX = 'winregrc.'
+
+  @classmethod
+  def _ConvertJSONToRecord(cls, json_dict):
+    """Converts a JSON dictionary to a record.
+
+    Args:
+      json_dict (dict[str, object]): JSON dictionary of the record.
+
+    Returns:
+      object: record.
+
+    Raises:
+      ValueError: if the record type is not supported.
+    """
+    type_name = json_dict['__type__']
+
+    module_name, _, class_name = type_name.rpartition('.')
+    if not module_name.startswith(cls._RECORD_MODULE_PREFIX):
+      raise ValueError(f'Unsupported record type: {type_name:s}')
+
+    module = importlib.import_module(module_name)
+    record_class = getattr(module, class_name, None)
+    if (not isinstance(record_class, type) or
+        not hasattr(record_class, '__slots__')):
+      raise ValueError(f'Unsupported record type: {type_name:s}')
+
+    record = record_class.__new__(record_class)
+    for attribute_name in record_class.__slots__:
+      attribute_value = json_dict.get(attribute_name, None)
+      setattr(record, attribute_name, cls.ConvertJSONToValue(attribute_value))
+
+    return record
+
+  @classmethod
+  def _ConvertRecordToJSON(cls, record):
+    """Converts a record to a JSON dictionary.
+
+    Args:
+      record (object): record, with its attributes defined by __slots__.
+
+    Returns:
+      dict[str, object]: JSON dictionary of the record.
+
+    Raises:
+      ValueError: if the record type is not supported.
+    """
+    record_class = record.__class__
+    type_name = f'{record_class.__module__:s}.{record_class.__name__:s}'
+
+    if (not type_name.startswith(cls._RECORD_MODULE_PREFIX) or
+        not hasattr(record_class, '__slots__')):
+      raise ValueError(f'Unsupported record type: {type_name:s}')
+
+    json_dict = {'__type__': type_name}
+    for attribute_name in record_class.__slots__:
+      attribute_value = getattr(record, attribute_name, None)
+      json_dict[attribute_name] = cls.ConvertValueToJSON(attribute_value)
+
+    return json_dict
+
+  @classmethod
+  def ConvertJSONToValue(cls, json_value):
+    """Converts a JSON value to a value.
+
+    Args:
+      json_value (object): JSON value.
+
+    Returns:
+      object: value.
+
+    Raises:
+      ValueError: if the JSON value is not supported.
+    """
+    if isinstance(json_value, list):
+      return [cls.ConvertJSONToValue(value) for value in json_value]
+
+    if not isinstance(json_value, dict):
+      return json_value
+
+    type_name = json_value.get('__type__', None)
+
+    if type_name == 'bytes':
+      return base64.b64decode(json_value['data'])
+
+    if type_name == 'DateTimeValues':
+      return dfdatetime_serializer.Serializer.ConvertJSONToDateTimeValues(
+          json_value)
+
+    if type_name == 'dict':
+      return {
+          cls.ConvertJSONToValue(key): cls.ConvertJSONToValue(value)
+          for key, value in json_value['items']}
+
+    if type_name == 'set':
+      return set(
+          cls.ConvertJSONToValue(value) for value in json_value['values'])
+
+    if type_name == 'tuple':
+      return tuple(
+          cls.ConvertJSONToValue(value) for value in json_value['values'])
+
+    if type_name:
+      return cls._ConvertJSONToRecord(json_value)
+
+    raise ValueError('Unsupported JSON value.')
+
+  @classmethod
+  def ConvertValueToJSON(cls, value):
+    """Converts a value to a JSON value.
+
+    Args:
+      value (object): value, such as a record or an attribute value.
+
+    Returns:
+      object: JSON value.
+
+    Raises:
+      ValueError: if the value is not supported.
+    """
+    if value is None or isinstance(value, (bool, float, int, str)):
+      return value
+
+    if isinstance(value, list):
+      return [cls.ConvertValueToJSON(element) for element in value]
+
+    if isinstance(value, bytes):
+      return {
+          '__type__': 'bytes',
+          'data': base64.b64encode(value).decode('ascii')}
+
+    if isinstance(value, dfdatetime_interface.DateTimeValues):
+      return dfdatetime_serializer.Serializer.ConvertDateTimeValuesToJSON(value)
+
+    if isinstance(value, dict):
+      return {'__type__': 'dict', 'items': [
+          [cls.ConvertValueToJSON(key), cls.ConvertValueToJSON(element)]
+          for key, element in value.items()]}
+
+    if isinstance(value, (frozenset, set)):
+      return {'__type__': 'set', 'values': [
+          cls.ConvertValueToJSON(element) for element in value]}
+
+    if isinstance(value, tuple):
+      return {'__type__': 'tuple', 'values': [
+          cls.ConvertValueToJSON(element) for element in value]}
+
+    return cls._ConvertRecordToJSON(value)
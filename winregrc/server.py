@@ -0,0 +1,555 @@
+# -*- coding: utf-8 -*-
+"""Windows Registry server that keeps sources open between requests."""
+
+import collections
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+
+from dfvfs.lib import errors as dfvfs_errors
+
+from winregrc import errors
+from winregrc import mru
+from winregrc import profiles
+from winregrc import sam
+from winregrc import serializers
+from winregrc import services
+from winregrc import userassist
+from winregrc import volume_scanner
+
+
+def _CollectMostRecentlyUsedEntries(
+    registry, options):  # pylint: disable=unused-argument
+  """Collects the Most Recently Used (MRU) entries.
+
+  Args:
+    registry (dfwinreg.WinRegistry): Windows Registry of the user.
+    options (dict[str, object]): collector options.
+
+  Returns:
+    list[MostRecentlyUsedEntry]: Most Recently Used (MRU) entries.
+  """
+  collector_object = mru.MostRecentlyUsedCollector()
+  if not collector_object.Collect(registry):
+    return []
+
+  return collector_object.mru_entries
+
+
+def _CollectUserAccounts(registry, options):
+  """Collects the Security Accounts Manager (SAM) user accounts.
+
+  Args:
+    registry (dfwinreg.WinRegistry): Windows Registry.
+    options (dict[str, object]): collector options, where "include_hashes"
+        indicates the encrypted LM and NTLM hashes should be collected.
+
+  Returns:
+    list[UserAccount]: user accounts.
+  """
+  collector_object = sam.SecurityAccountManagerCollector()
+  return list(collector_object.Collect(
+      registry, include_hashes=bool(options.get('include_hashes', False))))
+
+
+def _CollectUserAssistEntries(
+    registry, options):  # pylint: disable=unused-argument
+  """Collects the UserAssist entries.
+
+  Args:
+    registry (dfwinreg.WinRegistry): Windows Registry of the user.
+    options (dict[str, object]): collector options.
+
+  Returns:
+    list[UserAssistEntry]: UserAssist entries.
+  """
+  collector_object = userassist.UserAssistCollector()
+  if not collector_object.Collect(registry):
+    return []
+
+  return collector_object.user_assist_entries
+
+
+def _CollectUserProfiles(registry, options):  # pylint: disable=unused-argument
+  """Collects the user profiles.
+
+  Args:
+    registry (dfwinreg.WinRegistry): Windows Registry.
+    options (dict[str, object]): collector options.
+
+  Returns:
+    list[UserProfile]: user profiles.
+  """
+  collector_object = profiles.UserProfilesCollector()
+  return list(collector_object.Collect(registry))
+
+
+def _CollectWindowsServices(registry, options):
+  """Collects the Windows services.
+
+  Args:
+    registry (dfwinreg.WinRegistry): Windows Registry.
+    options (dict[str, object]): collector options, where "all_control_sets"
+        indicates the services of all control sets should be collected.
+
+  Returns:
+    list[WindowsService]: Windows services.
+  """
+  collector_object = services.WindowsServicesCollector()
+  return list(collector_object.Collect(
+      registry, all_control_sets=bool(options.get('all_control_sets', False))))
+
+
+class OpenSource(object):
+  """Source of which the Windows volume and Windows Registries are kept open.
+
+  Attributes:
+    last_used_time (float): time the source was last used, in number of
+        seconds since January 1, 1970 00:00:00.
+    lock (threading.Lock): lock that serializes the use of the source, since
+        the Windows Registries of a source cannot be read concurrently.
+    memory_size (int): estimated memory size of the source in bytes, which is
+        the total size of its Windows Registry files.
+    scanner (WindowsRegistryVolumeScanner): volume scanner, that found
+        the Windows volume.
+    source_path (str): path of the source.
+    user_registries (dict[str, dfwinreg.WinRegistry]): Windows Registries of
+        the users, per lower case username.
+  """
+
+  # Windows paths of the system Registry files.
+  _SYSTEM_REGISTRY_FILE_PATHS = (
+      '%SystemRoot%\\SYSTEM.DAT',
+      '%SystemRoot%\\System32\\config\\SAM',
+      '%SystemRoot%\\System32\\config\\SECURITY',
+      '%SystemRoot%\\System32\\config\\SOFTWARE',
+      '%SystemRoot%\\System32\\config\\SYSTEM')
+
+  # Paths of the user Registry files relative to the user profile.
+  _USER_REGISTRY_FILE_PATHS = (
+      'NTUSER.DAT',
+      'AppData\\Local\\Microsoft\\Windows\\UsrClass.dat',
+      'Local Settings\\Application Data\\Microsoft\\Windows\\UsrClass.dat')
+
+  def __init__(self, source_path, scanner):
+    """Initializes an open source.
+
+    Args:
+      source_path (str): path of the source.
+      scanner (WindowsRegistryVolumeScanner): volume scanner, that found
+          the Windows volume.
+    """
+    super(OpenSource, self).__init__()
+    self._user_profiles = None
+    self.last_used_time = time.time()
+    self.lock = threading.Lock()
+    self.memory_size = 0
+    self.scanner = scanner
+    self.source_path = source_path
+    self.user_registries = {}
+
+    if scanner.IsSingleFileRegistry():
+      self.memory_size = os.path.getsize(source_path)
+    else:
+      self.memory_size = self._GetRegistryFilesSize(
+          self._SYSTEM_REGISTRY_FILE_PATHS)
+
+  def _GetRegistryFilesSize(self, paths):
+    """Retrieves the total size of Windows Registry files.
+
+    Args:
+      paths (list[str]): Windows paths of the Windows Registry files.
+
+    Returns:
+      int: total size of the Windows Registry files that are available in
+          bytes.
+    """
+    return sum(self.scanner.GetRegistryFileSize(path) or 0 for path in paths)
+
+  def Close(self):
+    """Closes the prefetched Windows Registry files that were not opened."""
+    self.scanner.Close()
+
+  def GetUserRegistry(self, username=None):
+    """Retrieves the Windows Registry of a user.
+
+    The Windows Registry of a user is opened on first use and kept open.
+
+    Args:
+      username (Optional[str]): name of the user, which is the name of
+          the user profile directory, where None represents the only user.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry of the user.
+
+    Raises:
+      RequestError: if the user cannot be determined.
+    """
+    if self.scanner.IsSingleFileRegistry():
+      return self.scanner.registry
+
+    if self._user_profiles is None:
+      self._user_profiles = {}
+      for user_profile in self.scanner.GetUserProfiles():
+        _, _, profile_username = user_profile.profile_path.rpartition('\\')
+        self._user_profiles[profile_username.lower()] = user_profile
+
+    if not username:
+      if len(self._user_profiles) != 1:
+        usernames = ', '.join(sorted(self._user_profiles.keys()))
+        raise errors.RequestError(
+            f'Missing username, available usernames: {usernames:s}')
+
+      username = list(self._user_profiles.keys())[0]
+
+    lookup_username = username.lower()
+
+    registry = self.user_registries.get(lookup_username, None)
+    if not registry:
+      user_profile = self._user_profiles.get(lookup_username, None)
+      if not user_profile:
+        raise errors.RequestError(f'No such user: {username:s}')
+
+      registry = self.scanner.OpenUserRegistry(user_profile)
+      if not registry:
+        raise errors.RequestError(
+            f'Unable to open Windows Registry of user: {username:s}')
+
+      self.user_registries[lookup_username] = registry
+      self.memory_size += self._GetRegistryFilesSize([
+          f'{user_profile.profile_path:s}\\{path:s}'
+          for path in self._USER_REGISTRY_FILE_PATHS])
+
+    return registry
+
+
+class OpenSourcesCache(object):
+  """Cache of open sources.
+
+  The least recently used sources are closed when the number of open sources
+  or their total estimated memory size exceeds its maximum, and sources that
+  have not been used for longer than the idle timeout are closed.
+  """
+
+  def __init__(
+      self, idle_timeout=None, maximum_memory_size=None,
+      maximum_number_of_sources=None, number_of_prefetch_workers=0,
+      scan_cache=None):
+    """Initializes a cache of open sources.
+
+    Args:
+      idle_timeout (Optional[float]): number of seconds after which a source
+          that is not used is closed, where None represents no timeout.
+      maximum_memory_size (Optional[int]): maximum total estimated memory
+          size of the open sources in bytes, where None represents no
+          maximum.
+      maximum_number_of_sources (Optional[int]): maximum number of open
+          sources, where None represents no maximum.
+      number_of_prefetch_workers (Optional[int]): maximum number of Windows
+          Registry files to prefetch concurrently when a source is opened,
+          where 0 disables prefetching.
+      scan_cache (Optional[VolumeScanCache]): cache of volume scan results,
+          where None represents no cache.
+    """
+    super(OpenSourcesCache, self).__init__()
+    self._idle_timeout = idle_timeout
+    self._lock = threading.Lock()
+    self._maximum_memory_size = maximum_memory_size
+    self._maximum_number_of_sources = maximum_number_of_sources
+    self._number_of_prefetch_workers = number_of_prefetch_workers
+    self._open_sources = collections.OrderedDict()
+    self._opening_locks = {}
+    self._scan_cache = scan_cache
+
+  def _EvictLeastRecentlyUsed(self):
+    """Closes the least recently used sources that exceed the maximums.
+
+    The most recently used source is kept open, even if it exceeds
+    the maximum memory size by itself.
+    """
+    memory_size = sum(
+        open_source.memory_size for open_source in self._open_sources.values())
+
+    while len(self._open_sources) > 1:
+      if ((not self._maximum_number_of_sources or
+           len(self._open_sources) <= self._maximum_number_of_sources) and
+          (not self._maximum_memory_size or
+           memory_size <= self._maximum_memory_size)):
+        break
+
+      source_path, open_source = self._open_sources.popitem(last=False)
+      memory_size -= open_source.memory_size
+      logging.info(f'Closing least recently used source: {source_path:s}')
+      open_source.Close()
+
+  def _OpenSource(self, source_path):
+    """Opens a source.
+
+    Args:
+      source_path (str): path of the source.
+
+    Returns:
+      OpenSource: open source.
+
+    Raises:
+      RequestError: if the source cannot be opened.
+    """
+    logging.info(f'Opening source: {source_path:s}')
+
+    scanner = volume_scanner.WindowsRegistryVolumeScanner(
+        number_of_prefetch_workers=self._number_of_prefetch_workers,
+        scan_cache=self._scan_cache)
+
+    volume_scanner_options = volume_scanner.VolumeScannerOptions()
+    volume_scanner_options.partitions = ['all']
+    volume_scanner_options.snapshots = ['none']
+    volume_scanner_options.username = ['none']
+    volume_scanner_options.volumes = ['none']
+
+    try:
+      result = scanner.ScanForWindowsVolume(
+          source_path, options=volume_scanner_options)
+    except dfvfs_errors.Error as exception:
+      raise errors.RequestError((
+          f'Unable to scan source: {source_path:s} with error: '
+          f'{exception!s}'))
+
+    if not result:
+      raise errors.RequestError((
+          f'Unable to retrieve the volume with the Windows directory from: '
+          f'{source_path:s}'))
+
+    return OpenSource(source_path, scanner)
+
+  def CloseIdleSources(self):
+    """Closes the sources that have not been used within the idle timeout."""
+    if not self._idle_timeout:
+      return
+
+    idle_time = time.time() - self._idle_timeout
+
+    with self._lock:
+      for source_path, open_source in list(self._open_sources.items()):
+        if open_source.last_used_time < idle_time:
+          del self._open_sources[source_path]
+          logging.info(f'Closing idle source: {source_path:s}')
+          open_source.Close()
+
+  def GetOpenSource(self, source_path):
+    """Retrieves an open source.
+
+    Args:
+      source_path (str): path of the source.
+
+    Returns:
+      OpenSource: open source.
+
+    Raises:
+      RequestError: if the source cannot be opened.
+    """
+    source_path = os.path.abspath(source_path)
+
+    with self._lock:
+      open_source = self._open_sources.get(source_path, None)
+      if open_source:
+        self._open_sources.move_to_end(source_path)
+        open_source.last_used_time = time.time()
+        return open_source
+
+      opening_lock = self._opening_locks.setdefault(
+          source_path, threading.Lock())
+
+    # Sources are opened outside the cache lock, since scanning a source can
+    # take a while, but a source is only opened once.
+    with opening_lock:
+      with self._lock:
+        open_source = self._open_sources.get(source_path, None)
+
+      try:
+        if not open_source:
+          open_source = self._OpenSource(source_path)
+
+        with self._lock:
+          self._open_sources[source_path] = open_source
+          self._open_sources.move_to_end(source_path)
+          open_source.last_used_time = time.time()
+          self._EvictLeastRecentlyUsed()
+
+      finally:
+        with self._lock:
+          self._opening_locks.pop(source_path, None)
+
+    return open_source
+
+  def UpdateMemorySize(self):
+    """Closes the least recently used sources after their memory changed."""
+    with self._lock:
+      self._EvictLeastRecentlyUsed()
+
+
+class WindowsRegistryRequestHandler(socketserver.StreamRequestHandler):
+  """Windows Registry server request handler.
+
+  A request is a JSON object on a single line, such as:
+  {"collector": "services", "source": "/cases/image.raw"}
+
+  with the optional members "options", that contains the collector options,
+  such as {"all_control_sets": true}, and "username", that contains the name
+  of the user, whose Windows Registry is used by user collectors such as
+  "mru". The response is a JSON object on a single line, with the records
+  serialized by the record serializer as "records" or an error message as
+  "error". Multiple requests can be sent over the same connection.
+  """
+
+  # Collector functions and whether they use the Windows Registry of a user,
+  # per collector name.
+  _COLLECTORS = {
+      'mru': (_CollectMostRecentlyUsedEntries, True),
+      'profiles': (_CollectUserProfiles, False),
+      'sam': (_CollectUserAccounts, False),
+      'services': (_CollectWindowsServices, False),
+      'userassist': (_CollectUserAssistEntries, True)}
+
+  def _HandleRequest(self, request):
+    """Handles a request.
+
+    Args:
+      request (dict[str, object]): request.
+
+    Returns:
+      list[object]: records.
+
+    Raises:
+      RequestError: if the request cannot be answered.
+    """
+    if not isinstance(request, dict):
+      raise errors.RequestError('Unsupported request.')
+
+    collector_name = request.get('collector', None)
+    if not isinstance(collector_name, str):
+      raise errors.RequestError('Missing collector.')
+
+    collector_function, is_user_collector = self._COLLECTORS.get(
+        collector_name, (None, False))
+    if not collector_function:
+      collector_names = ', '.join(sorted(self._COLLECTORS.keys()))
+      raise errors.RequestError((
+          f'Unsupported collector: {collector_name!s}, supported collectors: '
+          f'{collector_names:s}'))
+
+    source_path = request.get('source', None)
+    if not isinstance(source_path, str):
+      raise errors.RequestError('Missing source.')
+
+    collector_options = request.get('options', None) or {}
+    if not isinstance(collector_options, dict):
+      raise errors.RequestError('Unsupported options.')
+
+    username = request.get('username', None)
+    if username is not None and not isinstance(username, str):
+      raise errors.RequestError('Unsupported username.')
+
+    open_sources = self.server.open_sources
+    open_source = open_sources.GetOpenSource(source_path)
+
+    with open_source.lock:
+      try:
+        if is_user_collector:
+          registry = open_source.GetUserRegistry(username=username)
+        else:
+          registry = open_source.scanner.registry
+
+        records = collector_function(registry, collector_options)
+
+      except errors.RequestError:
+        raise
+
+      except (dfvfs_errors.Error, errors.Error, IOError) as exception:
+        raise errors.RequestError((
+            f'Unable to collect: {collector_name:s} with error: '
+            f'{exception!s}'))
+
+    open_sources.UpdateMemorySize()
+
+    return records
+
+  def handle(self):
+    """Handles the requests of a connection."""
+    for line in self.rfile:
+      if not line.strip():
+        continue
+
+      try:
+        request = json.loads(line)
+        records = self._HandleRequest(request)
+        response = {
+            'records': serializers.RecordSerializer.ConvertValueToJSON(
+                records)}
+
+      except ValueError as exception:
+        response = {'error': f'Unsupported request: {exception!s}'}
+
+      except errors.RequestError as exception:
+        response = {'error': f'{exception!s}'}
+
+      except (dfvfs_errors.Error, errors.Error) as exception:
+        response = {'error': (
+            f'Unable to handle request with error: {exception!s}')}
+
+      # An unexpected error is returned as a response, so that it does not
+      # stop the thread that handles the connection.
+      except Exception as exception:  # pylint: disable=broad-exception-caught
+        logging.exception('Unable to handle request')
+        response = {'error': (
+            f'Unable to handle request with error: {exception!s}')}
+
+      response_data = json.dumps(response, separators=(',', ':'))
+      self.wfile.write(response_data.encode('utf-8'))
+      self.wfile.write(b'\n')
+      self.wfile.flush()
+
+
+class WindowsRegistryServer(
+    socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+  """Windows Registry server that listens on an Unix domain socket.
+
+  The server keeps the volume scan results, the Windows Registry files and
+  their cached keys of sources open between requests, so that a request does
+  not need to scan the source and open the Windows Registry files again.
+
+  The Unix domain socket can only be accessed by the user that runs
+  the server, since any source the server can read can be requested.
+
+  Attributes:
+    open_sources (OpenSourcesCache): cache of open sources.
+  """
+
+  daemon_threads = True
+
+  def __init__(self, socket_path, open_sources):
+    """Initializes a Windows Registry server.
+
+    Args:
+      socket_path (str): path of the Unix domain socket.
+      open_sources (OpenSourcesCache): cache of open sources.
+    """
+    super(WindowsRegistryServer, self).__init__(
+        socket_path, WindowsRegistryRequestHandler)
+    self.open_sources = open_sources
+
+  def server_bind(self):
+    """Binds the Unix domain socket with mode 0600."""
+    # The umask is set during bind, so that the socket is never accessible
+    # by other users.
+    umask = os.umask(0o177)
+    try:
+      super(WindowsRegistryServer, self).server_bind()
+    finally:
+      os.umask(umask)
+
+  def service_actions(self):
+    """Closes idle sources, which is called by serve_forever between polls."""
+    self.open_sources.CloseIdleSources()
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 """Windows services and drivers collector."""
 
+import hashlib
+
+from dfdatetime import semantic_time as dfdatetime_semantic_time
+
 from winregrc import interface
 
 
@@ -17,6 +21,14 @@ class WindowsService(object):
     start_value (str): start value.
   """
 
+  ATTRIBUTE_NAMES = (
+      'description', 'display_name', 'image_path', 'name', 'object_name',
+      'service_type', 'start_value')
+
+  __slots__ = (
+      'description', 'display_name', 'image_path', 'name', 'object_name',
+      'service_type', 'start_value')
+
   _OBJECT_NAME_DESCRIPTIONS = {
       0x00000010: 'Account name',
       0x00000020: 'Account name',
@@ -121,9 +133,75 @@ class WindowsService(object):
         self.start_value, f'Unknown 0x{self.start_value:08x}')
 
 
+class WindowsServiceChange(object):
+  """Windows service change.
+
+  Attributes:
+    change_type (str): type of change, which is "added", "changed" or
+        "removed".
+    changed_attributes (list[str]): names of the Windows service attributes
+        that changed.
+    name (str): name of the service.
+    original_service (WindowsService): Windows service before the change or
+        None if the service was added.
+    original_source (str): source of the Windows service before the change,
+        such as "ControlSet001".
+    service (WindowsService): Windows service after the change or None if
+        the service was removed.
+    source (str): source of the Windows service after the change, such as
+        "ControlSet002".
+  """
+
+  __slots__ = (
+      'change_type', 'changed_attributes', 'name', 'original_service',
+      'original_source', 'service', 'source')
+
+  def __init__(self, original_service, original_source, service, source):
+    """Initializes a Windows service change.
+
+    Args:
+      original_service (WindowsService): Windows service before the change or
+          None if the service was added.
+      original_source (str): source of the Windows service before the change.
+      service (WindowsService): Windows service after the change or None if
+          the service was removed.
+      source (str): source of the Windows service after the change.
+    """
+    super(WindowsServiceChange, self).__init__()
+    self.changed_attributes = []
+    self.original_service = original_service
+    self.original_source = original_source
+    self.service = service
+    self.source = source
+
+    if not original_service:
+      self.change_type = 'added'
+      self.name = service.name
+
+    elif not service:
+      self.change_type = 'removed'
+      self.name = original_service.name
+
+    else:
+      self.change_type = 'changed'
+      self.name = service.name
+
+      for attribute_name in WindowsService.ATTRIBUTE_NAMES:
+        if (getattr(original_service, attribute_name) !=
+            getattr(service, attribute_name)):
+          self.changed_attributes.append(attribute_name)
+
+
 class WindowsServicesCollector(interface.WindowsRegistryKeyCollector):
   """Windows services and drivers collector."""
 
+  _CURRENT_SERVICES_KEY_PATH = (
+      'HKEY_LOCAL_MACHINE\\System\\CurrentControlSet\\Services')
+
+  # Names of the values that define the attributes of a Windows service.
+  _SERVICE_VALUE_NAMES = (
+      'Description', 'DisplayName', 'ImagePath', 'ObjectName', 'Start', 'Type')
+
   def _CollectWindowsServicesFromServicesKey(self, services_key):
     """Collects the Windows services from a services key.
 
@@ -134,16 +212,7 @@ class WindowsServicesCollector(interface.WindowsRegistryKeyCollector):
       WindowsService: a Windows service.
     """
     for service_key in services_key.GetSubkeys():
-      display_name = self._GetStringValueFromKey(service_key, 'DisplayName')
-      description = self._GetValueFromKey(service_key, 'Description')
-      image_path = self._GetValueFromKey(service_key, 'ImagePath')
-      object_name = self._GetValueFromKey(service_key, 'ObjectName')
-      start_value = self._GetValueFromKey(service_key, 'Start')
-      type_value = self._GetValueFromKey(service_key, 'Type')
-
-      yield WindowsService(
-          service_key.name, type_value, display_name, description, image_path,
-          object_name, start_value)
+      yield self._GetWindowsServiceFromKey(service_key)
 
   def _CollectWindowsServicesFromSystemKey(self, system_key):
     """Collects the Windows services from a system key.
@@ -160,6 +229,150 @@ class WindowsServicesCollector(interface.WindowsRegistryKeyCollector):
         if services_key:
           yield from self._CollectWindowsServicesFromServicesKey(services_key)
 
+  def _CompareServicesKeys(
+      self, original_services_key, original_service_digests, original_source,
+      services_key, service_digests, source):
+    """Compares the Windows services of two services keys.
+
+    Only the Windows services with a different digest are read again to
+    determine the change.
+
+    Args:
+      original_services_key (dfwinreg.WinRegistryKey): services Windows
+          Registry key to compare against.
+      original_service_digests (dict[str, tuple[bytes, str]]): digest and
+          name of the Windows services in the services key to compare
+          against, per lower case name.
+      original_source (str): source of the services key to compare against.
+      services_key (dfwinreg.WinRegistryKey): services Windows Registry key.
+      service_digests (dict[str, tuple[bytes, str]]): digest and name of the
+          Windows services in the services key, per lower case name.
+      source (str): source of the services key.
+
+    Yields:
+      WindowsServiceChange: a Windows service change.
+    """
+    lookup_names = set(original_service_digests.keys())
+    lookup_names.update(service_digests.keys())
+
+    for lookup_name in sorted(lookup_names):
+      original_digest, original_name = original_service_digests.get(
+          lookup_name, (None, None))
+      digest, name = service_digests.get(lookup_name, (None, None))
+      if original_digest == digest:
+        continue
+
+      original_service = None
+      if original_name:
+        service_key = original_services_key.GetSubkeyByName(original_name)
+        original_service = self._GetWindowsServiceFromKey(service_key)
+
+      service = None
+      if name:
+        service_key = services_key.GetSubkeyByName(name)
+        service = self._GetWindowsServiceFromKey(service_key)
+
+      # Value data that differs can still represent the same attribute values.
+      if original_service == service:
+        continue
+
+      yield WindowsServiceChange(
+          original_service, original_source, service, source)
+
+  def _GetServiceDigests(self, services_key, include_last_written_time=False):
+    """Retrieves the digests of the Windows services in a services key.
+
+    Args:
+      services_key (dfwinreg.WinRegistryKey): services Windows Registry key.
+      include_last_written_time (Optional[bool]): True if the last written
+          time of the Windows service keys should be included in the digests.
+
+    Returns:
+      tuple[dict[str, tuple[bytes, str]], bytes]: digest and name of the
+          Windows services, per lower case name, and the digest of all the
+          Windows services in the services key.
+    """
+    service_digests = {}
+    for service_key in services_key.GetSubkeys():
+      lookup_name = service_key.name.lower()
+      if lookup_name in service_digests:
+        # TODO: print warning.
+        continue
+
+      service_digest = self._GetServiceKeyDigest(
+          service_key, include_last_written_time=include_last_written_time)
+      service_digests[lookup_name] = (service_digest, service_key.name)
+
+    services_digest = hashlib.blake2b(digest_size=16)
+    for lookup_name in sorted(service_digests.keys()):
+      service_digest, _ = service_digests[lookup_name]
+      services_digest.update(service_digest)
+
+    return service_digests, services_digest.digest()
+
+  def _GetServiceKeyDigest(self, service_key, include_last_written_time=False):
+    """Retrieves the digest of a Windows service key.
+
+    The digest is calculated over the name of the key and the data type and
+    data of the values that define a Windows service, so that a change that
+    preserves the last written time of the key, for example by a tool that
+    restores it, is still detected.
+
+    The last written time of the key is an optional extra input. It is not
+    included when comparing control sets, since their copies of a key have
+    different last written times.
+
+    Args:
+      service_key (dfwinreg.WinRegistryKey): Windows service Registry key.
+      include_last_written_time (Optional[bool]): True if the last written
+          time of the key should be included in the digest.
+
+    Returns:
+      bytes: digest of the Windows service key.
+    """
+    digest = hashlib.blake2b(
+        service_key.name.encode('utf-8', errors='surrogatepass'),
+        digest_size=16)
+
+    last_written_time = service_key.last_written_time
+    if include_last_written_time and last_written_time and not isinstance(
+        last_written_time, dfdatetime_semantic_time.SemanticTime):
+      date_time_string = last_written_time.CopyToDateTimeString()
+      digest.update(date_time_string.encode('ascii'))
+
+    for value_name in self._SERVICE_VALUE_NAMES:
+      registry_value = service_key.GetValueByName(value_name)
+      if not registry_value:
+        digest.update(b'\xff\xff\xff\xff')
+        continue
+
+      value_data = registry_value.data or b''
+      digest.update(registry_value.data_type.to_bytes(4, 'little'))
+      digest.update(len(value_data).to_bytes(4, 'little'))
+      digest.update(value_data)
+
+    return digest.digest()
+
+  def _GetWindowsServiceFromKey(self, service_key):
+    """Retrieves a Windows service from a Windows service key.
+
+    Args:
+      service_key (dfwinreg.WinRegistryKey): Windows service Registry key.
+
+    Returns:
+      WindowsService: a Windows service.
+    """
+    display_name = self._GetStringValueFromKey(service_key, 'DisplayName')
+    description = self._GetValueFromKey(service_key, 'Description')
+    image_path = self._GetValueFromKey(service_key, 'ImagePath')
+    object_name = self._GetValueFromKey(service_key, 'ObjectName')
+    start_value = self._GetValueFromKey(service_key, 'Start')
+    type_value = self._GetValueFromKey(service_key, 'Type')
+
+    return WindowsService(
+        service_key.name, type_value, display_name, description, image_path,
+        object_name, start_value)
+
   def Collect(self, registry, all_control_sets=False):
     """Collects Windows services and drivers.
 
@@ -178,67 +391,76 @@ class WindowsServicesCollector(interface.WindowsRegistryKeyCollector):
         yield from self._CollectWindowsServicesFromSystemKey(system_key)
 
     else:
-      services_key = registry.GetKeyByPath(
-          'HKEY_LOCAL_MACHINE\\System\\CurrentControlSet\\Services')
+      services_key = registry.GetKeyByPath(self._CURRENT_SERVICES_KEY_PATH)
       if services_key:
         yield from self._CollectWindowsServicesFromServicesKey(services_key)
 
-  def Compare(self, registry, output_writer):
-    """Compares services in the different control sets.
+  def Compare(self, registry, other_registry=None):
+    """Compares Windows services and drivers.
+
+    Without another Windows Registry the services of every control set are
+    compared against those of the first control set. With another Windows
+    Registry, for example of a later snapshot of the same system, the
+    services of the current control sets are compared. Control sets with
+    the same digest of all their services are skipped as a whole.
 
     Args:
       registry (dfwinreg.WinRegistry): Windows Registry.
-      output_writer (OutputWriter): output writer.
+      other_registry (Optional[dfwinreg.WinRegistry]): other Windows Registry
+          to compare against.
 
-    Returns:
-      bool: True if the services key was found, False if not.
+    Yields:
+      WindowsServiceChange: a Windows service change.
     """
+    if other_registry:
+      original_services_key = registry.GetKeyByPath(
+          self._CURRENT_SERVICES_KEY_PATH)
+      services_key = other_registry.GetKeyByPath(
+          self._CURRENT_SERVICES_KEY_PATH)
+      if not original_services_key or not services_key:
+        return
+
+      original_service_digests, original_services_digest = (
+          self._GetServiceDigests(
+              original_services_key, include_last_written_time=True))
+      service_digests, services_digest = self._GetServiceDigests(
+          services_key, include_last_written_time=True)
+
+      if original_services_digest != services_digest:
+        yield from self._CompareServicesKeys(
+            original_services_key, original_service_digests,
+            'CurrentControlSet', services_key, service_digests,
+            'CurrentControlSet')
+
+      return
+
     system_key = registry.GetKeyByPath('HKEY_LOCAL_MACHINE\\System')
     if not system_key:
-      return False
-
-    result = False
-    control_sets = []
-    service_names = set()
-    for control_set_key in system_key.GetSubkeys():
-      if control_set_key.name.startswith('ControlSet'):
-        services_key = control_set_key.GetSubkeyByName('Services')
-        if not services_key:
-          continue
-
-        result = True
-
-        services = {}
-        for windows_service in self._CollectWindowsServicesFromServicesKey(
-            services_key):
-          if windows_service.name in services:
-            # TODO: print warning.
-            continue
-
-          windows_service_name = windows_service.name.lower()
-          service_names.add(windows_service_name)
-          services[windows_service_name] = windows_service
+      return
 
-        control_sets.append(services)
+    original_services_digest = None
+    original_services_key = None
+    original_service_digests = None
+    original_source = None
 
-    number_of_control_sets = len(control_sets)
-    for name in service_names:
-      services_diff = set()
-
-      windows_service = control_sets[0].get(name, None)
-      for control_set_index in range(1, number_of_control_sets):
-        control_set = control_sets[control_set_index]
-
-        compare_windows_service = control_set.get(name, None)
-        if windows_service != compare_windows_service:
-          services_diff.add(windows_service)
-          services_diff.add(compare_windows_service)
-
-      for windows_service in services_diff:
-        if not windows_service:
-          if self._debug:
-            print('Not defined')
-        else:
-          output_writer.WriteWindowsService(windows_service)
-
-    return result
+    for control_set_key in system_key.GetSubkeys():
+      if not control_set_key.name.startswith('ControlSet'):
+        continue
+
+      services_key = control_set_key.GetSubkeyByName('Services')
+      if not services_key:
+        continue
+
+      service_digests, services_digest = self._GetServiceDigests(services_key)
+
+      if not original_services_key:
+        original_services_key = services_key
+        original_service_digests = service_digests
+        original_services_digest = services_digest
+        original_source = control_set_key.name
+
+      elif original_services_digest != services_digest:
+        yield from self._CompareServicesKeys(
+            original_services_key, original_service_digests,
+            original_source, services_key, service_digests,
+            control_set_key.name)
@@ -15,6 +15,9 @@ class WindowsShellFolder(object):
     localized_string (str): localized string of the name.
   """
 
+  __slots__ = (
+      'alternate_names', 'class_name', 'identifier', 'localized_string', 'name')
+
   def __init__(self, identifier=None, localized_string=None):
     """Initializes a Windows Shell folder.
 
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""Collector of records from the Volume Shadow Copy snapshots of a volume."""
+
+import concurrent.futures
+import hashlib
+
+
+class SnapshotRecords(object):
+  """Records collected from the current volume or a snapshot.
+
+  Attributes:
+    identical_snapshot_identifier (str): identifier of the current volume or
+        an earlier snapshot with identical Windows Registry files, in which
+        case the records of that snapshot are used instead of collecting
+        them again, or None if not set.
+    records (list[object]): records, such as Windows services.
+    snapshot_identifier (str): identifier of the snapshot, such as "vss1",
+        or "current" for the current volume.
+  """
+
+  __slots__ = (
+      'identical_snapshot_identifier', 'records', 'snapshot_identifier')
+
+  def __init__(self, snapshot_identifier):
+    """Initializes snapshot records.
+
+    Args:
+      snapshot_identifier (str): identifier of the snapshot.
+    """
+    super(SnapshotRecords, self).__init__()
+    self.identical_snapshot_identifier = None
+    self.records = []
+    self.snapshot_identifier = snapshot_identifier
+
+
+class SnapshotRecordsCollector(object):
+  """Collector of records from the Volume Shadow Copy snapshots of a volume.
+
+  The records are collected from the current volume and each snapshot, where
+  the Windows Registry of each snapshot is opened separately, so that
+  the snapshots can be processed concurrently.
+
+  Snapshots often contain Windows Registry files that are identical to those
+  of the current volume or another snapshot. The Windows Registry files that
+  are needed are therefore hashed first and records are only collected from
+  the first of the snapshots with identical Windows Registry files.
+  """
+
+  CURRENT_VOLUME_IDENTIFIER = 'current'
+
+  def __init__(
+      self, scanner, collect_function, registry_file_paths,
+      number_of_workers=1, profiler=None):
+    """Initializes a collector of records from snapshots.
+
+    Args:
+      scanner (WindowsRegistryVolumeScanner): volume scanner, that found
+          the Windows volume.
+      collect_function (function): function that collects the records from
+          the Windows Registry of a snapshot, which is passed as its argument.
+      registry_file_paths (list[str]): Windows paths of the Windows Registry
+          files the records are collected from, such as
+          "%SystemRoot%\\System32\\config\\SYSTEM".
+      number_of_workers (Optional[int]): maximum number of snapshots to
+          process concurrently.
+      profiler (Optional[ScriptProfiler]): profiler, where the snapshots are
+          processed sequentially when profiling.
+    """
+    super(SnapshotRecordsCollector, self).__init__()
+    self._collect_function = collect_function
+    self._number_of_workers = number_of_workers
+    self._profiler = profiler
+    self._registry_file_paths = registry_file_paths
+    self._scanner = scanner
+
+  def _CollectSnapshotRecords(self, snapshot_identifier):
+    """Collects the records of a snapshot.
+
+    Args:
+      snapshot_identifier (str): identifier of the snapshot.
+
+    Returns:
+      list[object]: records of the snapshot.
+    """
+    if snapshot_identifier == self.CURRENT_VOLUME_IDENTIFIER:
+      registry = self._scanner.registry
+    else:
+      registry = self._scanner.OpenSnapshotRegistry(snapshot_identifier)
+
+    if not registry:
+      return []
+
+    return list(self._collect_function(registry))
+
+  def _GetRegistryFilesHash(self, snapshot_identifier):
+    """Calculates a hash of the Windows Registry files of a snapshot.
+
+    Args:
+      snapshot_identifier (str): identifier of the snapshot.
+
+    Returns:
+      str: hexadecimal SHA-256 hash of the hashes of the Windows Registry
+          files.
+    """
+    if snapshot_identifier == self.CURRENT_VOLUME_IDENTIFIER:
+      snapshot_identifier = None
+
+    hash_context = hashlib.sha256()
+    for path in self._registry_file_paths:
+      file_hash = self._scanner.GetRegistryFileHash(
+          path, snapshot_identifier=snapshot_identifier)
+      hash_context.update(f'{path:s}:{file_hash or "":s}\n'.encode('utf-8'))
+
+    return hash_context.hexdigest()
+
+  def _Map(self, function, snapshot_identifiers):
+    """Applies a function to snapshots, optionally by multiple workers.
+
+    Args:
+      function (function): function that is passed a snapshot identifier.
+      snapshot_identifiers (list[str]): identifiers of the snapshots.
+
+    Returns:
+      list[object]: results of the function, in the order of the snapshots.
+    """
+    number_of_workers = min(self._number_of_workers, len(snapshot_identifiers))
+
+    if self._profiler or number_of_workers <= 1:
+      return [function(identifier) for identifier in snapshot_identifiers]
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=number_of_workers) as executor:
+      return list(executor.map(function, snapshot_identifiers))
+
+  def Collect(self):
+    """Collects the records of the current volume and its snapshots.
+
+    Yields:
+      SnapshotRecords: records of the current volume or a snapshot, in
+          the order of the current volume followed by the snapshots from
+          oldest to newest.
+    """
+    snapshot_identifiers = [self.CURRENT_VOLUME_IDENTIFIER]
+    snapshot_identifiers.extend(self._scanner.GetSnapshotIdentifiers())
+
+    registry_files_hashes = self._Map(
+        self._GetRegistryFilesHash, snapshot_identifiers)
+
+    snapshot_identifier_per_hash = {}
+    unique_snapshot_identifiers = []
+
+    snapshot_records_list = []
+    for snapshot_identifier, registry_files_hash in zip(
+        snapshot_identifiers, registry_files_hashes):
+      snapshot_records = SnapshotRecords(snapshot_identifier)
+      snapshot_records_list.append(snapshot_records)
+
+      identical_snapshot_identifier = snapshot_identifier_per_hash.get(
+          registry_files_hash, None)
+      if identical_snapshot_identifier:
+        snapshot_records.identical_snapshot_identifier = (
+            identical_snapshot_identifier)
+      else:
+        snapshot_identifier_per_hash[registry_files_hash] = snapshot_identifier
+        unique_snapshot_identifiers.append(snapshot_identifier)
+
+    records_per_snapshot = dict(zip(
+        unique_snapshot_identifiers,
+        self._Map(self._CollectSnapshotRecords, unique_snapshot_identifiers)))
+
+    for snapshot_records in snapshot_records_list:
+      snapshot_identifier = (
+          snapshot_records.identical_snapshot_identifier or
+          snapshot_records.snapshot_identifier)
+      snapshot_records.records = records_per_snapshot[snapshot_identifier]
+      yield snapshot_records
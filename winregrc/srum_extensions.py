@@ -12,6 +12,8 @@ class SRUMExtension(object):
     guid (str): identifier.
   """
 
+  __slots__ = ('dll_name', 'guid')
+
   def __init__(self, guid, dll_name):
     """Initializes a System Resource Usage Monitor (SRUM) extension.
 
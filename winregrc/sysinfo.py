@@ -24,6 +24,11 @@ class SystemInformation(object):
     system_root (str): system root path.
   """
 
+  __slots__ = (
+      'csd_version', 'current_build_number', 'current_type', 'current_version',
+      'installation_date', 'path_name', 'product_identifier', 'product_name',
+      'registered_organization', 'registered_owner', 'system_root')
+
   def __init__(self):
     """Initializes system information."""
     super(SystemInformation, self).__init__()
@@ -2,12 +2,11 @@
 """Task Cache collector."""
 
 import logging
+import struct
 
 from dfdatetime import filetime as dfdatetime_filetime
 from dfdatetime import semantic_time as dfdatetime_semantic_time
 
-from dtfabric import errors as dtfabric_errors
-
 from winregrc import data_format
 from winregrc import errors
 from winregrc import interface
@@ -22,8 +21,14 @@ class CachedTask(object):
         date and time.
     launch_time (dfdatetime.DateTimeValues): launch date and time.
     name (str): name.
+    path (str): path of the task in the Tree key, such as
+        "\\Microsoft\\Windows\\Location\\Notifications", or None if not
+        available.
   """
 
+  __slots__ = (
+      'identifier', 'last_registered_time', 'launch_time', 'name', 'path')
+
   def __init__(self):
     """Initializes a cached task."""
     super(CachedTask, self).__init__()
@@ -31,6 +36,7 @@ class CachedTask(object):
     self.last_registered_time = None
     self.launch_time = None
     self.name = None
+    self.path = None
 
 
 class TaskCacheDataParser(data_format.BinaryDataFormat):
@@ -38,6 +44,13 @@ class TaskCacheDataParser(data_format.BinaryDataFormat):
 
   _DEFINITION_FILE = 'task_cache.yaml'
 
+  # The DynamicInfo records are of a fixed size and are read for every task,
+  # hence they are unpacked with struct instead of dtFabric. The layouts
+  # correspond to dynamic_info_record and dynamic_info2_record.
+  _DYNAMIC_INFO_RECORDS = {
+      28: struct.Struct('<IQQII'),
+      36: struct.Struct('<IQQIIQ')}
+
   def __init__(self, debug=False, output_writer=None):
     """Initializes a Task Cache data parser.
 
@@ -81,59 +94,37 @@ class TaskCacheDataParser(data_format.BinaryDataFormat):
 
     value_data_size = len(value_data)
 
-    if value_data_size == 28:
-      data_type_map = self._GetDataTypeMap('dynamic_info_record')
-    elif value_data_size == 36:
-      data_type_map = self._GetDataTypeMap('dynamic_info2_record')
-    else:
-      data_type_map = None
-
-    if not data_type_map:
+    dynamic_info_record = self._DYNAMIC_INFO_RECORDS.get(value_data_size, None)
+    if not dynamic_info_record:
       raise errors.ParseError(
           f'Unsupported value data size: {value_data_size:d}.')
 
-    try:
-      dynamic_info = data_type_map.MapByteStream(value_data)
-    except (
-        dtfabric_errors.ByteStreamTooSmallError,
-        dtfabric_errors.MappingError) as exception:
-      raise errors.ParseError(exception)
+    dynamic_info = dynamic_info_record.unpack(value_data)
 
-    cached_task.last_registered_time = self._ParseFiletime(
-        dynamic_info.last_registered_time)
-    cached_task.launch_time = self._ParseFiletime(
-        dynamic_info.launch_time)
+    cached_task.last_registered_time = self._ParseFiletime(dynamic_info[1])
+    cached_task.launch_time = self._ParseFiletime(dynamic_info[2])
 
     if self._debug:
-      self._output_writer.WriteValue(
-          'Unknown1', f'0x{dynamic_info.unknown1:08x}')
+      self._output_writer.WriteValue('Unknown1', f'0x{dynamic_info[0]:08x}')
 
       # Note this is likely either the last registered time or
       # the update time.
-      self._DebugPrintFiletimeValue(
-          'Last registered time', dynamic_info.last_registered_time)
+      self._DebugPrintFiletimeValue('Last registered time', dynamic_info[1])
 
       # Note this is likely the launch time.
-      self._DebugPrintFiletimeValue('Launch time', dynamic_info.launch_time)
-
-      self._output_writer.WriteValue(
-          'Unknown2', f'0x{dynamic_info.unknown2:08x}')
+      self._DebugPrintFiletimeValue('Launch time', dynamic_info[2])
 
-      self._output_writer.WriteValue(
-          'Unknown3', f'0x{dynamic_info.unknown3:08x}')
+      self._output_writer.WriteValue('Unknown2', f'0x{dynamic_info[3]:08x}')
+      self._output_writer.WriteValue('Unknown3', f'0x{dynamic_info[4]:08x}')
 
-      if dynamic_info.unknown_time is not None:
-        self._DebugPrintFiletimeValue('Unknown time', dynamic_info.unknown_time)
+      if value_data_size == 36:
+        self._DebugPrintFiletimeValue('Unknown time', dynamic_info[5])
 
       self._output_writer.WriteText('')
 
 
 class TaskCacheCollector(interface.WindowsRegistryKeyCollector):
-  """Task Cache collector.
-
-  Attributes:
-    cached_tasks (list[CachedTask]): cached tasks.
-  """
+  """Task Cache collector."""
 
   _TASK_CACHE_KEY_PATH = (
       'HKEY_LOCAL_MACHINE\\Software\\Microsoft\\Windows NT\\CurrentVersion\\'
@@ -149,70 +140,86 @@ class TaskCacheCollector(interface.WindowsRegistryKeyCollector):
     super(TaskCacheCollector, self).__init__(debug=debug)
     self._parser = TaskCacheDataParser(debug=debug, output_writer=output_writer)
     self._output_writer = output_writer
-    self.cached_tasks = []
 
-  def _GetIdValue(self, registry_key):
-    """Retrieves the Id value from Task Cache Tree key.
+  def _GetTaskPathsPerIdentifier(self, tree_key):
+    """Retrieves the task paths per identifier from the Task Cache Tree key.
+
+    The Tree key is walked iteratively, instead of recursively, since it can
+    be deeply nested.
 
     Args:
-      registry_key (dfwinreg.WinRegistryKey): Windows Registry key.
+      tree_key (dfwinreg.WinRegistryKey): Task Cache Tree Windows Registry
+          key.
 
-    Yields:
-      tuple[dfwinreg.WinRegistryKey, dfwinreg.WinRegistryValue]: Windows
-          Registry key and value.
+    Returns:
+      dict[str, str]: task paths, relative to the Tree key, per lower case
+          task identifier.
     """
-    id_value = registry_key.GetValueByName('Id')
-    if id_value:
-      yield registry_key, id_value
+    task_paths = {}
+
+    keys_to_walk = [(subkey, '') for subkey in tree_key.GetSubkeys()]
+    while keys_to_walk:
+      registry_key, parent_path = keys_to_walk.pop()
+      key_path = '\\'.join([parent_path, registry_key.name])
+
+      id_value = registry_key.GetValueByName('Id')
+      if id_value:
+        # TODO: improve this check to a regex.
+        # The GUID is in the form {%GUID%} and stored an UTF-16 little-endian
+        # string and should be 78 bytes in size.
+        id_value_data_size = len(id_value.data)
+        if id_value_data_size != 78:
+          logging.error(
+              f'Unsupported Id value data size: {id_value_data_size:d}.')
+        else:
+          guid_string = id_value.GetDataAsObject().rstrip('\x00')
+          task_paths[guid_string.lower()] = key_path
 
-    for subkey in registry_key.GetSubkeys():
-      for value_key, id_value in self._GetIdValue(subkey):
-        yield value_key, id_value
+      keys_to_walk.extend([
+          (subkey, key_path) for subkey in registry_key.GetSubkeys()])
 
-  def Collect(self, registry):  # pylint: disable=arguments-differ
+    return task_paths
+
+  def Collect(self, registry):
     """Collects the Task Cache.
 
     Args:
       registry (dfwinreg.WinRegistry): Windows Registry.
 
-    Returns:
-      bool: True if the Task Cache key was found, False if not.
+    Yields:
+      CachedTask: a cached task.
     """
     dynamic_info_size_error_reported = False
 
     task_cache_key = registry.GetKeyByPath(self._TASK_CACHE_KEY_PATH)
     if not task_cache_key:
-      return False
+      return
 
     tasks_key = task_cache_key.GetSubkeyByName('Tasks')
-    tree_key = task_cache_key.GetSubkeyByName('Tree')
+    if not tasks_key:
+      return
 
-    if not tasks_key or not tree_key:
-      return False
+    task_paths = {}
 
-    task_guids = {}
-    for subkey in tree_key.GetSubkeys():
-      for value_key, id_value in self._GetIdValue(subkey):
-        # TODO: improve this check to a regex.
-        # The GUID is in the form {%GUID%} and stored an UTF-16 little-endian
-        # string and should be 78 bytes in size.
-
-        id_value_data_size = len(id_value.data)
-        if id_value_data_size != 78:
-          logging.error('Unsupported Id value data size: {0:s}.')
-          continue
-
-        guid_string = id_value.GetDataAsObject()
-        task_guids[guid_string] = value_key.name
+    tree_key = task_cache_key.GetSubkeyByName('Tree')
+    if tree_key:
+      task_paths = self._GetTaskPathsPerIdentifier(tree_key)
 
     for subkey in tasks_key.GetSubkeys():
       dynamic_info_value = subkey.GetValueByName('DynamicInfo')
       if not dynamic_info_value:
         continue
 
+      task_path = task_paths.get(subkey.name.lower(), None)
+
       cached_task = CachedTask()
       cached_task.identifier = subkey.name
-      cached_task.name = task_guids.get(subkey.name, subkey.name)
+      cached_task.path = task_path
+
+      if task_path:
+        _, _, cached_task.name = task_path.rpartition('\\')
+      else:
+        cached_task.name = subkey.name
 
       if self._debug:
         if (task_cache_key.last_written_time and
@@ -232,6 +239,13 @@ class TaskCacheCollector(interface.WindowsRegistryKeyCollector):
           dynamic_info_size_error_reported = True
         continue
 
-      self.cached_tasks.append(cached_task)
+      yield cached_task
+
+  def SetRegistryAccessStatistics(self, statistics):
+    """Sets the Windows Registry access statistics.
 
-    return True
+    Args:
+      statistics (RegistryAccessStatistics): statistics to update.
+    """
+    super(TaskCacheCollector, self).SetRegistryAccessStatistics(statistics)
+    self._parser.SetRegistryAccessStatistics(statistics)
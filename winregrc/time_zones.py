@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 """Windows time zones collector."""
 
+import array
+import bisect
+import calendar
+import datetime
+
 from winregrc import data_format
 from winregrc import errors
 from winregrc import interface
@@ -13,8 +18,12 @@ class TimeZone(object):
     localized_name (str): localized name.
     name (str): name.
     offset (int): time zone offset in number of minutes from UTC.
+    transition_table (TimeZoneTransitionTable): standard and daylight
+        transitions of the time zone or None if not available.
   """
 
+  __slots__ = ('localized_name', 'name', 'offset', 'transition_table')
+
   def __init__(self, name):
     """Initializes a time zone.
 
@@ -25,6 +34,123 @@ class TimeZone(object):
     self.localized_name = None
     self.name = name
     self.offset = 0
+    self.transition_table = None
+
+
+class TimeZoneTransitionTable(object):
+  """Time zone transition table.
+
+  The table consists of two arrays, one with the local date and time of every
+  transition, as a FILETIME timestamp in ascending order, and one with the
+  bias, in number of minutes, that applies from that transition onward, where
+  UTC = local date and time + bias. Local date and time before the first
+  transition use the bias of the first transition.
+
+  Note that local date and time that are ambiguous or do not exist due to
+  a transition are converted with the bias of the preceding transition.
+  """
+
+  __slots__ = ('_biases', '_timestamps')
+
+  _BIAS_MULTIPLIER = 60 * 10000000
+
+  def __init__(self):
+    """Initializes a time zone transition table."""
+    super(TimeZoneTransitionTable, self).__init__()
+    self._biases = array.array('l')
+    self._timestamps = array.array('q')
+
+  def __len__(self):
+    """Retrieves the number of transitions.
+
+    Returns:
+      int: number of transitions.
+    """
+    return len(self._timestamps)
+
+  def AddTransition(self, timestamp, bias):
+    """Adds a transition.
+
+    Transitions must be added in ascending order. A transition with the same
+    bias as the previous transition is not stored.
+
+    Args:
+      timestamp (int): local date and time of the transition as a FILETIME
+          timestamp.
+      bias (int): bias in number of minutes from the transition onward.
+
+    Raises:
+      ValueError: if the transition is before the previous transition.
+    """
+    if self._timestamps:
+      if timestamp < self._timestamps[-1]:
+        raise ValueError('Transition before previous transition.')
+
+      if timestamp == self._timestamps[-1]:
+        del self._timestamps[-1]
+        del self._biases[-1]
+
+      if self._biases and self._biases[-1] == bias:
+        return
+
+    self._timestamps.append(timestamp)
+    self._biases.append(bias)
+
+  def CopyLocalTimesToUTC(self, timestamps):
+    """Converts local date and time values to UTC.
+
+    The timestamps are converted in one pass, where the bounds of the current
+    transition are reused for consecutive timestamps within them, so that
+    sorted or clustered timestamps mostly do not require a lookup.
+
+    Args:
+      timestamps (Iterable[int]): local date and time values as FILETIME
+          timestamps.
+
+    Returns:
+      array.array[int]: UTC date and time values as FILETIME timestamps.
+
+    Raises:
+      ValueError: if the transition table is empty.
+    """
+    if not self._timestamps:
+      raise ValueError('Missing transitions.')
+
+    transition_timestamps = self._timestamps
+    number_of_transitions = len(transition_timestamps)
+
+    utc_timestamps = array.array('q')
+
+    lower_bound = upper_bound = 0
+    bias = 0
+    for timestamp in timestamps:
+      if not lower_bound <= timestamp < upper_bound:
+        index = bisect.bisect_right(transition_timestamps, timestamp) - 1
+        if index < 0:
+          index = 0
+          lower_bound = -(2 ** 63)
+        else:
+          lower_bound = transition_timestamps[index]
+
+        if index + 1 < number_of_transitions:
+          upper_bound = transition_timestamps[index + 1]
+        else:
+          upper_bound = 2 ** 63
+
+        bias = self._biases[index] * self._BIAS_MULTIPLIER
+
+      utc_timestamps.append(timestamp + bias)
+
+    return utc_timestamps
+
+  def GetTransitions(self):
+    """Retrieves the transitions.
+
+    Returns:
+      list[tuple[int, int]]: local date and time as a FILETIME timestamp and
+          bias in number of minutes of every transition.
+    """
+    return list(zip(self._timestamps, self._biases))
 
 
 class TimeZoneInformationDataParser(data_format.BinaryDataFormat):
@@ -39,6 +165,8 @@ class TimeZoneInformationDataParser(data_format.BinaryDataFormat):
 
   _DEFINITION_FILE = 'time_zone_information.yaml'
 
+  _FILETIME_EPOCH_ORDINAL = datetime.date(1601, 1, 1).toordinal()
+
   _MONTHS = [
       '', 'January', 'February', 'March', 'April', 'May', 'June', 'July',
       'August', 'September', 'October', 'November', 'December']
@@ -59,25 +187,95 @@ class TimeZoneInformationDataParser(data_format.BinaryDataFormat):
       str: formatted SYSTEMTIME structure.
     """
     if systemtime.month and systemtime.day_of_month:
-      occurance = self._OCCURANCE[systemtime.day_of_month]
-      weekday = self._WEEKDAYS[systemtime.weekday]
       month = self._MONTHS[systemtime.month]
 
-      if not systemtime.year:
-        return (f'{occurance:s} {weekday:s} of {month:s} at '
-                f'{systemtime.hours:02d}:{systemtime.minutes:02d}')
+      if systemtime.year:
+        return (f'{month:s} {systemtime.day_of_month:d}, {systemtime.year:d} '
+                f'at {systemtime.hours:02d}:{systemtime.minutes:02d}')
+
+      occurance = self._OCCURANCE[systemtime.day_of_month]
+      weekday = self._WEEKDAYS[systemtime.weekday]
 
-      return (f'{occurance:s} {weekday:s} of {month:s} in {systemtime.year:s} '
-              f'at {systemtime.hours:02d}:{systemtime.minutes:02d}')
+      return (f'{occurance:s} {weekday:s} of {month:s} at '
+              f'{systemtime.hours:02d}:{systemtime.minutes:02d}')
 
     return 'Not set'
 
-  def ParseTZIValue(self, value_data, time_zone):
-    """Parses the TZI value data.
+  def _GetFiletime(self, year, month, day_of_month, systemtime=None):
+    """Retrieves a FILETIME timestamp of a date and SYSTEMTIME time of day.
+
+    Args:
+      year (int): year.
+      month (int): month.
+      day_of_month (int): day of month.
+      systemtime (Optional[system_time]): SYSTEMTIME structure that contains
+          the time of day, where None represents midnight.
+
+    Returns:
+      int: FILETIME timestamp.
+    """
+    number_of_days = (
+        datetime.date(year, month, day_of_month).toordinal() -
+        self._FILETIME_EPOCH_ORDINAL)
+
+    if not systemtime:
+      return number_of_days * 86400 * 10000000
+
+    number_of_seconds = (
+        number_of_days * 86400 + systemtime.hours * 3600 +
+        systemtime.minutes * 60 + systemtime.seconds)
+
+    return number_of_seconds * 10000000 + systemtime.milliseconds * 10000
+
+  def _GetTransitionTimestamp(self, systemtime, year):
+    """Retrieves the timestamp of a transition in a specific year.
+
+    Args:
+      systemtime (system_time): SYSTEMTIME structure that contains the
+          transition rule, where a year of 0 represents the occurrence of
+          a weekday in the month, such as the last Sunday of March, and
+          a year other than 0 an absolute date in that year only.
+      year (int): year.
+
+    Returns:
+      int: local date and time of the transition as a FILETIME timestamp or
+          None if the transition rule is an absolute date in another year.
+
+    Raises:
+      ParseError: if the transition rule is not supported.
+    """
+    if systemtime.year and systemtime.year != year:
+      return None
+
+    _, number_of_days_in_month = calendar.monthrange(year, systemtime.month)
+
+    if systemtime.year:
+      day_of_month = systemtime.day_of_month
+    else:
+      # SYSTEMTIME weekdays start at Sunday, Python weekdays at Monday.
+      first_weekday = (calendar.weekday(year, systemtime.month, 1) + 1) % 7
+
+      day_of_month = 1 + ((systemtime.weekday - first_weekday) % 7)
+      day_of_month += (systemtime.day_of_month - 1) * 7
+
+      # An occurrence of 5 represents the last occurrence in the month.
+      while day_of_month > number_of_days_in_month:
+        day_of_month -= 7
+
+    if not 1 <= day_of_month <= number_of_days_in_month:
+      raise errors.ParseError(
+          f'Unsupported day of month: {day_of_month:d} in transition rule.')
+
+    return self._GetFiletime(year, systemtime.month, day_of_month, systemtime)
+
+  def _ReadTZIRecord(self, value_data):
+    """Reads a TZI record.
 
     Args:
       value_data (bytes): TZI value data.
-      time_zone (TimeZone): time zone.
+
+    Returns:
+      tzi_record: TZI record.
 
     Raises:
       ParseError: if the value data could not be parsed.
@@ -91,6 +289,67 @@ class TimeZoneInformationDataParser(data_format.BinaryDataFormat):
       raise errors.ParseError(
           f'Unable to parse TZI record value with error: {exception!s}')
 
+    return tzi_record
+
+  def ParseTransitions(self, value_data, year):
+    """Parses the standard and daylight transitions in a specific year.
+
+    Args:
+      value_data (bytes): TZI value data.
+      year (int): year.
+
+    Returns:
+      list[tuple[int, int]]: local date and time as a FILETIME timestamp and
+          bias in number of minutes of the transitions in the year, in
+          ascending order, starting with the bias at the start of the year.
+
+    Raises:
+      ParseError: if the value data could not be parsed.
+    """
+    tzi_record = self._ReadTZIRecord(value_data)
+
+    standard_bias = tzi_record.bias + tzi_record.standard_bias
+
+    transitions = []
+    if tzi_record.standard_date.month and tzi_record.daylight_date.month:
+      try:
+        daylight_timestamp = self._GetTransitionTimestamp(
+            tzi_record.daylight_date, year)
+        standard_timestamp = self._GetTransitionTimestamp(
+            tzi_record.standard_date, year)
+      except ValueError as exception:
+        raise errors.ParseError(
+            f'Unable to parse transition rule with error: {exception!s}')
+
+      # Transition rules with an absolute date in another year do not apply.
+      if daylight_timestamp is not None and standard_timestamp is not None:
+        transitions = sorted([
+            (daylight_timestamp, tzi_record.bias + tzi_record.daylight_bias),
+            (standard_timestamp, standard_bias)])
+
+    # The bias at the start of the year is the bias of the last transition
+    # of the year, which continues from the previous year.
+    if transitions:
+      bias = transitions[-1][1]
+    else:
+      bias = standard_bias
+
+    year_start_timestamp = self._GetFiletime(year, 1, 1)
+
+    return [(year_start_timestamp, bias)] + transitions
+
+  def ParseTZIValue(self, value_data, time_zone):
+    """Parses the TZI value data.
+
+    Args:
+      value_data (bytes): TZI value data.
+      time_zone (TimeZone): time zone.
+
+    Raises:
+      ParseError: if the value data could not be parsed.
+    """
+    tzi_record = self._ReadTZIRecord(value_data)
+
     if self._debug:
       self._DebugPrintStructureObject(tzi_record, self._DEBUG_INFO_TZI_RECORD)
 
@@ -107,15 +366,66 @@ class TimeZonesCollector(interface.WindowsRegistryKeyCollector):
       'HKEY_LOCAL_MACHINE\\Software\\Microsoft\\Windows NT\\CurrentVersion\\'
       'Time Zones')
 
-  def Collect(self, registry, output_writer):
+  def _GetTransitionTable(
+      self, time_zone_key, tzi_value_data, years, time_zone_information_parser):
+    """Retrieves the transition table of a time zone.
+
+    The transitions of a year are determined by the TZI value of the year in
+    the "Dynamic DST" subkey, if available. Years before the first or after
+    the last entry in the "Dynamic DST" subkey use the first or last entry
+    respectively. Otherwise the TZI value of the time zone key is used.
+
+    Args:
+      time_zone_key (dfwinreg.WinRegistryKey): time zone key.
+      tzi_value_data (bytes): TZI value data of the time zone key.
+      years (list[int]): years to determine the transitions of.
+      time_zone_information_parser (TimeZoneInformationDataParser): TZI data
+          parser.
+
+    Returns:
+      TimeZoneTransitionTable: transition table.
+
+    Raises:
+      ParseError: if a TZI value could not be parsed.
+    """
+    dynamic_dst_key = time_zone_key.GetSubkeyByName('Dynamic DST')
+
+    first_entry = self._GetValueFromKey(dynamic_dst_key, 'FirstEntry')
+    last_entry = self._GetValueFromKey(dynamic_dst_key, 'LastEntry')
+    if not isinstance(first_entry, int) or not isinstance(last_entry, int):
+      dynamic_dst_key = None
+
+    transition_table = TimeZoneTransitionTable()
+    for year in sorted(set(years)):
+      value_data = None
+      if dynamic_dst_key:
+        entry = min(max(year, first_entry), last_entry)
+        value_data = self._GetValueDataFromKey(
+            dynamic_dst_key, f'{entry:d}')
+
+      if value_data is None:
+        value_data = tzi_value_data
+
+      for timestamp, bias in time_zone_information_parser.ParseTransitions(
+          value_data, year):
+        transition_table.AddTransition(timestamp, bias)
+
+    return transition_table
+
+  def Collect(self, registry, output_writer, years=None):
     """Collects the time zones.
 
     Args:
       registry (dfwinreg.WinRegistry): Windows Registry.
       output_writer (OutputWriter): output writer.
+      years (Optional[list[int]]): years to precompute the standard and
+          daylight transitions of, where None represents no transitions.
 
     Returns:
       bool: True if the time zones key was found, False if not.
+
+    Raises:
+      ParseError: if a TZI value could not be parsed.
     """
     time_zones_key = registry.GetKeyByPath(self._TIME_ZONES_KEY_PATH)
     if not time_zones_key:
@@ -123,6 +433,7 @@ class TimeZonesCollector(interface.WindowsRegistryKeyCollector):
 
     time_zone_information_parser = TimeZoneInformationDataParser(
         debug=self._debug, output_writer=output_writer)
+    time_zone_information_parser.SetRegistryAccessStatistics(self._statistics)
 
     for subkey in time_zones_key.GetSubkeys():
       time_zone = TimeZone(subkey.name)
@@ -168,6 +479,10 @@ class TimeZonesCollector(interface.WindowsRegistryKeyCollector):
 
       time_zone_information_parser.ParseTZIValue(data, time_zone)
 
+      if years:
+        time_zone.transition_table = self._GetTransitionTable(
+            subkey, data, years, time_zone_information_parser)
+
       if self._debug and output_writer:
         output_writer.DebugPrintText('\n')
 
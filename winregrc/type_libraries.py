@@ -10,11 +10,20 @@ class TypeLibrary(object):
   Attributes:
     description (str): description.
     identifier (str): identifier.
+    language (str): language identifier (LCID) of the type library, such as
+        "0" or "409".
+    platform (str): platform of the type library, such as "win32" or "win64".
     typelib_filename (str): typelib_filename.
     version (str): version.
   """
 
-  def __init__(self, identifier, version, description, typelib_filename):
+  __slots__ = (
+      'description', 'identifier', 'language', 'platform', 'typelib_filename',
+      'version')
+
+  def __init__(
+      self, identifier, version, description, typelib_filename, language=None,
+      platform=None):
     """Initializes a type library.
 
     Args:
@@ -22,10 +31,15 @@ class TypeLibrary(object):
       version (str): version.
       description (str): description.
       typelib_filename (str): typelib_filename.
+      language (Optional[str]): language identifier (LCID) of the type
+          library.
+      platform (Optional[str]): platform of the type library.
     """
     super(TypeLibrary, self).__init__()
     self.description = description
     self.identifier = identifier
+    self.language = language
+    self.platform = platform
     self.typelib_filename = typelib_filename
     self.version = version
 
@@ -33,13 +47,21 @@ class TypeLibrary(object):
 class TypeLibrariesCollector(interface.WindowsRegistryKeyCollector):
   """Windows type libraries collector.
 
-  Attributes:
-    type_libraries (list[TypeLibrary]): type libraries.
+  The subkeys of every version and language key are enumerated once into
+  an index by lower case name, from which the language and platform keys are
+  selected, instead of looking up every preferred name separately.
   """
 
   _TYPE_LIBRARIES_KEY_PATH = (
       'HKEY_LOCAL_MACHINE\\Software\\Classes\\TypeLib')
 
+  # Names of version subkeys that do not contain a type library.
+  _IGNORE_SUBKEY_NAMES = frozenset(['flags', 'helpdir'])
+
+  _PREFERRED_LANGUAGES = ('0', '409')
+
+  _PREFERRED_PLATFORMS = ('win32', )
+
   def __init__(self, debug=False, output_writer=None):
     """Initializes a Windows type libraries collector.
 
@@ -49,56 +71,101 @@ class TypeLibrariesCollector(interface.WindowsRegistryKeyCollector):
     """
     super(TypeLibrariesCollector, self).__init__(debug=debug)
     self._output_writer = output_writer
-    self.type_libraries = []
 
-  def Collect(self, registry):  # pylint: disable=arguments-differ
-    """Collects the type libraries.
+  def _GetSubkeysIndex(self, registry_key):
+    """Retrieves an index of the subkeys of a key.
 
     Args:
-      registry (dfwinreg.WinRegistry): Windows Registry.
+      registry_key (dfwinreg.WinRegistryKey): Windows Registry key.
+
+    Returns:
+      dict[str, dfwinreg.WinRegistryKey]: subkeys per lower case name, in
+          the order of the subkeys.
+    """
+    subkeys_index = {}
+    for subkey in registry_key.GetSubkeys():
+      name = subkey.name.lower()
+      if name not in self._IGNORE_SUBKEY_NAMES:
+        subkeys_index[name] = subkey
+
+    return subkeys_index
+
+  def _SelectSubkeys(self, subkeys_index, preferred_names, select_all):
+    """Selects subkeys from an index.
+
+    Args:
+      subkeys_index (dict[str, dfwinreg.WinRegistryKey]): subkeys per lower
+          case name.
+      preferred_names (tuple[str]): lower case names of the subkeys to select
+          in order of preference, where the first subkey is selected if none
+          of the names are present.
+      select_all (bool): True if all subkeys should be selected.
 
     Returns:
-      bool: True if the type libraries key was found, False if not.
+      list[dfwinreg.WinRegistryKey]: selected subkeys.
+    """
+    if select_all or not subkeys_index:
+      return list(subkeys_index.values())
+
+    for name in preferred_names:
+      subkey = subkeys_index.get(name, None)
+      if subkey:
+        return [subkey]
+
+    return [next(iter(subkeys_index.values()))]
+
+  def Collect(  # pylint: disable=arguments-differ
+      self, registry, all_languages=False, all_platforms=False):
+    """Collects the type libraries.
+
+    Args:
+      registry (dfwinreg.WinRegistry): Windows Registry.
+      all_languages (Optional[bool]): True if the type libraries of all
+          languages should be collected instead of only the preferred
+          language, which is language neutral (0) or else English (409).
+      all_platforms (Optional[bool]): True if the type libraries of all
+          platforms should be collected instead of only the preferred
+          platform, which is win32.
+
+    Yields:
+      TypeLibrary: a type library.
     """
     type_libraries_key = registry.GetKeyByPath(
         self._TYPE_LIBRARIES_KEY_PATH)
     if not type_libraries_key:
-      return False
+      return
 
     for type_library_key in type_libraries_key.GetSubkeys():
       identifier = type_library_key.name.lower()
 
-      for subkey in type_library_key.GetSubkeys():
-        if subkey.name in ('FLAGS', 'HELPDIR'):
+      for version_key in type_library_key.GetSubkeys():
+        if version_key.name.lower() in self._IGNORE_SUBKEY_NAMES:
           continue
 
-        description = self._GetValueFromKey(subkey, '')
-
-        language_key = None
-        for lcid in ('0', '409'):
-          language_key = subkey.GetSubkeyByName(lcid)
-          if language_key:
-            break
+        description = self._GetValueFromKey(version_key, '')
 
-        if not language_key:
-          for language_key in subkey.GetSubkeys():
-            if language_key.name not in ('FLAGS', 'HELPDIR'):
-              break
+        languages_index = self._GetSubkeysIndex(version_key)
+        language_keys = self._SelectSubkeys(
+            languages_index, self._PREFERRED_LANGUAGES, all_languages)
 
-        platform_key = None
-        if language_key:
-          for platform in ('win32', ):
-            platform_key = language_key.GetSubkeyByName(platform)
-            if platform_key:
-              break
+        if not language_keys:
+          yield TypeLibrary(identifier, version_key.name, description, None)
+          continue
 
-          if not platform_key:
-            platform_key = language_key.GetSubkeyByIndex(0)
+        for language_key in language_keys:
+          platforms_index = self._GetSubkeysIndex(language_key)
+          platform_keys = self._SelectSubkeys(
+              platforms_index, self._PREFERRED_PLATFORMS, all_platforms)
 
-        typelib_filename = self._GetValueFromKey(platform_key, '')
+          if not platform_keys:
+            yield TypeLibrary(
+                identifier, version_key.name, description, None,
+                language=language_key.name)
+            continue
 
-        type_library = TypeLibrary(
-            identifier, subkey.name, description, typelib_filename)
-        self.type_libraries.append(type_library)
+          for platform_key in platform_keys:
+            typelib_filename = self._GetValueFromKey(platform_key, '')
 
-    return True
+            yield TypeLibrary(
+                identifier, version_key.name, description, typelib_filename,
+                language=language_key.name, platform=platform_key.name)
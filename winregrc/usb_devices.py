@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""Windows USB devices correlation collector."""
+
+from winregrc import interface
+from winregrc import mounted_devices
+from winregrc import usbstor
+
+
+class USBDeviceInterface(object):
+  """USB device interface.
+
+  Attributes:
+    class_identifier (str): identifier of the device interface class, such
+        as "{53f56307-b6bf-11d0-94f2-00a0c91efb8b}".
+    key_path (str): Windows Registry key path of the device interface.
+    last_written_time (dfdatetime.DateTimeValues): last written date and time
+        of the device interface key.
+  """
+
+  __slots__ = ('class_identifier', 'key_path', 'last_written_time')
+
+  def __init__(self, class_identifier, key_path, last_written_time):
+    """Initializes an USB device interface.
+
+    Args:
+      class_identifier (str): identifier of the device interface class.
+      key_path (str): Windows Registry key path of the device interface.
+      last_written_time (dfdatetime.DateTimeValues): last written date and
+          time of the device interface key.
+    """
+    super(USBDeviceInterface, self).__init__()
+    self.class_identifier = class_identifier
+    self.key_path = key_path
+    self.last_written_time = last_written_time
+
+
+class USBDevice(object):
+  """USB device correlated across USBSTOR, MountedDevices and DeviceClasses.
+
+  Attributes:
+    device_interfaces (list[USBDeviceInterface]): device interfaces of
+        the USB device.
+    mounted_devices (list[MountedDevice]): mounted devices of the USB device.
+    storage_device (USBStorageDevice): USB storage device.
+    volume_identifiers (list[str]): lower case identifiers of the volumes
+        of the USB device, such as "{9e3b3947-ca5d-4614-91a2-7b624e0e7244}".
+  """
+
+  __slots__ = (
+      'device_interfaces', 'mounted_devices', 'storage_device',
+      'volume_identifiers')
+
+  def __init__(self, storage_device):
+    """Initializes an USB device.
+
+    Args:
+      storage_device (USBStorageDevice): USB storage device.
+    """
+    super(USBDevice, self).__init__()
+    self.device_interfaces = []
+    self.mounted_devices = []
+    self.storage_device = storage_device
+    self.volume_identifiers = []
+
+
+class USBDevicesCollector(interface.WindowsRegistryKeyCollector):
+  """Windows USB devices correlation collector.
+
+  The USB storage devices are indexed by device instance identifier and
+  parent identifier prefix. The MountedDevices values and DeviceClasses
+  interface keys are then joined with them in a single pass each, so that
+  the time needed scales linearly with the number of devices.
+
+  The volume identifiers of the \\??\\Volume{...} MountedDevices values are
+  indexed as well, so that volume device interface keys that reference
+  a volume by its identifier, such as STORAGE#Volume#{...}, are joined with
+  the USB device of the volume.
+  """
+
+  _DEVICE_CLASSES_KEY_PATH = (
+      'HKEY_LOCAL_MACHINE\\System\\CurrentControlSet\\Control\\DeviceClasses')
+
+  _VOLUME_NAME_PREFIX = '\\??\\volume'
+
+  def __init__(self, debug=False):
+    """Initializes a Windows USB devices correlation collector.
+
+    Args:
+      debug (Optional[bool]): True if debug information should be printed.
+    """
+    super(USBDevicesCollector, self).__init__(debug=debug)
+    self._mounted_devices_collector = (
+        mounted_devices.MountedDevicesCollector(debug=debug))
+    self._usbstor_collector = usbstor.USBStorageDeviceCollector(debug=debug)
+
+  def _GetUSBDeviceByDeviceString(
+      self, device_string, usb_devices_per_instance_identifier,
+      usb_devices_per_parent_identifier_prefix,
+      usb_devices_per_volume_identifier):
+    """Retrieves the USB device referenced by a device string.
+
+    Device strings are device paths or device interface key names, such as:
+      \\??\\USBSTOR#Disk&Ven_Generic&Prod_Flash_Disk&Rev_8.07#0123456789&0#{...}
+      _??_USBSTOR#Disk&Ven_Generic&Prod_Flash_Disk&Rev_8.07#0123456789&0#{...}
+      ##?#STORAGE#Volume#_??_USBSTOR#Disk&Ven_Generic...#0123456789&0#{...}
+      \\??\\STORAGE#RemovableMedia#7&2a3b4c5d&0&RM#{...}
+      ##?#STORAGE#Volume#{9e3b3947-ca5d-4614-91a2-7b624e0e7244}#...#{...}
+
+    Args:
+      device_string (str): device string.
+      usb_devices_per_instance_identifier (dict[str, USBDevice]): USB devices
+          per lower case device instance identifier.
+      usb_devices_per_parent_identifier_prefix (dict[str, USBDevice]): USB
+          devices per lower case parent identifier prefix.
+      usb_devices_per_volume_identifier (dict[str, USBDevice]): USB devices
+          per lower case volume identifier.
+
+    Returns:
+      USBDevice: USB device or None if the device string does not reference
+          a known USB device.
+    """
+    segments = device_string.lower().split('#')
+    number_of_segments = len(segments)
+
+    for index, segment in enumerate(segments):
+      if segment.endswith('usbstor') and index + 2 < number_of_segments:
+        return usb_devices_per_instance_identifier.get(
+            segments[index + 2], None)
+
+      if segment == 'removablemedia' and index + 1 < number_of_segments:
+        parent_identifier_prefix, _, _ = segments[index + 1].rpartition('&')
+        return usb_devices_per_parent_identifier_prefix.get(
+            parent_identifier_prefix, None)
+
+      if (segment == 'volume' and index + 1 < number_of_segments and
+          segments[index + 1].startswith('{')):
+        return usb_devices_per_volume_identifier.get(
+            segments[index + 1], None)
+
+    return None
+
+  def Collect(self, registry, property_sets=None):
+    """Collects USB devices correlated with mounted devices and interfaces.
+
+    Args:
+      registry (dfwinreg.WinRegistry): Windows Registry.
+      property_sets (Optional[list[str]]): identifiers of the USB storage
+          device property sets to collect, where None represents all property
+          sets.
+
+    Yields:
+      USBDevice: an USB device.
+
+    Raises:
+      ParseError: if a USB storage device property or mounted devices value
+          could not be parsed.
+    """
+    usb_devices = []
+    usb_devices_per_instance_identifier = {}
+    usb_devices_per_parent_identifier_prefix = {}
+    usb_devices_per_volume_identifier = {}
+
+    for storage_device in self._usbstor_collector.Collect(
+        registry, property_sets=property_sets):
+      usb_device = USBDevice(storage_device)
+      usb_devices.append(usb_device)
+
+      instance_identifier = storage_device.instance_identifier.lower()
+      usb_devices_per_instance_identifier[instance_identifier] = usb_device
+
+      if storage_device.parent_identifier_prefix:
+        parent_identifier_prefix = (
+            storage_device.parent_identifier_prefix.lower())
+        usb_devices_per_parent_identifier_prefix[parent_identifier_prefix] = (
+            usb_device)
+
+    if not usb_devices:
+      return
+
+    for mounted_device in self._mounted_devices_collector.Collect(registry):
+      if not mounted_device.device:
+        continue
+
+      usb_device = self._GetUSBDeviceByDeviceString(
+          mounted_device.device, usb_devices_per_instance_identifier,
+          usb_devices_per_parent_identifier_prefix,
+          usb_devices_per_volume_identifier)
+      if not usb_device:
+        continue
+
+      usb_device.mounted_devices.append(mounted_device)
+
+      identifier = mounted_device.identifier.lower()
+      if identifier.startswith(self._VOLUME_NAME_PREFIX):
+        volume_identifier = identifier[len(self._VOLUME_NAME_PREFIX):]
+        usb_device.volume_identifiers.append(volume_identifier)
+        usb_devices_per_volume_identifier[volume_identifier] = usb_device
+
+    device_classes_key = registry.GetKeyByPath(self._DEVICE_CLASSES_KEY_PATH)
+    if device_classes_key:
+      for device_class_key in device_classes_key.GetSubkeys():
+        class_identifier = device_class_key.name.lower()
+
+        for device_interface_key in device_class_key.GetSubkeys():
+          usb_device = self._GetUSBDeviceByDeviceString(
+              device_interface_key.name, usb_devices_per_instance_identifier,
+              usb_devices_per_parent_identifier_prefix,
+              usb_devices_per_volume_identifier)
+          if usb_device:
+            usb_device.device_interfaces.append(USBDeviceInterface(
+                class_identifier, device_interface_key.path,
+                device_interface_key.last_written_time))
+
+    yield from usb_devices
+
+  def SetRegistryAccessStatistics(self, statistics):
+    """Sets the Windows Registry access statistics.
+
+    Args:
+      statistics (RegistryAccessStatistics): statistics to update.
+    """
+    super(USBDevicesCollector, self).SetRegistryAccessStatistics(statistics)
+    self._mounted_devices_collector.SetRegistryAccessStatistics(statistics)
+    self._usbstor_collector.SetRegistryAccessStatistics(statistics)
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """Windows USB storage device collector."""
 
+import struct
+
 from dfdatetime import filetime as dfdatetime_filetime
 from dfdatetime import semantic_time as dfdatetime_semantic_time
 
@@ -18,6 +20,8 @@ class USBStorageDeviceProperty(object):
     value_type (int): property value type.
   """
 
+  __slots__ = ('identifier', 'property_set', 'value', 'value_type')
+
   def __init__(self, property_set, identifier):
     """Initializes an USB storage device property.
 
@@ -38,22 +42,37 @@ class USBStorageDevice(object):
   Attributes:
     device_type (str): type of USB device.
     display_name (str): display name of the USB device.
+    instance_identifier (str): identifier of the device instance, such as
+        "0123456789&0".
     key_path (str): Windows Registry key path.
+    parent_identifier_prefix (str): parent identifier prefix, such as
+        "7&2a3b4c5d&0", which is used by Windows XP to identify the volume
+        of the USB device.
     product (str): product of the USB device.
     properties (list[USBStorageDeviceProperty]): properties.
     revision (str): revision number of the USB device.
+    serial_number (str): serial number of the USB device or None if the
+        device does not have a serial number.
     vendor (str): vendor of the USB device.
   """
 
+  __slots__ = (
+      'device_type', 'display_name', 'instance_identifier', 'key_path',
+      'parent_identifier_prefix', 'product', 'properties', 'revision',
+      'serial_number', 'vendor')
+
   def __init__(self):
     """Initializes an USB storage device."""
     super(USBStorageDevice, self).__init__()
     self.device_type = None
     self.display_name = None
+    self.instance_identifier = None
     self.key_path = None
+    self.parent_identifier_prefix = None
     self.product = None
     self.properties = []
     self.revision = None
+    self.serial_number = None
     self.vendor = None
 
 
@@ -65,17 +84,46 @@ class USBStorageDeviceCollector(data_format.BinaryDataFormat):
   _USBSTOR_KEY_PATH = (
       'HKEY_LOCAL_MACHINE\\System\\CurrentControlSet\\Enum\\USBSTOR')
 
-  def _CollectUSBStorageDevices(self, usbstor_key):
+  # The property value data only contains fixed size integers or UTF-16
+  # strings, which are decoded with struct instead of dtFabric since they
+  # are read for every property of every device instance.
+  _UINT32LE = struct.Struct('<I')
+  _UINT64LE = struct.Struct('<Q')
+
+  def _CollectUSBStorageDevices(self, usbstor_key, property_sets=None):
     """Collects USB storage devices.
 
     Args:
       usbstor_key (dfwinreg.WinRegistryKey): USB storage Windows Registry key.
+      property_sets (Optional[set[str]]): lower case identifiers of the
+          property sets to collect, where None represents all property sets.
 
     Yields:
       USBStorageDevice: an USB storage device.
     """
     for device_key in usbstor_key.GetSubkeys():
-      yield self._ParseDeviceKey(device_key)
+      yield from self._ParseDeviceKey(device_key, property_sets=property_sets)
+
+  def _GetPropertySetKeys(self, properties_key, property_sets=None):
+    """Retrieves property set keys.
+
+    Args:
+      properties_key (dfwinreg.WinRegistryKey): properties Windows Registry
+          key.
+      property_sets (Optional[set[str]]): lower case identifiers of the
+          property sets to retrieve, where None represents all property sets.
+
+    Yields:
+      dfwinreg.WinRegistryKey: property set Windows Registry key.
+    """
+    if property_sets is None:
+      yield from properties_key.GetSubkeys()
+
+    else:
+      for property_set in sorted(property_sets):
+        property_set_key = properties_key.GetSubkeyByName(property_set)
+        if property_set_key:
+          yield property_set_key
 
   def _GetPropertyValueData(self, property_value_key, value_type):
     """Retrieves a property value data.
@@ -92,26 +140,29 @@ class USBStorageDeviceCollector(data_format.BinaryDataFormat):
       ParseError: if the property value data cannot be determined.
     """
     binary_data = self._GetValueDataFromKey(property_value_key, 'Data')
-
-    if value_type == 0x00000007:
-      data_type_map = self._GetDataTypeMap('uint32le')
-    elif value_type == 0x00000010:
-      data_type_map = self._GetDataTypeMap('uint64le')
-    elif value_type == 0x00000012:
-      data_type_map = self._GetDataTypeMap('utf16le_string')
-    else:
-      raise errors.ParseError(f'Unsupported value type: 0x{value_type:08x}')
+    if binary_data is None:
+      raise errors.ParseError('Missing value: Data')
 
     try:
-      value_data = self._ReadStructureFromByteStream(
-          binary_data, 0, data_type_map, 'data')
-    except (ValueError, errors.ParseError) as exception:
+      if value_type == 0x00000007:
+        value_data = self._UnpackIntegerFromByteStream(
+            self._UINT32LE, binary_data)
+
+      elif value_type == 0x00000010:
+        value_data = self._UnpackIntegerFromByteStream(
+            self._UINT64LE, binary_data)
+        value_data = self._ParseFiletime(value_data)
+
+      elif value_type == 0x00000012:
+        value_data = self._ParseUTF16String(binary_data)
+
+      else:
+        raise errors.ParseError(f'Unsupported value type: 0x{value_type:08x}')
+
+    except (struct.error, UnicodeDecodeError) as exception:
       raise errors.ParseError(
           f'Unable to parse value: Data with error: {exception!s}')
 
-    if value_type == 0x00000010:
-      value_data = self._ParseFiletime(value_data)
-
     return value_data
 
   def _GetPropertyValueType(self, property_value_key):
@@ -128,13 +179,12 @@ class USBStorageDeviceCollector(data_format.BinaryDataFormat):
       ParseError: if the property value type cannot be determined.
     """
     binary_data = self._GetValueDataFromKey(property_value_key, 'Type')
-
-    data_type_map = self._GetDataTypeMap('uint32le')
+    if binary_data is None:
+      raise errors.ParseError('Missing value: Type')
 
     try:
-      return self._ReadStructureFromByteStream(
-          binary_data, 0, data_type_map, 'type')
-    except (ValueError, errors.ParseError) as exception:
+      return self._UnpackIntegerFromByteStream(self._UINT32LE, binary_data)
+    except struct.error as exception:
       raise errors.ParseError(
           f'Unable to parse value: Type with error: {exception!s}')
 
@@ -181,15 +231,17 @@ class USBStorageDeviceCollector(data_format.BinaryDataFormat):
 
     return registry_value.data
 
-  def _ParseDeviceKey(self, device_key):
+  def _ParseDeviceKey(self, device_key, property_sets=None):
     """Parses an USB storage device key.
 
     Args:
       device_key (dfwinreg.WinRegistryKey): USB storage device Windows Registry
           key.
+      property_sets (Optional[set[str]]): lower case identifiers of the
+          property sets to collect, where None represents all property sets.
 
-    Returns:
-      USBStorageDevice: an USB storage device.
+    Yields:
+      USBStorageDevice: an USB storage device per device instance.
     """
     name_values = device_key.name.split('&')
     device_type = None
@@ -211,7 +263,8 @@ class USBStorageDeviceCollector(data_format.BinaryDataFormat):
       properties = []
       properties_key = device_instance_key.GetSubkeyByName('Properties')
       if properties_key:
-        for property_set_key in properties_key.GetSubkeys():
+        for property_set_key in self._GetPropertySetKeys(
+            properties_key, property_sets=property_sets):
           for property_key in property_set_key.GetSubkeys():
             for property_value_key in property_key.GetSubkeys():
               storage_device_property = USBStorageDeviceProperty(
@@ -224,17 +277,31 @@ class USBStorageDeviceCollector(data_format.BinaryDataFormat):
 
               properties.append(storage_device_property)
 
+      instance_identifier = device_instance_key.name
+
+      # The instance identifier consists of the serial number followed by
+      # "&" and an interface number. If the second character is "&" the
+      # device has no serial number and Windows generated the identifier.
+      serial_number = None
+      if len(instance_identifier) > 1 and instance_identifier[1] != '&':
+        serial_number, _, _ = instance_identifier.rpartition('&')
+        serial_number = serial_number or instance_identifier
+
       storage_device = USBStorageDevice()
       storage_device.device_type = device_type
       storage_device.display_name = self._GetStringValueFromKey(
           device_instance_key, 'FriendlyName')
+      storage_device.instance_identifier = instance_identifier
       storage_device.key_path = device_instance_key.path
+      storage_device.parent_identifier_prefix = self._GetStringValueFromKey(
+          device_instance_key, 'ParentIdPrefix')
       storage_device.product = product
       storage_device.properties = properties
       storage_device.revision = revision
+      storage_device.serial_number = serial_number
       storage_device.vendor = vendor
 
-    return storage_device
+      yield storage_device
 
   def _ParseFiletime(self, filetime):
     """Parses a FILETIME timestamp value.
@@ -253,15 +320,67 @@ class USBStorageDeviceCollector(data_format.BinaryDataFormat):
 
     return dfdatetime_filetime.Filetime(timestamp=filetime)
 
-  def Collect(self, registry):
+  def _ParseUTF16String(self, binary_data):
+    """Parses an UTF-16 little-endian string.
+
+    Args:
+      binary_data (bytes): binary data, which can contain an end-of-string
+          character.
+
+    Returns:
+      str: string.
+
+    Raises:
+      UnicodeDecodeError: if the string cannot be decoded.
+    """
+    data_view = memoryview(binary_data)
+    data_size = len(data_view) & ~1
+
+    # The end-of-string character must be 16-bit aligned.
+    string_size = binary_data.find(b'\x00\x00')
+    while string_size != -1 and string_size % 2 != 0:
+      string_size = binary_data.find(b'\x00\x00', string_size + 1)
+
+    if string_size == -1:
+      string_size = data_size
+
+    return str(data_view[:string_size], 'utf-16-le')
+
+  def _UnpackIntegerFromByteStream(self, struct_object, byte_stream):
+    """Unpacks an integer from a byte stream.
+
+    Args:
+      struct_object (struct.Struct): struct of the integer.
+      byte_stream (bytes): byte stream.
+
+    Returns:
+      int: integer.
+
+    Raises:
+      struct.error: if the byte stream cannot be unpacked.
+    """
+    if self._statistics:
+      return self._statistics.UnpackFrom(struct_object, byte_stream)[0]
+
+    return struct_object.unpack_from(byte_stream, 0)[0]
+
+  def Collect(self, registry, property_sets=None):
     """Collects USB storage devices.
 
     Args:
       registry (dfwinreg.WinRegistry): Windows Registry.
+      property_sets (Optional[list[str]]): identifiers of the property sets
+          to collect, such as "{83da6326-97a6-4088-9453-a1923f573b29}", where
+          None represents all property sets.
 
     Yields:
-      USBStorageDevice: an USB storage device.
+      USBStorageDevice: an USB storage device per device instance.
     """
+    if property_sets is not None:
+      property_sets = set(
+          property_set.lower() for property_set in property_sets)
+
     usbstor_key = registry.GetKeyByPath(self._USBSTOR_KEY_PATH)
     if usbstor_key:
-      yield from self._CollectUSBStorageDevices(usbstor_key)
+      yield from self._CollectUSBStorageDevices(
+          usbstor_key, property_sets=property_sets)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Collector of records from the Windows Registry files of all users."""
+
+import concurrent.futures
+
+
+class UserRecord(object):
+  """Record collected from the Windows Registry files of a user.
+
+  Attributes:
+    record (object): record, such as an UserAssist entry.
+    security_identifier (str): security identifier of the user or None if
+        not available.
+    username (str): name of the user, which is the name of the user profile
+        directory.
+  """
+
+  __slots__ = ('record', 'security_identifier', 'username')
+
+  def __init__(self, record, security_identifier=None, username=None):
+    """Initializes a user record.
+
+    Args:
+      record (object): record.
+      security_identifier (Optional[str]): security identifier of the user.
+      username (Optional[str]): name of the user.
+    """
+    super(UserRecord, self).__init__()
+    self.record = record
+    self.security_identifier = security_identifier
+    self.username = username
+
+
+class UserRecordsCollector(object):
+  """Collector of records from the Windows Registry files of all users.
+
+  The user profiles are enumerated from the volume and the Windows Registry
+  of each user is opened separately, so that the records of multiple users
+  can be collected concurrently. The records are returned in the order of
+  the user profiles, so that the result does not depend on the number of
+  workers.
+  """
+
+  def __init__(
+      self, scanner, collect_function, number_of_workers=1, profiler=None):
+    """Initializes a collector of records from the Registry files of users.
+
+    Args:
+      scanner (WindowsRegistryVolumeScanner): volume scanner, that found
+          the Windows volume.
+      collect_function (function): function that collects the records from
+          the Windows Registry of a user, which is passed as its argument.
+      number_of_workers (Optional[int]): maximum number of users to collect
+          records from concurrently.
+      profiler (Optional[ScriptProfiler]): profiler, where the users are
+          processed sequentially when profiling.
+    """
+    super(UserRecordsCollector, self).__init__()
+    self._collect_function = collect_function
+    self._number_of_workers = number_of_workers
+    self._profiler = profiler
+    self._scanner = scanner
+
+  def _CollectUserRecords(self, user_profile):
+    """Collects the records of a user.
+
+    Args:
+      user_profile (UserProfile): user profile.
+
+    Returns:
+      list[UserRecord]: records of the user.
+    """
+    registry = self._scanner.OpenUserRegistry(user_profile)
+    if not registry:
+      return []
+
+    _, _, username = user_profile.profile_path.rpartition('\\')
+
+    return [
+        UserRecord(
+            record, security_identifier=user_profile.security_identifier,
+            username=username)
+        for record in self._collect_function(registry)]
+
+  def Collect(self):
+    """Collects the records of all users.
+
+    Yields:
+      UserRecord: record of a user.
+    """
+    user_profiles = self._scanner.GetUserProfiles()
+
+    number_of_workers = min(self._number_of_workers, len(user_profiles))
+
+    if self._profiler or number_of_workers <= 1:
+      for user_profile in user_profiles:
+        yield from self._CollectUserRecords(user_profile)
+
+    else:
+      with concurrent.futures.ThreadPoolExecutor(
+          max_workers=number_of_workers) as executor:
+        for user_records in executor.map(
+            self._CollectUserRecords, user_profiles):
+          yield from user_records
@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
 """Windows UserAssist information collector."""
 
-import codecs
 import logging
+import string
 
 from winregrc import data_format
 from winregrc import errors
@@ -13,11 +13,22 @@ class UserAssistEntry(object):
   """UserAssist entry.
 
   Attributes:
+    application_focus_count (int): number of times the application had focus
+        or None if not available, such as in format version 3.
+    application_focus_duration (int): duration the application had focus
+        or None if not available, such as in format version 3.
     guid (str): GUID.
+    last_execution_time (int): last execution date and time, as a FILETIME
+        timestamp.
     name (str): name.
+    number_of_executions (int): number of executions.
     value_name (str): name of the Windows Registry value.
   """
 
+  __slots__ = (
+      'application_focus_count', 'application_focus_duration', 'guid',
+      'last_execution_time', 'name', 'number_of_executions', 'value_name')
+
   def __init__(self, guid=None, name=None, value_name=None):
     """Initializes an UserAssist entry.
 
@@ -27,8 +38,12 @@ class UserAssistEntry(object):
       value_name (Optional[str]): name of the Windows Registry value.
     """
     super(UserAssistEntry, self).__init__()
+    self.application_focus_count = None
+    self.application_focus_duration = None
     self.guid = guid
+    self.last_execution_time = None
     self.name = name
+    self.number_of_executions = None
     self.value_name = value_name
 
 
@@ -134,6 +149,13 @@ class UserAssistCollector(interface.WindowsRegistryKeyCollector):
       'HKEY_CURRENT_USER\\Software\\Microsoft\\Windows\\CurrentVersion\\'
       'Explorer\\UserAssist')
 
+  # Translation table to decode ROT13, which leaves characters outside of
+  # the ASCII letters, including non-ASCII characters, unchanged.
+  _ROT13_TRANSLATION_TABLE = str.maketrans(
+      string.ascii_lowercase + string.ascii_uppercase,
+      string.ascii_lowercase[13:] + string.ascii_lowercase[:13] +
+      string.ascii_uppercase[13:] + string.ascii_uppercase[:13])
+
   def __init__(self, debug=False, output_writer=None):
     """Initializes a Windows UserAssist information collector.
 
@@ -152,6 +174,12 @@ class UserAssistCollector(interface.WindowsRegistryKeyCollector):
 
     Args:
       guid_subkey (dfwinreg.WinRegistryKey): UserAssist GUID Registry key.
+
+    Yields:
+      UserAssistEntry: an UserAssist entry.
+
+    Raises:
+      ParseError: if an UserAssist entry value could not be parsed.
     """
     version_value = guid_subkey.GetValueByName('Version')
     if not version_value:
@@ -168,38 +196,49 @@ class UserAssistCollector(interface.WindowsRegistryKeyCollector):
       self._output_writer.WriteText('\n')
 
     count_subkey = guid_subkey.GetSubkeyByName('Count')
-    for value in count_subkey.GetValues():
-      if self._debug:
-        self._output_writer.WriteValue('Original name', value.name)
+    if not count_subkey:
+      return
 
-      try:
-        # Note that Python 2 codecs.decode() does not support keyword arguments
-        # such as encodings='rot-13'.
-        value_name = codecs.decode(value.name, 'rot-13')
-      except UnicodeEncodeError:
-        characters = []
-        for character in value.name:
-          if ord(character) < 128:
-            try:
-              character = codecs.decode(character, 'rot-13')
-              characters.append(character)
-            except UnicodeEncodeError:
-              characters.append(character)
-          else:
-            characters.append(character)
-
-        value_name = ''.join(characters)
+    values = list(count_subkey.GetValues())
+    value_names = self._DecodeValueNames([value.name for value in values])
 
+    for value, value_name in zip(values, value_names):
       if self._debug:
+        self._output_writer.WriteValue('Original name', value.name)
         self._output_writer.WriteValue('Converted name', value_name)
         self._output_writer.WriteDebugData('Value data:', value.data)
 
-      if value_name != 'UEME_CTLSESSION':
-        user_assist_entry = self._parser.ParseEntry(format_version, value.data)
+      if value_name == 'UEME_CTLSESSION':
+        continue
+
+      entry_values = self._parser.ParseEntry(format_version, value.data)
+
+      user_assist_entry = UserAssistEntry(
+          guid=guid_subkey.name, name=value_name, value_name=value.name)
+      user_assist_entry.last_execution_time = entry_values.last_execution_time
+      user_assist_entry.number_of_executions = (
+          entry_values.number_of_executions)
 
-        user_assist_entry = UserAssistEntry(
-            guid=guid_subkey.name, name=value_name, value_name=value.name)
-        self.user_assist_entries.append(user_assist_entry)
+      if format_version == 5:
+        user_assist_entry.application_focus_count = (
+            entry_values.application_focus_count)
+        user_assist_entry.application_focus_duration = (
+            entry_values.application_focus_duration)
+
+      yield user_assist_entry
+
+  def _DecodeValueNames(self, value_names):
+    """Decodes ROT13 encoded value names.
+
+    Args:
+      value_names (list[str]): ROT13 encoded value names.
+
+    Returns:
+      list[str]: decoded value names.
+    """
+    translation_table = self._ROT13_TRANSLATION_TABLE
+    return [value_name.translate(translation_table)
+            for value_name in value_names]
 
   def Collect(self, registry):  # pylint: disable=arguments-differ
     """Collects the UserAssist information.
@@ -215,6 +254,16 @@ class UserAssistCollector(interface.WindowsRegistryKeyCollector):
       return False
 
     for guid_subkey in user_assist_key.GetSubkeys():
-      self._CollectUserAssistFromKey(guid_subkey)
+      self.user_assist_entries.extend(
+          self._CollectUserAssistFromKey(guid_subkey))
 
     return True
+
+  def SetRegistryAccessStatistics(self, statistics):
+    """Sets the Windows Registry access statistics.
+
+    Args:
+      statistics (RegistryAccessStatistics): statistics to update.
+    """
+    super(UserAssistCollector, self).SetRegistryAccessStatistics(statistics)
+    self._parser.SetRegistryAccessStatistics(statistics)
@@ -1,17 +1,33 @@
 # -*- coding: utf-8 -*-
 """Windows Registry volume scanner."""
 
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
 from dfimagetools import windows_registry
 
+from dfvfs.analyzer import analyzer as dfvfs_analyzer
 from dfvfs.helpers import command_line as dfvfs_command_line
 from dfvfs.helpers import volume_scanner as dfvfs_volume_scanner
+from dfvfs.helpers import windows_path_resolver as dfvfs_windows_path_resolver
 from dfvfs.lib import definitions as dfvfs_definitions
 from dfvfs.lib import errors as dfvfs_errors
+from dfvfs.path import factory as dfvfs_path_spec_factory
+from dfvfs.resolver import context as dfvfs_context
 from dfvfs.resolver import resolver as dfvfs_resolver
+from dfvfs.serializer import json_serializer as dfvfs_json_serializer
 
 from dfwinreg import interface as dfwinreg_interface
 from dfwinreg import registry as dfwinreg_registry
 
+from winregrc import cache_files
+from winregrc import profiles
+from winregrc import profilers
+
 
 class VolumeScannerOptions(dfvfs_volume_scanner.VolumeScannerOptions):
   """Volume scanner options.
@@ -34,6 +50,239 @@ class VolumeScannerOptions(dfvfs_volume_scanner.VolumeScannerOptions):
     self.username = None
 
 
+class CachingWindowsPathResolver(
+    dfvfs_windows_path_resolver.WindowsPathResolver):
+  """Windows path resolver with previously resolved paths.
+
+  Attributes:
+    resolved_path_specs (dict[str, dfvfs.PathSpec]): path specifications
+        per previously resolved Windows path, where None represents a path
+        that could not be resolved.
+  """
+
+  def __init__(self, file_system, mount_point, resolved_path_specs=None):
+    """Initializes a Windows path resolver.
+
+    Args:
+      file_system (dfvfs.FileSystem): file system.
+      mount_point (dfvfs.PathSpec): mount point path specification.
+      resolved_path_specs (Optional[dict[str, dfvfs.PathSpec]]): path
+          specifications per previously resolved Windows path.
+    """
+    super(CachingWindowsPathResolver, self).__init__(file_system, mount_point)
+    self.resolved_path_specs = resolved_path_specs or {}
+
+  def ResolvePath(self, path, expand_variables=True):
+    """Resolves a Windows path in file system specific format.
+
+    Args:
+      path (str): Windows path to resolve.
+      expand_variables (Optional[bool]): True if path variables should be
+          expanded or not.
+
+    Returns:
+      dfvfs.PathSpec: path specification in file system specific format or
+          None if the path could not be resolved.
+    """
+    if expand_variables and path in self.resolved_path_specs:
+      return self.resolved_path_specs[path]
+
+    return super(CachingWindowsPathResolver, self).ResolvePath(
+        path, expand_variables=expand_variables)
+
+
+class VolumeScanResult(object):
+  """Volume scan result.
+
+  Attributes:
+    file_system_path_spec (dfvfs.PathSpec): path specification of the file
+        system that contains the Windows directory.
+    registry_file_path_specs (dict[str, dfvfs.PathSpec]): path specifications
+        per Windows path of the system Registry files, where None represents
+        a Registry file that was not found.
+    source_type (str): dfvfs source type.
+    windows_directory (str): path of the Windows directory, such as
+        "C:\\Windows".
+  """
+
+  __slots__ = (
+      'file_system_path_spec', 'registry_file_path_specs', 'source_type',
+      'windows_directory')
+
+  def __init__(self):
+    """Initializes a volume scan result."""
+    super(VolumeScanResult, self).__init__()
+    self.file_system_path_spec = None
+    self.registry_file_path_specs = {}
+    self.source_type = None
+    self.windows_directory = None
+
+
+class VolumeScanCache(object):
+  """Sidecar cache of volume scan results.
+
+  The volume scan results are stored in a single JSON file, per a hash of
+  the path, size and modification time of the source and the volume scanner
+  options that affect the scan. Sources that are not files, such as devices
+  and directories, and sources that require credentials are not cached.
+  """
+
+  _FORMAT_VERSION = 1
+
+  def __init__(self, path):
+    """Initializes a volume scan cache.
+
+    Args:
+      path (str): path of the cache file.
+    """
+    super(VolumeScanCache, self).__init__()
+    self._path = path
+
+  def _GetCacheKey(self, source_path, options):
+    """Retrieves the cache key of a source.
+
+    Args:
+      source_path (str): path of the source.
+      options (VolumeScannerOptions): volume scanner options.
+
+    Returns:
+      str: cache key or None if the volume scan result of the source cannot
+          be cached.
+    """
+    if options and options.credentials:
+      return None
+
+    try:
+      stat_object = os.stat(source_path)
+    except OSError:
+      return None
+
+    if not os.path.isfile(source_path):
+      return None
+
+    cache_key = json.dumps([
+        self._FORMAT_VERSION, os.path.abspath(source_path),
+        stat_object.st_size, stat_object.st_mtime_ns,
+        getattr(options, 'partitions', None),
+        getattr(options, 'snapshots', None),
+        getattr(options, 'volumes', None)])
+
+    return hashlib.sha256(cache_key.encode('utf-8')).hexdigest()
+
+  def _ReadCacheFile(self):
+    """Reads the cache file.
+
+    Returns:
+      dict[str, dict[str, object]]: JSON dictionaries of the volume scan
+          results per cache key.
+    """
+    try:
+      with open(self._path, 'r', encoding='utf-8') as file_object:
+        json_dict = json.load(file_object)
+
+    except FileNotFoundError:
+      return {}
+
+    except (OSError, ValueError) as exception:
+      logging.warning((
+          f'Unable to read volume scan cache: {self._path:s} with error: '
+          f'{exception!s}'))
+      return {}
+
+    if (not isinstance(json_dict, dict) or
+        json_dict.get('format_version', None) != self._FORMAT_VERSION):
+      return {}
+
+    return json_dict.get('scan_results', None) or {}
+
+  def GetScanResult(self, source_path, options):
+    """Retrieves the cached volume scan result of a source.
+
+    Args:
+      source_path (str): path of the source.
+      options (VolumeScannerOptions): volume scanner options.
+
+    Returns:
+      VolumeScanResult: volume scan result or None if not cached.
+    """
+    cache_key = self._GetCacheKey(source_path, options)
+    if not cache_key:
+      return None
+
+    json_dict = self._ReadCacheFile().get(cache_key, None)
+    if not json_dict:
+      return None
+
+    serializer = dfvfs_json_serializer.JsonPathSpecSerializer
+
+    try:
+      scan_result = VolumeScanResult()
+      scan_result.file_system_path_spec = serializer.ReadSerialized(
+          json_dict['file_system_path_spec'])
+      scan_result.source_type = json_dict['source_type']
+      scan_result.windows_directory = json_dict['windows_directory']
+
+      for windows_path, json_string in json_dict[
+          'registry_file_path_specs'].items():
+        path_spec = None
+        if json_string:
+          path_spec = serializer.ReadSerialized(json_string)
+
+        scan_result.registry_file_path_specs[windows_path] = path_spec
+
+    except (AttributeError, KeyError, TypeError, ValueError,
+            dfvfs_errors.Error) as exception:
+      logging.warning((
+          f'Unable to read cached volume scan result of: {source_path:s} '
+          f'with error: {exception!s}'))
+      return None
+
+    return scan_result
+
+  def SetScanResult(self, source_path, options, scan_result):
+    """Caches the volume scan result of a source.
+
+    Args:
+      source_path (str): path of the source.
+      options (VolumeScannerOptions): volume scanner options.
+      scan_result (VolumeScanResult): volume scan result.
+    """
+    cache_key = self._GetCacheKey(source_path, options)
+    if not cache_key:
+      return
+
+    serializer = dfvfs_json_serializer.JsonPathSpecSerializer
+
+    registry_file_path_specs = {}
+    for windows_path, path_spec in (
+        scan_result.registry_file_path_specs.items()):
+      json_string = None
+      if path_spec:
+        json_string = serializer.WriteSerialized(path_spec)
+
+      registry_file_path_specs[windows_path] = json_string
+
+    scan_results = self._ReadCacheFile()
+    scan_results[cache_key] = {
+        'file_system_path_spec': serializer.WriteSerialized(
+            scan_result.file_system_path_spec),
+        'registry_file_path_specs': registry_file_path_specs,
+        'source_type': scan_result.source_type,
+        'windows_directory': scan_result.windows_directory}
+
+    json_string = json.dumps({
+        'format_version': self._FORMAT_VERSION,
+        'scan_results': scan_results})
+
+    try:
+      cache_files.WriteCacheFile(self._path, json_string.encode('utf-8'))
+
+    except OSError as exception:
+      logging.warning((
+          f'Unable to write volume scan cache: {self._path:s} with error: '
+          f'{exception!s}'))
+
+
 class SingleFileWindowsRegistryFileReader(
     dfwinreg_interface.WinRegistryFileReader):
   """Single file Windows Registry file reader."""
@@ -84,6 +333,172 @@ class SingleFileWindowsRegistryFileReader(
     return registry_file
 
 
+class PrefetchingWindowsRegistryFileReader(
+    windows_registry.StorageMediaImageWindowsRegistryFileReader):
+  """Storage media image Windows Registry file reader that prefetches files.
+
+  The Windows Registry files are read concurrently into local buffers, that
+  are kept in memory up to a maximum size and spooled to a temporary file
+  otherwise, so that the collectors do not wait for a slow storage media
+  image backend one file at a time. Each thread opens the storage media
+  image with its own dfvfs resolver context, since dfvfs file objects cannot
+  be shared between threads. Files that were not prefetched are opened from
+  the storage media image when needed. The local buffers of files that were
+  prefetched but not opened are closed by Close.
+  """
+
+  _MAXIMUM_BUFFER_SIZE = 64 * 1024 * 1024
+
+  _READ_BUFFER_SIZE = 1024 * 1024
+
+  # Windows paths of the Windows Registry files of the system and the user.
+  _REGISTRY_FILE_PATHS = (
+      '%SystemRoot%\\SYSTEM.DAT',
+      '%SystemRoot%\\USER.DAT',
+      '%SystemRoot%\\System32\\config\\SAM',
+      '%SystemRoot%\\System32\\config\\SECURITY',
+      '%SystemRoot%\\System32\\config\\SOFTWARE',
+      '%SystemRoot%\\System32\\config\\SYSTEM',
+      '%UserProfile%\\NTUSER.DAT',
+      '%UserProfile%\\AppData\\Local\\Microsoft\\Windows\\UsrClass.dat',
+      ('%UserProfile%\\Local Settings\\Application Data\\Microsoft\\'
+       'Windows\\UsrClass.dat'))
+
+  def __init__(self, file_system, path_resolver, number_of_workers=1):
+    """Initializes a prefetching Windows Registry file reader.
+
+    Args:
+      file_system (dfvfs.FileSystem): file system that contains the Windows
+          directory.
+      path_resolver (dfvfs.WindowsPathResolver): Windows path resolver.
+      number_of_workers (Optional[int]): maximum number of Windows Registry
+          files to read concurrently.
+    """
+    super(PrefetchingWindowsRegistryFileReader, self).__init__(
+        file_system, path_resolver)
+    self._file_objects = {}
+    self._number_of_workers = number_of_workers
+
+  def _ReadFile(self, path_spec):
+    """Reads a file into a local buffer.
+
+    Args:
+      path_spec (dfvfs.PathSpec): path specification of the file.
+
+    Returns:
+      file: file-like object of the local buffer or None if the file could
+          not be read.
+    """
+    resolver_context = dfvfs_context.Context()
+
+    # The local buffer is returned to the caller, that closes it.
+    # pylint: disable-next=consider-using-with
+    local_file_object = tempfile.SpooledTemporaryFile(
+        max_size=self._MAXIMUM_BUFFER_SIZE)
+
+    try:
+      file_object = dfvfs_resolver.Resolver.OpenFileObject(
+          path_spec, resolver_context=resolver_context)
+
+      data = file_object.read(self._READ_BUFFER_SIZE)
+      while data:
+        local_file_object.write(data)
+        data = file_object.read(self._READ_BUFFER_SIZE)
+
+    except (IOError, dfvfs_errors.Error) as exception:
+      local_file_object.close()
+      location = getattr(path_spec, 'location', None) or ''
+      logging.warning((
+          f'Unable to prefetch: {location:s} with error: {exception!s}'))
+      return None
+
+    finally:
+      resolver_context.Empty()
+
+    local_file_object.seek(0, os.SEEK_SET)
+    return local_file_object
+
+  def Close(self):
+    """Closes the local buffers of the files that were not opened."""
+    while self._file_objects:
+      _, file_object = self._file_objects.popitem()
+      file_object.close()
+
+  def Open(self, path, ascii_codepage='cp1252'):
+    """Opens the Windows Registry file specified by the path.
+
+    Args:
+      path (str): path of the Windows Registry file. The path is a Windows path
+          relative to the root of the file system that contains the specific
+          Windows Registry file. E.g. C:\\Windows\\System32\\config\\SYSTEM
+      ascii_codepage (Optional[str]): ASCII string codepage.
+
+    Returns:
+      WinRegistryFile: Windows Registry file or None if the file cannot
+          be opened.
+    """
+    file_object = self._file_objects.pop(path, None)
+    if not file_object:
+      return super(PrefetchingWindowsRegistryFileReader, self).Open(
+          path, ascii_codepage=ascii_codepage)
+
+    try:
+      signature = file_object.read(4)
+      file_object.seek(0, os.SEEK_SET)
+
+      if signature == b'regf':
+        registry_file = windows_registry.REGFWindowsRegistryFile(
+            ascii_codepage=ascii_codepage)
+      else:
+        registry_file = windows_registry.CREGWindowsRegistryFile(
+            ascii_codepage=ascii_codepage)
+
+      # Note that registry_file takes over management of file_object.
+      registry_file.Open(file_object)
+
+    except IOError:
+      file_object.close()
+      return None
+
+    return registry_file
+
+  def Prefetch(self, paths=None):
+    """Reads Windows Registry files into local buffers concurrently.
+
+    Args:
+      paths (Optional[list[str]]): Windows paths of the Windows Registry files
+          to prefetch, where None represents the Windows Registry files of
+          the system and the user.
+
+    Returns:
+      int: number of Windows Registry files that were prefetched.
+    """
+    path_specs = {}
+    for path in paths or self._REGISTRY_FILE_PATHS:
+      path_spec = self._path_resolver.ResolvePath(path)
+      if path_spec:
+        path_specs[path] = path_spec
+
+    number_of_workers = min(self._number_of_workers, len(path_specs))
+    if number_of_workers <= 1:
+      file_objects = [
+          self._ReadFile(path_spec) for path_spec in path_specs.values()]
+
+    else:
+      with concurrent.futures.ThreadPoolExecutor(
+          max_workers=number_of_workers) as executor:
+        file_objects = list(executor.map(
+            self._ReadFile, path_specs.values()))
+
+    number_of_files = 0
+    for path, file_object in zip(path_specs.keys(), file_objects):
+      if file_object:
+        self._file_objects[path] = file_object
+        number_of_files += 1
+
+    return number_of_files
+
+
 class WindowsRegistryVolumeScanner(dfvfs_volume_scanner.WindowsVolumeScanner):
   """Windows Registry volume scanner.
 
@@ -91,19 +506,128 @@ class WindowsRegistryVolumeScanner(dfvfs_volume_scanner.WindowsVolumeScanner):
     registry (dfwinreg.WinRegistry): Windows Registry.
   """
 
-  def __init__(self, mediator=None):
+  # Windows paths of the system Registry files, that are located when
+  # the volume scan result is cached.
+  _SYSTEM_REGISTRY_FILE_PATHS = (
+      '%SystemRoot%\\SYSTEM.DAT',
+      '%SystemRoot%\\System32\\config\\SAM',
+      '%SystemRoot%\\System32\\config\\SECURITY',
+      '%SystemRoot%\\System32\\config\\SOFTWARE',
+      '%SystemRoot%\\System32\\config\\SYSTEM')
+
+  _READ_BUFFER_SIZE = 1024 * 1024
+
+  def __init__(
+      self, mediator=None, number_of_prefetch_workers=0, prefetch_paths=None,
+      profiler=None, scan_cache=None):
     """Initializes a Windows Registry collector.
 
     Args:
       mediator (Optional[dfvfs.VolumeScannerMediator]): a volume scanner
           mediator.
+      number_of_prefetch_workers (Optional[int]): maximum number of Windows
+          Registry files to read concurrently from a storage media image once
+          the Windows volume was found, where 0 represents the files are read
+          when needed.
+      prefetch_paths (Optional[list[str]]): Windows paths of the Windows
+          Registry files to prefetch, such as those a script collects from,
+          where None represents the Windows Registry files of the system and
+          the user.
+      profiler (Optional[ScriptProfiler]): profiler, where None represents
+          profiling is disabled.
+      scan_cache (Optional[VolumeScanCache]): volume scan cache, where None
+          represents the volume scan results are not cached.
     """
     super(WindowsRegistryVolumeScanner, self).__init__(mediator=mediator)
+    self._file_system_path_spec = None
+    self._file_systems_per_snapshot = {}
+    self._number_of_prefetch_workers = number_of_prefetch_workers
+    self._prefetch_paths = prefetch_paths
+    self._prefetching_file_reader = None
+    self._profiler = profiler
+    self._scan_cache = scan_cache
     self._single_file = False
+    self._snapshot_identifiers = None
+    self._snapshot_path_specs = {}
     self._users_path = False
 
     self.registry = None
 
+  def _GetScanResult(self):
+    """Retrieves the volume scan result and locates the system Registry files.
+
+    Returns:
+      VolumeScanResult: volume scan result.
+    """
+    scan_result = VolumeScanResult()
+    scan_result.file_system_path_spec = self._file_system_path_spec
+    scan_result.source_type = self._source_type
+    scan_result.windows_directory = self._windows_directory
+
+    for windows_path in self._SYSTEM_REGISTRY_FILE_PATHS:
+      scan_result.registry_file_path_specs[windows_path] = (
+          self._path_resolver.ResolvePath(windows_path))
+
+    return scan_result
+
+  def _GetSnapshotFileSystem(self, snapshot_identifier):
+    """Retrieves the file system of the current volume or a snapshot.
+
+    The file system is opened on first use with its own dfvfs resolver
+    context, that is kept until Close.
+
+    Args:
+      snapshot_identifier (str): identifier of the Volume Shadow Copy
+          snapshot, such as "vss1", where None represents the current volume.
+
+    Returns:
+      tuple[dfvfs.FileSystem, dfvfs.WindowsPathResolver]: file system and
+          Windows path resolver or (None, None) if not available.
+    """
+    lookup_key = snapshot_identifier or ''
+
+    file_system_tuple = self._file_systems_per_snapshot.get(lookup_key, None)
+    if file_system_tuple:
+      return file_system_tuple[:2]
+
+    file_system_path_spec = self._file_system_path_spec
+    if snapshot_identifier:
+      file_system_path_spec = self._GetSnapshotFileSystemPathSpec(
+          snapshot_identifier)
+      if not file_system_path_spec:
+        return None, None
+
+    resolver_context = dfvfs_context.Context()
+    file_system, path_resolver = self._OpenFileSystem(
+        file_system_path_spec, resolver_context=resolver_context)
+
+    self._file_systems_per_snapshot[lookup_key] = (
+        file_system, path_resolver, resolver_context)
+
+    return file_system, path_resolver
+
+  def _GetSnapshotFileSystemPathSpec(self, snapshot_identifier):
+    """Retrieves the path specification of the file system of a snapshot.
+
+    Args:
+      snapshot_identifier (str): identifier of the Volume Shadow Copy
+          snapshot, such as "vss1".
+
+    Returns:
+      dfvfs.PathSpec: path specification of the file system that contains
+          the Windows directory in the snapshot or None if not available.
+    """
+    store_path_spec = self._snapshot_path_specs.get(snapshot_identifier, None)
+    if not store_path_spec:
+      return None
+
+    properties = dfvfs_path_spec_factory.Factory.GetProperties(
+        self._file_system_path_spec)
+    properties['parent'] = store_path_spec
+
+    return dfvfs_path_spec_factory.Factory.NewPathSpec(
+        self._file_system_path_spec.type_indicator, **properties)
+
   def _GetUsername(self, options):
     """Determines the username.
 
@@ -117,22 +641,7 @@ class WindowsRegistryVolumeScanner(dfvfs_volume_scanner.WindowsVolumeScanner):
       ScannerError: if the scanner does not know how to proceed.
       UserAbort: if the user requested to abort.
     """
-    usernames = []
-
-    # TODO: handle alternative users path locations
-    self._users_path = '\\Users'
-    users_path_spec = self._path_resolver.ResolvePath(self._users_path)
-    if not users_path_spec:
-      self._users_path = '\\Documents and Settings'
-      users_path_spec = self._path_resolver.ResolvePath(self._users_path)
-
-    if users_path_spec:
-      users_file_entry = dfvfs_resolver.Resolver.OpenFileEntry(
-          users_path_spec)
-      for sub_file_entry in users_file_entry.sub_file_entries:
-        if sub_file_entry.IsDirectory():
-          usernames.append(sub_file_entry.name)
-
+    usernames = self._GetUsernames()
     if not usernames:
       return None
 
@@ -161,6 +670,318 @@ class WindowsRegistryVolumeScanner(dfvfs_volume_scanner.WindowsVolumeScanner):
 
     return username
 
+  def _GetUsernames(self):
+    """Determines the usernames from the user profile directories.
+
+    Returns:
+      list[str]: usernames.
+    """
+    usernames = []
+
+    # TODO: handle alternative users path locations
+    self._users_path = '\\Users'
+    users_path_spec = self._path_resolver.ResolvePath(self._users_path)
+    if not users_path_spec:
+      self._users_path = '\\Documents and Settings'
+      users_path_spec = self._path_resolver.ResolvePath(self._users_path)
+
+    if users_path_spec:
+      users_file_entry = dfvfs_resolver.Resolver.OpenFileEntry(
+          users_path_spec)
+      for sub_file_entry in users_file_entry.sub_file_entries:
+        if sub_file_entry.IsDirectory():
+          usernames.append(sub_file_entry.name)
+
+    return usernames
+
+  def _GetUserProfilePath(self, profile_path):
+    """Retrieves a user profile path relative to the root of the volume.
+
+    Args:
+      profile_path (str): user profile path, such as "C:\\Users\\user" or
+          "%SystemDrive%\\Users\\user".
+
+    Returns:
+      str: user profile path relative to the root of the volume, such as
+          "\\Users\\user" or None if not supported.
+    """
+    lower_profile_path = profile_path.lower()
+
+    if lower_profile_path.startswith('%systemdrive%\\'):
+      return profile_path[13:]
+
+    if lower_profile_path.startswith('%systemroot%\\'):
+      _, _, windows_directory = self._windows_directory.partition(':')
+      return f'{windows_directory:s}{profile_path[12:]:s}'
+
+    if len(profile_path) >= 3 and profile_path[1:3] == ':\\':
+      return profile_path[2:]
+
+    if profile_path.startswith('\\') and not profile_path.startswith('\\\\'):
+      return profile_path
+
+    return None
+
+  def _OpenFileSystem(self, file_system_path_spec, resolver_context=None):
+    """Opens a file system with its own dfvfs resolver context.
+
+    Since the file system does not share file objects with other file
+    systems, it can be read concurrently with them.
+
+    Args:
+      file_system_path_spec (dfvfs.PathSpec): path specification of the file
+          system that contains the Windows directory.
+      resolver_context (Optional[dfvfs.Context]): dfvfs resolver context,
+          where None represents a new resolver context.
+
+    Returns:
+      tuple[dfvfs.FileSystem, dfvfs.WindowsPathResolver]: file system and
+          Windows path resolver.
+
+    Raises:
+      BackEndError: if the file system cannot be opened.
+    """
+    if not resolver_context:
+      resolver_context = dfvfs_context.Context()
+
+    file_system = dfvfs_resolver.Resolver.OpenFileSystem(
+        file_system_path_spec, resolver_context=resolver_context)
+
+    if file_system_path_spec.type_indicator == (
+        dfvfs_definitions.TYPE_INDICATOR_OS):
+      mount_point = file_system_path_spec
+    else:
+      mount_point = file_system_path_spec.parent
+
+    path_resolver = dfvfs_windows_path_resolver.WindowsPathResolver(
+        file_system, mount_point)
+    path_resolver.SetEnvironmentVariable('SystemRoot', self._windows_directory)
+    path_resolver.SetEnvironmentVariable('WinDir', self._windows_directory)
+
+    return file_system, path_resolver
+
+  def _OpenRegistry(self, file_system, path_resolver):
+    """Opens a Windows Registry.
+
+    Args:
+      file_system (dfvfs.FileSystem): file system that contains the Windows
+          directory.
+      path_resolver (dfvfs.WindowsPathResolver): Windows path resolver.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry.
+    """
+    registry_file_reader = (
+        windows_registry.StorageMediaImageWindowsRegistryFileReader(
+            file_system, path_resolver))
+
+    if self._profiler:
+      registry_file_reader = profilers.ProfilingWindowsRegistryFileReader(
+          registry_file_reader, self._profiler)
+
+    return dfwinreg_registry.WinRegistry(
+        registry_file_reader=registry_file_reader)
+
+  def _OpenScanResult(self, source_path, scan_result):
+    """Opens the Windows volume of a cached volume scan result.
+
+    Args:
+      source_path (str): source path.
+      scan_result (VolumeScanResult): volume scan result.
+
+    Returns:
+      bool: True if the Windows volume was opened.
+    """
+    file_system_path_spec = scan_result.file_system_path_spec
+
+    try:
+      file_system = dfvfs_resolver.Resolver.OpenFileSystem(
+          file_system_path_spec)
+    except dfvfs_errors.Error as exception:
+      logging.warning((
+          f'Unable to open cached volume of: {source_path:s} with error: '
+          f'{exception!s}'))
+      return False
+
+    if file_system_path_spec.type_indicator == (
+        dfvfs_definitions.TYPE_INDICATOR_OS):
+      mount_point = file_system_path_spec
+    else:
+      mount_point = file_system_path_spec.parent
+
+    self._file_system = file_system
+    self._file_system_path_spec = file_system_path_spec
+    self._path_resolver = CachingWindowsPathResolver(
+        file_system, mount_point,
+        resolved_path_specs=scan_result.registry_file_path_specs)
+    self._source_path = source_path
+    self._source_type = scan_result.source_type
+    self._windows_directory = scan_result.windows_directory
+
+    self._path_resolver.SetEnvironmentVariable(
+        'SystemRoot', self._windows_directory)
+    self._path_resolver.SetEnvironmentVariable(
+        'WinDir', self._windows_directory)
+
+    return True
+
+  def Close(self):
+    """Closes the file systems opened to read the snapshots.
+
+    Also closes the prefetched Windows Registry files that were not opened.
+    The Windows Registries returned by OpenSnapshotRegistry can no longer be
+    used afterwards.
+    """
+    while self._file_systems_per_snapshot:
+      _, file_system_tuple = self._file_systems_per_snapshot.popitem()
+      file_system_tuple[2].Empty()
+
+    if self._prefetching_file_reader:
+      self._prefetching_file_reader.Close()
+      self._prefetching_file_reader = None
+
+  def GetRegistryFileHash(self, path, snapshot_identifier=None):
+    """Calculates the SHA-256 hash of the content of a Windows Registry file.
+
+    Args:
+      path (str): Windows path of the Windows Registry file, such as
+          "%SystemRoot%\\System32\\config\\SYSTEM".
+      snapshot_identifier (Optional[str]): identifier of the Volume Shadow
+          Copy snapshot, such as "vss1", where None represents the current
+          volume.
+
+    Returns:
+      str: hexadecimal SHA-256 hash or None if the Windows Registry file is
+          not available.
+    """
+    if self._single_file or not self._file_system_path_spec:
+      return None
+
+    file_system, path_resolver = self._GetSnapshotFileSystem(
+        snapshot_identifier)
+    if not file_system:
+      return None
+
+    path_spec = path_resolver.ResolvePath(path)
+    if not path_spec:
+      return None
+
+    file_object = file_system.GetFileObjectByPathSpec(path_spec)
+    if not file_object:
+      return None
+
+    hash_context = hashlib.sha256()
+
+    file_object.seek(0, os.SEEK_SET)
+    data = file_object.read(self._READ_BUFFER_SIZE)
+    while data:
+      hash_context.update(data)
+      data = file_object.read(self._READ_BUFFER_SIZE)
+
+    return hash_context.hexdigest()
+
+  def GetRegistryFileSize(self, path):
+    """Retrieves the size of a Windows Registry file.
+
+    Args:
+      path (str): Windows path of the Windows Registry file, such as
+          "%SystemRoot%\\System32\\config\\SYSTEM" or
+          "\\Users\\user\\NTUSER.DAT".
+
+    Returns:
+      int: size of the Windows Registry file in bytes or None if the Windows
+          Registry file is not available.
+    """
+    if self._single_file or not self._path_resolver:
+      return None
+
+    path_spec = self._path_resolver.ResolvePath(path)
+    if not path_spec:
+      return None
+
+    file_entry = self._file_system.GetFileEntryByPathSpec(path_spec)
+    if not file_entry:
+      return None
+
+    return file_entry.size
+
+  def GetSnapshotIdentifiers(self):
+    """Retrieves the identifiers of the Volume Shadow Copy snapshots.
+
+    Returns:
+      list[str]: identifiers of the snapshots of the volume that contains
+          the Windows directory, such as "vss1", from oldest to newest.
+    """
+    if self._snapshot_identifiers is not None:
+      return self._snapshot_identifiers
+
+    self._snapshot_identifiers = []
+
+    if (self._single_file or not self._file_system_path_spec or
+        not self._file_system_path_spec.HasParent()):
+      return self._snapshot_identifiers
+
+    volume_path_spec = self._file_system_path_spec.parent
+    if volume_path_spec.type_indicator == (
+        dfvfs_definitions.TYPE_INDICATOR_VSHADOW):
+      return self._snapshot_identifiers
+
+    try:
+      type_indicators = (
+          dfvfs_analyzer.Analyzer.GetVolumeSystemTypeIndicators(
+              volume_path_spec))
+    except dfvfs_errors.Error as exception:
+      logging.warning(
+          f'Unable to scan for Volume Shadow Copies with error: {exception!s}')
+      return self._snapshot_identifiers
+
+    if dfvfs_definitions.TYPE_INDICATOR_VSHADOW not in type_indicators:
+      return self._snapshot_identifiers
+
+    vshadow_path_spec = dfvfs_path_spec_factory.Factory.NewPathSpec(
+        dfvfs_definitions.TYPE_INDICATOR_VSHADOW, location='/',
+        parent=volume_path_spec)
+
+    file_entry = dfvfs_resolver.Resolver.OpenFileEntry(vshadow_path_spec)
+    for sub_file_entry in file_entry.sub_file_entries:
+      self._snapshot_identifiers.append(sub_file_entry.name)
+      self._snapshot_path_specs[sub_file_entry.name] = sub_file_entry.path_spec
+
+    return self._snapshot_identifiers
+
+  def GetUserProfiles(self):
+    """Retrieves the user profiles of the Windows volume.
+
+    The user profiles are read from the ProfileList key of the SOFTWARE
+    Registry file. If not available, the directories in the users directory
+    are used as user profiles without a security identifier.
+
+    Returns:
+      list[UserProfile]: user profiles, where the profile path is relative to
+          the root of the volume, such as "\\Users\\user".
+    """
+    if self._single_file or not self._path_resolver:
+      return []
+
+    user_profiles = []
+
+    collector_object = profiles.UserProfilesCollector()
+    for user_profile in collector_object.Collect(self.registry):
+      profile_path = None
+      if user_profile.profile_path:
+        profile_path = self._GetUserProfilePath(user_profile.profile_path)
+
+      if profile_path:
+        user_profiles.append(profiles.UserProfile(
+            user_profile.security_identifier, profile_path))
+
+    if not user_profiles:
+      for username in self._GetUsernames():
+        user_profiles.append(profiles.UserProfile(
+            None, f'{self._users_path:s}\\{username:s}'))
+
+    return user_profiles
+
   def IsSingleFileRegistry(self):
     """Determines if the Registry consists of a single file.
 
@@ -169,9 +990,63 @@ class WindowsRegistryVolumeScanner(dfvfs_volume_scanner.WindowsVolumeScanner):
     """
     return self._single_file
 
+  def OpenSnapshotRegistry(self, snapshot_identifier):
+    """Opens the Windows Registry of a Volume Shadow Copy snapshot.
+
+    The file system of each snapshot is opened with its own dfvfs resolver
+    context, so that the Windows Registries of multiple snapshots can be read
+    concurrently. The file system is shared with GetRegistryFileHash and kept
+    open until Close.
+
+    Args:
+      snapshot_identifier (str): identifier of the Volume Shadow Copy
+          snapshot, such as "vss1".
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry of the snapshot or None if
+          the snapshot is not available.
+    """
+    if self._single_file or not self._file_system_path_spec:
+      return None
+
+    file_system, path_resolver = self._GetSnapshotFileSystem(
+        snapshot_identifier)
+    if not file_system:
+      return None
+
+    return self._OpenRegistry(file_system, path_resolver)
+
+  def OpenUserRegistry(self, user_profile):
+    """Opens the Windows Registry of a user.
+
+    The file system is opened with its own dfvfs resolver context, so that
+    the Windows Registries of multiple users can be read concurrently.
+
+    Args:
+      user_profile (UserProfile): user profile, where the profile path is
+          relative to the root of the volume.
+
+    Returns:
+      dfwinreg.WinRegistry: Windows Registry of the user or None if
+          the Windows volume was not found.
+    """
+    if self._single_file or not self._file_system_path_spec:
+      return None
+
+    file_system, path_resolver = self._OpenFileSystem(
+        self._file_system_path_spec)
+    path_resolver.SetEnvironmentVariable(
+        'UserProfile', user_profile.profile_path)
+
+    return self._OpenRegistry(file_system, path_resolver)
+
   def ScanForWindowsVolume(self, source_path, options=None):
     """Scans for a Windows volume.
 
+    When a volume scan cache is used, a previously found Windows volume and
+    the locations of its system Registry files are used instead of scanning
+    the source.
+
     Args:
       source_path (str): source path.
       options (Optional[VolumeScannerOptions]): volume scanner options. If None
@@ -186,8 +1061,40 @@ class WindowsRegistryVolumeScanner(dfvfs_volume_scanner.WindowsVolumeScanner):
           is not a file or directory, or if the format of or within
           the source file is not supported.
     """
-    result = super(WindowsRegistryVolumeScanner, self).ScanForWindowsVolume(
-        source_path, options=options)
+    if self._profiler:
+      self._profiler.StartTiming('volume scan')
+
+    try:
+      scan_result = None
+      if self._scan_cache:
+        scan_result = self._scan_cache.GetScanResult(source_path, options)
+
+      result = False
+      if scan_result:
+        result = self._OpenScanResult(source_path, scan_result)
+
+      if not result:
+        result = super(
+            WindowsRegistryVolumeScanner, self).ScanForWindowsVolume(
+                source_path, options=options)
+
+        if result:
+          if self._source_type == dfvfs_definitions.SOURCE_TYPE_DIRECTORY:
+            self._file_system_path_spec = (
+                dfvfs_path_spec_factory.Factory.NewPathSpec(
+                    dfvfs_definitions.TYPE_INDICATOR_OS,
+                    location=os.path.abspath(source_path)))
+          else:
+            self._file_system_path_spec = (
+                self._file_system.GetRootFileEntry().path_spec)
+
+        if result and self._scan_cache:
+          scan_result = self._GetScanResult()
+          self._scan_cache.SetScanResult(source_path, options, scan_result)
+
+    finally:
+      if self._profiler:
+        self._profiler.StopTiming('volume scan')
 
     registry_file_reader = None
     if self._source_type == dfvfs_definitions.SOURCE_TYPE_FILE:
@@ -201,11 +1108,31 @@ class WindowsRegistryVolumeScanner(dfvfs_volume_scanner.WindowsVolumeScanner):
         self._path_resolver.SetEnvironmentVariable(
             'UserProfile', f'{self._users_path:s}\\{username:s}')
 
-      registry_file_reader = (
-          windows_registry.StorageMediaImageWindowsRegistryFileReader(
-              self._file_system, self._path_resolver))
+      if self._number_of_prefetch_workers > 0:
+        registry_file_reader = PrefetchingWindowsRegistryFileReader(
+            self._file_system, self._path_resolver,
+            number_of_workers=self._number_of_prefetch_workers)
+        self._prefetching_file_reader = registry_file_reader
+
+        if self._profiler:
+          self._profiler.StartTiming('hive prefetch')
+
+        try:
+          registry_file_reader.Prefetch(paths=self._prefetch_paths)
+        finally:
+          if self._profiler:
+            self._profiler.StopTiming('hive prefetch')
+
+      else:
+        registry_file_reader = (
+            windows_registry.StorageMediaImageWindowsRegistryFileReader(
+                self._file_system, self._path_resolver))
 
     if registry_file_reader:
+      if self._profiler:
+        registry_file_reader = profilers.ProfilingWindowsRegistryFileReader(
+            registry_file_reader, self._profiler)
+
       self.registry = dfwinreg_registry.WinRegistry(
           registry_file_reader=registry_file_reader)
 